@@ -0,0 +1,104 @@
+"""
+各スクリプト・モジュールの import にかかる時間を計測するベンチマーク。
+
+`python -X importtime` を別プロセスで実行し、対象モジュールの import 時間（累積）と、
+時間のかかっている依存パッケージの上位を表示する。
+FORBIDDEN に挙げた依存パッケージを import 時に読み込んでいるモジュールがあれば、終了コード 1 で終了する。
+ディスクキャッシュの影響を減らすため、同じモジュールを複数回計測して最小値を使う。
+
+実行例:
+    python benchmark/s3_operations/bench_import.py --modules config utils upload --top 5
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# 実行スクリプトと同じ import 解決ができるように検索パスを追加する
+ROOT_DIR = Path(__file__).resolve().parents[2]
+SEARCH_PATH = [str(ROOT_DIR), str(ROOT_DIR / "s3_operations")]
+
+DEFAULT_MODULES = ["config", "custom_log", "utils", "url_checker", "upload", "delete"]
+
+# import 時に読み込んではいけない依存パッケージ（設定ファイルの読込・クライアント生成は初回の参照時に行う）
+FORBIDDEN = {
+    "config": ["yaml", "boto3", "botocore"],
+    "utils": ["yaml", "boto3", "botocore"],
+}
+
+
+def measure(code: str) -> dict[str, tuple[int, int]]:
+    """
+    コードを新しいプロセスで実行し、-X importtime の出力を解析する。
+
+    Args:
+        code (str): 実行するコード（ import 文 ）。
+
+    Returns:
+        dict[str, tuple[int, int]]: モジュール名ごとの (自身の時間, 累積時間)（マイクロ秒）。
+
+    Raises:
+        subprocess.CalledProcessError: import に失敗した場合。
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(SEARCH_PATH))
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    timings = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    # インタープリタの起動時に読み込まれるモジュールは集計から除く
+    startup = set(measure("pass"))
+
+    violations = []
+    for module in args.modules:
+        runs = [measure(f"import {module}") for _ in range(args.repeat)]
+        best = min(runs, key=lambda timings: timings[module][1])
+        total_ms = best[module][1] / 1000
+
+        # 最上位のパッケージ単位で累積時間を集計する（サブモジュールは親に含まれる）
+        packages = {
+            name: cumulative
+            for name, (_, cumulative) in best.items()
+            if "." not in name and name != module and name not in startup
+        }
+        heaviest = sorted(packages.items(), key=lambda item: item[1], reverse=True)
+
+        print(f"{module:<12} {total_ms:8.1f} ms")
+        for name, cumulative in heaviest[: args.top]:
+            print(f"    {name:<24} {cumulative / 1000:8.1f} ms")
+
+        violations += [
+            f"{module} : {name}" for name in FORBIDDEN.get(module, []) if name in best
+        ]
+
+    if violations:
+        print("import 時に読み込んではいけないパッケージを読み込んでいます:")
+        for violation in violations:
+            print(f"    {violation}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
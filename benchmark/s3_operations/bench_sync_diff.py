@@ -0,0 +1,88 @@
+"""
+同期の差分計算（ソート済み一覧の突き合わせ）の処理時間と使用メモリを計測するベンチマーク。
+
+ローカル・S3 の一覧を模したジェネレーターを diff_listings() で突き合わせ、
+全件を辞書にまとめて比較する方法と、所要時間・ピークメモリ（tracemalloc）を比較する。
+件数を増やしても突き合わせのピークメモリが変わらないことを確認できる。
+
+実行例:
+    python benchmark/s3_operations/bench_sync_diff.py --counts 100000 1000000
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+
+# 実行スクリプトと同じ import 解決ができるように検索パスを追加する
+ROOT_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT_DIR / "s3_operations"))
+
+from listing_index import ObjectRecord  # noqa: E402
+from resource_index import ResourceFile  # noqa: E402
+from sync_diff import diff_listings  # noqa: E402
+
+
+def local_files(count: int):
+    """ローカルファイル（3の倍数番目は S3 とサイズが異なる）。"""
+    for i in range(count):
+        size = 2 if i % 3 == 0 else 1
+        yield f"site/{i:09d}.png", ResourceFile(f"/files/{i:09d}.png", size, 0)
+
+
+def remote_objects(count: int):
+    """S3 オブジェクト（偶数番号のみ。ローカルと半数が重なり、残りは S3 にのみ存在する）。"""
+    for i in range(0, count * 2, 2):
+        yield f"site/{i:09d}.png", ObjectRecord(1, "etag", 0.0)
+
+
+def merge(count: int) -> Counter:
+    counts = Counter()
+    for _ in diff_listings(local_files(count), remote_objects(count), counts):
+        pass
+    return counts
+
+
+def dict_of_everything(count: int) -> Counter:
+    local = dict(local_files(count))
+    remote = dict(remote_objects(count))
+    counts = Counter()
+    for key, resource_file in local.items():
+        record = remote.get(key)
+        if record is None:
+            counts["new"] += 1
+        elif record.size == resource_file.size:
+            counts["matched"] += 1
+        else:
+            counts["changed"] += 1
+    counts["deleted"] = len(remote.keys() - local.keys())
+    return counts
+
+
+def measure(func, count: int) -> tuple[float, float, Counter]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    counts = func(count)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024, counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--counts", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'method':<20} {'count':>10} {'sec':>8} {'peak MB':>10}")
+    for count in args.counts:
+        for name, func in [("sorted merge", merge), ("dict", dict_of_everything)]:
+            elapsed, peak_mb, counts = measure(func, count)
+            print(f"{name:<20} {count:>10} {elapsed:8.2f} {peak_mb:10.1f}")
+        print(f"{'':<20} {dict(counts)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+ファイルサイズごとの転送プロファイルの効果を計測するベンチマーク。
+
+ローカルの S3 スタンドイン（moto server）に対して、同じファイルを
+s3transfer の既定値と転送プロファイルの設定でそれぞれアップロードし、所要時間を比較する。
+転送プロファイルは config.yml の upload.transfer_profiles を使い、
+未設定の場合は SAMPLE_PROFILES（ config.sample.yml と同じ内容 ）を使う。
+
+実行例:
+    python benchmark/s3_operations/bench_transfer.py --sizes-mb 1 100 2048 --latency-ms 30
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from moto.server import ThreadedMotoServer
+
+# 実行スクリプトと同じ import 解決ができるように検索パスを追加する
+ROOT_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT_DIR))
+sys.path.insert(0, str(ROOT_DIR / "s3_operations"))
+
+from bench_upload import create_bucket, create_client  # noqa: E402
+from hashing import get_default_transfer_config  # noqa: E402
+from transfer_profiles import MB, TransferProfiles  # noqa: E402
+from upload import UPLOAD_TRANSFER_PROFILES, upload_one  # noqa: E402
+
+SAMPLE_PROFILES = [
+    {"max_size_mb": 16, "multipart_threshold_mb": 64, "use_threads": False},
+    {
+        "max_size_mb": 1024,
+        "multipart_threshold_mb": 16,
+        "multipart_chunksize_mb": 16,
+        "max_concurrency": 8,
+    },
+    {
+        "multipart_threshold_mb": 64,
+        "multipart_chunksize_mb": 64,
+        "max_concurrency": 16,
+    },
+]
+
+
+def create_file(directory: Path, size: int) -> Path:
+    """指定サイズのファイルを 1MB 単位のランダムデータで生成する。"""
+    path = directory / f"bench_{size}.bin"
+    block = os.urandom(MB)
+    with open(path, "wb") as f:
+        for _ in range(size // MB):
+            f.write(block)
+        f.write(block[: size % MB])
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes-mb",
+        type=int,
+        nargs="+",
+        default=[1, 100, 2048],
+        help="ファイルサイズ（MB）",
+    )
+    parser.add_argument("--latency-ms", type=float, default=30.0, help="擬似遅延（ms）")
+    parser.add_argument("--port", type=int, default=5056, help="moto server のポート")
+    args = parser.parse_args()
+
+    # moto server のアクセスログを抑制する
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+
+    transfer_profiles = TransferProfiles(UPLOAD_TRANSFER_PROFILES or SAMPLE_PROFILES)
+
+    server = ThreadedMotoServer(port=args.port, verbose=False)
+    server.start()
+    endpoint_url = f"http://127.0.0.1:{args.port}"
+
+    try:
+        client = create_client(
+            endpoint_url, transfer_profiles.max_concurrency, args.latency_ms / 1000
+        )
+        create_bucket(client)
+
+        print(f"latency={args.latency_ms}ms")
+        print(f"{'size':>8} {'config':>8} {'seconds':>9} {'MB/s':>9}")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            for size_mb in args.sizes_mb:
+                size = size_mb * MB
+                path = create_file(Path(tmp), size)
+
+                for label, transfer_config in [
+                    ("default", get_default_transfer_config()),
+                    ("profile", transfer_profiles.select(size)),
+                ]:
+                    item = {
+                        "resource_file": str(path),
+                        "key": f"bench/{label}/{path.name}",
+                        "extra_args": {"ContentType": "application/octet-stream"},
+                        "transfer_config": transfer_config,
+                    }
+
+                    started = time.perf_counter()
+                    ok, result = upload_one(client, item)
+                    elapsed = time.perf_counter() - started
+
+                    assert ok, result
+                    print(
+                        f"{size_mb:>6}MB {label:>8} {elapsed:>9.2f}"
+                        f" {size_mb / elapsed:>9.1f}"
+                    )
+
+                path.unlink()
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+upload_s3_object の並列数ごとのスループットを計測するベンチマーク。
+
+ローカルの S3 スタンドイン（moto server）に対してアップロードを行う。
+ローカル通信では実環境のネットワーク遅延が再現されないため、
+リクエスト送信前に擬似的な遅延（--latency-ms）を挿入して計測する。
+
+実行例:
+    python benchmark/s3_operations/bench_upload.py --files 256 --latency-ms 30
+"""
+
+import argparse
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from moto.server import ThreadedMotoServer
+
+# 実行スクリプトと同じ import 解決ができるように検索パスを追加する
+ROOT_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT_DIR))
+sys.path.insert(0, str(ROOT_DIR / "s3_operations"))
+
+from upload import S3_BUCKET, upload_s3_object  # noqa: E402
+from utils import create_s3_client  # noqa: E402
+
+WORKER_STEPS = [1, 2, 4, 8, 16, 32, 64]
+
+
+def create_files(directory: Path, count: int, size: int) -> list[dict]:
+    """ベンチマーク用のファイルを生成し、アップロード情報のリストを返す。"""
+    payload = b"x" * size
+    items = []
+    for i in range(count):
+        resource_file = directory / f"bench_{i}.bin"
+        resource_file.write_bytes(payload)
+        items.append(
+            {
+                "resource_file": str(resource_file),
+                "key": f"bench/bench_{i}.bin",
+                "extra_args": {"ContentType": "application/octet-stream"},
+            }
+        )
+    return items
+
+
+def create_client(endpoint_url: str, max_workers: int, latency: float):
+    """moto server 向けのクライアントを取得し、擬似遅延を挿入する。"""
+    client = create_s3_client(
+        max_pool_connections=max_workers, endpoint_url=endpoint_url
+    )
+
+    # クライアントはキャッシュされるため、同じクライアントに遅延を重ねて登録しない
+    if latency > 0:
+        client.meta.events.register(
+            "before-send.s3.*",
+            lambda **kwargs: time.sleep(latency),
+            unique_id="bench-latency",
+        )
+
+    return client
+
+
+def create_bucket(client) -> None:
+    """ベンチマーク用のバケットを作成する（作成済みの場合は何もしない）。"""
+    region = client.meta.region_name
+    kwargs = {}
+    if region != "us-east-1":
+        kwargs["CreateBucketConfiguration"] = {"LocationConstraint": region}
+
+    try:
+        client.create_bucket(Bucket=S3_BUCKET, **kwargs)
+    except client.exceptions.BucketAlreadyOwnedByYou:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=256, help="ファイル数")
+    parser.add_argument(
+        "--size", type=int, default=16 * 1024, help="1ファイルのバイト数"
+    )
+    parser.add_argument("--latency-ms", type=float, default=30.0, help="擬似遅延（ms）")
+    parser.add_argument("--port", type=int, default=5055, help="moto server のポート")
+    args = parser.parse_args()
+
+    # moto server のアクセスログを抑制する
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+
+    server = ThreadedMotoServer(port=args.port, verbose=False)
+    server.start()
+    endpoint_url = f"http://127.0.0.1:{args.port}"
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            items = create_files(Path(tmp), args.files, args.size)
+
+            print(f"files={args.files} size={args.size}B latency={args.latency_ms}ms")
+            print(f"{'workers':>8} {'seconds':>9} {'files/s':>9} {'speedup':>8}")
+
+            baseline = None
+            for workers in WORKER_STEPS:
+                client = create_client(endpoint_url, workers, args.latency_ms / 1000)
+                create_bucket(client)
+
+                started = time.perf_counter()
+                succeed_items, failure_list = upload_s3_object(
+                    client, items, max_workers=workers
+                )
+                elapsed = time.perf_counter() - started
+
+                assert not failure_list, failure_list
+                assert len(succeed_items) == len(items)
+
+                baseline = baseline or elapsed
+                print(
+                    f"{workers:>8} {elapsed:>9.2f} {len(items) / elapsed:>9.1f}"
+                    f" {baseline / elapsed:>7.1f}x"
+                )
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
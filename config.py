@@ -1,4 +1,5 @@
-import yaml
+from functools import lru_cache
+from pathlib import Path
 
 from s3_operations.custom_log import handle_exception
 
@@ -19,6 +20,8 @@ def load_config() -> dict:
     Raises:
         ValueError: 'environment'キーが存在しない、または'environments'に含まれていない場合に発生します。
     """
+    import yaml
+
     with open(CONFIG_FILE, "r", encoding="utf-8") as file:
         config = yaml.safe_load(file)
         environment = config.get("environment")
@@ -50,9 +53,20 @@ def report_config(file_name: str, messages: list[str]) -> None:
     print("====================================")
 
 
-# 設定をロード
-try:
-    CONFIG: dict = load_config()
+def build_settings(config: dict) -> dict:
+    """
+    設定ファイルの内容から、各処理で参照する設定値（大文字の名前）を組み立てます。
+
+    Args:
+        config (dict): load_config() で読み込んだ設定の辞書。
+
+    Returns:
+        dict: 設定名と値の辞書。
+
+    Raises:
+        KeyError: 必須の設定項目が存在しない場合に発生します。
+    """
+    CONFIG: dict = config
 
     # 現在の環境設定を取得
     ENVIRONMENT: str = CONFIG["environment"]
@@ -73,13 +87,189 @@ try:
     UPLOAD_FILE_LIST: str = CONFIG["data"]["params"]["upload_file_list"]
     RESOURCE: str = CONFIG["data"]["resources"]["files"]
     UPLOAD_RESULT: str = CONFIG["data"]["logs"]["upload_results"]
+    VERIFY_RESULT: str = CONFIG["data"]["logs"].get(
+        "verify_results", str(Path(UPLOAD_RESULT).with_name("verify_results.txt"))
+    )
+    SYNC_RESULT: str = CONFIG["data"]["logs"].get(
+        "sync_results", str(Path(UPLOAD_RESULT).with_name("sync_results.txt"))
+    )
+    MOVE_LIST: str = CONFIG["data"]["params"].get(
+        "move_list", str(Path(DELETE_URL_LIST).with_name("move_list.txt"))
+    )
+    COPY_RESULT: str = CONFIG["data"]["logs"].get(
+        "copy_results", str(Path(DELETE_RESULT).with_name("copy_results.txt"))
+    )
+    MOVE_RESULT: str = CONFIG["data"]["logs"].get(
+        "move_results", str(Path(DELETE_RESULT).with_name("move_results.txt"))
+    )
+
+    # ジャーナル・再実行用リスト・計測値の設定（未設定の場合は結果ファイルと同じディレクトリに作成）
+    DELETE_JOURNAL: str = CONFIG["data"]["logs"].get(
+        "delete_journal", str(Path(DELETE_RESULT).with_suffix(".journal.jsonl"))
+    )
+    UPLOAD_JOURNAL: str = CONFIG["data"]["logs"].get(
+        "upload_journal", str(Path(UPLOAD_RESULT).with_suffix(".journal.jsonl"))
+    )
+    VERIFY_JOURNAL: str = CONFIG["data"]["logs"].get(
+        "verify_journal", str(Path(VERIFY_RESULT).with_suffix(".journal.jsonl"))
+    )
+    SYNC_JOURNAL: str = CONFIG["data"]["logs"].get(
+        "sync_journal", str(Path(SYNC_RESULT).with_suffix(".journal.jsonl"))
+    )
+    COPY_JOURNAL: str = CONFIG["data"]["logs"].get(
+        "copy_journal", str(Path(COPY_RESULT).with_suffix(".journal.jsonl"))
+    )
+    MOVE_JOURNAL: str = CONFIG["data"]["logs"].get(
+        "move_journal", str(Path(MOVE_RESULT).with_suffix(".journal.jsonl"))
+    )
+    DELETE_RETRY_LIST: str = CONFIG["data"]["logs"].get(
+        "delete_retry_list", str(Path(DELETE_RESULT).with_name("delete_retry_list.txt"))
+    )
+    UPLOAD_RETRY_LIST: str = CONFIG["data"]["logs"].get(
+        "upload_retry_list", str(Path(UPLOAD_RESULT).with_name("upload_retry_list.txt"))
+    )
+    VERIFY_RETRY_LIST: str = CONFIG["data"]["logs"].get(
+        "verify_retry_list", str(Path(VERIFY_RESULT).with_name("verify_retry_list.txt"))
+    )
+    SYNC_RETRY_LIST: str = CONFIG["data"]["logs"].get(
+        "sync_retry_list", str(Path(SYNC_RESULT).with_name("sync_retry_list.txt"))
+    )
+    COPY_RETRY_LIST: str = CONFIG["data"]["logs"].get(
+        "copy_retry_list", str(Path(COPY_RESULT).with_name("copy_retry_list.txt"))
+    )
+    MOVE_RETRY_LIST: str = CONFIG["data"]["logs"].get(
+        "move_retry_list", str(Path(MOVE_RESULT).with_name("move_retry_list.txt"))
+    )
+    DELETE_METRICS: str = CONFIG["data"]["logs"].get(
+        "delete_metrics", str(Path(DELETE_RESULT).with_name("delete_metrics.jsonl"))
+    )
+    UPLOAD_METRICS: str = CONFIG["data"]["logs"].get(
+        "upload_metrics", str(Path(UPLOAD_RESULT).with_name("upload_metrics.jsonl"))
+    )
+    VERIFY_METRICS: str = CONFIG["data"]["logs"].get(
+        "verify_metrics", str(Path(VERIFY_RESULT).with_name("verify_metrics.jsonl"))
+    )
+    SYNC_METRICS: str = CONFIG["data"]["logs"].get(
+        "sync_metrics", str(Path(SYNC_RESULT).with_name("sync_metrics.jsonl"))
+    )
+    COPY_METRICS: str = CONFIG["data"]["logs"].get(
+        "copy_metrics", str(Path(COPY_RESULT).with_name("copy_metrics.jsonl"))
+    )
+    MOVE_METRICS: str = CONFIG["data"]["logs"].get(
+        "move_metrics", str(Path(MOVE_RESULT).with_name("move_metrics.jsonl"))
+    )
+    RESULTS_CONFIG: dict = CONFIG.get("results") or {}
+    RESULT_FORMAT: str = RESULTS_CONFIG.get("format", "text")
+    LOGGING_CONFIG: dict = CONFIG.get("logging") or {}
+    LOGGING_LEVEL: str = LOGGING_CONFIG.get("level", "INFO")
+    LOGGING_FORMAT: str = LOGGING_CONFIG.get("format", "text")
+    LOGGING_DEBUG_SUMMARY_INTERVAL: float = float(
+        LOGGING_CONFIG.get("debug_summary_interval", 0)
+    )
+    JOURNAL_CONFIG: dict = CONFIG.get("journal") or {}
+    JOURNAL_SYNC_EVERY: int = int(JOURNAL_CONFIG.get("sync_every", 500))
+    JOURNAL_SYNC_INTERVAL: float = float(JOURNAL_CONFIG.get("sync_interval", 1.0))
+
+    # 並列処理の設定（未設定の場合は逐次処理）
+    CONCURRENCY_CONFIG: dict = CONFIG.get("concurrency") or {}
+    UPLOAD_MAX_WORKERS: int = int(CONCURRENCY_CONFIG.get("upload_workers", 1))
+    VERIFY_MAX_WORKERS: int = int(CONCURRENCY_CONFIG.get("verify_workers", 1))
+    VERIFY_LIMIT_PER_HOST: int = int(CONCURRENCY_CONFIG.get("verify_per_host", 20))
+    DELETE_MAX_WORKERS: int = int(CONCURRENCY_CONFIG.get("delete_workers", 1))
+    COPY_MAX_WORKERS: int = int(CONCURRENCY_CONFIG.get("copy_workers", 1))
+    BATCH_SIZE: int = int(CONCURRENCY_CONFIG.get("batch_size", 1000))
+    QUEUE_SIZE: int = int(CONCURRENCY_CONFIG.get("queue_size", 0))
+
+    # 流量制御の設定（未設定の場合は同時実行数を固定し、転送速度は無制限）
+    RATE_CONTROL_CONFIG: dict = CONFIG.get("rate_control") or {}
+    RATE_CONTROL_ADAPTIVE: bool = bool(RATE_CONTROL_CONFIG.get("adaptive", False))
+    RATE_CONTROL_MIN_WORKERS: int = int(RATE_CONTROL_CONFIG.get("min_workers", 1))
+    RATE_CONTROL_MAX_WORKERS: int = int(RATE_CONTROL_CONFIG.get("max_workers", 32))
+    RATE_CONTROL_MAX_BYTES_PER_SECOND: float = (
+        float(RATE_CONTROL_CONFIG.get("max_mb_per_second", 0)) * 1024 * 1024
+    )
+
+    # S3 クライアントの設定（未設定の場合は botocore の既定値）
+    S3_CLIENT_CONFIG: dict = CONFIG.get("s3_client") or {}
+    S3_ENDPOINT_URL: str | None = S3_CLIENT_CONFIG.get("endpoint_url") or None
+    S3_MAX_POOL_CONNECTIONS: int = int(S3_CLIENT_CONFIG.get("max_pool_connections", 10))
+    S3_CONNECT_TIMEOUT: float = float(S3_CLIENT_CONFIG.get("connect_timeout", 60))
+    S3_READ_TIMEOUT: float = float(S3_CLIENT_CONFIG.get("read_timeout", 60))
+    S3_TCP_KEEPALIVE: bool = bool(S3_CLIENT_CONFIG.get("tcp_keepalive", False))
+    S3_RETRY_MODE: str | None = S3_CLIENT_CONFIG.get("retry_mode")
+    S3_MAX_ATTEMPTS: int | None = (
+        int(S3_CLIENT_CONFIG["max_attempts"])
+        if S3_CLIENT_CONFIG.get("max_attempts")
+        else None
+    )
+
+    # アップロードの設定
+    UPLOAD_CONFIG: dict = CONFIG.get("upload") or {}
+    UPLOAD_INCREMENTAL: bool = bool(UPLOAD_CONFIG.get("incremental", False))
+    UPLOAD_MIRROR_KEYS: bool = bool(UPLOAD_CONFIG.get("mirror_keys", False))
+    UPLOAD_METADATA_RULES: list[dict] = UPLOAD_CONFIG.get("metadata_rules") or []
+    UPLOAD_TRANSFER_PROFILES: list[dict] = UPLOAD_CONFIG.get("transfer_profiles") or []
+
+    # マニフェストの設定（未設定の場合は使用せず、差分判定のたびに S3 の一覧を取得する）
+    MANIFEST_CONFIG: dict = CONFIG.get("manifest") or {}
+    MANIFEST_PATH: str = MANIFEST_CONFIG.get("path") or ""
+
+    # ハッシュ計算の設定（未設定の場合はプロセスを分けずに計算し、キャッシュしない）
+    HASHING_CONFIG: dict = CONFIG.get("hashing") or {}
+    HASH_WORKERS: int = int(HASHING_CONFIG.get("workers", 1))
+    HASH_CACHE_PATH: str = HASHING_CONFIG.get("cache") or ""
+
+    # 削除前のバックアップの設定（未設定の場合はバックアップせずに削除する）
+    BACKUP_CONFIG: dict = CONFIG.get("backup") or {}
+    BACKUP_PATH: str = BACKUP_CONFIG.get("path") or ""
+    BACKUP_MAX_WORKERS: int = int(BACKUP_CONFIG.get("workers", 16))
+    BACKUP_PART_SIZE: int = int(
+        float(BACKUP_CONFIG.get("part_size_mb", 8)) * 1024 * 1024
+    )
+
+    # 同期の設定（未設定の場合はバケット直下と同期し、S3 からは削除しない）
+    SYNC_CONFIG: dict = CONFIG.get("sync") or {}
+    SYNC_PREFIX: str = SYNC_CONFIG.get("prefix") or ""
+    SYNC_DELETE: bool = bool(SYNC_CONFIG.get("delete", False))
 
     # 設定内容の確認出力用
     CONFIG_SUMMARY: list[str] = [
         f"✅ Using `{ENVIRONMENT}` environment",
         f"✅ Bucket Name: {S3_BUCKET}",
+        f"✅ Upload Workers: {UPLOAD_MAX_WORKERS}",
+        f"✅ Incremental Upload: {UPLOAD_INCREMENTAL}",
+        f"✅ Adaptive Concurrency: {RATE_CONTROL_ADAPTIVE}",
+        f"✅ Retry Mode: {S3_RETRY_MODE or 'legacy'}",
     ]
 
-except Exception as e:
-    handle_exception(e, CONTEXT)
-    raise SystemExit(1)
+    return {name: value for name, value in locals().items() if name.isupper()}
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> dict:
+    """
+    設定ファイルを読み込み、設定値の辞書を返します。
+
+    初回の呼び出し時にだけ読み込み、以降は同じ辞書を返します。
+
+    Returns:
+        dict: 設定名と値の辞書。
+    """
+    try:
+        return build_settings(load_config())
+    except Exception as e:
+        handle_exception(e, CONTEXT)
+        raise SystemExit(1)
+
+
+def __getattr__(name: str):
+    """
+    config.S3_BUCKET のような設定値の参照を、初回参照時の読み込み結果から返します。
+
+    import しただけでは設定ファイルを読み込まないため、起動時の待ち時間が短くなります。
+    """
+    if name.isupper():
+        settings = get_settings()
+        if name in settings:
+            return settings[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
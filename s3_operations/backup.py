@@ -0,0 +1,338 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import PurePosixPath
+from typing import TYPE_CHECKING, TextIO
+
+from custom_log import record_metrics
+from listing_index import ObjectRecord
+
+import config
+
+if TYPE_CHECKING:
+    from botocore.client import BaseClient
+
+# アーカイブ内の、オブジェクトごとの情報（1行1件の JSON）を記録する索引
+INDEX_FILE = "index.jsonl"
+
+# アーカイブ内の、オブジェクトを S3 キーの階層で保存するディレクトリ
+OBJECTS_DIR = "objects"
+
+# ダウンロード中のファイルの拡張子（すべてのパートを書き込んでから名前を変える）
+PARTIAL_SUFFIX = ".partial"
+
+# レスポンスの本文を読み込む単位
+READ_CHUNK_SIZE = 1024 * 1024
+
+# 復元時に ExtraArgs として指定する、GET のレスポンスの項目
+ARCHIVED_HEADERS = (
+    "CacheControl",
+    "ContentDisposition",
+    "ContentEncoding",
+    "ContentLanguage",
+    "ContentType",
+    "Metadata",
+)
+
+
+class Archive:
+    """
+    削除前に保存したオブジェクトのアーカイブ（ S3 キーの階層のファイルと、索引 ）。
+
+    索引には保存が完了したオブジェクトだけを1行ずつ追記する。複数スレッドから呼び出してよい。
+    """
+
+    def __init__(self, root: str):
+        """
+        Args:
+            root (str): アーカイブのディレクトリ。
+        """
+        self.root = root
+        self.index_path = os.path.join(root, INDEX_FILE)
+        self.index: TextIO | None = None
+        self.lock = threading.Lock()
+
+    @classmethod
+    def create(cls, base: str) -> Archive:
+        """
+        実行日時のサブディレクトリに新しいアーカイブを作成する。
+
+        Args:
+            base (str): アーカイブを作成するディレクトリ（ backup.path ）。
+
+        Returns:
+            Archive: 作成したアーカイブ。
+        """
+        name = time.strftime("%Y%m%d-%H%M%S")
+        root = os.path.join(base, name)
+        suffix = 1
+        while os.path.exists(root):
+            root = os.path.join(base, f"{name}-{suffix}")
+            suffix += 1
+        os.makedirs(root)
+        return cls(root)
+
+    def __enter__(self) -> Archive:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """索引を閉じる。"""
+        with self.lock:
+            if self.index is not None:
+                self.index.close()
+                self.index = None
+
+    def object_path(self, s3_key: str) -> str:
+        """
+        オブジェクトを保存するファイルのパスを返す。
+
+        アーカイブの外を指さないよう、キーに含まれる "." / ".." / 空の階層は除く。
+
+        Args:
+            s3_key (str): S3 オブジェクトキー。
+
+        Returns:
+            str: 保存先のファイルのパス。
+        """
+        parts = [p for p in PurePosixPath(s3_key).parts if p not in ("/", ".", "..")]
+        return os.path.join(self.root, OBJECTS_DIR, *parts)
+
+    def add(self, entry: dict) -> None:
+        """
+        保存が完了したオブジェクトの情報を索引に追記する（1件ごとに書き出す）。
+
+        Args:
+            entry (dict): オブジェクトの情報（key, size, etag, version_id, headers）。
+        """
+        line = json.dumps(entry, ensure_ascii=False)
+        with self.lock:
+            if self.index is None:
+                self.index = open(self.index_path, "a", encoding="utf-8")
+            self.index.write(f"{line}\n")
+            self.index.flush()
+
+    def iter_entries(self) -> Iterator[dict]:
+        """
+        索引に記録したオブジェクトの情報を1件ずつ返す。
+
+        Yields:
+            dict: オブジェクトの情報（key, size, etag, version_id, headers）。
+        """
+        with open(self.index_path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+class ObjectDownload:
+    """
+    1オブジェクト分のダウンロードの状態（書き込み先・GET のレスポンスの情報・失敗理由）。
+
+    範囲指定の GET は別々のスレッドで、書き込み先のファイルの各位置へ直接書き込む。
+    """
+
+    def __init__(
+        self, s3_client: BaseClient, s3_key: str, record: ObjectRecord, path: str
+    ):
+        """
+        Args:
+            s3_client (BaseClient): boto3のS3クライアント。
+            s3_key (str): S3 オブジェクトキー。
+            record (ObjectRecord): 一覧取得で得たオブジェクトの情報（サイズ・ETag）。
+            path (str): 保存先のファイルのパス。
+        """
+        self.s3_client = s3_client
+        self.key = s3_key
+        self.record = record
+        self.path = path
+        self.partial_path = path + PARTIAL_SUFFIX
+        self.headers: dict = {}
+        self.version_id: str | None = None
+        self.error: str | None = None
+        self.lock = threading.Lock()
+
+    def prepare(self) -> None:
+        """書き込み先のファイルをオブジェクトのサイズで作成する。"""
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.partial_path, "wb") as f:
+                f.truncate(self.record.size)
+        except OSError as e:
+            self.fail(str(e))
+
+    def fail(self, reason: str) -> None:
+        """最初の失敗理由を記録する（以降のパートはダウンロードしない）。"""
+        with self.lock:
+            self.error = self.error or reason
+
+    def fetch(self, start: int, end: int | None) -> None:
+        """
+        オブジェクトの指定範囲を GET し、ファイルの同じ位置へ書き込む（ワーカースレッド）。
+
+        一覧取得時と内容が変わっていないことを ETag（ IfMatch ）で確認する。
+
+        Args:
+            start (int): 範囲の先頭のバイト位置。
+            end (int | None): 範囲の末尾のバイト位置（含む）。None の場合は範囲を指定しない。
+        """
+        if self.error is not None:
+            return
+
+        started = time.monotonic()
+        written = 0
+        try:
+            extra = {} if end is None else {"Range": f"bytes={start}-{end}"}
+            response = self.s3_client.get_object(
+                Bucket=config.S3_BUCKET,
+                Key=self.key,
+                IfMatch=f'"{self.record.etag}"',
+                **extra,
+            )
+            fd = os.open(self.partial_path, os.O_WRONLY)
+            try:
+                for chunk in response["Body"].iter_chunks(READ_CHUNK_SIZE):
+                    os.pwrite(fd, chunk, start + written)
+                    written += len(chunk)
+            finally:
+                os.close(fd)
+
+            expected = self.record.size - start if end is None else end - start + 1
+            if written != expected:
+                raise OSError(f"{written} / {expected} バイトしか取得できませんでした")
+
+            if start == 0:
+                with self.lock:
+                    self.headers = {
+                        name: response[name]
+                        for name in ARCHIVED_HEADERS
+                        if response.get(name)
+                    }
+                    self.version_id = response.get("VersionId")
+        except Exception as e:
+            self.fail(str(e))
+
+        record_metrics(items=0, nbytes=written, latency=time.monotonic() - started)
+
+    def finish(self, archive: Archive) -> None:
+        """
+        すべてのパートを書き込んだファイルを保存先の名前に変え、索引に記録する。
+
+        失敗した場合は書き込み途中のファイルを削除する。
+
+        Args:
+            archive (Archive): 記録先のアーカイブ。
+        """
+        if self.error is None:
+            try:
+                os.replace(self.partial_path, self.path)
+            except OSError as e:
+                self.fail(str(e))
+
+        if self.error is not None:
+            if os.path.exists(self.partial_path):
+                os.remove(self.partial_path)
+            return
+
+        archive.add(
+            {
+                "key": self.key,
+                "size": self.record.size,
+                "etag": self.record.etag,
+                "version_id": self.version_id,
+                "headers": self.headers,
+            }
+        )
+
+
+def byte_ranges(size: int, part_size: int) -> list[tuple[int, int | None]]:
+    """
+    範囲指定の GET の範囲を返す。
+
+    Args:
+        size (int): オブジェクトのバイト数。
+        part_size (int): 1回の GET のバイト数。
+
+    Returns:
+        list[tuple[int, int | None]]: 先頭・末尾（含む）のバイト位置。
+            part_size 以下のオブジェクトは範囲を指定しない1回の GET（末尾 None）。
+    """
+    if size <= part_size:
+        return [(0, None)]
+    return [
+        (start, min(start + part_size, size) - 1) for start in range(0, size, part_size)
+    ]
+
+
+def backup_objects(
+    s3_client: BaseClient,
+    objects: list[tuple[str, ObjectRecord]],
+    archive: Archive,
+    max_workers: int | None = None,
+    part_size: int | None = None,
+) -> dict[str, str]:
+    """
+    オブジェクトの最新バージョンをアーカイブへ保存する。
+
+    大きいオブジェクトは範囲指定の GET に分け、全オブジェクトのパートを1つのスレッドプールで
+    並行してダウンロードするため、同時接続数は合計で max_workers に収まる。
+
+    Args:
+        s3_client (BaseClient): boto3のS3クライアント。
+        objects (list[tuple[str, ObjectRecord]]): S3 キーと一覧取得で得たオブジェクトの情報。
+        archive (Archive): 保存先のアーカイブ。
+        max_workers (int | None, optional): GET の同時実行数の上限。
+            省略時は config.yml の backup.workers に従う。
+        part_size (int | None, optional): 範囲指定の GET 1回あたりのバイト数。
+            省略時は config.yml の backup.part_size_mb に従う。
+
+    Returns:
+        dict[str, str]: 保存に失敗したキーと失敗理由の辞書。
+    """
+    max_workers = config.BACKUP_MAX_WORKERS if max_workers is None else max_workers
+    part_size = config.BACKUP_PART_SIZE if part_size is None else part_size
+
+    downloads = [
+        ObjectDownload(s3_client, s3_key, record, archive.object_path(s3_key))
+        for s3_key, record in objects
+    ]
+
+    tasks = []
+    for download in downloads:
+        download.prepare()
+        tasks.extend(
+            (download, start, end)
+            for start, end in byte_ranges(download.record.size, part_size)
+        )
+
+    def fetch(task: tuple[ObjectDownload, int, int | None]) -> None:
+        download, start, end = task
+        download.fetch(start, end)
+
+    if max_workers <= 1:
+        for task in tasks:
+            fetch(task)
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(fetch, tasks))
+
+    errors = {}
+    for download in downloads:
+        download.finish(archive)
+        if download.error is not None:
+            logging.debug(
+                f"{download.key} : バックアップに失敗しました: {download.error}"
+            )
+            errors[download.key] = download.error
+        else:
+            record_metrics(items=1)
+
+    return errors
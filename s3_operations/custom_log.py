@@ -1,7 +1,19 @@
+import atexit
+import json
 import logging
+import math
+import os
+import queue
+import re
+import threading
+import time
 import traceback
-
-from botocore.exceptions import ClientError, NoCredentialsError, PartialCredentialsError
+import unicodedata
+from array import array
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 
 LOG_FORMAT = {
     "message": "%(asctime)s [ %(levelname)s ] %(message)s",
@@ -15,6 +27,18 @@ LOG_FORMAT = {
     },
 }
 
+# ログの出力形式
+LOG_STYLES = ["text", "json"]
+
+# DEBUG 指定時も INFO 以上だけを出力するライブラリのロガー（リクエストごとの詳細ログが大量に出るため）
+QUIET_LOGGERS = ["boto3", "botocore", "s3transfer", "urllib3", "aiohttp", "asyncio"]
+
+# DEBUG ログを間引く場合に、出力箇所ごと・1区間あたりにそのまま出力する件数
+DEBUG_SUMMARY_BURST = 10
+
+# JSON 形式で出力する際に取り除く色指定（ANSI エスケープシーケンス）
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*m")
+
 
 class ColorFormatter(logging.Formatter):
     """
@@ -33,9 +57,8 @@ class ColorFormatter(logging.Formatter):
     }
 
     def format(self, record):
-        # メッセージの中に suffix の start や end が含まれていれば色を強制的に青にする
-        msg = str(record.getMessage())
-        if LOG_FORMAT["suffix"]["start"] in msg or LOG_FORMAT["suffix"]["end"] in msg:
+        # start() / end() の通知（ highlight 指定あり）は色を強制的に青にする
+        if getattr(record, "highlight", False):
             color = LOG_FORMAT["color"]["blue"]
         else:
             color = self.COLOR_MAP.get(record.levelno, "")
@@ -44,32 +67,585 @@ class ColorFormatter(logging.Formatter):
         return f"{color}{original_msg}{reset}"
 
 
-def setup_logger():
+class JsonFormatter(logging.Formatter):
+    """
+    ログを1行1レコードの JSON に整形するフォーマッター（ログ収集基盤などでの機械処理用）。
+    """
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created).astimezone().isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": ANSI_ESCAPE.sub("", record.getMessage()),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class DebugSummaryFilter(logging.Filter):
+    """
+    1件ごとに出力される DEBUG ログを、出力箇所ごとに一定間隔で間引くフィルター。
+
+    出力箇所（ファイル・行）ごとに、interval 秒の区間内で最初の burst 件だけを通し、残りは破棄する。
+    破棄した件数は次の区間の最初のログに付記し、flush() でも出力する。
+    INFO 以上のログは間引かない。
+    """
+
+    def __init__(self, interval: float, burst: int = DEBUG_SUMMARY_BURST):
+        """
+        Args:
+            interval (float): 間引きの区間（秒）。
+            burst (int, optional): 1区間あたりにそのまま出力する件数。
+        """
+        super().__init__()
+        self.interval = interval
+        self.burst = burst
+        self.lock = threading.Lock()
+        # 出力箇所ごとの [区間の開始時刻, 区間内の件数, 破棄した件数]
+        self.windows: dict[tuple[str, int], list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or getattr(record, "debug_summary", False):
+            return True
+
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self.lock:
+            window = self.windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                suppressed = window[2] if window else 0
+                self.windows[key] = [now, 1, 0]
+                if suppressed:
+                    record.msg = f"{record.msg} （直前の区間で同じ箇所のログ {suppressed} 件を省略）"
+                return True
+
+            window[1] += 1
+            if window[1] <= self.burst:
+                return True
+            window[2] += 1
+            return False
+
+    def flush(self) -> list[str]:
+        """
+        まだ報告していない破棄件数を、出力箇所ごとのメッセージとして返す。
+
+        Returns:
+            list[str]: 破棄件数のメッセージ。
+        """
+        with self.lock:
+            messages = [
+                f"{os.path.basename(path)}:{lineno} : DEBUG ログ {window[2]} 件を省略しました"
+                for (path, lineno), window in self.windows.items()
+                if window[2]
+            ]
+            self.windows.clear()
+        return messages
+
+
+class StageMetrics:
+    """
+    処理段階1つ分の計測値。
+
+    所要時間（実時間）・処理件数・転送バイト数と、リクエストごとのレイテンシを保持する。
+    同じ名前の段階に複数回入った場合（バッチごとの処理など）は合算する。
+    キューで接続した段階（ stream.run_stream ）では、取り出し時の入力キューの滞留数も保持する。
+    """
+
+    def __init__(self, name: str, depth: int = 0):
+        """
+        Args:
+            name (str): 処理段階の名前（各スクリプトの CONTEXT の値）。
+            depth (int, optional): 入れ子の深さ（最上位は 0）。
+        """
+        self.name = name
+        self.depth = depth
+        self.elapsed = 0.0
+        self.items = 0
+        self.bytes = 0
+        self.failed = False
+        self.latencies = array("d")
+        self.queue_depths = array("I")
+        # 並行して処理中のワーカー数と、最初のワーカーが処理を始めた時刻（ bind() 用 ）
+        self.workers = 0
+        self.opened_at = 0.0
+
+    def percentiles(self, *points: float) -> list[float | None]:
+        """
+        リクエストごとのレイテンシのパーセンタイル（最近傍順位法）を返す。
+
+        Args:
+            *points (float): 求めるパーセンタイル（0〜100）。
+
+        Returns:
+            list[float | None]: 各パーセンタイルのレイテンシ（秒）。記録がない場合は None。
+        """
+        if not self.latencies:
+            return [None for _ in points]
+
+        ordered = sorted(self.latencies)
+        return [
+            ordered[max(0, math.ceil(len(ordered) * point / 100) - 1)]
+            for point in points
+        ]
+
+    def rate(self, amount: int) -> float | None:
+        """
+        1秒あたりの処理量を返す。
+
+        Args:
+            amount (int): 処理件数またはバイト数。
+
+        Returns:
+            float | None: 1秒あたりの処理量。処理量または所要時間が 0 の場合は None。
+        """
+        return amount / self.elapsed if amount and self.elapsed else None
+
+    def queue_depth(self) -> tuple[float | None, int | None]:
+        """
+        入力キューの滞留数の平均と最大を返す。
+
+        Returns:
+            tuple[float | None, int | None]: 平均と最大。記録がない場合は None。
+        """
+        if not self.queue_depths:
+            return None, None
+        return sum(self.queue_depths) / len(self.queue_depths), max(self.queue_depths)
+
+    def to_dict(self) -> dict:
+        """
+        計測値を JSON に書き出せる辞書で返す。
+
+        Returns:
+            dict: 計測値（時間は秒、レイテンシはミリ秒）。記録がない値は None。
+        """
+        p50, p95, p99 = self.percentiles(50, 95, 99)
+        queue_avg, queue_max = self.queue_depth()
+        return {
+            "stage": self.name,
+            "depth": self.depth,
+            "seconds": round(self.elapsed, 6),
+            "items": self.items,
+            "bytes": self.bytes,
+            "items_per_second": self.rate(self.items),
+            "bytes_per_second": self.rate(self.bytes),
+            "requests": len(self.latencies),
+            "p50_ms": None if p50 is None else p50 * 1000,
+            "p95_ms": None if p95 is None else p95 * 1000,
+            "p99_ms": None if p99 is None else p99 * 1000,
+            "queue_avg": queue_avg,
+            "queue_max": queue_max,
+            "failed": self.failed,
+        }
+
+
+class MetricsRecorder:
+    """
+    スクリプト1回分の処理段階ごとの計測値を集計する。
+
+    stage() で囲んだ処理の所要時間を計測し、その間に record() された件数・バイト数・
+    レイテンシを実行中の最も内側の段階に加算する。ワーカースレッドから record() してよい。
+    並行して動く段階のワーカーは bind() で段階を指定し、そのスレッドの記録を振り分ける。
+    """
+
+    def __init__(self):
+        self.local = threading.local()
+        self.reset()
+
+    def reset(self, metrics_file: str | None = None) -> None:
+        """
+        計測値を破棄し、新しい実行の計測を始める。
+
+        Args:
+            metrics_file (str | None, optional): end() で計測値を追記する JSON Lines ファイル。
+        """
+        self.lock = threading.Lock()
+        self.stages: dict[str, StageMetrics] = {}
+        self.active: list[StageMetrics] = []
+        self.metrics_file = metrics_file
+        self.started_at = datetime.now().astimezone().isoformat(timespec="seconds")
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageMetrics]:
+        """
+        処理段階の所要時間を計測する。
+
+        例外が発生した場合も所要時間を記録し、失敗した段階として扱う。
+
+        Args:
+            name (str): 処理段階の名前。
+
+        Yields:
+            StageMetrics: 処理段階の計測値。
+        """
+        with self.lock:
+            metrics = self.get_stage_locked(name)
+            self.active.append(metrics)
+
+        started = time.perf_counter()
+        try:
+            yield metrics
+        except BaseException:
+            metrics.failed = True
+            raise
+        finally:
+            with self.lock:
+                metrics.elapsed += time.perf_counter() - started
+                self.active.remove(metrics)
+
+    def get_stage(self, name: str) -> StageMetrics:
+        """
+        処理段階の計測値を返す。初めての段階は実行中の段階の内側に作成する。
+
+        Args:
+            name (str): 処理段階の名前。
+
+        Returns:
+            StageMetrics: 処理段階の計測値。
+        """
+        with self.lock:
+            return self.get_stage_locked(name)
+
+    def get_stage_locked(self, name: str) -> StageMetrics:
+        """get_stage() の本体（ロック取得済みで呼び出す）。"""
+        metrics = self.stages.get(name)
+        if metrics is None:
+            metrics = StageMetrics(name, depth=len(self.active))
+            self.stages[name] = metrics
+        return metrics
+
+    @contextmanager
+    def bind(self, metrics: StageMetrics) -> Iterator[StageMetrics]:
+        """
+        実行中のスレッドの record() を、指定した処理段階に加算するようにする。
+
+        同じ段階に複数のワーカーが bind() した場合、所要時間は最初のワーカーが始めてから
+        最後のワーカーが終わるまでの実時間とする。
+
+        Args:
+            metrics (StageMetrics): get_stage() で取得した処理段階の計測値。
+
+        Yields:
+            StageMetrics: 処理段階の計測値。
+        """
+        with self.lock:
+            if metrics.workers == 0:
+                metrics.opened_at = time.perf_counter()
+            metrics.workers += 1
+
+        previous = getattr(self.local, "metrics", None)
+        self.local.metrics = metrics
+        try:
+            yield metrics
+        except BaseException:
+            metrics.failed = True
+            raise
+        finally:
+            self.local.metrics = previous
+            with self.lock:
+                metrics.workers -= 1
+                if metrics.workers == 0:
+                    metrics.elapsed += time.perf_counter() - metrics.opened_at
+
+    def record(
+        self, items: int = 1, nbytes: int = 0, latency: float | None = None
+    ) -> None:
+        """
+        実行中の処理段階に件数・バイト数・リクエスト1件のレイテンシを加算する。
+
+        bind() したスレッドでは、その段階に加算する。計測中の段階がない場合は何もしない。
+
+        Args:
+            items (int, optional): 処理件数。
+            nbytes (int, optional): 転送バイト数。
+            latency (float | None, optional): リクエスト1件の所要時間（秒）。
+        """
+        with self.lock:
+            metrics = getattr(self.local, "metrics", None)
+            if metrics is None:
+                if not self.active:
+                    return
+                metrics = self.active[-1]
+            metrics.items += items
+            metrics.bytes += nbytes
+            if latency is not None:
+                metrics.latencies.append(latency)
+
+    def record_queue(self, depth: int) -> None:
+        """
+        bind() した処理段階に、取り出し時の入力キューの滞留数を記録する。
+
+        Args:
+            depth (int): 入力キューに残っている件数。
+        """
+        metrics = getattr(self.local, "metrics", None)
+        if metrics is not None:
+            with self.lock:
+                metrics.queue_depths.append(depth)
+
+    def summary(self) -> list[str]:
+        """
+        処理段階ごとの計測値を表形式の行で返す。
+
+        キューで接続した段階がある場合は、入力キューの滞留数（平均/最大）の列も出力する。
+
+        Returns:
+            list[str]: 見出し行と、処理段階ごとの行。
+        """
+        with_queue = any(metrics.queue_depths for metrics in self.stages.values())
+        rows = [
+            [
+                "stage",
+                "sec",
+                "items",
+                "MB",
+                "items/s",
+                "MB/s",
+                "p50 ms",
+                "p95 ms",
+                "p99 ms",
+                *(["queue avg/max"] if with_queue else []),
+            ]
+        ]
+        for metrics in self.stages.values():
+            values = metrics.to_dict()
+            queue_avg, queue_max = metrics.queue_depth()
+            rows.append(
+                [
+                    "  " * metrics.depth
+                    + metrics.name
+                    + (" (失敗)" if metrics.failed else ""),
+                    f"{metrics.elapsed:.3f}",
+                    str(metrics.items),
+                    f"{metrics.bytes / 1024 / 1024:.1f}",
+                    format_rate(values["items_per_second"], 1),
+                    format_rate(values["bytes_per_second"], 1024 * 1024),
+                    *(
+                        format_rate(values[key], 1)
+                        for key in ["p50_ms", "p95_ms", "p99_ms"]
+                    ),
+                    *(
+                        ["-" if queue_max is None else f"{queue_avg:.1f}/{queue_max}"]
+                        if with_queue
+                        else []
+                    ),
+                ]
+            )
+
+        widths = [
+            max(display_width(row[i]) for row in rows) for i in range(len(rows[0]))
+        ]
+        return [
+            " | ".join(
+                pad(value, width, left=(i == 0))
+                for i, (value, width) in enumerate(zip(row, widths))
+            )
+            for row in rows
+        ]
+
+    def write(self, path: str) -> None:
+        """
+        計測値を JSON Lines ファイルに1行（1回の実行分）追記する。
+
+        Args:
+            path (str): 書き出し先のパス。
+        """
+        record = {
+            "started_at": self.started_at,
+            "stages": [metrics.to_dict() for metrics in self.stages.values()],
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def format_rate(value: float | None, unit: float) -> str:
+    """計測値を単位で割って表示用に整形する。値がない場合は "-" を返す。"""
+    return "-" if value is None else f"{value / unit:.1f}"
+
+
+def display_width(text: str) -> int:
+    """全角文字を2桁として、端末に表示したときの幅を返す。"""
+    return sum(2 if unicodedata.east_asian_width(c) in "WF" else 1 for c in text)
+
+
+def pad(text: str, width: int, left: bool = False) -> str:
+    """表示幅が width になるよう空白で埋める。left が False の場合は右寄せにする。"""
+    spaces = " " * (width - display_width(text))
+    return text + spaces if left else spaces + text
+
+
+# 実行中のスクリプトの計測値
+METRICS = MetricsRecorder()
+
+
+def stage(context: str):
+    """
+    処理段階の所要時間・件数・バイト数・レイテンシを計測するコンテキストマネージャーを返す。
+
+    Args:
+        context (str): 処理段階の名前（例: CONTEXT["process_upload"]）。
+
+    Returns:
+        ContextManager[StageMetrics]: 計測中の処理段階。
+    """
+    return METRICS.stage(context)
+
+
+def bind_stage(metrics: StageMetrics):
+    """
+    実行中のスレッドの計測値を、指定した処理段階に加算するコンテキストマネージャーを返す。
+
+    Args:
+        metrics (StageMetrics): get_stage() で取得した処理段階の計測値。
+
+    Returns:
+        ContextManager[StageMetrics]: 計測中の処理段階。
+    """
+    return METRICS.bind(metrics)
+
+
+def get_stage(context: str) -> StageMetrics:
+    """
+    処理段階の計測値を返す。初めての段階は実行中の段階の内側に作成する。
+
+    Args:
+        context (str): 処理段階の名前。
+
+    Returns:
+        StageMetrics: 処理段階の計測値。
+    """
+    return METRICS.get_stage(context)
+
+
+def record_queue_depth(depth: int) -> None:
+    """
+    実行中のスレッドの処理段階に、入力キューの滞留数を記録する。
+
+    Args:
+        depth (int): 入力キューに残っている件数。
+    """
+    METRICS.record_queue(depth)
+
+
+def record_metrics(
+    items: int = 1, nbytes: int = 0, latency: float | None = None
+) -> None:
+    """
+    実行中の処理段階に件数・バイト数・リクエスト1件のレイテンシを加算する。
+
+    Args:
+        items (int, optional): 処理件数。
+        nbytes (int, optional): 転送バイト数。
+        latency (float | None, optional): リクエスト1件の所要時間（秒）。
+    """
+    METRICS.record(items=items, nbytes=nbytes, latency=latency)
+
+
+# ログを書き出すバックグラウンドスレッドと、その入力キュー
+LOG_QUEUE: queue.Queue | None = None
+LOG_LISTENER: QueueListener | None = None
+
+
+def setup_logger(
+    level: str = "INFO", style: str = "text", debug_summary_interval: float = 0.0
+):
     """
     ルートロガーに対してコンソール出力用のハンドラーを設定する。
 
-    - ログレベルは DEBUG に設定される（すべてのログが対象）。
-    - コンソール出力は INFO レベル以上のログを表示。
+    - 各スレッドはログをキューに積むだけで、整形と書き出しはバックグラウンドスレッドで行う。
+      並列処理中のワーカーがコンソール出力のロックで待たされないようにするため。
+    - ログレベルは level に設定される（既定は INFO 以上を出力）。
+      level 未満のログは生成されないため、1件ごとの DEBUG ログのコストもかからない。
     - すでにハンドラーが設定されている場合は再設定を行わず、処理をスキップする。
 
     この関数は冪等に設計されており、複数回呼び出してもハンドラーの重複追加は起こらない。
+    プロセス終了時には stop_logger() でキューに残ったログを書き出す。
+
+    Args:
+        level (str, optional): 出力するログレベル（DEBUG / INFO / WARNING / ERROR）。
+        style (str, optional): 出力形式（text / json）。json の場合は1行1レコードの JSON で出力する。
+        debug_summary_interval (float, optional): 0 より大きい場合、DEBUG ログを出力箇所ごとに
+            この秒数の区間で間引き、省略した件数だけを出力する。
+
+    Raises:
+        ValueError: 未対応のログレベル・出力形式が指定された場合。
     """
+    global LOG_QUEUE, LOG_LISTENER
+
     logger = logging.getLogger()
 
     # ハンドラーがセットアップ済みであれば、処理をスキップする
     if logger.hasHandlers():
         return
 
-    logger.setLevel(logging.DEBUG)
-    formatter = ColorFormatter(LOG_FORMAT["message"])
+    log_level = logging.getLevelName(str(level).upper())
+    if not isinstance(log_level, int):
+        raise ValueError(f"logging.level : {level} : 未対応のログレベルです")
+    if style not in LOG_STYLES:
+        raise ValueError(
+            f"logging.format : {style} : 出力形式は {LOG_STYLES} から指定してください"
+        )
+
+    logger.setLevel(log_level)
+    for name in QUIET_LOGGERS:
+        logging.getLogger(name).setLevel(max(log_level, logging.INFO))
 
-    # コンソールハンドラー設定（ INFO 以上を書き出す ）
+    if style == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = ColorFormatter(LOG_FORMAT["message"])
+
+    # コンソールハンドラー設定（バックグラウンドスレッドで level 以上を書き出す）
     console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
+    console_handler.setLevel(log_level)
     console_handler.setFormatter(formatter)
 
-    # ロガーにハンドラーを追加
-    logger.addHandler(console_handler)
+    # ロガーにはキューへ積むだけのハンドラーを追加
+    LOG_QUEUE = queue.Queue()
+    queue_handler = QueueHandler(LOG_QUEUE)
+    if debug_summary_interval > 0:
+        queue_handler.addFilter(DebugSummaryFilter(debug_summary_interval))
+    logger.addHandler(queue_handler)
+
+    LOG_LISTENER = QueueListener(LOG_QUEUE, console_handler, respect_handler_level=True)
+    LOG_LISTENER.start()
+    atexit.unregister(stop_logger)
+    atexit.register(stop_logger)
+
+
+def flush_logger() -> None:
+    """キューに積まれたログがすべて書き出されるまで待機する。"""
+    if LOG_QUEUE is not None and LOG_LISTENER is not None:
+        LOG_QUEUE.join()
+
+
+def stop_logger() -> None:
+    """
+    キューに残ったログと DEBUG ログの省略件数を書き出し、バックグラウンドスレッドを止める。
+
+    ルートロガーからキュー用のハンドラーを外すため、再度 setup_logger() を呼び出せる。
+    """
+    global LOG_QUEUE, LOG_LISTENER
+
+    if LOG_LISTENER is None:
+        return
+
+    logger = logging.getLogger()
+    for handler in [h for h in logger.handlers if isinstance(h, QueueHandler)]:
+        for log_filter in handler.filters:
+            if isinstance(log_filter, DebugSummaryFilter):
+                for message in log_filter.flush():
+                    logging.debug(message, extra={"debug_summary": True})
+        logger.removeHandler(handler)
+
+    LOG_LISTENER.stop()
+    for handler in LOG_LISTENER.handlers:
+        handler.close()
+    LOG_QUEUE = None
+    LOG_LISTENER = None
 
 
 def handle_exception(e: Exception, context: str = "処理"):
@@ -80,6 +656,12 @@ def handle_exception(e: Exception, context: str = "処理"):
         e (Exception): 捕捉した例外
         context (str): 処理内容（例: 'S3削除'、'アップロード'）
     """
+    from botocore.exceptions import (
+        ClientError,
+        NoCredentialsError,
+        PartialCredentialsError,
+    )
+
     suffix = LOG_FORMAT["suffix"]["failure"]
 
     # s3クライアント生成時のエラー
@@ -124,15 +706,42 @@ def notify(context: str):
     logging.info(f"[{context}] {suffix}")
 
 
-def start():
+def start(metrics_file: str | None = None):
+    """
+    開始を通知し、処理段階ごとの計測を始める。
+
+    Args:
+        metrics_file (str | None, optional): 終了時に計測値を追記する JSON Lines ファイル。
+    """
+    METRICS.reset(metrics_file)
+
     suffix = LOG_FORMAT["suffix"]["start"]
     context = "-------------------------------"
     message = "START"
-    logging.info(f"[{context}] {message}{suffix}")
+    logging.info(f"[{context}] {message}{suffix}", extra={"highlight": True})
 
 
 def end():
+    """
+    処理段階ごとの計測値を表で出力して終了を通知する。
+
+    start() で metrics_file を指定した場合は、計測値をファイルにも追記する。
+    キューに積まれたログがすべて書き出されてから戻る。
+    """
+    if METRICS.stages:
+        logging.info("\n".join(["[処理時間]", *METRICS.summary()]))
+        if METRICS.metrics_file:
+            try:
+                METRICS.write(METRICS.metrics_file)
+            except OSError as e:
+                logging.warning(
+                    f"{METRICS.metrics_file} : 計測値を書き出せませんでした: {e}"
+                )
+
     suffix = LOG_FORMAT["suffix"]["end"]
     context = "-------------------------------"
     message = "END"
-    logging.info(f"[{context}] {message}{suffix}\n")
+    logging.info(f"[{context}] {message}{suffix}\n", extra={"highlight": True})
+
+    # 後続の print（結果ファイルの出力など）とログの順序が入れ替わらないようにする
+    flush_logger()
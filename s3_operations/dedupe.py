@@ -0,0 +1,185 @@
+import hashlib
+import math
+import sqlite3
+
+# ハッシュ値の桁数（バイト）。完全一致判定と Bloom フィルターの両方で使用する
+DIGEST_SIZE = 16
+
+# 一時データベースへまとめて書き込む件数
+FLUSH_SIZE = 10_000
+
+
+def digest(value: str) -> bytes:
+    """
+    文字列の固定長ハッシュ値を返す。
+
+    Args:
+        value (str): 対象の文字列。
+
+    Returns:
+        bytes: DIGEST_SIZE バイトのハッシュ値。
+    """
+    return hashlib.blake2b(value.encode("utf-8"), digest_size=DIGEST_SIZE).digest()
+
+
+class BloomFilter:
+    """
+    固定サイズのビット配列で集合の所属を判定する Bloom フィルター。
+
+    メモリ使用量は要素数に関係なく一定。偽陽性（未登録を登録済みと判定）は
+    error_rate 程度の確率で起こるが、偽陰性は起こらない。
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        """
+        Args:
+            capacity (int): 想定する最大要素数。
+            error_rate (float): capacity 件登録時の偽陽性率。
+        """
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def positions(self, value_digest: bytes) -> list[int]:
+        """
+        ハッシュ値からビット位置を求める（ダブルハッシュ法）。
+
+        Args:
+            value_digest (bytes): digest() で求めたハッシュ値。
+
+        Returns:
+            list[int]: ビット位置のリスト。
+        """
+        h1 = int.from_bytes(value_digest[:8], "little")
+        h2 = int.from_bytes(value_digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, value_digest: bytes) -> bool:
+        """
+        要素を登録する。
+
+        Args:
+            value_digest (bytes): digest() で求めたハッシュ値。
+
+        Returns:
+            bool: 登録済み（と判定された）場合は False、新規に登録した場合は True。
+        """
+        added = False
+        for position in self.positions(value_digest):
+            byte, bit = divmod(position, 8)
+            if not self.bits[byte] & (1 << bit):
+                self.bits[byte] |= 1 << bit
+                added = True
+        return added
+
+
+class Deduplicator:
+    """
+    大量の行から重複を取り除くための判定器。
+
+    max_exact 件まではハッシュ値の集合で判定し、それを超えたらハッシュ値を一時ファイルの
+    SQLite データベースへ移してメモリ使用量を頭打ちにする。
+    切り替え後は固定サイズの Bloom フィルターで未登録の行を先に判定し、登録済みと判定された行
+    （偽陽性を含む）だけをデータベースで確認するため、未登録の行を重複と判定することはない。
+    """
+
+    def __init__(
+        self,
+        max_exact: int = 100_000,
+        capacity: int = 5_000_000,
+        error_rate: float = 1e-7,
+    ):
+        """
+        Args:
+            max_exact (int, optional): 正確に判定する最大件数。
+            capacity (int, optional): Bloom フィルターで想定する最大件数。
+            error_rate (float, optional): Bloom フィルターの偽陽性率。
+        """
+        self.max_exact = max_exact
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.exact: set[bytes] | None = set()
+        self.bloom: BloomFilter | None = None
+        self.store: sqlite3.Connection | None = None
+        self.pending: set[bytes] = set()
+        self.duplicates = 0
+
+    def close(self) -> None:
+        """一時データベースを閉じる（ファイルは削除される）。"""
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
+    def flush(self) -> None:
+        """未書き込みのハッシュ値を一時データベースへ書き込む。"""
+        if self.pending:
+            with self.store:
+                self.store.executemany(
+                    "INSERT OR IGNORE INTO seen (digest) VALUES (?)",
+                    ((value_digest,) for value_digest in self.pending),
+                )
+            self.pending.clear()
+
+    def seen(self, value_digest: bytes) -> bool:
+        """
+        切り替え後に、ハッシュ値が登録済みかどうかを正確に判定する。
+
+        Args:
+            value_digest (bytes): digest() で求めたハッシュ値。
+
+        Returns:
+            bool: 登録済みであれば True。
+        """
+        if value_digest in self.pending:
+            return True
+        row = self.store.execute(
+            "SELECT 1 FROM seen WHERE digest = ?", (value_digest,)
+        ).fetchone()
+        return row is not None
+
+    def switch_to_store(self) -> None:
+        """メモリ上の集合を Bloom フィルターと一時データベースへ移し替える。"""
+        self.bloom = BloomFilter(self.capacity, self.error_rate)
+        # ファイル名が空の場合、SQLite は閉じると削除される一時ファイルを作成する
+        self.store = sqlite3.connect("")
+        self.store.execute("CREATE TABLE seen (digest BLOB PRIMARY KEY) WITHOUT ROWID")
+        for exact_digest in self.exact:
+            self.bloom.add(exact_digest)
+        self.pending = self.exact
+        self.exact = None
+        self.flush()
+
+    def add(self, value: str) -> bool:
+        """
+        行を登録し、初めて現れた行かどうかを返す。
+
+        Args:
+            value (str): 対象の行。
+
+        Returns:
+            bool: 初めて現れた行であれば True、重複であれば False。
+        """
+        value_digest = digest(value)
+
+        if self.bloom is not None:
+            # Bloom フィルターで登録済みと判定された場合だけ、データベースで確認する
+            added = self.bloom.add(value_digest) or not self.seen(value_digest)
+            if added:
+                self.pending.add(value_digest)
+                if len(self.pending) >= FLUSH_SIZE:
+                    self.flush()
+
+        elif value_digest in self.exact:
+            added = False
+
+        else:
+            self.exact.add(value_digest)
+            added = True
+
+            # 上限を超えたら Bloom フィルターと一時データベースへ移し替える
+            if len(self.exact) > self.max_exact:
+                self.switch_to_store()
+
+        if not added:
+            self.duplicates += 1
+        return added
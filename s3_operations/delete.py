@@ -1,36 +1,46 @@
+from __future__ import annotations
+
+import argparse
+import logging
 import re
+import time
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import TYPE_CHECKING
 from urllib import parse
 
-from botocore.client import BaseClient
-from custom_log import end, handle_exception, notify, setup_logger, start
-from utils import (
-    create_s3_client,
-    is_url_accessible,
-    load_file,
-    notify_output,
-    write_results_to_file,
-)
-
-from config import (
-    AWS_REGION,
-    CONFIG_SUMMARY,
-    DELETE_RESULT,
-    DELETE_URL_LIST,
-    S3_BUCKET,
-    report_config,
-)
+from backup import Archive, backup_objects
+from custom_log import record_metrics, setup_logger, stage
+from journal import Journal
+from listing_index import ObjectRecord, group_keys_by_prefix
+from manifest import Manifest
+from pipeline import Operation, Session, run_pipeline
+from rate_control import THROTTLE_CODES, AdaptiveController
+from result_sink import ResultSink
+from utils import is_url_accessible
+
+import config
+
+if TYPE_CHECKING:
+    from botocore.client import BaseClient
 
 CONTEXT = {
-    "create_s3client": "s3クライアント生成",
-    "connect_bucket": "バケット疎通確認",
     "load_url_list": "URLリスト読込",
     "delete_s3_object": "s3オブジェクト削除",
-    "write_results": "結果リスト生成",
+    "check_url": "URL有効チェック",
+    "list_objects": "オブジェクト・バージョン一覧取得",
+    "create_archive": "バックアップ準備",
+    "backup_objects": "削除前バックアップ",
+    "delete_versions": "バージョン一括削除",
+    "record_results": "結果・ジャーナル記録",
 }
 
 REGX = r"^https?://[^/]+(\.net|\.com)"
 
+# DeleteObjects 1リクエストあたりの最大件数
+DELETE_BATCH_SIZE = 1000
+
 
 def create_s3_key_and_s3_url(
     original_url: str, s3_origin: str, delimiter: str
@@ -58,53 +68,191 @@ def create_s3_key_and_s3_url(
     return s3_key, s3_url
 
 
-def delete_object_versions(s3_client: BaseClient, s3_key: str) -> None:
+class VersionIndex(dict):
+    """
+    キーと、そのキーの VersionId（バージョン・削除マーカー）のリストの辞書。
+
+    最新バージョンが削除マーカーでないキーは、latest に最新バージョンの情報（サイズ・ETag・VersionId）も保持します。
+    1回の一覧取得で、オブジェクトの存在確認と削除対象のバージョンの収集を行えます。
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.latest: dict[str, ObjectRecord] = {}
+
+
+def build_version_index(s3_client: BaseClient, s3_keys: Iterable[str]) -> VersionIndex:
     """
-    指定された S3 オブジェクトのすべてのバージョンと削除マーカーを削除します。
+    指定されたキーのバージョンと削除マーカーを、ディレクトリ単位の一覧取得でまとめて収集します。
 
-    この関数は、指定されたバケットとキーに対応するオブジェクトが存在するか確認した後、
-    バージョン管理が有効なバケットから該当オブジェクトの全バージョンと削除マーカーを削除します。
+    ListObjectVersions をディレクトリごとに1回（ページングを含む）だけ実行し、
+    指定されたキーと完全一致するものだけを残します。
+    Prefix 指定による前方一致（例: a.png と a.png.bak）は除外されます。
 
     Parameters:
         s3_client (BaseClient): Boto3 の S3 クライアントインスタンス。
-        s3_key (str): 削除対象のオブジェクトキー（ファイルパス）。
+        s3_keys (Iterable[str]): 削除対象のオブジェクトキーの一覧。
 
     Raises:
-        botocore.exceptions.ClientError: オブジェクトが存在しない、またはアクセスできない場合など。
-        Exception: その他の予期しないエラーが発生した場合。
+        botocore.exceptions.ClientError: 一覧取得に失敗した場合など。
 
     Returns:
-        None
+        VersionIndex: キーと、そのキーの VersionId（バージョン・削除マーカー）のリスト。
+            バージョンが存在しないキーは含まれません。
     """
+    index = VersionIndex()
+    paginator = s3_client.get_paginator("list_object_versions")
+
+    for prefix, keys in group_keys_by_prefix(s3_keys).items():
+        # Delimiter を指定し、サブディレクトリ配下のバージョンは取得しない
+        pages = paginator.paginate(
+            Bucket=config.S3_BUCKET, Prefix=prefix, Delimiter="/"
+        )
+
+        for page in pages:
+            for attr in ["Versions", "DeleteMarkers"]:
+                for version in page.get(attr, []):
+                    if version["Key"] not in keys:
+                        continue
+                    index.setdefault(version["Key"], []).append(version["VersionId"])
+
+                    # 削除マーカーが最新の場合は、オブジェクトが存在しないものとする
+                    if attr == "Versions" and version.get("IsLatest"):
+                        index.latest[version["Key"]] = ObjectRecord(
+                            version["Size"],
+                            version["ETag"].strip('"'),
+                            version["LastModified"].timestamp(),
+                            version["VersionId"],
+                        )
+
+    return index
+
+
+def delete_chunk(
+    s3_client: BaseClient,
+    chunk: list[dict],
+    controller: AdaptiveController | None = None,
+) -> dict[str, str]:
+    """
+    最大 1000 件の (Key, VersionId) を DeleteObjects 1リクエストで削除します。
 
-    # リソースの確認
-    s3_client.head_object(Bucket=S3_BUCKET, Key=s3_key)
+    Parameters:
+        s3_client (BaseClient): Boto3 の S3 クライアントインスタンス。
+        chunk (list[dict]): 削除対象の {"Key": ..., "VersionId": ...} のリスト。
+        controller (AdaptiveController | None): 指定した場合、所要時間とスロットリングを記録します。
+
+    Returns:
+        dict[str, str]: 削除に失敗したキーと失敗理由の辞書。
+    """
+    errors = {}
+    started = time.monotonic()
 
-    # オブジェクトのバージョン情報を取得
-    versions = s3_client.list_object_versions(Bucket=S3_BUCKET, Prefix=s3_key)
+    try:
+        response = s3_client.delete_objects(
+            Bucket=config.S3_BUCKET, Delete={"Objects": chunk, "Quiet": True}
+        )
+    except Exception as e:
+        record_metrics(items=len(chunk), latency=time.monotonic() - started)
+        # リクエスト自体が失敗した場合はチャンク内の全キーを失敗とする
+        for obj in chunk:
+            errors.setdefault(obj["Key"], str(e))
+        return errors
+
+    elapsed = time.monotonic() - started
+    record_metrics(items=len(chunk), latency=elapsed)
+    logging.debug(
+        f"DeleteObjects : {len(chunk)} 件（エラー {len(response.get('Errors', []))} 件）"
+        f"（{elapsed * 1000:.1f} ms）"
+    )
 
-    # ループ処理で バージョン と 削除マーカー をそれぞれ削除する
-    for attr in ["Versions", "DeleteMarkers"]:
-        for version in versions.get(attr, []):
-            s3_client.delete_object(
-                Bucket=S3_BUCKET, Key=s3_key, VersionId=version["VersionId"]
-            )
+    throttled = False
+    for error in response.get("Errors", []):
+        reason = f"[{error.get('Code')}] {error.get('Message')}"
+        errors.setdefault(error["Key"], reason)
+        throttled = throttled or error.get("Code") in THROTTLE_CODES
 
-    return
+    # キー単位のエラーとして返るスロットリングも流量制御に反映する
+    if controller is not None:
+        if throttled:
+            controller.record_throttle()
+        else:
+            controller.record_success(time.monotonic() - started)
+
+    return errors
+
+
+def delete_versions_in_batches(
+    s3_client: BaseClient,
+    objects: list[dict],
+    controller: AdaptiveController | None = None,
+) -> dict[str, str]:
+    """
+    (Key, VersionId) のリストを DeleteObjects で一括削除します。
+
+    DeleteObjects は1リクエストあたり最大 1000 件のため、分割して送信します。
+    Quiet モードで送信し、レスポンスに含まれるエラーのみをキーごとに集計します。
+
+    Parameters:
+        s3_client (BaseClient): Boto3 の S3 クライアントインスタンス。
+        objects (list[dict]): 削除対象の {"Key": ..., "VersionId": ...} のリスト。
+        controller (AdaptiveController | None): 指定した場合、分割したリクエストを
+            コントローラーの同時実行数で並行して送信します。省略時は逐次送信します。
+
+    Returns:
+        dict[str, str]: 削除に失敗したキーと失敗理由の辞書。
+            同じキーで複数のバージョンが失敗した場合は最初の理由を保持します。
+    """
+    chunks = [
+        objects[i : i + DELETE_BATCH_SIZE]
+        for i in range(0, len(objects), DELETE_BATCH_SIZE)
+    ]
+
+    if controller is None or len(chunks) <= 1:
+        results = [delete_chunk(s3_client, chunk, controller) for chunk in chunks]
+    else:
+
+        def delete_with_slot(chunk: list[dict]) -> dict[str, str]:
+            with controller.slot():
+                return delete_chunk(s3_client, chunk, controller)
+
+        with ThreadPoolExecutor(max_workers=controller.maximum) as executor:
+            results = list(executor.map(delete_with_slot, chunks))
+
+    # 分割前の順序で、キーごとに最初の理由を保持する
+    errors = {}
+    for chunk_errors in results:
+        for key, reason in chunk_errors.items():
+            errors.setdefault(key, reason)
+
+    return errors
 
 
 def process_deletions(
-    urls: list, s3_origin: str, delimiter: str, s3_client: BaseClient
+    urls: Iterable[str],
+    s3_origin: str,
+    delimiter: str,
+    s3_client: BaseClient,
+    controller: AdaptiveController | None = None,
+    manifest: Manifest | None = None,
+    archive: Archive | None = None,
 ) -> tuple[list, list]:
     """
     指定されたURLリストに基づき、S3オブジェクトの削除を試み、
     削除に成功したURLと失敗したURLのリストを返す。
 
+    全URLの削除対象バージョンをディレクトリ単位の一覧取得（ ListObjectVersions ）で先に収集し、
+    DeleteObjects でまとめて削除する。オブジェクトの存在確認も同じ一覧取得の最新バージョンで行う。
+    DeleteObjects のレスポンスに含まれるキー単位のエラーは failure_list に反映される。
+    アーカイブを指定した場合は、削除の前に最新バージョンを保存し、保存できなかったキーは削除しない。
+
     Args:
-        urls (list): 削除対象のファイルURLリスト。
+        urls (Iterable[str]): 削除対象のファイルURL（1バッチ分）。
         s3_origin (str): S3オリジンのベースURL。S3キーを生成するために使用。
         delimiter (str): S3キー生成時に使用する区切り文字。
         s3_client (BaseClient): boto3のS3クライアントインスタンス。
+        controller (AdaptiveController | None, optional): 一括削除の同時実行数のコントローラー。
+        manifest (Manifest | None, optional): 指定した場合、削除に成功したキーの記録を1トランザクションで削除する。
+        archive (Archive | None, optional): 指定した場合、削除前に最新バージョンを保存する。
 
     Returns:
         tuple[list, list]:
@@ -115,94 +263,274 @@ def process_deletions(
     success_list = []
     failure_list = []
 
-    for original_url in urls:
-        # URLからオブジェクトのアクセス情報を生成
-        s3_key, s3_url = create_s3_key_and_s3_url(original_url, s3_origin, delimiter)
+    # URL有効チェックを通過した削除候補（URL ごとのキー）
+    candidates = []
 
-        # URL有効チェック後に削除を行う
-        if is_url_accessible(s3_url):
-            try:
-                delete_object_versions(s3_client, s3_key)
-                success_list.append({"url": s3_url})
+    with stage(CONTEXT["check_url"]):
+        for original_url in urls:
+            # URLからオブジェクトのアクセス情報を生成
+            s3_key, s3_url = create_s3_key_and_s3_url(
+                original_url, s3_origin, delimiter
+            )
 
-            except Exception as e:
-                # 削除失敗の場合もループは継続
-                reason = str(e)
+            # URL有効チェック後に削除対象を収集する
+            if not is_url_accessible(s3_url):
                 failure_list.append(
-                    {"file_name": s3_key, "path": s3_url, "reason": reason}
+                    {
+                        "file_name": s3_key,
+                        "path": s3_url,
+                        "reason": "URL not accessible",
+                    }
                 )
-        else:
+                continue
+
+            candidates.append((s3_key, s3_url))
+
+        record_metrics(items=len(failure_list) + len(candidates))
+
+    # リソースの確認と削除対象バージョンの収集（ディレクトリ単位の一覧取得を1回だけ行う）
+    try:
+        with stage(CONTEXT["list_objects"]):
+            record_metrics(items=len(candidates))
+            version_index = build_version_index(
+                s3_client, (s3_key for s3_key, _ in candidates)
+            )
+
+    except Exception as e:
+        # 一覧取得に失敗した場合は全件を失敗とする
+        reason = str(e)
+        failure_list.extend(
+            {"file_name": s3_key, "path": s3_url, "reason": reason}
+            for s3_key, s3_url in candidates
+        )
+        return success_list, failure_list
+
+    # 削除対象（URL ごとのキー）。最新バージョンが削除マーカーのキーは存在しないものとする
+    targets = []
+    for s3_key, s3_url in candidates:
+        if s3_key not in version_index.latest:
+            failure_list.append(
+                {
+                    "file_name": s3_key,
+                    "path": s3_url,
+                    "reason": "オブジェクトが見つかりません",
+                }
+            )
+            continue
+
+        targets.append((s3_key, s3_url))
+
+    # 削除前に最新バージョンを保存し、保存できなかったキーは削除対象から除く
+    if archive is not None and targets:
+        with stage(CONTEXT["backup_objects"]):
+            backup_keys = dict.fromkeys(s3_key for s3_key, _ in targets)
+            backup_errors = backup_objects(
+                s3_client,
+                [(s3_key, version_index.latest[s3_key]) for s3_key in backup_keys],
+                archive,
+                max_workers=config.BACKUP_MAX_WORKERS,
+            )
+
+        failure_list.extend(
+            {
+                "file_name": s3_key,
+                "path": s3_url,
+                "reason": f"バックアップ失敗: {backup_errors[s3_key]}",
+            }
+            for s3_key, s3_url in targets
+            if s3_key in backup_errors
+        )
+        targets = [
+            (s3_key, s3_url)
+            for s3_key, s3_url in targets
+            if s3_key not in backup_errors
+        ]
+
+    unique_keys = dict.fromkeys(s3_key for s3_key, _ in targets)
+    objects = [
+        {"Key": s3_key, "VersionId": version_id}
+        for s3_key in unique_keys
+        for version_id in version_index.get(s3_key, [])
+    ]
+
+    # 収集したバージョンを一括削除し、キー単位の結果を振り分ける
+    with stage(CONTEXT["delete_versions"]):
+        errors = delete_versions_in_batches(s3_client, objects, controller)
+
+    deleted_keys = []
+    for s3_key, s3_url in targets:
+        if s3_key in errors:
             failure_list.append(
-                {"file_name": s3_key, "path": s3_url, "reason": "URL not accessible"}
+                {"file_name": s3_key, "path": s3_url, "reason": errors[s3_key]}
             )
+        else:
+            success_list.append({"url": s3_url})
+            deleted_keys.append(s3_key)
+
+    if manifest is not None:
+        manifest.remove(deleted_keys)
 
     return success_list, failure_list
 
 
-def main():
-    # 開始通知
-    report_config(Path(__file__).name, CONFIG_SUMMARY)
-    start()
+def record_deletion_batch(
+    urls: list[str],
+    s3_origin: str,
+    delimiter: str,
+    success_list: list[dict],
+    failure_list: list[dict],
+    journal: Journal | None = None,
+    sink: ResultSink | None = None,
+) -> None:
+    """
+    1バッチ分の結果を URL ごとにジャーナル・結果ファイルへ記録する。
 
-    # s3クライアント作成
-    context = CONTEXT["create_s3client"]
-    try:
-        s3_client = create_s3_client()
-        notify(context)
-    except Exception as e:
-        handle_exception(e, context)
-        end()
-        return
+    成功以外の URL は失敗としてジャーナルに記録し、再開時に再実行の対象とする。
+    失敗した URL は入力と同じ形式で再実行用リストにも書き出す。
 
-    # バケットへの疎通確認
-    context = CONTEXT["connect_bucket"]
-    try:
-        s3_client.head_bucket(Bucket=S3_BUCKET)
-        notify(context)
-    except Exception as e:
-        handle_exception(e, context)
-        end()
-        return
+    Args:
+        urls (list[str]): 削除対象のファイルURL（1バッチ分）。
+        s3_origin (str): S3オリジンのベースURL。
+        delimiter (str): S3キー生成時に使用する区切り文字。
+        success_list (list[dict]): 削除に成功したファイルのS3公開URLのリスト。
+        failure_list (list[dict]): 削除に失敗したファイルの情報のリスト。
+        journal (Journal | None, optional): 記録先のジャーナル。
+        sink (ResultSink | None, optional): 結果の出力先。
+    """
+    if sink is not None:
+        for result in success_list:
+            sink.success(result)
+        for result in failure_list:
+            sink.failure(result)
 
-    # 入力ファイルからURLを取り出してリストを生成
-    context = CONTEXT["load_url_list"]
-    try:
-        urls = load_file(DELETE_URL_LIST)
-        notify(context)
-    except Exception as e:
-        handle_exception(e, context)
-        end()
-        return
+    # 削除結果は S3 オリジンの URL のため、入力の URL と対応付ける
+    result_by_url = {result["url"]: result for result in success_list}
+
+    for original_url in dict.fromkeys(urls):
+        _, s3_url = create_s3_key_and_s3_url(original_url, s3_origin, delimiter)
+        result = result_by_url.get(s3_url)
+
+        if result is not None:
+            if journal is not None:
+                journal.record(original_url, "success", result)
+            continue
 
-    # 削除処理を行い、結果リストを生成
-    context = CONTEXT["delete_s3_object"]
+        if journal is not None:
+            journal.record(original_url, "failure")
+        if sink is not None:
+            sink.add_retry(original_url)
 
-    s3_host = f"{S3_BUCKET}.s3.{AWS_REGION}.amazonaws.com"
-    s3_origin = f"https://{s3_host}"
-    delimiter = f"{s3_host}/"
+    if journal is not None:
+        journal.sync()
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """
+    コマンドライン引数を解析する。
+
+    Args:
+        argv (list[str] | None, optional): 引数のリスト。省略時は sys.argv を使う。
 
-    success_list, failure_list = process_deletions(
-        urls, s3_origin, delimiter, s3_client
+    Returns:
+        argparse.Namespace: 解析結果（resume）。
+    """
+    parser = argparse.ArgumentParser(description="S3 オブジェクトを一括削除する")
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="前回のジャーナルを読み込み、完了済みの URL をスキップして再開する",
     )
-    notify(context)
+    return parser.parse_args(argv)
 
-    # 処理結果ログ を出力
-    context = CONTEXT["write_results"]
-    try:
-        path = write_results_to_file(success_list, failure_list, DELETE_RESULT)
-        notify(context)
-    except Exception as e:
-        handle_exception(e, context)
-        end()
-        return
 
-    # 終了通知
-    end()
-    notify_output(path)
+class DeleteOperation(Operation):
+    """
+    URLリストに対応する S3 オブジェクトの一括削除（ URL検証 → 全バージョン削除 ）。
+    """
+
+    name = "delete"
+    script = Path(__file__).name
+    context = {
+        "load_list": CONTEXT["load_url_list"],
+        "process": CONTEXT["delete_s3_object"],
+    }
+
+    def __init__(self):
+        self.input_file = config.DELETE_URL_LIST
+        self.result_file = config.DELETE_RESULT
+        self.journal_file = config.DELETE_JOURNAL
+        self.retry_file = config.DELETE_RETRY_LIST
+        self.metrics_file = config.DELETE_METRICS
+
+        s3_host = f"{config.S3_BUCKET}.s3.{config.AWS_REGION}.amazonaws.com"
+        self.s3_origin = f"https://{s3_host}"
+        self.delimiter = f"{s3_host}/"
+
+        # backup.path を設定した場合は、バッチ処理の前にアーカイブを作成する
+        self.archive: Archive | None = None
+        if config.BACKUP_PATH:
+            self.context = {**self.context, "setup": CONTEXT["create_archive"]}
+
+    def create_session(self) -> Session:
+        """
+        最大同時削除数（バックアップする場合は GET の同時実行数も）のコネクションを持つセッションを生成する。
+
+        Returns:
+            Session: 生成したセッション。
+        """
+        if not config.BACKUP_PATH:
+            return Session.create(config.DELETE_MAX_WORKERS)
+        return Session.create(
+            config.DELETE_MAX_WORKERS,
+            connections_per_worker=-(
+                -config.BACKUP_MAX_WORKERS // config.DELETE_MAX_WORKERS
+            ),
+        )
+
+    def setup(self, session: Session) -> None:
+        """削除前のバックアップを保存するアーカイブを作成する。"""
+        self.archive = Archive.create(config.BACKUP_PATH)
+        logging.info(f"{self.archive.root} : 削除前の最新バージョンを保存します")
+
+    def finish(self) -> None:
+        """アーカイブの索引を閉じる。"""
+        if self.archive is not None:
+            self.archive.close()
+
+    def process_batch(
+        self, session: Session, batch: list[str], journal: Journal, sink: ResultSink
+    ) -> None:
+        """1バッチ分の URL に対応するオブジェクトを削除し、結果を記録する。"""
+        batch_success, batch_failure = process_deletions(
+            batch,
+            self.s3_origin,
+            self.delimiter,
+            session.s3_client,
+            session.controller,
+            manifest=session.manifest,
+            archive=self.archive,
+        )
+        with stage(CONTEXT["record_results"]):
+            record_deletion_batch(
+                batch,
+                self.s3_origin,
+                self.delimiter,
+                batch_success,
+                batch_failure,
+                journal=journal,
+                sink=sink,
+            )
 
 
-# エラーログ用にセットアップ関数呼び出し
-setup_logger()
+def main(argv: list[str] | None = None):
+    args = parse_args(argv)
+    setup_logger(
+        config.LOGGING_LEVEL,
+        config.LOGGING_FORMAT,
+        config.LOGGING_DEBUG_SUMMARY_INTERVAL,
+    )
+    run_pipeline(DeleteOperation(), resume=args.resume)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import hashlib
+import mmap
+import multiprocessing
+import os
+import sqlite3
+import threading
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from boto3.s3.transfer import TransferConfig
+
+# 1プロセスにまとめて渡すファイル数（プロセス間の受け渡し回数を減らす）
+POOL_CHUNK_SIZE = 8
+
+# プロセスプールの起動方式。ログ出力・転送などのスレッドが動いているプロセスから fork すると、
+# 子プロセスが他のスレッドの保持していたロックを引き継いで停止することがあるため fork は使わない
+POOL_START_METHOD = (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hashes (
+    path TEXT NOT NULL,
+    part_size INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    etag TEXT NOT NULL,
+    PRIMARY KEY (path, part_size)
+) WITHOUT ROWID
+"""
+
+
+@lru_cache(maxsize=1)
+def get_default_transfer_config() -> TransferConfig:
+    """
+    upload_file が Config 未指定時に使う転送設定（ s3transfer の既定値 ）を返す。
+
+    boto3.s3.transfer の読み込みに時間がかかるため、初回の呼び出し時に生成する。
+
+    Returns:
+        TransferConfig: 既定の転送設定。以降の呼び出しでは同じインスタンスを返す。
+    """
+    from boto3.s3.transfer import TransferConfig
+
+    return TransferConfig()
+
+
+def __getattr__(name: str):
+    """DEFAULT_TRANSFER_CONFIG を参照された時点で既定の転送設定を生成して返す。"""
+    if name == "DEFAULT_TRANSFER_CONFIG":
+        return get_default_transfer_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def md5_file(path: str) -> str:
+    """
+    ファイル全体の MD5 を16進文字列で返す。
+
+    Args:
+        path (str): 対象ファイルのパス。
+
+    Returns:
+        str: MD5 の16進文字列。
+    """
+    return file_etag(path, 0)
+
+
+def etag_part_size(size: int, transfer_config: TransferConfig | None = None) -> int:
+    """
+    アップロード時のパートサイズ（ETag の計算単位）を返す。
+
+    パートサイズは s3transfer と同じ調整（最大パート数による拡大）を行う。
+
+    Args:
+        size (int): ファイルのバイト数。
+        transfer_config (TransferConfig | None, optional): アップロード時に使用する転送設定。
+            省略時は s3transfer の既定値。
+
+    Returns:
+        int: パートサイズ。マルチパートの閾値未満（単一パート）の場合は 0。
+    """
+    transfer_config = transfer_config or get_default_transfer_config()
+    if size < transfer_config.multipart_threshold:
+        return 0
+
+    from s3transfer.utils import ChunksizeAdjuster
+
+    return ChunksizeAdjuster().adjust_chunksize(
+        transfer_config.multipart_chunksize, size
+    )
+
+
+def file_etag(path: str, part_size: int) -> str:
+    """
+    ファイルをメモリマップで読み込み、パートサイズごとの ETag を計算する。
+
+    ページキャッシュを直接参照するため、読み込み用のバッファへのコピーが発生しない。
+    プロセスプールのワーカーから呼び出すため、引数・戻り値は pickle できる値だけにしている。
+
+    Args:
+        path (str): 対象ファイルのパス。
+        part_size (int): パートサイズ。0 の場合はファイル全体の MD5 を返す。
+
+    Returns:
+        str: ETag（前後のダブルクォートなし）。
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        # 空のファイルはメモリマップできない
+        if size == 0:
+            return hashlib.md5(b"", usedforsecurity=False).hexdigest()
+
+        with (
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped,
+            memoryview(mapped) as view,
+        ):
+            if not part_size:
+                return hashlib.md5(view, usedforsecurity=False).hexdigest()
+
+            part_digests = [
+                hashlib.md5(
+                    view[offset : offset + part_size], usedforsecurity=False
+                ).digest()
+                for offset in range(0, size, part_size)
+            ]
+
+    etag = hashlib.md5(b"".join(part_digests), usedforsecurity=False).hexdigest()
+    return f"{etag}-{len(part_digests)}"
+
+
+def compute_etag(path: str, transfer_config: TransferConfig | None = None) -> str:
+    """
+    ファイルをアップロードした場合に S3 が返す ETag をローカルで計算する。
+
+    マルチパートの閾値未満のファイルはファイル全体の MD5 を、
+    閾値以上のファイルは「各パートの MD5 を連結した値の MD5 + "-パート数"」を返す。
+
+    Args:
+        path (str): 対象ファイルのパス。
+        transfer_config (TransferConfig | None, optional): アップロード時に使用する転送設定。
+            省略時は s3transfer の既定値。
+
+    Returns:
+        str: ETag（前後のダブルクォートなし）。
+    """
+    return file_etag(path, etag_part_size(os.path.getsize(path), transfer_config))
+
+
+class HashCache:
+    """
+    計算済みの ETag を記録するローカルのキャッシュ（SQLite）。
+
+    パスとパートサイズごとに1件を保持し、サイズ・更新日時が記録と同じ場合だけ再利用する。
+    複数スレッドから呼び出してよい。
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): データベースファイルのパス。存在しない場合は作成する。
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(CACHE_SCHEMA)
+        self.lock = threading.Lock()
+
+    def close(self) -> None:
+        """データベースを閉じる。"""
+        with self.lock:
+            self.connection.close()
+
+    def get(self, path: str, part_size: int, size: int, mtime_ns: int) -> str | None:
+        """
+        記録済みの ETag を返す。
+
+        Args:
+            path (str): ファイルのパス。
+            part_size (int): パートサイズ（単一パートの場合は 0）。
+            size (int): 現在のファイルのバイト数。
+            mtime_ns (int): 現在のファイルの更新日時（ナノ秒）。
+
+        Returns:
+            str | None: ETag。記録がない、またはサイズ・更新日時が異なる場合は None。
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT etag FROM hashes WHERE path = ? AND part_size = ? "
+                "AND size = ? AND mtime_ns = ?",
+                (path, part_size, size, mtime_ns),
+            ).fetchone()
+        return row[0] if row else None
+
+    def put_many(self, rows: Iterable[tuple[str, int, int, int, str]]) -> None:
+        """
+        計算した ETag を1トランザクションで記録する（同じパス・パートサイズは上書き）。
+
+        Args:
+            rows (Iterable[tuple[str, int, int, int, str]]): パス・パートサイズ・サイズ・更新日時・ETag。
+        """
+        with self.lock, self.connection:
+            self.connection.execute("BEGIN")
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO hashes "
+                "(path, part_size, size, mtime_ns, etag) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+
+
+class HashService:
+    """
+    複数ファイルの ETag をプロセスプールで並列に計算し、結果をキャッシュする。
+
+    プロセスプールは最初に2件以上を計算する時点で起動し、close() まで使い回す。
+    """
+
+    def __init__(self, max_workers: int = 1, cache_path: str = ""):
+        """
+        Args:
+            max_workers (int, optional): 計算に使うプロセス数。1 の場合は呼び出し元のプロセスで計算する。
+            cache_path (str, optional): キャッシュのデータベースファイルのパス。空の場合は使用しない。
+        """
+        self.max_workers = max_workers
+        self.cache = HashCache(cache_path) if cache_path else None
+        self.executor: ProcessPoolExecutor | None = None
+
+    def __enter__(self) -> HashService:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """プロセスプールとキャッシュを閉じる。"""
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+        if self.cache is not None:
+            self.cache.close()
+
+    def compute_etags(
+        self,
+        files: list[tuple[str, int, int | None, TransferConfig | None]],
+    ) -> list[str]:
+        """
+        ファイルごとの ETag を計算する。キャッシュにあるファイルは読み込まない。
+
+        Args:
+            files (list[tuple[str, int, int | None, TransferConfig | None]]):
+                パス・バイト数・更新日時（ナノ秒、不明な場合は None）・アップロード時の転送設定。
+
+        Returns:
+            list[str]: files と同じ順の ETag。
+        """
+        part_sizes = [
+            etag_part_size(size, transfer_config)
+            for _, size, _, transfer_config in files
+        ]
+        etags: list[str | None] = [None] * len(files)
+
+        # サイズ・更新日時がキャッシュと同じファイルは再計算しない
+        if self.cache is not None:
+            for i, ((path, size, mtime_ns, _), part_size) in enumerate(
+                zip(files, part_sizes)
+            ):
+                if mtime_ns is not None:
+                    etags[i] = self.cache.get(path, part_size, size, mtime_ns)
+
+        misses = [i for i, etag in enumerate(etags) if etag is None]
+        paths = [files[i][0] for i in misses]
+        miss_part_sizes = [part_sizes[i] for i in misses]
+
+        if self.max_workers > 1 and len(misses) > 1:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context(POOL_START_METHOD),
+                )
+            computed = self.executor.map(
+                file_etag, paths, miss_part_sizes, chunksize=POOL_CHUNK_SIZE
+            )
+        else:
+            computed = map(file_etag, paths, miss_part_sizes)
+
+        for i, etag in zip(misses, computed):
+            etags[i] = etag
+
+        if self.cache is not None:
+            self.cache.put_many(
+                (files[i][0], part_sizes[i], files[i][1], files[i][2], etags[i])
+                for i in misses
+                if files[i][2] is not None
+            )
+        return etags
@@ -0,0 +1,151 @@
+import json
+import logging
+import os
+import threading
+import time
+
+# 完了済みとして再開時にスキップするステータス
+DONE_STATUSES = ("success", "skipped")
+
+
+class Journal:
+    """
+    処理結果を1件ずつ追記する、クラッシュに強いジャーナル（JSONL 形式）。
+
+    各行は {"item": 入力行, "status": ステータス, "result": 結果} の1レコード。
+    書き込みはバッファに溜め、sync_every 件ごと、または sync_interval 秒ごとに
+    まとめて fsync するため、1件ごとの書き込みコストはほとんど増えない。
+    途中で異常終了しても fsync 済みのレコードは失われず、
+    書き込み途中の最終行は読み込み時に無視する。
+    """
+
+    def __init__(
+        self,
+        path: str,
+        resume: bool = False,
+        sync_every: int = 500,
+        sync_interval: float = 1.0,
+    ):
+        """
+        Args:
+            path (str): ジャーナルファイルのパス。
+            resume (bool, optional): True の場合、既存のジャーナルを読み込んで追記する。
+                False の場合、既存のジャーナルを破棄して新しく書き始める。
+            sync_every (int, optional): fsync するまでに溜めるレコード数。
+            sync_interval (float, optional): fsync するまでの最大間隔（秒）。
+        """
+        self.path = path
+        self.sync_every = max(1, sync_every)
+        self.sync_interval = sync_interval
+
+        self.records: dict[str, dict] = self.load(path) if resume else {}
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.file = open(path, "a" if resume else "w", encoding="utf-8")
+
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.last_sync = time.monotonic()
+
+    def __enter__(self) -> "Journal":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @staticmethod
+    def load(path: str) -> dict[str, dict]:
+        """
+        既存のジャーナルを読み込み、入力行ごとの最新のレコードを返す。
+
+        Args:
+            path (str): ジャーナルファイルのパス。
+
+        Returns:
+            dict[str, dict]: 入力行とレコードの辞書。ファイルがない場合は空の辞書。
+        """
+        records = {}
+        if not os.path.exists(path):
+            return records
+
+        with open(path, "r", encoding="utf-8") as f:
+            for number, line in enumerate(f, start=1):
+                try:
+                    record = json.loads(line)
+                    records[record["item"]] = record
+                except (ValueError, KeyError, TypeError):
+                    # 異常終了で書き込み途中になった行は読み飛ばす
+                    logging.warning(f"{path}:{number} : 壊れたレコードを無視しました")
+
+        return records
+
+    def is_done(self, item: str) -> bool:
+        """
+        入力行が再開前の実行で完了済みかを返す。
+
+        Args:
+            item (str): 入力行（S3キーや URL）。
+
+        Returns:
+            bool: 成功またはスキップとして記録済みであれば True。
+        """
+        record = self.records.get(item)
+        return record is not None and record["status"] in DONE_STATUSES
+
+    def done_results(self, status: str) -> list[dict]:
+        """
+        再開前の実行で記録された、指定ステータスの結果を返す。
+
+        Args:
+            status (str): ステータス（"success" または "skipped"）。
+
+        Returns:
+            list[dict]: 記録された結果のリスト（記録順）。
+        """
+        return [
+            record["result"]
+            for record in self.records.values()
+            if record["status"] == status and record.get("result") is not None
+        ]
+
+    def record(self, item: str, status: str, result: dict | None = None) -> None:
+        """
+        1件分の処理結果をジャーナルに追記する。複数スレッドから呼び出してよい。
+
+        Args:
+            item (str): 入力行（S3キーや URL）。
+            status (str): ステータス（"success" / "skipped" / "failure"）。
+            result (dict | None, optional): 結果ファイルに出力する情報。
+        """
+        line = json.dumps(
+            {"item": item, "status": status, "result": result}, ensure_ascii=False
+        )
+        with self.lock:
+            self.file.write(f"{line}\n")
+            self.pending += 1
+
+            if (
+                self.pending >= self.sync_every
+                or time.monotonic() - self.last_sync >= self.sync_interval
+            ):
+                self.sync_locked()
+
+    def sync(self) -> None:
+        """未同期のレコードをディスクへ書き出す。"""
+        with self.lock:
+            self.sync_locked()
+
+    def sync_locked(self) -> None:
+        """未同期のレコードをディスクへ書き出す（ロック取得済みで呼び出す）。"""
+        if self.pending:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.pending = 0
+        self.last_sync = time.monotonic()
+
+    def close(self) -> None:
+        """未同期のレコードを書き出してファイルを閉じる。"""
+        if self.file.closed:
+            return
+        self.sync()
+        self.file.close()
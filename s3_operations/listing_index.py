@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from botocore.client import BaseClient
+
+
+class ObjectRecord:
+    """
+    一覧取得で得た S3 オブジェクト1件分の情報。
+
+    大量のオブジェクトを保持するため __slots__ でインスタンス辞書を持たない。
+    """
+
+    __slots__ = ("size", "etag", "last_modified", "version_id")
+
+    def __init__(
+        self,
+        size: int,
+        etag: str,
+        last_modified: float,
+        version_id: str | None = None,
+    ):
+        """
+        Args:
+            size (int): オブジェクトのバイト数。
+            etag (str): ETag（前後のダブルクォートなし）。
+            last_modified (float): 最終更新日時（UNIX タイムスタンプ）。
+            version_id (str | None, optional): バージョンの一覧から取得した場合の VersionId。
+        """
+        self.size = size
+        self.etag = etag
+        self.last_modified = last_modified
+        self.version_id = version_id
+
+    def __repr__(self) -> str:
+        return (
+            f"ObjectRecord(size={self.size}, etag={self.etag!r}, "
+            f"last_modified={self.last_modified}, version_id={self.version_id!r})"
+        )
+
+
+def group_keys_by_prefix(s3_keys: Iterable[str]) -> dict[str, set[str]]:
+    """
+    S3 キーをディレクトリ（最後の "/" まで）ごとにグループ化します。
+
+    Args:
+        s3_keys (Iterable[str]): S3 オブジェクトキーの一覧。
+
+    Returns:
+        dict[str, set[str]]: ディレクトリプレフィックスと、そのディレクトリ直下のキーの集合。
+            ルート直下のキーは空文字のプレフィックスにまとめられます。
+    """
+    groups = defaultdict(set)
+    for s3_key in s3_keys:
+        prefix = s3_key[: s3_key.rfind("/") + 1]
+        groups[prefix].add(s3_key)
+    return dict(groups)
+
+
+class ListingIndex:
+    """
+    S3 バケットの一覧をメモリ上に保持するインデックス。
+
+    入力キーが属するディレクトリごとに ListObjectsV2 を1回（ページングを含む）だけ実行し、
+    キー → (サイズ, ETag, 最終更新日時) を保持する。
+    以降のオブジェクト存在確認や ETag 比較はネットワークを使わずに行える。
+    """
+
+    def __init__(self):
+        self.records: dict[str, ObjectRecord] = {}
+        self.prefixes: set[str] = set()
+
+    def __contains__(self, s3_key: str) -> bool:
+        return s3_key in self.records
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def get(self, s3_key: str) -> ObjectRecord | None:
+        """
+        キーに対応するオブジェクト情報を返す。
+
+        Args:
+            s3_key (str): S3 オブジェクトキー。
+
+        Returns:
+            ObjectRecord | None: 存在しない場合は None。
+        """
+        return self.records.get(s3_key)
+
+    def load_prefix(self, s3_client: BaseClient, bucket: str, prefix: str) -> None:
+        """
+        指定ディレクトリ直下のオブジェクトを一覧取得してインデックスに追加する。
+
+        取得済みのディレクトリは再取得しない。
+
+        Args:
+            s3_client (BaseClient): boto3のS3クライアント。
+            bucket (str): バケット名。
+            prefix (str): ディレクトリプレフィックス（末尾 "/"、ルートは空文字）。
+
+        Raises:
+            botocore.exceptions.ClientError: 一覧取得に失敗した場合。
+        """
+        if prefix in self.prefixes:
+            return
+
+        paginator = s3_client.get_paginator("list_objects_v2")
+
+        # Delimiter を指定し、サブディレクトリ配下のオブジェクトは取得しない
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix, Delimiter="/"):
+            for obj in page.get("Contents", []):
+                self.records[obj["Key"]] = ObjectRecord(
+                    obj["Size"],
+                    obj["ETag"].strip('"'),
+                    obj["LastModified"].timestamp(),
+                )
+
+        self.prefixes.add(prefix)
+
+    @classmethod
+    def build(
+        cls, s3_client: BaseClient, bucket: str, s3_keys: Iterable[str]
+    ) -> "ListingIndex":
+        """
+        入力キーが属するディレクトリをまとめて一覧取得し、インデックスを生成する。
+
+        Args:
+            s3_client (BaseClient): boto3のS3クライアント。
+            bucket (str): バケット名。
+            s3_keys (Iterable[str]): 確認対象の S3 オブジェクトキー。
+
+        Returns:
+            ListingIndex: 生成したインデックス。
+
+        Raises:
+            botocore.exceptions.ClientError: 一覧取得に失敗した場合。
+        """
+        index = cls()
+        for prefix in group_keys_by_prefix(s3_keys):
+            index.load_prefix(s3_client, bucket, prefix)
+        return index
+
+
+def iter_objects(
+    s3_client: BaseClient, bucket: str, prefix: str = ""
+) -> Iterator[tuple[str, ObjectRecord]]:
+    """
+    プレフィックス配下のオブジェクトを、ページ単位で取得しながら1件ずつ返す。
+
+    ListObjectsV2 はキーを UTF-8 のバイト順で返すため、結果はキーの昇順になる。
+    全件をメモリに保持しないため、オブジェクト数に関わらず使用メモリは1ページ分で済む。
+    フォルダとして作成された空のオブジェクト（末尾 "/"）は除外する。
+
+    Args:
+        s3_client (BaseClient): boto3のS3クライアント。
+        bucket (str): バケット名。
+        prefix (str, optional): 一覧取得するプレフィックス（サブディレクトリ配下も含む）。
+
+    Yields:
+        tuple[str, ObjectRecord]: S3 オブジェクトキーとオブジェクトの情報。
+
+    Raises:
+        botocore.exceptions.ClientError: 一覧取得に失敗した場合。
+    """
+    paginator = s3_client.get_paginator("list_objects_v2")
+
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get("Contents", []):
+            if obj["Key"].endswith("/"):
+                continue
+            yield (
+                obj["Key"],
+                ObjectRecord(
+                    obj["Size"], obj["ETag"].strip('"'), obj["LastModified"].timestamp()
+                ),
+            )
@@ -0,0 +1,148 @@
+"""
+S3 操作の共通エントリポイント。
+
+サブコマンドごとの処理（ Operation ）を共通のパイプライン（ pipeline.run_pipeline ）で実行する。
+クライアント生成・バケットの疎通確認・入力リストの読込・ジャーナル・結果ファイルの出力は
+全サブコマンドで共通のため、各処理はバッチごとの処理だけを定義している。
+
+実行例:
+    python s3_operations/main.py upload
+    python s3_operations/main.py delete --resume
+    python s3_operations/main.py verify
+    python s3_operations/main.py sync
+    python s3_operations/main.py move --resume
+    python s3_operations/main.py restore --archive data/s3_operations/backup/20250101-120000
+    python s3_operations/main.py reconcile --prefix site/
+"""
+
+import argparse
+
+from custom_log import setup_logger
+
+import config
+
+# サブコマンドと説明
+COMMANDS = {
+    "upload": "S3 へファイルを一括アップロードする",
+    "delete": "S3 オブジェクトを一括削除する",
+    "verify": "アップロード済みファイルの公開URLを一括検証する",
+    "sync": "リソースディレクトリと S3 の差分（新規・変更・削除）を同期する",
+    "copy": "対応表に従って S3 オブジェクトをサーバー側でコピーする",
+    "move": "対応表に従って S3 オブジェクトをサーバー側で移動する（コピー後に移動元を削除）",
+    "restore": "削除前に保存したオブジェクトをアーカイブから復元する",
+}
+
+# パイプライン以外のサブコマンドと説明
+TOOLS = {
+    "reconcile": "S3 の一覧と突き合わせてマニフェストを更新する",
+}
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """
+    コマンドライン引数を解析する。
+
+    Args:
+        argv (list[str] | None, optional): 引数のリスト。省略時は sys.argv を使う。
+
+    Returns:
+        argparse.Namespace: 解析結果（command, resume（restore は archive も）または prefix）。
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for command, help_text in COMMANDS.items():
+        subparser = subparsers.add_parser(
+            command, help=help_text, description=help_text
+        )
+        subparser.add_argument(
+            "--resume",
+            action="store_true",
+            help="前回のジャーナルを読み込み、完了済みの項目をスキップして再開する",
+        )
+        if command == "restore":
+            subparser.add_argument(
+                "--archive",
+                required=True,
+                help="復元元のアーカイブ（ backup.path 配下の実行日時のディレクトリ ）",
+            )
+
+    reconcile = subparsers.add_parser(
+        "reconcile", help=TOOLS["reconcile"], description=TOOLS["reconcile"]
+    )
+    reconcile.add_argument(
+        "--prefix",
+        default="",
+        help="照合するプレフィックス（省略時はバケット全体）",
+    )
+    return parser.parse_args(argv)
+
+
+def create_operation(command: str, archive: str = ""):
+    """
+    サブコマンドに対応する処理を生成する。
+
+    使わない処理のモジュール（boto3 や aiohttp を含む）は読み込まないように、
+    サブコマンドが決まってから import する。
+
+    Args:
+        command (str): サブコマンド名。
+        archive (str, optional): restore の復元元のアーカイブ。
+
+    Returns:
+        pipeline.Operation: 実行する処理。
+
+    Raises:
+        ValueError: 未対応のサブコマンドが指定された場合。
+    """
+    if command == "upload":
+        from upload import UploadOperation
+
+        return UploadOperation()
+    if command == "sync":
+        from sync import SyncOperation
+
+        return SyncOperation()
+    if command == "delete":
+        from delete import DeleteOperation
+
+        return DeleteOperation()
+    if command == "verify":
+        from verify import VerifyOperation
+
+        return VerifyOperation()
+    if command in ("copy", "move"):
+        from move import MoveOperation
+
+        return MoveOperation(delete_source=command == "move")
+    if command == "restore":
+        from restore import RestoreOperation
+
+        return RestoreOperation(archive)
+    raise ValueError(
+        f"{command} : サブコマンドは {list(COMMANDS)} から指定してください"
+    )
+
+
+def main(argv: list[str] | None = None) -> str | None:
+    args = parse_args(argv)
+    setup_logger(
+        config.LOGGING_LEVEL,
+        config.LOGGING_FORMAT,
+        config.LOGGING_DEBUG_SUMMARY_INTERVAL,
+    )
+    if args.command == "reconcile":
+        from reconcile import run_reconcile
+
+        run_reconcile(args.prefix)
+        return None
+
+    operation = create_operation(args.command, getattr(args, "archive", ""))
+
+    from pipeline import run_pipeline
+
+    return run_pipeline(operation, resume=args.resume)
+
+
+# スクリプト実行
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,395 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from typing import TYPE_CHECKING
+
+from sync_diff import diff_listings
+
+if TYPE_CHECKING:
+    from botocore.client import BaseClient
+
+# 1トランザクションでまとめて書き込む件数（照合時）
+RECONCILE_CHUNK_SIZE = 1000
+
+# アップロードのレスポンスから ETag・VersionId を記録する操作
+UPLOAD_OPERATIONS = ("PutObject", "CompleteMultipartUpload")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    key TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER,
+    content_hash TEXT,
+    etag TEXT,
+    version_id TEXT,
+    uploaded_at REAL NOT NULL
+) WITHOUT ROWID
+"""
+
+COLUMNS = "key, size, mtime_ns, content_hash, etag, version_id, uploaded_at"
+
+UPSERT = f"""
+INSERT INTO objects ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(key) DO UPDATE SET
+    size = excluded.size,
+    mtime_ns = excluded.mtime_ns,
+    content_hash = excluded.content_hash,
+    etag = excluded.etag,
+    version_id = excluded.version_id,
+    uploaded_at = excluded.uploaded_at
+"""
+
+
+class ManifestRecord:
+    """
+    マニフェストに記録した S3 オブジェクト1件分の情報。
+
+    ListingIndex の ObjectRecord と同じく size・etag を持つため、差分判定にそのまま使える。
+    """
+
+    __slots__ = (
+        "size",
+        "mtime_ns",
+        "content_hash",
+        "etag",
+        "version_id",
+        "uploaded_at",
+    )
+
+    def __init__(
+        self,
+        size: int,
+        mtime_ns: int | None = None,
+        content_hash: str | None = None,
+        etag: str | None = None,
+        version_id: str | None = None,
+        uploaded_at: float = 0.0,
+    ):
+        """
+        Args:
+            size (int): オブジェクトのバイト数。
+            mtime_ns (int | None, optional): アップロードしたローカルファイルの更新日時（ナノ秒）。
+            content_hash (str | None, optional): ローカルで計算した ETag 形式のハッシュ。
+            etag (str | None, optional): S3 が返した ETag（前後のダブルクォートなし）。
+            version_id (str | None, optional): S3 が返した VersionId。
+            uploaded_at (float, optional): アップロード（または照合）日時（UNIX タイムスタンプ）。
+        """
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.content_hash = content_hash
+        self.etag = etag
+        self.version_id = version_id
+        self.uploaded_at = uploaded_at
+
+    def __repr__(self) -> str:
+        return (
+            f"ManifestRecord(size={self.size}, etag={self.etag!r}, "
+            f"version_id={self.version_id!r})"
+        )
+
+
+def prefix_range(prefix: str) -> tuple[str, str] | None:
+    """
+    プレフィックスに前方一致するキーの範囲（主キーの索引で引ける形）を返す。
+
+    Args:
+        prefix (str): プレフィックス。
+
+    Returns:
+        tuple[str, str] | None: 下限（含む）と上限（含まない）。空のプレフィックスは None（全件）。
+    """
+    if not prefix:
+        return None
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def iter_latest_versions(
+    s3_client: BaseClient, bucket: str, prefix: str = ""
+) -> Iterator[tuple[str, ManifestRecord]]:
+    """
+    プレフィックス配下の最新バージョンを、ページ単位で取得しながらキーの昇順に返す。
+
+    ListObjectVersions は VersionId を含むため、ListObjectsV2 の代わりに使う。
+    最新が削除マーカーのキー（削除済み）と、フォルダのオブジェクト（末尾 "/"）は除外する。
+
+    Args:
+        s3_client (BaseClient): boto3のS3クライアント。
+        bucket (str): バケット名。
+        prefix (str, optional): 一覧取得するプレフィックス。
+
+    Yields:
+        tuple[str, ManifestRecord]: S3 オブジェクトキーと最新バージョンの情報。
+
+    Raises:
+        botocore.exceptions.ClientError: 一覧取得に失敗した場合。
+    """
+    paginator = s3_client.get_paginator("list_object_versions")
+
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for version in page.get("Versions", []):
+            if not version["IsLatest"] or version["Key"].endswith("/"):
+                continue
+            yield (
+                version["Key"],
+                ManifestRecord(
+                    version["Size"],
+                    etag=version["ETag"].strip('"'),
+                    version_id=version["VersionId"],
+                    uploaded_at=version["LastModified"].timestamp(),
+                ),
+            )
+
+
+class Manifest:
+    """
+    アップロード済みオブジェクトを記録するローカルのマニフェスト（SQLite）。
+
+    アップロード・削除のたびにトランザクション単位で更新し、
+    S3 に一覧を問い合わせずに、アップロード・削除の要否を判定できるようにする。
+    attach() したクライアントのアップロードのレスポンスから ETag・VersionId を記録する。
+    複数スレッドから呼び出してよい。
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): データベースファイルのパス。存在しない場合は作成する。
+        """
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self.connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        # 照合中の読み込み（別コネクション）と書き込みを並行できるようにする
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(SCHEMA)
+
+        self.lock = threading.Lock()
+        self.responses: dict[str, tuple[str | None, str | None]] = {}
+
+    def __enter__(self) -> Manifest:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM objects").fetchone()[0]
+
+    def close(self) -> None:
+        """データベースを閉じる。"""
+        with self.lock:
+            self.connection.close()
+
+    def attach(self, s3_client: BaseClient) -> None:
+        """
+        クライアントのアップロード（単一・マルチパート）のレスポンスから ETag・VersionId を記録するよう登録する。
+
+        Args:
+            s3_client (BaseClient): boto3のS3クライアント。
+        """
+        for operation in UPLOAD_OPERATIONS:
+            s3_client.meta.events.register(
+                f"before-parameter-build.s3.{operation}", self.handle_params
+            )
+            s3_client.meta.events.register(
+                f"after-call.s3.{operation}", self.handle_response
+            )
+
+    def detach(self, s3_client: BaseClient) -> None:
+        """
+        attach() で登録したハンドラーの登録を解除する。
+
+        クライアントはプロセス内で再利用されるため、閉じたマニフェストが後のセッションの
+        レスポンスを受け取り続けないようにする。
+
+        Args:
+            s3_client (BaseClient): boto3のS3クライアント。
+        """
+        for operation in UPLOAD_OPERATIONS:
+            s3_client.meta.events.unregister(
+                f"before-parameter-build.s3.{operation}", self.handle_params
+            )
+            s3_client.meta.events.unregister(
+                f"after-call.s3.{operation}", self.handle_response
+            )
+
+    def handle_params(self, params: dict, context: dict, **kwargs) -> None:
+        """リクエストのキーを、レスポンスの処理で参照できるようにコンテキストへ保存する。"""
+        context["manifest_key"] = params.get("Key")
+
+    def handle_response(self, parsed: dict, context: dict, **kwargs) -> None:
+        """レスポンスの ETag・VersionId をキーごとに保持する（ record_uploads() で記録する ）。"""
+        key = context.get("manifest_key")
+        if key is None or "ETag" not in parsed:
+            return
+        with self.lock:
+            self.responses[key] = (parsed["ETag"].strip('"'), parsed.get("VersionId"))
+
+    def get(self, key: str) -> ManifestRecord | None:
+        """
+        キーに対応する記録を返す。
+
+        Args:
+            key (str): S3 オブジェクトキー。
+
+        Returns:
+            ManifestRecord | None: 記録がない場合は None。
+        """
+        with self.lock:
+            row = self.connection.execute(
+                f"SELECT {COLUMNS} FROM objects WHERE key = ?", (key,)
+            ).fetchone()
+        return ManifestRecord(*row[1:]) if row else None
+
+    def iter_objects(self, prefix: str = "") -> Iterator[tuple[str, ManifestRecord]]:
+        """
+        プレフィックス配下の記録を、キーの昇順（ S3 の一覧と同じ順 ）に1件ずつ返す。
+
+        書き込み用とは別のコネクションで読み込むため、読み込み中に記録を更新してもよい。
+
+        Args:
+            prefix (str, optional): プレフィックス。空の場合は全件。
+
+        Yields:
+            tuple[str, ManifestRecord]: S3 オブジェクトキーと記録。
+        """
+        connection = sqlite3.connect(self.path)
+        try:
+            key_range = prefix_range(prefix)
+            if key_range is None:
+                rows = connection.execute(f"SELECT {COLUMNS} FROM objects ORDER BY key")
+            else:
+                rows = connection.execute(
+                    f"SELECT {COLUMNS} FROM objects "
+                    "WHERE key >= ? AND key < ? ORDER BY key",
+                    key_range,
+                )
+            for row in rows:
+                yield row[0], ManifestRecord(*row[1:])
+        finally:
+            connection.close()
+
+    def record_uploads(self, upload_items: Iterable[dict]) -> None:
+        """
+        アップロードに成功したファイルを1トランザクションで記録する。
+
+        Args:
+            upload_items (Iterable[dict]): アップロード情報（key, size, mtime_ns, content_hash）。
+                content_hash は差分判定で計算済みの場合のみ。
+        """
+        uploaded_at = time.time()
+        with self.lock:
+            rows = []
+            for item in upload_items:
+                etag, version_id = self.responses.pop(item["key"], (None, None))
+                rows.append(
+                    (
+                        item["key"],
+                        item["size"],
+                        item.get("mtime_ns"),
+                        item.get("content_hash"),
+                        etag,
+                        version_id,
+                        uploaded_at,
+                    )
+                )
+            with self.connection:
+                self.connection.execute("BEGIN")
+                self.connection.executemany(UPSERT, rows)
+
+    def remove(self, keys: Iterable[str]) -> None:
+        """
+        削除したオブジェクトの記録を1トランザクションで削除する。
+
+        Args:
+            keys (Iterable[str]): S3 オブジェクトキー。
+        """
+        with self.lock, self.connection:
+            self.connection.execute("BEGIN")
+            self.connection.executemany(
+                "DELETE FROM objects WHERE key = ?", ((key,) for key in keys)
+            )
+
+    def reconcile(
+        self, listing: Iterable[tuple[str, ManifestRecord]], prefix: str = ""
+    ) -> Counter:
+        """
+        S3 の一覧（キーの昇順）と突き合わせて、プレフィックス配下の記録を一覧に合わせる。
+
+        記録と一覧を先頭から突き合わせるため、件数に関わらず使用メモリは一定になる。
+        S3 側の内容（ETag・VersionId）が記録と同じ場合は、ローカルの更新日時・ハッシュを残す。
+
+        Args:
+            listing (Iterable[tuple[str, ManifestRecord]]): S3 の一覧（ iter_latest_versions() ）。
+            prefix (str, optional): 照合するプレフィックス。listing と同じ範囲を指定する。
+
+        Returns:
+            Counter: added（記録なし）/ updated（内容違い）/ removed（S3 になし）/ unchanged の件数。
+        """
+        counts = Counter()
+        upserts = []
+        removals = []
+
+        def flush() -> None:
+            if upserts:
+                self.record_rows(upserts)
+                upserts.clear()
+            if removals:
+                self.remove(removals)
+                removals.clear()
+
+        # 記録を「ローカル」、S3 の一覧を「リモート」として突き合わせる
+        for entry in diff_listings(self.iter_objects(prefix), listing):
+            recorded, listed = entry.local, entry.remote
+            if entry.status == "new":
+                counts["removed"] += 1
+                removals.append(entry.key)
+            elif entry.status == "deleted":
+                counts["added"] += 1
+                upserts.append((entry.key, listed))
+            elif (recorded.etag, recorded.version_id) != (
+                listed.etag,
+                listed.version_id,
+            ) or recorded.size != listed.size:
+                counts["updated"] += 1
+                upserts.append((entry.key, listed))
+            else:
+                counts["unchanged"] += 1
+
+            if len(upserts) + len(removals) >= RECONCILE_CHUNK_SIZE:
+                flush()
+
+        flush()
+        return counts
+
+    def record_rows(self, records: Iterable[tuple[str, ManifestRecord]]) -> None:
+        """
+        キーと記録の組を1トランザクションで書き込む（照合用）。
+
+        Args:
+            records (Iterable[tuple[str, ManifestRecord]]): S3 オブジェクトキーと記録。
+        """
+        rows = [
+            (
+                key,
+                record.size,
+                record.mtime_ns,
+                record.content_hash,
+                record.etag,
+                record.version_id,
+                record.uploaded_at,
+            )
+            for key, record in records
+        ]
+        with self.lock, self.connection:
+            self.connection.execute("BEGIN")
+            self.connection.executemany(UPSERT, rows)
@@ -0,0 +1,202 @@
+import mimetypes
+import re
+from fnmatch import translate
+from pathlib import PurePosixPath
+
+# ルールの設定キーと、S3 アップロード時の ExtraArgs のキーの対応
+RULE_FIELDS = {
+    "content_type": "ContentType",
+    "cache_control": "CacheControl",
+    "content_disposition": "ContentDisposition",
+}
+
+# 拡張子のみのパターン（例: *.png ）。拡張子単位でメモ化できる
+EXTENSION_PATTERN = re.compile(r"^\*\.([^*?\[\]/.]+)$")
+
+# 全オブジェクト共通の追加パラメータ
+DEFAULT_EXTRA_ARGS = {"ACL": "public-read"}
+
+# MIMEタイプ不明な場合の ContentType
+DEFAULT_CONTENT_TYPE = "application/octet-stream"
+
+
+def get_extension(s3_key: str) -> str:
+    """
+    S3 キーの拡張子（ドットなし）を返す。
+
+    Args:
+        s3_key (str): S3 オブジェクトキー。
+
+    Returns:
+        str: 拡張子。拡張子がない場合は空文字。
+    """
+    return PurePosixPath(s3_key).suffix[1:]
+
+
+class MetadataResolver:
+    """
+    config.yml のメタデータルールから、S3 アップロード時の追加パラメータを決定する。
+
+    ルールは上から順に適用し、後のルールが前のルールを上書きする（metadata は結合）。
+    パターンは生成時に1回だけコンパイルし、拡張子のみのパターンは拡張子単位でメモ化する。
+    適用ルールの組み合わせごとに結果もキャッシュするため、大量のキーでも高速に解決できる。
+
+    ルールの例:
+        - patterns: ["*.png", "*.jpg"]
+          cache_control: "public, max-age=31536000, immutable"
+        - patterns: ["*/downloads/*.pdf"]
+          content_disposition: "attachment"
+          metadata:
+            category: "download"
+    """
+
+    def __init__(self, rules: list[dict] | None = None):
+        """
+        Args:
+            rules (list[dict] | None, optional): メタデータルールのリスト。
+
+        Raises:
+            ValueError: ルールの形式が正しくない場合。
+        """
+        self.rules: list[dict] = []
+        self.extension_rules: dict[str, list[int]] = {}
+        self.path_rules: list[tuple[int, re.Pattern]] = []
+
+        self.extension_cache: dict[str, tuple[int, ...]] = {}
+        self.result_cache: dict[tuple[str, tuple[int, ...]], dict] = {}
+
+        for number, rule in enumerate(rules or []):
+            self.rules.append(self.validate_rule(number, rule))
+
+            for pattern in rule["patterns"]:
+                match = EXTENSION_PATTERN.match(pattern)
+                if match:
+                    self.extension_rules.setdefault(match.group(1), []).append(number)
+                else:
+                    self.path_rules.append((number, re.compile(translate(pattern))))
+
+    @staticmethod
+    def validate_rule(number: int, rule: dict) -> dict:
+        """
+        ルールの形式を検証する。
+
+        Args:
+            number (int): ルールの番号（0 始まり）。
+            rule (dict): メタデータルール。
+
+        Returns:
+            dict: 検証済みのルール。
+
+        Raises:
+            ValueError: ルールの形式が正しくない場合。
+        """
+        if not isinstance(rule, dict):
+            raise ValueError(
+                f"metadata_rules[{number}] : ルールの形式が正しくありません"
+            )
+
+        patterns = rule.get("patterns")
+        if not patterns or not isinstance(patterns, list):
+            raise ValueError(
+                f"metadata_rules[{number}] : 'patterns' にパターンのリストを指定してください"
+            )
+
+        unknown = set(rule) - {"patterns", "metadata", *RULE_FIELDS}
+        if unknown:
+            raise ValueError(
+                f"metadata_rules[{number}] : 未対応のキーが含まれています: {sorted(unknown)}"
+            )
+
+        if not isinstance(rule.get("metadata", {}), dict):
+            raise ValueError(
+                f"metadata_rules[{number}] : 'metadata' はキーと値の組で指定してください"
+            )
+
+        return rule
+
+    def match_rules(self, s3_key: str, extension: str) -> tuple[int, ...]:
+        """
+        キーに一致するルールの番号を返す。
+
+        Args:
+            s3_key (str): S3 オブジェクトキー。
+            extension (str): キーの拡張子。
+
+        Returns:
+            tuple[int, ...]: 一致したルールの番号（昇順）。
+        """
+        matched = self.extension_cache.get(extension)
+        if matched is None:
+            matched = tuple(self.extension_rules.get(extension, []))
+            self.extension_cache[extension] = matched
+
+        if not self.path_rules:
+            return matched
+
+        path_matched = [
+            number for number, regex in self.path_rules if regex.match(s3_key)
+        ]
+        if not path_matched:
+            return matched
+
+        return tuple(sorted({*matched, *path_matched}))
+
+    def build_extra_args(self, extension: str, matched: tuple[int, ...]) -> dict:
+        """
+        拡張子と一致したルールから追加パラメータを組み立てる。
+
+        Args:
+            extension (str): キーの拡張子。
+            matched (tuple[int, ...]): 一致したルールの番号。
+
+        Returns:
+            dict: S3 アップロード時の追加パラメータ。
+        """
+        mime_type, _ = mimetypes.guess_type(
+            f"file.{extension}" if extension else "file"
+        )
+        extra_args = {
+            **DEFAULT_EXTRA_ARGS,
+            "ContentType": mime_type if mime_type else DEFAULT_CONTENT_TYPE,
+        }
+        metadata = {}
+
+        for number in matched:
+            rule = self.rules[number]
+            for field, arg_name in RULE_FIELDS.items():
+                if field in rule:
+                    extra_args[arg_name] = str(rule[field])
+            metadata.update(
+                {str(k): str(v) for k, v in (rule.get("metadata") or {}).items()}
+            )
+
+        if metadata:
+            extra_args["Metadata"] = metadata
+
+        return extra_args
+
+    def resolve(self, s3_key: str) -> dict:
+        """
+        S3 キーに対応する追加パラメータを返す。
+
+        Args:
+            s3_key (str): S3 オブジェクトキー。
+
+        Returns:
+            dict: 以下のキーを持つ辞書（呼び出し側で変更しても良いコピー）。
+                - "ACL": アクセス権（常に "public-read"）
+                - "ContentType": ルールで指定された、または推測された MIME タイプ
+                - "CacheControl" / "ContentDisposition" / "Metadata": ルールで指定された場合のみ
+        """
+        extension = get_extension(s3_key)
+        matched = self.match_rules(s3_key, extension)
+
+        cache_key = (extension, matched)
+        extra_args = self.result_cache.get(cache_key)
+        if extra_args is None:
+            extra_args = self.build_extra_args(extension, matched)
+            self.result_cache[cache_key] = extra_args
+
+        if "Metadata" in extra_args:
+            return {**extra_args, "Metadata": dict(extra_args["Metadata"])}
+        return dict(extra_args)
@@ -0,0 +1,675 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import time
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path, PurePosixPath
+from typing import TYPE_CHECKING
+
+from custom_log import record_metrics, setup_logger, stage
+from delete import (
+    VersionIndex,
+    build_version_index,
+    create_s3_key_and_s3_url,
+    delete_versions_in_batches,
+)
+from journal import Journal
+from listing_index import ObjectRecord
+from manifest import Manifest, ManifestRecord
+from metadata_rules import DEFAULT_EXTRA_ARGS
+from pipeline import Operation, Session, run_pipeline
+from rate_control import AdaptiveController
+from result_sink import ResultSink
+from upload import create_access_url
+from utils import iter_lines
+
+import config
+
+if TYPE_CHECKING:
+    from botocore.client import BaseClient
+
+CONTEXT = {
+    "load_move_list": "対応表読込",
+    "check_mapping": "対応表の移動元確認",
+    "copy_s3_object": "s3オブジェクトコピー",
+    "move_s3_object": "s3オブジェクト移動",
+    "list_objects": "オブジェクト一覧取得",
+    "copy_objects": "サーバー側コピー",
+    "delete_sources": "移動元のバージョン一括削除",
+    "record_results": "結果・ジャーナル記録",
+}
+
+MB = 1024 * 1024
+
+# CopyObject でコピーできる最大サイズ。これを超える場合は UploadPartCopy で分割してコピーする
+MULTIPART_COPY_THRESHOLD = 5 * 1024 * MB
+
+# UploadPartCopy 1回あたりのサイズ（パート数が上限を超える場合は大きくする）
+COPY_PART_SIZE = 512 * MB
+
+# マルチパートアップロードのパート数の上限
+MAX_PARTS = 10000
+
+# 1オブジェクトのパートを並行してコピーする数
+COPY_PART_WORKERS = 8
+
+# CopyObject / CreateMultipartUpload で引き継ぐ、HEAD のレスポンスの項目
+COPIED_HEADERS = (
+    "CacheControl",
+    "ContentDisposition",
+    "ContentEncoding",
+    "ContentLanguage",
+    "ContentType",
+    "Metadata",
+)
+
+
+def parse_move_line(line: str) -> tuple[str, str]:
+    """
+    対応表の1行を 移動元のURL と 移動先のS3キー に分ける。
+
+    URL はパーセントエンコード済みで空白を含まないため、最初の空白（タブ）で区切る。
+    移動先のキーは空白を含んでもよい。
+
+    Args:
+        line (str): 対応表の1行（「移動元のURL 移動先のS3キー」）。
+
+    Returns:
+        tuple[str, str]: 移動元のURL と 移動先のS3キー。
+
+    Raises:
+        ValueError: 移動先のキーがない場合。
+    """
+    parts = line.split(maxsplit=1)
+    if len(parts) != 2:
+        raise ValueError("移動先のS3キーがありません")
+    return parts[0], parts[1].strip().lstrip("/")
+
+
+def copy_part_ranges(size: int, part_size: int = COPY_PART_SIZE) -> list[str]:
+    """
+    UploadPartCopy の CopySourceRange をパートの順に返す。
+
+    Args:
+        size (int): コピー元のバイト数。
+        part_size (int, optional): 1パートのバイト数。パート数が上限を超える場合は大きくする。
+
+    Returns:
+        list[str]: "bytes=開始-終了"（終了を含む）のリスト。
+    """
+    part_size = max(part_size, -(-size // MAX_PARTS))
+    return [
+        f"bytes={start}-{min(start + part_size, size) - 1}"
+        for start in range(0, size, part_size)
+    ]
+
+
+def copy_source(source_key: str, record: ObjectRecord) -> dict:
+    """
+    CopySource を返す。一覧取得したバージョンに固定し、後から書き込まれたバージョンはコピーしない。
+
+    Args:
+        source_key (str): コピー元の S3 キー。
+        record (ObjectRecord): 一覧取得で得たコピー元の情報。
+
+    Returns:
+        dict: CopySource（バージョニングが無効なバケットでは VersionId を含まない）。
+    """
+    source = {"Bucket": config.S3_BUCKET, "Key": source_key}
+    if record.version_id and record.version_id != "null":
+        source["VersionId"] = record.version_id
+    return source
+
+
+def multipart_copy(
+    s3_client: BaseClient, source_key: str, dest_key: str, record: ObjectRecord
+) -> dict:
+    """
+    UploadPartCopy でオブジェクトを分割してサーバー側でコピーする（ 5GB を超える場合 ）。
+
+    CreateMultipartUpload はコピー元のメタデータを引き継がないため、HEAD で取得して指定する。
+    途中で失敗した場合はマルチパートアップロードを中止する。
+
+    Args:
+        s3_client (BaseClient): boto3のS3クライアント。
+        source_key (str): コピー元の S3 キー。
+        dest_key (str): コピー先の S3 キー。
+        record (ObjectRecord): 一覧取得で得たコピー元の情報（サイズ・ETag）。
+
+    Returns:
+        dict: CompleteMultipartUpload のレスポンス（ETag, VersionId）。
+
+    Raises:
+        botocore.exceptions.ClientError: コピーに失敗した場合。
+    """
+    if_match = f'"{record.etag}"'
+    source = copy_source(source_key, record)
+    head = s3_client.head_object(
+        Bucket=config.S3_BUCKET,
+        Key=source_key,
+        IfMatch=if_match,
+        **({"VersionId": source["VersionId"]} if "VersionId" in source else {}),
+    )
+    response = s3_client.create_multipart_upload(
+        Bucket=config.S3_BUCKET,
+        Key=dest_key,
+        **DEFAULT_EXTRA_ARGS,
+        **{name: head[name] for name in COPIED_HEADERS if name in head},
+    )
+    upload_id = response["UploadId"]
+
+    def copy_part(part: tuple[int, str]) -> dict:
+        number, byte_range = part
+        result = s3_client.upload_part_copy(
+            Bucket=config.S3_BUCKET,
+            Key=dest_key,
+            UploadId=upload_id,
+            PartNumber=number,
+            CopySource=source,
+            CopySourceRange=byte_range,
+            CopySourceIfMatch=if_match,
+        )
+        return {"PartNumber": number, "ETag": result["CopyPartResult"]["ETag"]}
+
+    try:
+        parts = list(enumerate(copy_part_ranges(record.size, COPY_PART_SIZE), start=1))
+        with ThreadPoolExecutor(max_workers=COPY_PART_WORKERS) as executor:
+            completed = list(executor.map(copy_part, parts))
+        return s3_client.complete_multipart_upload(
+            Bucket=config.S3_BUCKET,
+            Key=dest_key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": completed},
+        )
+    except Exception:
+        s3_client.abort_multipart_upload(
+            Bucket=config.S3_BUCKET, Key=dest_key, UploadId=upload_id
+        )
+        raise
+
+
+def copy_one(
+    s3_client: BaseClient,
+    source_key: str,
+    dest_key: str,
+    record: ObjectRecord,
+    controller: AdaptiveController | None = None,
+) -> tuple[bool, dict | str]:
+    """
+    1件のオブジェクトをサーバー側でコピーする（データはこのマシンを経由しない）。
+
+    一覧取得したバージョンからコピーし、内容が変わっていないことを ETag（ CopySourceIfMatch ）で確認する。
+    コピー先はアップロードと同じく公開読み取り（ DEFAULT_EXTRA_ARGS ）とする。
+
+    Args:
+        s3_client (BaseClient): boto3のS3クライアント。
+        source_key (str): コピー元の S3 キー。
+        dest_key (str): コピー先の S3 キー。
+        record (ObjectRecord): 一覧取得で得たコピー元の情報（サイズ・ETag）。
+        controller (AdaptiveController | None, optional): 指定した場合、同時実行数の枠を確保してコピーする。
+
+    Returns:
+        tuple[bool, dict | str]: 成功した場合は (True, コピー先の ETag・VersionId)、
+            失敗した場合は (False, 失敗理由)。
+    """
+
+    def copy() -> dict:
+        if record.size > MULTIPART_COPY_THRESHOLD:
+            response = multipart_copy(s3_client, source_key, dest_key, record)
+            return {"etag": response["ETag"], "version_id": response.get("VersionId")}
+
+        response = s3_client.copy_object(
+            Bucket=config.S3_BUCKET,
+            Key=dest_key,
+            CopySource=copy_source(source_key, record),
+            CopySourceIfMatch=f'"{record.etag}"',
+            **DEFAULT_EXTRA_ARGS,
+        )
+        return {
+            "etag": response["CopyObjectResult"]["ETag"],
+            "version_id": response.get("VersionId"),
+        }
+
+    started = time.monotonic()
+    try:
+        if controller is None:
+            result = copy()
+        else:
+            with controller.slot():
+                result = copy()
+                elapsed = time.monotonic() - started
+                controller.record_success(elapsed / max(1.0, record.size / MB))
+    except Exception as e:
+        record_metrics(latency=time.monotonic() - started)
+        logging.debug(f"{source_key} → {dest_key} : コピーに失敗しました: {e}")
+        return False, f"S3コピー失敗: {e}"
+
+    # データは転送しないが、コピーしたバイト数を記録する（ MB/s はサーバー側のコピー速度 ）
+    record_metrics(nbytes=record.size, latency=time.monotonic() - started)
+    result["etag"] = result["etag"].strip('"')
+    return True, result
+
+
+def copy_objects(
+    s3_client: BaseClient,
+    copies: list[tuple[str, str, ObjectRecord]],
+    max_workers: int = 1,
+    controller: AdaptiveController | None = None,
+) -> list[tuple[bool, dict | str]]:
+    """
+    複数のオブジェクトを並行してサーバー側でコピーする。
+
+    Args:
+        s3_client (BaseClient): boto3のS3クライアント。
+        copies (list[tuple[str, str, ObjectRecord]]): コピー元のキー・コピー先のキー・コピー元の情報。
+        max_workers (int, optional): 同時コピー数。1 の場合は逐次処理。
+        controller (AdaptiveController | None, optional): 指定した場合、max_workers の代わりに
+            コントローラーの同時実行数（上限 controller.maximum ）に従う。
+
+    Returns:
+        list[tuple[bool, dict | str]]: copies と同じ順の copy_one() の結果。
+    """
+    workers = controller.maximum if controller is not None else max_workers
+    if workers <= 1:
+        return [copy_one(s3_client, *copy, controller) for copy in copies]
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(
+            executor.map(lambda copy: copy_one(s3_client, *copy, controller), copies)
+        )
+
+
+def process_moves(
+    lines: list[str],
+    s3_origin: str,
+    delimiter: str,
+    s3_client: BaseClient,
+    delete_source: bool = False,
+    max_workers: int = 1,
+    controller: AdaptiveController | None = None,
+    manifest: Manifest | None = None,
+    mapping_sources: set[str] | None = None,
+    shared_mapping_sources: set[str] | None = None,
+) -> list[tuple[str, str, dict]]:
+    """
+    対応表の行ごとにオブジェクトをサーバー側でコピーし、移動の場合はコピー元を一括削除する。
+
+    コピー元はディレクトリ単位のバージョンの一覧取得でまとめて確認し、オブジェクトごとの HEAD は行わない。
+    コピー元の削除は、一覧取得した時点のバージョンだけを DeleteObjects でまとめて行うため、
+    同じキーへ後から書き込まれたオブジェクト（他の行のコピー先など）は削除しない。
+    移動先が他の行の移動元になっている行（ a→b, b→c の連鎖や a→b, b→a の入れ替え ）は、
+    コピーの順序で結果が変わるため失敗とする。
+    移動の場合、同じ移動元から複数の移動先へ移動する行も、1行目のコピー後に移動元が削除され
+    残りの行がコピーできなくなるため失敗とする（コピーのみの場合は対象外）。
+
+    Args:
+        lines (list[str]): 対応表の行（1バッチ分）。
+        s3_origin (str): S3オリジンのベースURL。S3キーを生成するために使用。
+        delimiter (str): S3キー生成時に使用する区切り文字。
+        s3_client (BaseClient): boto3のS3クライアント。
+        delete_source (bool, optional): True の場合、コピーに成功したコピー元を削除する（移動）。
+        max_workers (int, optional): 同時コピー数。
+        controller (AdaptiveController | None, optional): コピー・一括削除の同時実行数のコントローラー。
+        manifest (Manifest | None, optional): 指定した場合、コピー先を記録し、削除したコピー元の記録を削除する。
+        mapping_sources (set[str] | None, optional): 対応表全体の移動元のキー。
+            省略時はバッチ内の行の移動元だけと比較する。
+        shared_mapping_sources (set[str] | None, optional): 対応表全体で複数の移動先に対応している
+            移動元のキー。省略時はバッチ内の行だけで判定する。
+
+    Returns:
+        list[tuple[str, str, dict]]: 入力順の (対応表の行, 結果の種類, 結果の情報)。
+            結果の種類は success / failure。
+    """
+    results: dict[int, tuple[str, dict]] = {}
+
+    # 対応表の行からコピー元・コピー先のキーを生成する
+    candidates = []
+    for i, line in enumerate(lines):
+        try:
+            original_url, dest_key = parse_move_line(line)
+            source_key, _ = create_s3_key_and_s3_url(original_url, s3_origin, delimiter)
+        except (ValueError, IndexError) as e:
+            reason = (
+                str(e) if isinstance(e, ValueError) else "URLからS3キーを生成できません"
+            )
+            results[i] = ("failure", {"file_name": "-", "path": line, "reason": reason})
+            continue
+
+        if source_key == dest_key:
+            results[i] = (
+                "failure",
+                {
+                    "file_name": dest_key,
+                    "path": original_url,
+                    "reason": "移動元と移動先が同じです",
+                },
+            )
+            continue
+
+        candidates.append((i, original_url, source_key, dest_key))
+
+    # 移動先が他の行の移動元になっている行は失敗とする
+    # 移動の場合は、複数の移動先に対応している移動元の行も失敗とする
+    sources = {source_key for _, _, source_key, _ in candidates}
+    sources.update(mapping_sources or ())
+    shared = set()
+    if delete_source:
+        shared = shared_sources(
+            (source_key, dest_key) for _, _, source_key, dest_key in candidates
+        )
+        shared.update(shared_mapping_sources or ())
+    for i, original_url, source_key, dest_key in candidates:
+        if dest_key in sources:
+            reason = "移動先が対応表の他の行の移動元です"
+        elif source_key in shared:
+            reason = "移動元が対応表の複数の行で使われています"
+        else:
+            continue
+        results[i] = (
+            "failure",
+            {"file_name": dest_key, "path": original_url, "reason": reason},
+        )
+    candidates = [candidate for candidate in candidates if candidate[0] not in results]
+
+    # コピー元の確認と削除対象のバージョンの収集（ディレクトリ単位の一覧取得でまとめて行う）
+    # 一覧取得に失敗した場合は全件を失敗とする
+    version_index = VersionIndex()
+    missing_reason = "オブジェクトが見つかりません"
+    try:
+        with stage(CONTEXT["list_objects"]):
+            record_metrics(items=len(candidates))
+            version_index = build_version_index(
+                s3_client, (source_key for _, _, source_key, _ in candidates)
+            )
+    except Exception as e:
+        missing_reason = str(e)
+
+    copies = []
+    for i, original_url, source_key, dest_key in candidates:
+        record = version_index.latest.get(source_key)
+        if record is None:
+            results[i] = (
+                "failure",
+                {"file_name": dest_key, "path": original_url, "reason": missing_reason},
+            )
+            continue
+        copies.append((i, original_url, source_key, dest_key, record))
+
+    # サーバー側でコピーする
+    with stage(CONTEXT["copy_objects"]):
+        copied = copy_objects(
+            s3_client,
+            [
+                (source_key, dest_key, record)
+                for _, _, source_key, dest_key, record in copies
+            ],
+            max_workers=max_workers,
+            controller=controller,
+        )
+
+    succeeded = []
+    for (i, original_url, source_key, dest_key, record), (ok, outcome) in zip(
+        copies, copied
+    ):
+        if not ok:
+            results[i] = (
+                "failure",
+                {"file_name": dest_key, "path": original_url, "reason": outcome},
+            )
+            continue
+        succeeded.append((i, original_url, source_key, dest_key, record, outcome))
+
+    if manifest is not None:
+        manifest.record_rows(
+            (dest_key, copied_record(manifest, source_key, record, outcome))
+            for _, _, source_key, dest_key, record, outcome in succeeded
+        )
+
+    # 移動の場合は、コピーに成功したコピー元の（一覧取得した時点の）全バージョンをまとめて削除する
+    errors = {}
+    if delete_source and succeeded:
+        source_keys = dict.fromkeys(source_key for _, _, source_key, *_ in succeeded)
+        try:
+            with stage(CONTEXT["delete_sources"]):
+                errors = delete_versions_in_batches(
+                    s3_client,
+                    [
+                        {"Key": source_key, "VersionId": version_id}
+                        for source_key in source_keys
+                        for version_id in version_index[source_key]
+                    ],
+                    controller,
+                )
+        except Exception as e:
+            errors = dict.fromkeys(source_keys, str(e))
+
+        if manifest is not None:
+            manifest.remove(key for key in source_keys if key not in errors)
+
+    for i, original_url, source_key, dest_key, _, _ in succeeded:
+        if source_key in errors:
+            results[i] = (
+                "failure",
+                {
+                    "file_name": dest_key,
+                    "path": original_url,
+                    "reason": f"コピー済み・移動元の削除に失敗: {errors[source_key]}",
+                },
+            )
+        else:
+            results[i] = (
+                "success",
+                {
+                    "file_name": PurePosixPath(dest_key).name,
+                    "key": dest_key,
+                    "path": create_access_url(dest_key),
+                },
+            )
+
+    return [(line, *results[i]) for i, line in enumerate(lines)]
+
+
+def shared_sources(pairs: Iterable[tuple[str, str]]) -> set[str]:
+    """
+    複数の移動先に対応している移動元のキーを返す。
+
+    Args:
+        pairs (Iterable[tuple[str, str]]): (移動元のキー, 移動先のキー)。
+
+    Returns:
+        set[str]: 異なる移動先を持つ行が2行以上ある移動元のキー。
+    """
+    destinations: dict[str, str] = {}
+    shared = set()
+    for source_key, dest_key in pairs:
+        if destinations.setdefault(source_key, dest_key) != dest_key:
+            shared.add(source_key)
+    return shared
+
+
+def copied_record(
+    manifest: Manifest, source_key: str, record: ObjectRecord, outcome: dict
+) -> ManifestRecord:
+    """
+    コピー先としてマニフェストに記録する情報を返す。
+
+    内容はコピー元と同じため、コピー元の記録にあるローカルファイルの更新日時・ハッシュを引き継ぐ。
+
+    Args:
+        manifest (Manifest): マニフェスト。
+        source_key (str): コピー元の S3 キー。
+        record (ObjectRecord): 一覧取得で得たコピー元の情報。
+        outcome (dict): copy_one() が返したコピー先の ETag・VersionId。
+
+    Returns:
+        ManifestRecord: コピー先の記録。
+    """
+    source = manifest.get(source_key)
+    return ManifestRecord(
+        record.size,
+        mtime_ns=source.mtime_ns if source else None,
+        content_hash=source.content_hash if source else None,
+        etag=outcome["etag"],
+        version_id=outcome["version_id"],
+        uploaded_at=time.time(),
+    )
+
+
+def record_move_batch(
+    results: list[tuple[str, str, dict]],
+    journal: Journal | None = None,
+    sink: ResultSink | None = None,
+) -> None:
+    """
+    1バッチ分のコピー・移動結果を結果ファイルへ書き出し、行ごとの状態をジャーナルに記録する。
+
+    Args:
+        results (list[tuple[str, str, dict]]): process_moves() の結果。
+        journal (Journal | None, optional): 記録先のジャーナル。
+        sink (ResultSink | None, optional): 結果の出力先。失敗した行は再実行用リストにも出力する。
+    """
+    for line, status, result in results:
+        if sink is not None:
+            sink.write(status, result)
+            if status == "failure":
+                sink.add_retry(line)
+        if journal is not None:
+            journal.record(line, status, result if status == "success" else None)
+
+    if journal is not None:
+        journal.sync()
+
+
+class MoveOperation(Operation):
+    """
+    対応表（移動元のURL → 移動先のS3キー）に従った、サーバー側コピー（と移動元の一括削除）。
+    """
+
+    script = Path(__file__).name
+
+    def __init__(self, delete_source: bool = True):
+        """
+        Args:
+            delete_source (bool, optional): True の場合は移動（コピー後に移動元を削除）、
+                False の場合はコピーのみ。
+        """
+        self.delete_source = delete_source
+        self.name = "move" if delete_source else "copy"
+        self.context = {
+            "load_list": CONTEXT["load_move_list"],
+            "setup": CONTEXT["check_mapping"],
+            "process": CONTEXT["move_s3_object" if delete_source else "copy_s3_object"],
+        }
+        self.mapping_sources: set[str] = set()
+        self.shared_mapping_sources: set[str] = set()
+
+        self.input_file = config.MOVE_LIST
+        if delete_source:
+            self.result_file = config.MOVE_RESULT
+            self.journal_file = config.MOVE_JOURNAL
+            self.retry_file = config.MOVE_RETRY_LIST
+            self.metrics_file = config.MOVE_METRICS
+        else:
+            self.result_file = config.COPY_RESULT
+            self.journal_file = config.COPY_JOURNAL
+            self.retry_file = config.COPY_RETRY_LIST
+            self.metrics_file = config.COPY_METRICS
+
+        s3_host = f"{config.S3_BUCKET}.s3.{config.AWS_REGION}.amazonaws.com"
+        self.s3_origin = f"https://{s3_host}"
+        self.delimiter = f"{s3_host}/"
+
+    def create_session(self) -> Session:
+        """
+        最大同時コピー数 × パートの並行数 のコネクションを持つセッションを生成する。
+
+        Returns:
+            Session: 生成したセッション。
+        """
+        return Session.create(
+            config.COPY_MAX_WORKERS, connections_per_worker=COPY_PART_WORKERS
+        )
+
+    def setup(self, session: Session) -> None:
+        """
+        対応表全体の移動元のキーを集める（バッチをまたいだ連鎖・入れ替えと、
+        移動の場合は同じ移動元から複数の移動先への移動の確認に使う）。
+        """
+
+        def iter_pairs():
+            for line in iter_lines(self.input_file):
+                try:
+                    original_url, dest_key = parse_move_line(line)
+                    source_key, _ = create_s3_key_and_s3_url(
+                        original_url, self.s3_origin, self.delimiter
+                    )
+                except (ValueError, IndexError):
+                    continue
+                self.mapping_sources.add(source_key)
+                yield source_key, dest_key
+
+        shared = shared_sources(iter_pairs())
+        if self.delete_source:
+            self.shared_mapping_sources = shared
+
+    def process_batch(
+        self, session: Session, batch: list[str], journal: Journal, sink: ResultSink
+    ) -> None:
+        """1バッチ分の行のオブジェクトをコピー（移動）し、結果を記録する。"""
+        results = process_moves(
+            batch,
+            self.s3_origin,
+            self.delimiter,
+            session.s3_client,
+            delete_source=self.delete_source,
+            max_workers=config.COPY_MAX_WORKERS,
+            controller=session.controller,
+            manifest=session.manifest,
+            mapping_sources=self.mapping_sources,
+            shared_mapping_sources=self.shared_mapping_sources,
+        )
+        with stage(CONTEXT["record_results"]):
+            record_move_batch(results, journal=journal, sink=sink)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """
+    コマンドライン引数を解析する。
+
+    Args:
+        argv (list[str] | None, optional): 引数のリスト。省略時は sys.argv を使う。
+
+    Returns:
+        argparse.Namespace: 解析結果（copy, resume）。
+    """
+    parser = argparse.ArgumentParser(
+        description="対応表に従って S3 オブジェクトをサーバー側で移動（コピー）する"
+    )
+    parser.add_argument(
+        "--copy",
+        action="store_true",
+        help="コピーのみ行い、移動元を削除しない",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="前回のジャーナルを読み込み、完了済みの行をスキップして再開する",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None):
+    args = parse_args(argv)
+    setup_logger(
+        config.LOGGING_LEVEL,
+        config.LOGGING_FORMAT,
+        config.LOGGING_DEBUG_SUMMARY_INTERVAL,
+    )
+    run_pipeline(MoveOperation(delete_source=not args.copy), resume=args.resume)
+
+
+# スクリプト実行
+if __name__ == "__main__":
+    main()
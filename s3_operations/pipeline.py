@@ -0,0 +1,414 @@
+from __future__ import annotations
+
+import logging
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
+
+from custom_log import end, handle_exception, notify, record_metrics, stage, start
+from dedupe import Deduplicator
+from hashing import HashService
+from journal import Journal
+from manifest import Manifest
+from rate_control import AdaptiveController
+from result_sink import ResultSink, result_path
+from utils import (
+    create_controller,
+    create_s3_client,
+    iter_batches,
+    iter_unique_lines,
+    log_duplicates,
+    notify_output,
+)
+
+import config
+
+if TYPE_CHECKING:
+    from botocore.client import BaseClient
+
+# 全処理で共通の処理段階
+CONTEXT = {
+    "create_s3client": "s3クライアント生成",
+    "connect_bucket": "バケット疎通確認",
+    "write_results": "結果リスト生成",
+}
+
+
+class Session:
+    """
+    パイプラインの各処理で共有する S3 クライアント、流量制御のコントローラー、マニフェスト、
+    ハッシュ計算のサービス。
+    """
+
+    def __init__(
+        self,
+        s3_client: BaseClient,
+        controller: AdaptiveController | None = None,
+        manifest: Manifest | None = None,
+        hasher: HashService | None = None,
+    ):
+        """
+        Args:
+            s3_client (BaseClient): boto3のS3クライアント。
+            controller (AdaptiveController | None, optional): 同時実行数と転送速度のコントローラー。
+            manifest (Manifest | None, optional): アップロード済みオブジェクトのマニフェスト。
+            hasher (HashService | None, optional): 差分判定で使うハッシュ計算のサービス。
+        """
+        self.s3_client = s3_client
+        self.controller = controller
+        self.manifest = manifest
+        self.hasher = hasher
+
+    @classmethod
+    def create(
+        cls, max_workers: int, connections_per_worker: int = 1, upload: bool = False
+    ) -> Session:
+        """
+        config.yml の s3_client / rate_control / manifest / hashing に従って
+        クライアント・コントローラー・マニフェスト・ハッシュ計算のサービスを生成する。
+
+        Args:
+            max_workers (int): 同時実行数（ adaptive の場合は初期値 ）。
+            connections_per_worker (int, optional): 1ワーカーあたりの最大同時接続数。
+                （ 最大同時実行数 × この値 のコネクションを確保する ）
+            upload (bool, optional): True の場合、転送速度の上限も適用する。
+
+        Returns:
+            Session: 生成したセッション。
+        """
+        controller = create_controller(max_workers, upload=upload)
+        workers = controller.maximum if controller else max_workers
+        s3_client = create_s3_client(
+            max_pool_connections=workers * connections_per_worker
+        )
+        if controller:
+            controller.attach(s3_client)
+
+        manifest = None
+        if config.MANIFEST_PATH:
+            manifest = Manifest(config.MANIFEST_PATH)
+            manifest.attach(s3_client)
+
+        # プロセスプールは最初にハッシュを計算する時点で起動する
+        hasher = HashService(config.HASH_WORKERS, config.HASH_CACHE_PATH)
+        return cls(s3_client, controller, manifest, hasher)
+
+    def close(self) -> None:
+        """
+        コントローラー・マニフェストのクライアントへの登録を解除し、
+        マニフェストとハッシュ計算のサービスを閉じる。
+        """
+        if self.controller is not None:
+            self.controller.detach(self.s3_client)
+        if self.manifest is not None:
+            self.manifest.detach(self.s3_client)
+            self.manifest.close()
+        if self.hasher is not None:
+            self.hasher.close()
+
+    def preflight(self) -> None:
+        """
+        バケットへの疎通を確認する。
+
+        Raises:
+            botocore.exceptions.ClientError: バケットが存在しない、または権限がない場合。
+        """
+        self.s3_client.head_bucket(Bucket=config.S3_BUCKET)
+
+
+class Operation:
+    """
+    パイプラインで実行する処理（ステージ）の基底クラス。
+
+    クライアント生成・バケットの疎通確認・入力リストの読込・ジャーナル・結果ファイルの出力は
+    run_pipeline() が共通で行い、サブクラスは入出力ファイルと各バッチの処理だけを定義する。
+
+    サブクラスで設定する属性:
+        name: サブコマンド名。
+        script: 開始時の設定表示に使う名前。
+        context: 処理段階の名前（ load_list / process は必須、setup は setup() を行う場合のみ ）。
+        input_file / result_file / journal_file / retry_file / metrics_file: 入出力ファイル。
+        resume_statuses: 再開時に完了済みとして結果ファイルに含めるジャーナルの状態。
+        with_skipped: テキスト形式の結果ファイルに SKIPPED セクションを出力するか。
+    """
+
+    name = ""
+    script = ""
+    context: dict[str, str] = {}
+    input_file = ""
+    result_file = ""
+    journal_file = ""
+    retry_file = ""
+    metrics_file = ""
+    resume_statuses = ("success",)
+    with_skipped = False
+
+    def create_session(self) -> Session:
+        """
+        処理に合わせた設定でセッションを生成する。
+
+        Returns:
+            Session: 生成したセッション。
+        """
+        return Session.create(1)
+
+    def load_items(self, session: Session, deduplicator: Deduplicator) -> Iterable:
+        """
+        入力ファイルから処理対象を1行ずつ読み込む（重複行は除外する）。
+
+        Args:
+            session (Session): 共有のセッション。
+            deduplicator (Deduplicator): 重複判定に使う集合。
+
+        Returns:
+            Iterable: 処理対象（S3キーや URL）。
+        """
+        return iter_unique_lines(self.input_file, deduplicator)
+
+    def item_key(self, item) -> str:
+        """
+        処理対象をジャーナルに記録するときのキーを返す。
+
+        Args:
+            item: load_items() で読み込んだ処理対象。
+
+        Returns:
+            str: ジャーナルのキー（入力行）。
+        """
+        return item
+
+    def setup(self, session: Session) -> None:
+        """
+        バッチ処理の前に1回だけ行う準備。context に setup がある場合に呼び出される。
+
+        Args:
+            session (Session): 共有のセッション。
+        """
+
+    def process_items(
+        self,
+        session: Session,
+        items: Iterable,
+        journal: Journal,
+        sink: ResultSink,
+    ) -> None:
+        """
+        読み込んだ項目を BATCH_SIZE 件ずつ process_batch() に渡す。
+
+        バッチに分けずに処理する場合（ stream.run_stream で段を並行させる場合など ）は上書きする。
+
+        Args:
+            session (Session): 共有のセッション。
+            items (Iterable): 処理対象（ジャーナルで完了済みの項目は除外済み）。
+            journal (Journal): 記録先のジャーナル。
+            sink (ResultSink): 結果の出力先。
+        """
+        for batch in iter_batches(items, config.BATCH_SIZE):
+            record_metrics(items=len(batch))
+            self.process_batch(session, batch, journal, sink)
+
+    def process_batch(
+        self,
+        session: Session,
+        batch: list,
+        journal: Journal,
+        sink: ResultSink,
+    ) -> None:
+        """
+        1バッチ分の処理を行い、項目ごとの結果をジャーナル・結果ファイルへ記録する。
+
+        Args:
+            session (Session): 共有のセッション。
+            batch (list): 処理対象（1バッチ分）。
+            journal (Journal): 記録先のジャーナル。
+            sink (ResultSink): 結果の出力先。
+        """
+        raise NotImplementedError
+
+    def finish(self) -> None:
+        """
+        全バッチの処理が終わった後に1回だけ行う後処理（件数の集計ログ・準備で開いたファイルを閉じるなど）。
+
+        準備・バッチ処理の途中で失敗した場合も呼び出される。
+        """
+
+
+def run_pipeline(
+    operation: Operation, resume: bool = False, session: Session | None = None
+) -> str | None:
+    """
+    クライアント生成 → 疎通確認 → 入力リスト読込 → 準備 → バッチ処理 → 結果書き込み を順に行う。
+
+    各段階で例外が発生した場合はログを出力して終了する。
+
+    Args:
+        operation (Operation): 実行する処理。
+        resume (bool, optional): True の場合、ジャーナルで完了済みの項目をスキップして再開する。
+        session (Session | None, optional): 共有するセッション。省略時は operation に合わせて生成する。
+
+    Returns:
+        str | None: 結果ファイルの絶対パス。途中で失敗した場合は None。
+    """
+    # 開始通知
+    config.report_config(operation.script, config.CONFIG_SUMMARY)
+    start(metrics_file=operation.metrics_file)
+
+    # s3 クライアントを作成（生成したセッションは終了時に閉じる）
+    context = CONTEXT["create_s3client"]
+    owns_session = session is None
+    try:
+        with stage(context):
+            session = session or operation.create_session()
+        notify(context)
+    except Exception as e:
+        handle_exception(e, context)
+        end()
+        return None
+
+    try:
+        return run_stages(operation, session, resume)
+    finally:
+        if owns_session:
+            session.close()
+
+
+def process_stages(
+    operation: Operation,
+    session: Session,
+    items: Iterable,
+    journal: Journal,
+    deduplicator: Deduplicator,
+) -> ResultSink | None:
+    """
+    run_stages() のうち、準備 → バッチ処理 を行う。
+
+    Args:
+        operation (Operation): 実行する処理。
+        session (Session): 共有のセッション。
+        items (Iterable): 処理対象（ジャーナルで完了済みの項目は除外済み）。
+        journal (Journal): 記録先のジャーナル。
+        deduplicator (Deduplicator): 入力リストの読込で重複判定に使った集合。
+
+    Returns:
+        ResultSink | None: 結果を書き出した出力先（未クローズ）。途中で失敗した場合は None。
+    """
+    # バッチ処理の前の準備
+    if "setup" in operation.context:
+        context = operation.context["setup"]
+        try:
+            with stage(context):
+                operation.setup(session)
+            notify(context)
+        except Exception as e:
+            handle_exception(e, context)
+            end()
+            return None
+
+    # 読み込んだ項目をバッチ単位で処理し、結果は1件ずつ結果ファイルへ書き出す
+    # 再開時は前回までに完了した結果も結果ファイルに含める
+    context = operation.context["process"]
+    sink = None
+    try:
+        with stage(context):
+            sink = ResultSink(
+                result_path(operation.result_file, config.RESULT_FORMAT),
+                config.RESULT_FORMAT,
+                retry_file=operation.retry_file,
+                with_skipped=operation.with_skipped,
+            )
+            for status in operation.resume_statuses:
+                for result in journal.done_results(status):
+                    sink.write(status, result)
+            if journal.records:
+                done = sum(sink.counts[s] for s in operation.resume_statuses)
+                logging.info(
+                    f"{operation.journal_file} : 完了済みの {done} 件をスキップして再開します"
+                )
+
+            operation.process_items(session, items, journal, sink)
+
+            log_duplicates(deduplicator, operation.input_file)
+        notify(context)
+    except Exception as e:
+        handle_exception(e, context)
+        if sink is not None:
+            sink.close()
+        end()
+        return None
+
+    return sink
+
+
+def run_stages(operation: Operation, session: Session, resume: bool) -> str | None:
+    """
+    run_pipeline() のうち、疎通確認 → 入力リスト読込 → 準備 → バッチ処理 → 結果書き込み を行う。
+
+    Args:
+        operation (Operation): 実行する処理。
+        session (Session): 共有のセッション。
+        resume (bool): True の場合、ジャーナルで完了済みの項目をスキップして再開する。
+
+    Returns:
+        str | None: 結果ファイルの絶対パス。途中で失敗した場合は None。
+    """
+    # バケットへの疎通確認
+    context = CONTEXT["connect_bucket"]
+    try:
+        with stage(context):
+            session.preflight()
+        notify(context)
+    except Exception as e:
+        handle_exception(e, context)
+        end()
+        return None
+
+    # 入力リスト読込（ファイル全体は読み込まず、1行ずつ後続処理へ渡す）
+    # 再開時はジャーナルで完了済みの項目を除外する
+    context = operation.context["load_list"]
+    try:
+        with stage(context):
+            deduplicator = Deduplicator()
+            items = operation.load_items(session, deduplicator)
+            journal = Journal(
+                operation.journal_file,
+                resume=resume,
+                sync_every=config.JOURNAL_SYNC_EVERY,
+                sync_interval=config.JOURNAL_SYNC_INTERVAL,
+            )
+            items = (
+                item for item in items if not journal.is_done(operation.item_key(item))
+            )
+        notify(context)
+    except Exception as e:
+        handle_exception(e, context)
+        end()
+        return None
+
+    # 準備・バッチ処理の途中で失敗した場合も、ジャーナルを閉じて後処理を行う
+    try:
+        sink = process_stages(operation, session, items, journal, deduplicator)
+    finally:
+        journal.close()
+        deduplicator.close()
+        operation.finish()
+    if sink is None:
+        return None
+
+    # 結果書き込み
+    context = CONTEXT["write_results"]
+    try:
+        with stage(context):
+            path = sink.close()
+            if sink.counts["retry"]:
+                logging.info(
+                    f"{operation.retry_file} : 失敗した {sink.counts['retry']} 件を再実行用リストに出力しました"
+                )
+        notify(context)
+    except Exception as e:
+        handle_exception(e, context)
+        end()
+        return None
+
+    # 終了通知
+    end()
+    notify_output(path)
+    return path
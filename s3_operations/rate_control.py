@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from botocore.client import BaseClient
+
+# スロットリングとして扱うエラーコード
+THROTTLE_CODES = {
+    "SlowDown",
+    "Throttling",
+    "ThrottlingException",
+    "RequestLimitExceeded",
+    "RequestThrottled",
+    "TooManyRequestsException",
+}
+
+# スロットリングとして扱う HTTP ステータス
+THROTTLE_STATUS = 503
+
+
+class AdaptiveController:
+    """
+    S3 へのリクエストの同時実行数と転送速度を調整するコントローラー（AIMD 方式）。
+
+    レイテンシが安定している間は同時実行数を少しずつ増やし（加算的増加）、
+    スロットリング（503 SlowDown など）を検知したら即座に一定割合まで減らす（乗算的減少）。
+    減少後は cooldown 秒間は再度の減少・増加を行わず、1回のスロットリングで連続して絞らないようにする。
+    bytes_per_second を指定した場合は、トークンバケットで全スレッド合計の転送速度を制限する。
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int = 1,
+        maximum: int | None = None,
+        bytes_per_second: float | None = None,
+        backoff: float = 0.5,
+        latency_tolerance: float = 2.0,
+        cooldown: float = 1.0,
+    ):
+        """
+        Args:
+            initial (int): 同時実行数の初期値。
+            minimum (int, optional): 同時実行数の下限。
+            maximum (int | None, optional): 同時実行数の上限。省略時は initial（増加しない）。
+            bytes_per_second (float | None, optional): 転送速度の上限（バイト/秒）。省略時は無制限。
+            backoff (float, optional): スロットリング時に同時実行数へ掛ける係数。
+            latency_tolerance (float, optional): 平均レイテンシの何倍までを安定とみなすか。
+            cooldown (float, optional): 同時実行数を減らした後に調整を止める秒数。
+        """
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum or initial)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.cooldown = cooldown
+
+        self.active = 0
+        self.baseline: float | None = None
+        self.last_decrease = float("-inf")
+        self.throttles = 0
+        self.condition = threading.Condition()
+
+        # 転送速度の制限（トークンバケット。最大1秒分までまとめて送れる）
+        self.bytes_per_second = bytes_per_second or None
+        self.tokens = self.bytes_per_second or 0.0
+        self.last_refill = time.monotonic()
+        self.token_lock = threading.Lock()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """
+        同時実行数の枠を1つ確保する。枠が空くまで待機する。
+
+        Yields:
+            None: 枠を確保している間の処理。
+        """
+        with self.condition:
+            while self.active >= int(self.limit):
+                self.condition.wait()
+            self.active += 1
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.active -= 1
+                self.condition.notify_all()
+
+    def record_success(self, latency: float) -> None:
+        """
+        成功したリクエストのレイテンシを記録し、安定していれば同時実行数を増やす。
+
+        Args:
+            latency (float): リクエストの所要時間（秒、または処理量あたりの秒数）。
+        """
+        with self.condition:
+            stable = (
+                self.baseline is None
+                or latency <= self.baseline * self.latency_tolerance
+            )
+            self.baseline = (
+                latency
+                if self.baseline is None
+                else self.baseline * 0.9 + latency * 0.1
+            )
+
+            # 同時実行数の枠1周分の成功ごとに +1 する
+            if stable and time.monotonic() - self.last_decrease >= self.cooldown:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+                self.condition.notify_all()
+
+    def record_throttle(self) -> None:
+        """スロットリングを記録し、同時実行数を減らす。"""
+        with self.condition:
+            self.throttles += 1
+            now = time.monotonic()
+            if now - self.last_decrease < self.cooldown:
+                return
+
+            self.last_decrease = now
+            self.limit = max(self.minimum, self.limit * self.backoff)
+            logging.debug(
+                f"スロットリングを検知したため同時実行数を {int(self.limit)} に減らします"
+            )
+
+    def consume(self, amount: int) -> None:
+        """
+        転送したバイト数を記録し、上限を超えた分だけ待機する。
+
+        s3transfer の進捗コールバック（ Callback ）として渡せる。
+
+        Args:
+            amount (int): 転送したバイト数（再送時は負の値になる場合がある）。
+        """
+        if self.bytes_per_second is None or amount <= 0:
+            return
+
+        with self.token_lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.bytes_per_second,
+                self.tokens + (now - self.last_refill) * self.bytes_per_second,
+            )
+            self.last_refill = now
+            self.tokens -= amount
+            wait = -self.tokens / self.bytes_per_second if self.tokens < 0 else 0.0
+
+        if wait > 0:
+            time.sleep(wait)
+
+    def handle_retry(self, response=None, **kwargs) -> None:
+        """
+        botocore の needs-retry イベントで応答を確認し、スロットリングを記録する。
+
+        再試行の判定には関与しないため、常に None を返す。
+
+        Args:
+            response (tuple | None, optional): (HTTP レスポンス, 解析済みレスポンス)。
+        """
+        if response is None:
+            return None
+
+        http_response, parsed = response
+        code = (parsed or {}).get("Error", {}).get("Code")
+        if code in THROTTLE_CODES or http_response.status_code == THROTTLE_STATUS:
+            self.record_throttle()
+        return None
+
+    def attach(self, s3_client: BaseClient) -> None:
+        """
+        クライアントの全リクエスト（再試行を含む）のスロットリングを検知するよう登録する。
+
+        Args:
+            s3_client (BaseClient): boto3のS3クライアント。
+        """
+        s3_client.meta.events.register("needs-retry.s3", self.handle_retry)
+
+    def detach(self, s3_client: BaseClient) -> None:
+        """
+        attach() で登録したハンドラーの登録を解除する。
+
+        クライアントはプロセス内で再利用されるため、終了したセッションのコントローラーが
+        後のセッションのスロットリングを受け取り続けないようにする。
+
+        Args:
+            s3_client (BaseClient): boto3のS3クライアント。
+        """
+        s3_client.meta.events.unregister("needs-retry.s3", self.handle_retry)
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import argparse
+import logging
+from collections import Counter
+from pathlib import Path
+
+from custom_log import end, handle_exception, notify, setup_logger, stage, start
+from manifest import iter_latest_versions
+from pipeline import Session
+
+import config
+
+CONTEXT = {
+    "create_s3client": "s3クライアント生成",
+    "connect_bucket": "バケット疎通確認",
+    "reconcile_manifest": "マニフェスト照合",
+}
+
+# 照合結果の種類
+RECONCILE_STATUSES = ("added", "updated", "removed", "unchanged")
+
+
+def run_reconcile(prefix: str = "") -> Counter | None:
+    """
+    S3 の一覧（ページ単位で取得）と突き合わせて、マニフェストの記録を S3 の状態に合わせる。
+
+    マニフェストの外で行われたアップロード・削除や、記録前に中断した処理の分を反映する。
+
+    Args:
+        prefix (str, optional): 照合するプレフィックス。空の場合はバケット全体。
+
+    Returns:
+        Counter | None: 照合結果の種類ごとの件数。途中で失敗した場合は None。
+    """
+    config.report_config(Path(__file__).name, config.CONFIG_SUMMARY)
+    start()
+
+    if not config.MANIFEST_PATH:
+        logging.error("manifest.path が設定されていません（ config.yml ）")
+        end()
+        return None
+
+    # s3 クライアントとマニフェストを生成
+    context = CONTEXT["create_s3client"]
+    try:
+        with stage(context):
+            session = Session.create(1)
+        notify(context)
+    except Exception as e:
+        handle_exception(e, context)
+        end()
+        return None
+
+    try:
+        # バケットへの疎通確認
+        context = CONTEXT["connect_bucket"]
+        with stage(context):
+            session.preflight()
+        notify(context)
+
+        # S3 の一覧とマニフェストを突き合わせる
+        context = CONTEXT["reconcile_manifest"]
+        with stage(context):
+            counts = session.manifest.reconcile(
+                iter_latest_versions(session.s3_client, config.S3_BUCKET, prefix),
+                prefix,
+            )
+        notify(context)
+        logging.info(
+            f"s3://{config.S3_BUCKET}/{prefix} ⇒ {config.MANIFEST_PATH} : "
+            + " / ".join(
+                f"{status} {counts[status]} 件" for status in RECONCILE_STATUSES
+            )
+        )
+    except Exception as e:
+        handle_exception(e, context)
+        return None
+    finally:
+        session.close()
+        end()
+
+    return counts
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """
+    コマンドライン引数を解析する。
+
+    Args:
+        argv (list[str] | None, optional): 引数のリスト。省略時は sys.argv を使う。
+
+    Returns:
+        argparse.Namespace: 解析結果（prefix）。
+    """
+    parser = argparse.ArgumentParser(
+        description="S3 の一覧と突き合わせてマニフェストを更新する"
+    )
+    parser.add_argument(
+        "--prefix",
+        default="",
+        help="照合するプレフィックス（省略時はバケット全体）",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None):
+    args = parse_args(argv)
+    setup_logger(
+        config.LOGGING_LEVEL,
+        config.LOGGING_FORMAT,
+        config.LOGGING_DEBUG_SUMMARY_INTERVAL,
+    )
+    run_reconcile(args.prefix)
+
+
+# スクリプト実行
+if __name__ == "__main__":
+    main()
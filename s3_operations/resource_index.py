@@ -0,0 +1,181 @@
+import os
+from collections import defaultdict
+from collections.abc import Iterator
+from pathlib import PurePosixPath
+
+
+class ResourceFile:
+    """
+    リソースディレクトリ内のファイル1件分の情報。
+
+    走査時に取得したサイズと更新日時を保持し、後続処理で stat を再実行しないようにする。
+    """
+
+    __slots__ = ("path", "size", "mtime_ns")
+
+    def __init__(self, path: str, size: int, mtime_ns: int):
+        """
+        Args:
+            path (str): ファイルのパス。
+            size (int): ファイルのバイト数。
+            mtime_ns (int): 最終更新日時（ナノ秒）。
+        """
+        self.path = path
+        self.size = size
+        self.mtime_ns = mtime_ns
+
+    def __repr__(self) -> str:
+        return (
+            f"ResourceFile(path={self.path!r}, size={self.size}, "
+            f"mtime_ns={self.mtime_ns})"
+        )
+
+
+class ResourceIndex:
+    """
+    リソースディレクトリを1回だけ走査して作成するファイルインデックス。
+
+    os.scandir で再帰的に走査し、ディレクトリからの相対パスとファイル名の両方で引けるようにする。
+    ファイルごとの存在確認（stat）をキーの数だけ実行せずに済む。
+    """
+
+    def __init__(self, root: str):
+        """
+        Args:
+            root (str): リソースディレクトリのパス。
+        """
+        self.root = root
+        self.by_path: dict[str, ResourceFile] = {}
+        self.by_name: dict[str, list[ResourceFile]] = defaultdict(list)
+
+    def __len__(self) -> int:
+        return len(self.by_path)
+
+    @classmethod
+    def build(cls, root: str) -> "ResourceIndex":
+        """
+        リソースディレクトリを再帰的に走査してインデックスを生成する。
+
+        Args:
+            root (str): リソースディレクトリのパス。
+
+        Returns:
+            ResourceIndex: 生成したインデックス。
+
+        Raises:
+            FileNotFoundError: リソースディレクトリが存在しない場合。
+            PermissionError: リソースディレクトリへのアクセス権がない場合。
+        """
+        index = cls(root)
+        stack = [(root, "")]
+
+        while stack:
+            directory, relative_dir = stack.pop()
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    relative_path = f"{relative_dir}{entry.name}"
+
+                    if entry.is_dir(follow_symlinks=True):
+                        stack.append((entry.path, f"{relative_path}/"))
+                        continue
+
+                    if not entry.is_file(follow_symlinks=True):
+                        continue
+
+                    stat = entry.stat()
+                    resource_file = ResourceFile(
+                        entry.path, stat.st_size, stat.st_mtime_ns
+                    )
+                    index.by_path[relative_path] = resource_file
+                    index.by_name[entry.name].append(resource_file)
+
+        return index
+
+    def find(self, s3_key: str, mirror: bool = False) -> ResourceFile | None:
+        """
+        S3 キーに対応するリソースファイルを返す。
+
+        Args:
+            s3_key (str): S3 オブジェクトキー。
+            mirror (bool, optional): True の場合、キーの階層と同じ相対パスで探す。
+                False の場合、ファイル名（キーの末尾）で探す。
+
+        Returns:
+            ResourceFile | None: 見つからない、またはファイル名が一意に決まらない場合は None。
+        """
+        if mirror:
+            return self.by_path.get(s3_key)
+
+        candidates = self.by_name.get(PurePosixPath(s3_key).name, [])
+        return candidates[0] if len(candidates) == 1 else None
+
+    def count_by_name(self, file_name: str) -> int:
+        """
+        指定したファイル名を持つリソースファイルの数を返す。
+
+        Args:
+            file_name (str): ファイル名。
+
+        Returns:
+            int: ファイル数。
+        """
+        return len(self.by_name.get(file_name, []))
+
+
+def iter_sorted_files(root: str) -> Iterator[tuple[str, ResourceFile]]:
+    """
+    リソースディレクトリを再帰的に走査し、相対パスの順（S3 の一覧と同じ順）にファイルを返す。
+
+    S3 はキーを UTF-8 のバイト順で返すため、ディレクトリは名前の末尾に "/" を付けて
+    同じ階層のファイルと並べ替える（例: "a.txt" < "a/b.txt" < "a0.txt"）。
+    ディレクトリごとに並べ替えるため、メモリに保持するのは走査中の階層のエントリだけになる。
+
+    Args:
+        root (str): リソースディレクトリのパス。
+
+    Yields:
+        tuple[str, ResourceFile]: ディレクトリからの相対パス（"/" 区切り）とファイルの情報。
+
+    Raises:
+        FileNotFoundError: リソースディレクトリが存在しない場合。
+        PermissionError: リソースディレクトリへのアクセス権がない場合。
+    """
+    # 階層ごとに、並べ替え済みで未処理のエントリを逆順に積んでおく
+    stack = [_sorted_entries(root, "")]
+
+    while stack:
+        entries = stack[-1]
+        if not entries:
+            stack.pop()
+            continue
+
+        relative_path, entry = entries.pop()
+        if relative_path.endswith("/"):
+            stack.append(_sorted_entries(entry.path, relative_path))
+            continue
+
+        stat = entry.stat()
+        yield relative_path, ResourceFile(entry.path, stat.st_size, stat.st_mtime_ns)
+
+
+def _sorted_entries(directory: str, relative_dir: str) -> list[tuple[str, os.DirEntry]]:
+    """
+    ディレクトリ直下のファイル・ディレクトリを、相対パスの降順で返す（末尾から取り出す）。
+
+    Args:
+        directory (str): 走査するディレクトリのパス。
+        relative_dir (str): リソースディレクトリからの相対パス（末尾 "/"、ルートは空文字）。
+
+    Returns:
+        list[tuple[str, os.DirEntry]]: 相対パス（ディレクトリは末尾 "/"）とエントリ。
+    """
+    entries = []
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=True):
+                entries.append((f"{relative_dir}{entry.name}/", entry))
+            elif entry.is_file(follow_symlinks=True):
+                entries.append((f"{relative_dir}{entry.name}", entry))
+
+    entries.sort(key=lambda pair: pair[0], reverse=True)
+    return entries
@@ -0,0 +1,205 @@
+import argparse
+import json
+import os
+from pathlib import Path, PurePosixPath
+
+from backup import Archive
+from custom_log import setup_logger, stage
+from journal import Journal
+from metadata_rules import DEFAULT_EXTRA_ARGS
+from pipeline import Operation, Session, run_pipeline
+from result_sink import ResultSink
+from transfer_profiles import TransferProfiles
+from upload import create_access_url, upload_s3_object
+
+import config
+
+CONTEXT = {
+    "load_archive": "アーカイブ索引読込",
+    "restore_s3_object": "s3オブジェクト復元",
+    "upload_archived": "アーカイブからアップロード",
+    "record_results": "結果・ジャーナル記録",
+}
+
+
+def create_restore_item(
+    archive: Archive, entry: dict, transfer_profiles: TransferProfiles
+) -> dict:
+    """
+    アーカイブの索引1件分から、アップロード情報（ upload_s3_object() の形式 ）を生成する。
+
+    削除前の GET で取得した Content-Type・メタデータなどを ExtraArgs に指定する。
+    ACL は GET で取得できないため、アップロードと同じ DEFAULT_EXTRA_ARGS（公開読み取り）とする。
+
+    Args:
+        archive (Archive): 復元元のアーカイブ。
+        entry (dict): 索引に記録したオブジェクトの情報（key, size, headers）。
+        transfer_profiles (TransferProfiles): ファイルサイズごとの転送設定。
+
+    Returns:
+        dict: アップロード情報（resource_file, key, size, extra_args, transfer_config）。
+    """
+    return {
+        "resource_file": archive.object_path(entry["key"]),
+        "key": entry["key"],
+        "size": entry["size"],
+        "extra_args": {**DEFAULT_EXTRA_ARGS, **(entry.get("headers") or {})},
+        "transfer_config": transfer_profiles.select(entry["size"]),
+    }
+
+
+def record_restore_batch(
+    lines: list[str],
+    restore_items: list[dict],
+    succeed_items: list[dict],
+    failure_list: list[dict],
+    journal: Journal | None = None,
+    sink: ResultSink | None = None,
+) -> None:
+    """
+    1バッチ分の復元結果を結果ファイルへ書き出し、キーごとの状態をジャーナルに記録する。
+
+    Args:
+        lines (list[str]): 索引の行（1バッチ分）。
+        restore_items (list[dict]): lines と同じ順のアップロード情報。
+        succeed_items (list[dict]): upload_s3_object() の成功結果。
+        failure_list (list[dict]): upload_s3_object() の失敗結果（restore_items の順）。
+        journal (Journal | None, optional): 記録先のジャーナル。
+        sink (ResultSink | None, optional): 結果の出力先。失敗した行は再実行用リストにも出力する。
+    """
+    succeeded = {result["key"] for result in succeed_items}
+    failures = iter(failure_list)
+
+    for line, item in zip(lines, restore_items):
+        if item["key"] in succeeded:
+            status = "success"
+            result = {
+                "file_name": PurePosixPath(item["key"]).name,
+                "key": item["key"],
+                "path": create_access_url(item["key"]),
+            }
+        else:
+            status = "failure"
+            result = {**next(failures), "path": item["resource_file"]}
+
+        if sink is not None:
+            sink.write(status, result)
+            if status == "failure":
+                sink.add_retry(line)
+        if journal is not None:
+            journal.record(item["key"], status, result if status == "success" else None)
+
+    if journal is not None:
+        journal.sync()
+
+
+class RestoreOperation(Operation):
+    """
+    削除前に保存したアーカイブのオブジェクトを、同じキーへ再アップロードする。
+
+    結果・ジャーナル・再実行用リスト・計測値はアーカイブのディレクトリに出力する。
+    """
+
+    name = "restore"
+    script = Path(__file__).name
+    context = {
+        "load_list": CONTEXT["load_archive"],
+        "process": CONTEXT["restore_s3_object"],
+    }
+
+    def __init__(self, archive_dir: str):
+        """
+        Args:
+            archive_dir (str): 復元元のアーカイブ（ backup.path 配下の実行日時のディレクトリ ）。
+        """
+        self.archive = Archive(archive_dir)
+        self.input_file = self.archive.index_path
+        self.result_file = os.path.join(archive_dir, "restore_results.txt")
+        self.journal_file = os.path.join(archive_dir, "restore_journal.jsonl")
+        self.retry_file = os.path.join(archive_dir, "restore_retry_list.txt")
+        self.metrics_file = os.path.join(archive_dir, "restore_metrics.jsonl")
+        self.transfer_profiles = TransferProfiles(config.UPLOAD_TRANSFER_PROFILES)
+
+    def create_session(self) -> Session:
+        """
+        最大同時アップロード数 × 1ファイルあたりの最大同時接続数 のコネクションを持つセッションを生成する。
+
+        Returns:
+            Session: 生成したセッション。
+        """
+        return Session.create(
+            config.UPLOAD_MAX_WORKERS,
+            connections_per_worker=self.transfer_profiles.max_concurrency,
+            upload=True,
+        )
+
+    def item_key(self, item: str) -> str:
+        """索引の行をジャーナルに記録するときのキー（ S3 キー ）を返す。"""
+        return json.loads(item)["key"]
+
+    def process_batch(
+        self, session: Session, batch: list[str], journal: Journal, sink: ResultSink
+    ) -> None:
+        """1バッチ分の索引の行のオブジェクトを再アップロードし、結果を記録する。"""
+        restore_items = [
+            create_restore_item(self.archive, json.loads(line), self.transfer_profiles)
+            for line in batch
+        ]
+        with stage(CONTEXT["upload_archived"]):
+            succeed_items, failure_list = upload_s3_object(
+                session.s3_client,
+                restore_items,
+                max_workers=config.UPLOAD_MAX_WORKERS,
+                controller=session.controller,
+                manifest=session.manifest,
+            )
+        with stage(CONTEXT["record_results"]):
+            record_restore_batch(
+                batch,
+                restore_items,
+                succeed_items,
+                failure_list,
+                journal=journal,
+                sink=sink,
+            )
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """
+    コマンドライン引数を解析する。
+
+    Args:
+        argv (list[str] | None, optional): 引数のリスト。省略時は sys.argv を使う。
+
+    Returns:
+        argparse.Namespace: 解析結果（archive, resume）。
+    """
+    parser = argparse.ArgumentParser(
+        description="削除前に保存したオブジェクトをアーカイブから復元する"
+    )
+    parser.add_argument(
+        "--archive",
+        required=True,
+        help="復元元のアーカイブ（ backup.path 配下の実行日時のディレクトリ ）",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="前回のジャーナルを読み込み、完了済みのキーをスキップして再開する",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None):
+    args = parse_args(argv)
+    setup_logger(
+        config.LOGGING_LEVEL,
+        config.LOGGING_FORMAT,
+        config.LOGGING_DEBUG_SUMMARY_INTERVAL,
+    )
+    run_pipeline(RestoreOperation(args.archive), resume=args.resume)
+
+
+# スクリプト実行
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+import csv
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import TextIO
+
+# 対応する出力形式と拡張子
+RESULT_FORMATS = {"text": ".txt", "jsonl": ".jsonl", "csv": ".csv"}
+
+# CSV 形式の列（結果の種類によって使わない列は空になる）
+CSV_FIELDS = ["status", "file_name", "key", "path", "url", "reason"]
+
+# テキスト形式の各セクションの見出し
+TEXT_HEADERS = {
+    "success": "SUCCESS ++++++++++++++++++++++++\n",
+    "failure": "\nFAILURE ------------------------\n",
+    "skipped": "\nSKIPPED ========================\n",
+}
+
+
+def result_path(output_file: str, result_format: str) -> str:
+    """
+    出力形式に合わせて結果ファイルの拡張子を置き換える。
+
+    Args:
+        output_file (str): 設定された結果ファイルのパス。
+        result_format (str): 出力形式（text / jsonl / csv）。
+
+    Returns:
+        str: 出力形式の拡張子に置き換えたパス。
+    """
+    return str(Path(output_file).with_suffix(RESULT_FORMATS[result_format]))
+
+
+class ResultSink:
+    """
+    処理結果を1件ずつファイルへ書き出す出力先。
+
+    結果をメモリに溜めず、受け取った時点で書き出す。複数スレッドから呼び出してよい。
+    テキスト形式では SUCCESS → FAILURE → SKIPPED の順に出力するため、
+    失敗・スキップは一時ファイルに書き出しておき、close() で結果ファイルの末尾に連結する。
+    retry_file を指定した場合は、失敗した入力行を入力ファイルと同じ形式（1行1件）で書き出す。
+    """
+
+    def __init__(
+        self,
+        output_file: str,
+        result_format: str = "text",
+        retry_file: str | None = None,
+        with_skipped: bool = False,
+    ):
+        """
+        Args:
+            output_file (str): 結果ファイルのパス。
+            result_format (str, optional): 出力形式（text / jsonl / csv）。
+            retry_file (str | None, optional): 再実行用リストのパス。省略時は出力しない。
+            with_skipped (bool, optional): True の場合、テキスト形式で SKIPPED セクションを出力する。
+
+        Raises:
+            ValueError: 未対応の出力形式が指定された場合。
+        """
+        if result_format not in RESULT_FORMATS:
+            raise ValueError(
+                f"results.format : {result_format} : "
+                f"出力形式は {list(RESULT_FORMATS)} から指定してください"
+            )
+
+        self.output_file = output_file
+        self.result_format = result_format
+        self.retry_file = retry_file
+        self.with_skipped = with_skipped
+        self.counts = {"success": 0, "failure": 0, "skipped": 0, "retry": 0}
+        self.lock = threading.Lock()
+
+        self.file = self.open(output_file)
+        self.retry = self.open(retry_file) if retry_file else None
+        self.spools: dict[str, TextIO] = {}
+
+        if result_format == "text":
+            self.file.write(TEXT_HEADERS["success"])
+            self.spools["failure"] = tempfile.TemporaryFile("w+", encoding="utf-8")
+            if with_skipped:
+                self.spools["skipped"] = tempfile.TemporaryFile("w+", encoding="utf-8")
+        elif result_format == "csv":
+            self.csv_writer = csv.DictWriter(
+                self.file, fieldnames=CSV_FIELDS, extrasaction="ignore"
+            )
+            self.csv_writer.writeheader()
+
+    def __enter__(self) -> "ResultSink":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @staticmethod
+    def open(path: str) -> TextIO:
+        """
+        出力先のディレクトリを作成し、書き込み用にファイルを開く。
+
+        Args:
+            path (str): ファイルのパス。
+
+        Returns:
+            TextIO: 開いたファイル。
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        return open(path, "w", encoding="utf-8", newline="")
+
+    @staticmethod
+    def format_text(status: str, result: dict) -> str:
+        """
+        結果1件をテキスト形式の1行に整形する。
+
+        Args:
+            status (str): 結果の種類（success / failure / skipped）。
+            result (dict): 結果の情報。
+
+        Returns:
+            str: 改行付きの1行。
+        """
+        if status == "failure":
+            return f"[{result['file_name']}] {result['reason']} : {result['path']}\n"
+        return "\t".join(str(v) for v in result.values()) + "\n"
+
+    def write(self, status: str, result: dict) -> None:
+        """
+        結果1件を書き出す。
+
+        Args:
+            status (str): 結果の種類（success / failure / skipped）。
+            result (dict): 結果の情報。
+        """
+        with self.lock:
+            self.counts[status] += 1
+
+            if self.result_format == "jsonl":
+                line = json.dumps({"status": status, **result}, ensure_ascii=False)
+                self.file.write(f"{line}\n")
+            elif self.result_format == "csv":
+                self.csv_writer.writerow({"status": status, **result})
+            elif status == "success":
+                self.file.write(self.format_text(status, result))
+            elif status in self.spools:
+                self.spools[status].write(self.format_text(status, result))
+
+    def success(self, result: dict) -> None:
+        """成功した結果1件を書き出す。"""
+        self.write("success", result)
+
+    def failure(self, result: dict) -> None:
+        """失敗した結果1件を書き出す。"""
+        self.write("failure", result)
+
+    def skipped(self, result: dict) -> None:
+        """スキップした結果1件を書き出す。"""
+        self.write("skipped", result)
+
+    def add_retry(self, item: str) -> None:
+        """
+        再実行用リストに入力行を1件書き出す。
+
+        Args:
+            item (str): 入力ファイルの1行（S3キーや URL）。
+        """
+        if self.retry is None:
+            return
+        with self.lock:
+            self.counts["retry"] += 1
+            self.retry.write(f"{item}\n")
+
+    def close(self) -> str:
+        """
+        書き出しを完了してファイルを閉じる。
+
+        Returns:
+            str: 結果ファイルの絶対パス。
+        """
+        with self.lock:
+            if not self.file.closed:
+                # テキスト形式は一時ファイルに書き出したセクションを連結する
+                for status in ["failure", "skipped"]:
+                    spool = self.spools.get(status)
+                    if spool is None:
+                        continue
+                    self.file.write(TEXT_HEADERS[status])
+                    spool.seek(0)
+                    for line in spool:
+                        self.file.write(line)
+                    spool.close()
+
+                self.file.close()
+
+            if self.retry is not None and not self.retry.closed:
+                self.retry.close()
+
+        return os.path.abspath(self.output_file)
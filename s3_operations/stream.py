@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import queue
+import threading
+from collections.abc import Callable, Iterable, Iterator
+
+from custom_log import bind_stage, get_stage, record_queue_depth
+
+# キューの空き・到着を待つ間隔（秒）。中断の確認に使う
+POLL_INTERVAL = 0.1
+
+# 上流の段がすべて処理を終えたことを表す目印
+DONE = object()
+
+
+class StreamCancelled(Exception):
+    """他の段で例外が発生したため、処理を中断したことを表す。"""
+
+
+class StreamStage:
+    """
+    キューで接続した処理の1段分（名前・処理関数・ワーカー数）。
+
+    各ワーカーは入力キューから項目を取り出して処理し、次の段の入力キューへ渡す。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[list], tuple[Iterable, Iterable]],
+        workers: int = 1,
+        chunk_size: int = 1,
+    ):
+        """
+        Args:
+            name (str): 処理段階の名前（計測値の集計に使う）。
+            func (Callable[[list], tuple[Iterable, Iterable]]): 取り出した項目を処理する関数。
+                次の段へ渡す項目と、この段で完了した結果の組を返す。
+                最後の段が次の段へ渡す項目は、完了した結果として扱う。
+                ワーカーのスレッドで呼び出され、record_metrics() はこの段の計測値に加算される。
+            workers (int, optional): この段のワーカー数（スレッド数）。
+            chunk_size (int, optional): 1回に取り出す最大件数。
+                キューにある分だけをまとめて取り出し、件数がそろうまでは待たない。
+        """
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.chunk_size = max(1, chunk_size)
+
+
+class Stream:
+    """
+    run_stream() の実行中の状態（キュー・スレッド・中断の目印・発生した例外）。
+    """
+
+    def __init__(self, stages: list[StreamStage], queue_size: int):
+        """
+        Args:
+            stages (list[StreamStage]): 先頭から順に接続する段。
+            queue_size (int): 各段の入力キューと完了した結果のキューの上限件数。
+        """
+        self.stages = stages
+        self.queues = [queue.Queue(maxsize=queue_size) for _ in stages]
+        self.results: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.cancelled = threading.Event()
+        self.errors: list[BaseException] = []
+        self.lock = threading.Lock()
+        self.running = [stage.workers for stage in stages]
+        self.threads: list[threading.Thread] = []
+
+    def put(self, target: queue.Queue, item) -> None:
+        """
+        キューに空きができるまで待って項目を追加する（背圧）。
+
+        Raises:
+            StreamCancelled: 待っている間に中断された場合。
+        """
+        while not self.cancelled.is_set():
+            try:
+                target.put(item, timeout=POLL_INTERVAL)
+                return
+            except queue.Full:
+                continue
+        raise StreamCancelled
+
+    def get(self, source: queue.Queue):
+        """
+        キューに項目が届くまで待って取り出す。
+
+        Raises:
+            StreamCancelled: 待っている間に中断された場合。
+        """
+        while not self.cancelled.is_set():
+            try:
+                return source.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                continue
+        raise StreamCancelled
+
+    def fail(self, error: BaseException) -> None:
+        """例外を記録し、全段の処理を中断する。"""
+        with self.lock:
+            self.errors.append(error)
+        self.cancelled.set()
+
+    def feed(self, items: Iterable) -> None:
+        """入力を先頭の段のキューへ順に追加する（ワーカースレッド）。"""
+        try:
+            for item in items:
+                self.put(self.queues[0], item)
+            self.put(self.queues[0], DONE)
+        except StreamCancelled:
+            pass
+        except BaseException as e:
+            self.fail(e)
+
+    def work(self, index: int) -> None:
+        """
+        index 番目の段のワーカー（ワーカースレッド）。
+
+        入力がなくなったら目印をキューに戻して同じ段の他のワーカーにも知らせ、
+        段の最後のワーカーが次の段（または完了した結果のキュー）へ目印を渡す。
+        """
+        stage = self.stages[index]
+        source = self.queues[index]
+        target = self.queues[index + 1] if index + 1 < len(self.queues) else None
+
+        try:
+            with bind_stage(get_stage(stage.name)):
+                finished = False
+                while not finished:
+                    chunk = [self.get(source)]
+                    record_queue_depth(source.qsize())
+                    while len(chunk) < stage.chunk_size and chunk[-1] is not DONE:
+                        try:
+                            chunk.append(source.get_nowait())
+                        except queue.Empty:
+                            break
+
+                    if chunk[-1] is DONE:
+                        chunk.pop()
+                        finished = True
+                        source.put(DONE)
+                    if not chunk:
+                        continue
+
+                    forward, done = stage.func(chunk)
+                    for result in done:
+                        self.put(self.results, result)
+                    for item in forward:
+                        self.put(self.results if target is None else target, item)
+
+            with self.lock:
+                self.running[index] -= 1
+                last = self.running[index] == 0
+            if last:
+                self.put(self.results if target is None else target, DONE)
+
+        except StreamCancelled:
+            pass
+        except BaseException as e:
+            self.fail(e)
+
+    def start(self, items: Iterable) -> None:
+        """入力を追加するスレッドと、各段のワーカースレッドを起動する。"""
+        # 計測値の表が段の順に並ぶよう、先に計測値を作成しておく
+        for stage in self.stages:
+            get_stage(stage.name)
+
+        self.threads.append(threading.Thread(target=self.feed, args=(items,)))
+        for index, stage in enumerate(self.stages):
+            self.threads.extend(
+                threading.Thread(target=self.work, args=(index,))
+                for _ in range(stage.workers)
+            )
+        for thread in self.threads:
+            thread.daemon = True
+            thread.start()
+
+    def stop(self) -> None:
+        """全段の処理を中断し、スレッドの終了を待つ。"""
+        self.cancelled.set()
+        for thread in self.threads:
+            thread.join()
+
+
+def run_stream(
+    items: Iterable, stages: list[StreamStage], queue_size: int = 1000
+) -> Iterator:
+    """
+    入力を先頭の段から順に流し、完了した結果を到着順に返す。
+
+    各段は上限付きのキューで接続し、段ごとのワーカーが並行して処理するため、
+    前の段が全件を終える前に次の段が処理を始める。キューが上限に達すると前の段は空きを待つため、
+    メモリに保持する件数は 段数 × queue_size 程度に収まる。
+    各段の入力キューの滞留数は計測値（ queue avg/max ）に記録する。
+
+    Args:
+        items (Iterable): 先頭の段へ渡す入力。別スレッドから1件ずつ読み込む。
+        stages (list[StreamStage]): 先頭から順に接続する段。
+        queue_size (int, optional): 各キューの上限件数。
+
+    Yields:
+        完了した結果（各段の func が返したもの）。
+
+    Raises:
+        Exception: いずれかの段（または入力の読み込み）で発生した最初の例外。
+    """
+    stream = Stream(stages, max(1, queue_size))
+    stream.start(items)
+    try:
+        while True:
+            try:
+                result = stream.get(stream.results)
+            except StreamCancelled:
+                break
+            if result is DONE:
+                break
+            yield result
+    finally:
+        stream.stop()
+
+    if stream.errors:
+        raise stream.errors[0]
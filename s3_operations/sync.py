@@ -0,0 +1,397 @@
+from __future__ import annotations
+
+import argparse
+import logging
+from collections import Counter
+from collections.abc import Iterator
+from pathlib import Path, PurePosixPath
+from typing import TYPE_CHECKING
+
+from custom_log import record_metrics, setup_logger, stage
+from dedupe import Deduplicator
+from delete import build_version_index, delete_versions_in_batches
+from hashing import HashService
+from journal import Journal
+from listing_index import iter_objects
+from metadata_rules import MetadataResolver
+from pipeline import Operation, Session, run_pipeline
+from resource_index import iter_sorted_files
+from result_sink import ResultSink
+from sync_diff import DIFF_STATUSES, DiffEntry, diff_listings
+from transfer_profiles import TransferProfiles
+from upload import (
+    create_upload_item,
+    hash_items,
+    matches_record,
+    needs_hash,
+    upload_and_record,
+)
+
+import config
+
+if TYPE_CHECKING:
+    from botocore.client import BaseClient
+    from rate_control import AdaptiveController
+
+CONTEXT = {
+    "diff_listings": "差分計算",
+    "setup_upload_resource": "リソース準備",
+    "process_sync": "同期処理",
+    "prepare_items": "アップロード対象準備",
+    "filter_unchanged": "差分判定",
+    "delete_objects": "s3オブジェクト削除",
+    "record_deletions": "削除結果・ジャーナル記録",
+}
+
+
+def normalize_prefix(prefix: str) -> str:
+    """
+    同期先のプレフィックスを、先頭の "/" なし・末尾 "/" ありの形にそろえる。
+
+    Args:
+        prefix (str): 設定されたプレフィックス。
+
+    Returns:
+        str: 正規化したプレフィックス。空の場合はバケット直下を表す空文字。
+    """
+    prefix = prefix.strip("/")
+    return f"{prefix}/" if prefix else ""
+
+
+def filter_unchanged_entries(
+    entries: list[DiffEntry],
+    upload_items: list[dict],
+    max_workers: int = 1,
+    hasher: HashService | None = None,
+) -> tuple[list[dict], list[dict]]:
+    """
+    サイズが同じ（matched）ファイルのうち、S3 上と内容が同一のものをアップロード対象から除外する。
+
+    S3 上の情報は差分計算時の一覧から参照し、再度の一覧取得や HEAD は行わない。
+    matched のファイルのハッシュは、比較の前にまとめて（プロセスを分けて）計算する。
+
+    Args:
+        entries (list[DiffEntry]): アップロード対象の差分（new / changed / matched）。
+        upload_items (list[dict]): entries と同じ順のアップロード情報。
+        max_workers (int, optional): hasher を省略した場合のハッシュ計算のプロセス数。1 の場合は逐次処理。
+        hasher (HashService | None, optional): ハッシュ計算のサービス（キャッシュ・プロセスプール）。
+
+    Returns:
+        tuple[list[dict], list[dict]]:
+            - changed_items: アップロードが必要なファイルの情報リスト（upload_items と同じ形式）
+            - skipped_list: 変更がないためスキップしたファイルの情報（file_name, key）
+    """
+    pairs = list(zip(entries, upload_items))
+    hash_items(
+        [
+            item
+            for entry, item in pairs
+            if entry.status == "matched" and needs_hash(entry.remote, item)
+        ],
+        hasher=hasher,
+        max_workers=max_workers,
+    )
+
+    changed_items = []
+    skipped_list = []
+    for entry, item in pairs:
+        if entry.status == "matched" and matches_record(entry.remote, item):
+            skipped_list.append(
+                {"file_name": PurePosixPath(entry.key).name, "key": entry.key}
+            )
+        else:
+            changed_items.append(item)
+
+    return changed_items, skipped_list
+
+
+def delete_entries(
+    s3_client: BaseClient,
+    s3_keys: list[str],
+    controller: AdaptiveController | None = None,
+) -> dict[str, str]:
+    """
+    S3 にのみ存在するオブジェクトを、全バージョンまとめて DeleteObjects で削除する。
+
+    Args:
+        s3_client (BaseClient): boto3のS3クライアント。
+        s3_keys (list[str]): 削除対象の S3 オブジェクトキー（1バッチ分）。
+        controller (AdaptiveController | None, optional): 一括削除の同時実行数のコントローラー。
+
+    Returns:
+        dict[str, str]: 削除に失敗したキーと失敗理由の辞書。
+    """
+    try:
+        version_index = build_version_index(s3_client, s3_keys)
+    except Exception as e:
+        # 一覧取得に失敗した場合は全件を失敗とする
+        return {s3_key: str(e) for s3_key in s3_keys}
+
+    objects = [
+        {"Key": s3_key, "VersionId": version_id}
+        for s3_key in s3_keys
+        for version_id in version_index.get(s3_key, [])
+    ]
+    return delete_versions_in_batches(s3_client, objects, controller)
+
+
+def record_deletion_results(
+    s3_keys: list[str],
+    errors: dict[str, str],
+    journal: Journal | None = None,
+    sink: ResultSink | None = None,
+) -> None:
+    """
+    1バッチ分の削除結果をキーごとにジャーナル・結果ファイルへ記録する。
+
+    Args:
+        s3_keys (list[str]): 削除対象の S3 オブジェクトキー（1バッチ分）。
+        errors (dict[str, str]): 削除に失敗したキーと失敗理由。
+        journal (Journal | None, optional): 記録先のジャーナル。
+        sink (ResultSink | None, optional): 結果の出力先。失敗したキーは再実行用リストにも出力する。
+    """
+    s3_origin = f"https://{config.S3_BUCKET}.s3.{config.AWS_REGION}.amazonaws.com"
+
+    for s3_key in s3_keys:
+        result = {
+            "file_name": PurePosixPath(s3_key).name,
+            "url": f"{s3_origin}/{s3_key}",
+        }
+        if s3_key in errors:
+            failure = {
+                "file_name": result["file_name"],
+                "reason": errors[s3_key],
+                "path": result["url"],
+            }
+            if journal is not None:
+                journal.record(s3_key, "failure")
+            if sink is not None:
+                sink.failure(failure)
+                sink.add_retry(s3_key)
+            continue
+
+        if journal is not None:
+            journal.record(s3_key, "success", result)
+        if sink is not None:
+            sink.success(result)
+
+    if journal is not None:
+        journal.sync()
+
+
+class SyncOperation(Operation):
+    """
+    リソースディレクトリと S3 のプレフィックス配下を突き合わせ、差分だけを反映する。
+
+    ローカルの走査結果と S3 の一覧をキーの昇順で突き合わせるため、
+    どちらの一覧もメモリにまとめて保持しない（件数に関わらず使用メモリは一定）。
+    新規・変更のファイルはアップロードし、S3 にのみ存在するオブジェクトは sync.delete が
+    true の場合だけ削除する。
+    """
+
+    name = "sync"
+    script = Path(__file__).name
+    context = {
+        "load_list": CONTEXT["diff_listings"],
+        "setup": CONTEXT["setup_upload_resource"],
+        "process": CONTEXT["process_sync"],
+    }
+    resume_statuses = ("success", "skipped")
+    with_skipped = True
+
+    def __init__(self, prefix: str | None = None, delete: bool | None = None):
+        """
+        Args:
+            prefix (str | None, optional): 同期先のプレフィックス。省略時は config.yml の sync.prefix。
+            delete (bool | None, optional): True の場合、ローカルに存在しないオブジェクトを削除する。
+                省略時は config.yml の sync.delete に従う。
+        """
+        self.prefix = normalize_prefix(config.SYNC_PREFIX if prefix is None else prefix)
+        self.delete = config.SYNC_DELETE if delete is None else delete
+        self.input_file = config.RESOURCE
+        self.result_file = config.SYNC_RESULT
+        self.journal_file = config.SYNC_JOURNAL
+        self.retry_file = config.SYNC_RETRY_LIST
+        self.metrics_file = config.SYNC_METRICS
+        self.counts: Counter = Counter()
+        self.transfer_profiles: TransferProfiles | None = None
+        self.metadata_resolver: MetadataResolver | None = None
+
+    def create_session(self) -> Session:
+        """
+        アップロードと同じ設定（転送プロファイル・転送速度の上限）でセッションを生成する。
+
+        Returns:
+            Session: 生成したセッション。
+        """
+        self.transfer_profiles = TransferProfiles(config.UPLOAD_TRANSFER_PROFILES)
+        return Session.create(
+            config.UPLOAD_MAX_WORKERS,
+            connections_per_worker=self.transfer_profiles.max_concurrency,
+            upload=True,
+        )
+
+    def load_items(
+        self, session: Session, deduplicator: Deduplicator
+    ) -> Iterator[DiffEntry]:
+        """
+        リソースディレクトリの走査結果と S3 の一覧（1回だけ取得）の差分を1件ずつ返す。
+
+        マニフェストを使う場合は S3 の一覧の代わりにマニフェストの記録と突き合わせ、一覧取得を行わない。
+
+        Args:
+            session (Session): 共有のセッション。
+            deduplicator (Deduplicator): 未使用（キーは走査・一覧取得の時点で一意）。
+
+        Returns:
+            Iterator[DiffEntry]: キーの昇順の差分。sync.delete が false の場合は deleted を含まない。
+        """
+        local_files = (
+            (f"{self.prefix}{relative_path}", resource_file)
+            for relative_path, resource_file in iter_sorted_files(config.RESOURCE)
+        )
+        if session.manifest is not None:
+            remote_objects = session.manifest.iter_objects(self.prefix)
+        else:
+            remote_objects = iter_objects(
+                session.s3_client, config.S3_BUCKET, self.prefix
+            )
+        entries = diff_listings(local_files, remote_objects, self.counts)
+
+        if self.delete:
+            return entries
+        return (entry for entry in entries if entry.status != "deleted")
+
+    def item_key(self, item: DiffEntry) -> str:
+        """差分の S3 キーをジャーナルのキーにする。"""
+        return item.key
+
+    def setup(self, session: Session) -> None:
+        """アップロード情報の生成に使う、メタデータのルールと転送設定を準備する。"""
+        self.metadata_resolver = MetadataResolver(config.UPLOAD_METADATA_RULES)
+        if self.transfer_profiles is None:
+            self.transfer_profiles = TransferProfiles(config.UPLOAD_TRANSFER_PROFILES)
+
+    def process_batch(
+        self,
+        session: Session,
+        batch: list[DiffEntry],
+        journal: Journal,
+        sink: ResultSink,
+    ) -> None:
+        """1バッチ分の差分のうち、新規・変更はアップロードし、削除対象は一括削除する。"""
+        uploads = [entry for entry in batch if entry.status != "deleted"]
+        deletions = [entry.key for entry in batch if entry.status == "deleted"]
+
+        if uploads:
+            self.upload_entries(session, uploads, journal, sink)
+        if deletions:
+            with stage(CONTEXT["delete_objects"]):
+                record_metrics(items=len(deletions))
+                errors = delete_entries(
+                    session.s3_client, deletions, session.controller
+                )
+                if session.manifest is not None:
+                    session.manifest.remove(
+                        s3_key for s3_key in deletions if s3_key not in errors
+                    )
+            with stage(CONTEXT["record_deletions"]):
+                record_deletion_results(deletions, errors, journal=journal, sink=sink)
+
+    def upload_entries(
+        self,
+        session: Session,
+        entries: list[DiffEntry],
+        journal: Journal,
+        sink: ResultSink,
+    ) -> None:
+        """
+        新規・変更のファイルを 準備 → 差分判定 → アップロード → URL検証 に流す。
+
+        Args:
+            session (Session): 共有のセッション。
+            entries (list[DiffEntry]): アップロード対象の差分（new / changed / matched）。
+            journal (Journal): 記録先のジャーナル。
+            sink (ResultSink): 結果の出力先。
+        """
+        with stage(CONTEXT["prepare_items"]):
+            record_metrics(items=len(entries))
+            upload_items = [
+                create_upload_item(
+                    entry.key,
+                    entry.local,
+                    self.metadata_resolver,
+                    self.transfer_profiles,
+                )
+                for entry in entries
+            ]
+
+        with stage(CONTEXT["filter_unchanged"]):
+            record_metrics(items=len(entries))
+            upload_items, skipped_list = filter_unchanged_entries(
+                entries,
+                upload_items,
+                max_workers=config.UPLOAD_MAX_WORKERS,
+                hasher=session.hasher,
+            )
+
+        upload_and_record(
+            session.s3_client,
+            [entry.key for entry in entries],
+            upload_items,
+            skipped_list=skipped_list,
+            journal=journal,
+            controller=session.controller,
+            sink=sink,
+            manifest=session.manifest,
+        )
+
+    def finish(self) -> None:
+        """差分の種類ごとの件数をログに出力する。"""
+        logging.info(
+            f"{config.RESOURCE} ⇔ s3://{config.S3_BUCKET}/{self.prefix} : "
+            + " / ".join(
+                f"{status} {self.counts[status]} 件" for status in DIFF_STATUSES
+            )
+        )
+        if self.counts["deleted"] and not self.delete:
+            logging.info(
+                f"S3 にのみ存在する {self.counts['deleted']} 件は削除していません"
+                "（ sync.delete: true で削除します ）"
+            )
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """
+    コマンドライン引数を解析する。
+
+    Args:
+        argv (list[str] | None, optional): 引数のリスト。省略時は sys.argv を使う。
+
+    Returns:
+        argparse.Namespace: 解析結果（resume）。
+    """
+    parser = argparse.ArgumentParser(
+        description="リソースディレクトリと S3 の差分（新規・変更・削除）を同期する"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="前回のジャーナルを読み込み、完了済みのキーをスキップして再開する",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None):
+    args = parse_args(argv)
+    setup_logger(
+        config.LOGGING_LEVEL,
+        config.LOGGING_FORMAT,
+        config.LOGGING_DEBUG_SUMMARY_INTERVAL,
+    )
+    run_pipeline(SyncOperation(), resume=args.resume)
+
+
+# スクリプト実行
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from listing_index import ObjectRecord
+    from resource_index import ResourceFile
+
+# 差分の種類
+#   new     : ローカルにのみ存在する
+#   changed : 両方に存在し、サイズが異なる
+#   matched : 両方に存在し、サイズが同じ（内容は ETag で比較する）
+#   deleted : S3 にのみ存在する
+DIFF_STATUSES = ("new", "changed", "matched", "deleted")
+
+
+class DiffEntry:
+    """
+    ローカルのリソースと S3 の一覧を突き合わせた、キー1件分の差分。
+
+    大量のキーを扱うため __slots__ でインスタンス辞書を持たない。
+    """
+
+    __slots__ = ("status", "key", "local", "remote")
+
+    def __init__(
+        self,
+        status: str,
+        key: str,
+        local: ResourceFile | None = None,
+        remote: ObjectRecord | None = None,
+    ):
+        """
+        Args:
+            status (str): 差分の種類（new / changed / matched / deleted）。
+            key (str): S3 オブジェクトキー。
+            local (ResourceFile | None, optional): ローカルのファイル。S3 にのみ存在する場合は None。
+            remote (ObjectRecord | None, optional): S3 のオブジェクト。ローカルにのみ存在する場合は None。
+        """
+        self.status = status
+        self.key = key
+        self.local = local
+        self.remote = remote
+
+    def __repr__(self) -> str:
+        return f"DiffEntry(status={self.status!r}, key={self.key!r})"
+
+
+def diff_listings(
+    local_files: Iterable[tuple[str, ResourceFile]],
+    remote_objects: Iterable[tuple[str, ObjectRecord]],
+    counts: Counter | None = None,
+) -> Iterator[DiffEntry]:
+    """
+    キーの昇順に並んだローカルと S3 の一覧を先頭から突き合わせ（マージ）、差分を1件ずつ返す。
+
+    どちらの一覧も辞書にまとめずに1件ずつ読み進めるため、件数に関わらず使用メモリは一定になる。
+    両方の一覧がキーの昇順（UTF-8 のバイト順）に並んでいる必要がある。
+
+    Args:
+        local_files (Iterable[tuple[str, ResourceFile]]): S3 キーとローカルファイルの組（キーの昇順）。
+        remote_objects (Iterable[tuple[str, ObjectRecord]]): S3 キーとオブジェクトの組（キーの昇順）。
+        counts (Counter | None, optional): 指定した場合、差分の種類ごとの件数を加算する。
+
+    Yields:
+        DiffEntry: キーの昇順の差分。
+
+    Raises:
+        ValueError: どちらかの一覧がキーの昇順に並んでいない場合。
+    """
+    local_iter = _check_sorted(local_files, "local")
+    remote_iter = _check_sorted(remote_objects, "remote")
+    local = next(local_iter, None)
+    remote = next(remote_iter, None)
+
+    while local is not None or remote is not None:
+        if remote is None or (local is not None and local[0] < remote[0]):
+            entry = DiffEntry("new", local[0], local=local[1])
+            local = next(local_iter, None)
+        elif local is None or remote[0] < local[0]:
+            entry = DiffEntry("deleted", remote[0], remote=remote[1])
+            remote = next(remote_iter, None)
+        else:
+            status = "matched" if local[1].size == remote[1].size else "changed"
+            entry = DiffEntry(status, local[0], local=local[1], remote=remote[1])
+            local = next(local_iter, None)
+            remote = next(remote_iter, None)
+
+        if counts is not None:
+            counts[entry.status] += 1
+        yield entry
+
+
+def _check_sorted(pairs: Iterable[tuple], name: str) -> Iterator[tuple]:
+    """
+    キーが昇順（重複なし）に並んでいることを確認しながら1件ずつ返す。
+
+    Args:
+        pairs (Iterable[tuple]): 先頭の要素がキーの組。
+        name (str): エラーメッセージに使う一覧の名前。
+
+    Yields:
+        tuple: 入力と同じ組。
+
+    Raises:
+        ValueError: キーが昇順に並んでいない場合。
+    """
+    previous = None
+    for pair in pairs:
+        if previous is not None and pair[0] <= previous:
+            raise ValueError(
+                f"{name} : {pair[0]} : 一覧がキーの昇順に並んでいません（直前: {previous}）"
+            )
+        previous = pair[0]
+        yield pair
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from hashing import get_default_transfer_config
+
+if TYPE_CHECKING:
+    from boto3.s3.transfer import TransferConfig
+
+MB = 1024 * 1024
+
+# プロファイルの設定キーと TransferConfig の引数の対応（ MB 単位の値はバイトに変換する）
+PROFILE_FIELDS = {
+    "multipart_threshold_mb": "multipart_threshold",
+    "multipart_chunksize_mb": "multipart_chunksize",
+    "max_concurrency": "max_concurrency",
+    "use_threads": "use_threads",
+}
+
+
+class TransferProfiles:
+    """
+    ファイルサイズに応じて upload_file の転送設定（TransferConfig）を切り替える。
+
+    プロファイルは max_size_mb の昇順に評価し、ファイルサイズが上限以下の最初のプロファイルを使う。
+    max_size_mb を省略したプロファイルは上限なしとして扱う。
+    どのプロファイルにも該当しない場合は s3transfer の既定値を使う。
+
+    プロファイルの例:
+        - max_size_mb: 16
+          multipart_threshold_mb: 64
+          use_threads: false
+        - max_size_mb: 1024
+          multipart_threshold_mb: 16
+          multipart_chunksize_mb: 16
+          max_concurrency: 8
+        - multipart_threshold_mb: 64
+          multipart_chunksize_mb: 64
+          max_concurrency: 16
+    """
+
+    def __init__(self, profiles: list[dict] | None = None):
+        """
+        Args:
+            profiles (list[dict] | None, optional): 転送プロファイルのリスト。
+
+        Raises:
+            ValueError: プロファイルの形式が正しくない場合。
+        """
+        self.profiles: list[tuple[float, TransferConfig]] = sorted(
+            (
+                self.build_profile(number, profile)
+                for number, profile in enumerate(profiles or [])
+            ),
+            key=lambda profile: profile[0],
+        )
+
+    @staticmethod
+    def build_profile(number: int, profile: dict) -> tuple[float, TransferConfig]:
+        """
+        プロファイルの設定から (サイズ上限, TransferConfig) を生成する。
+
+        Args:
+            number (int): プロファイルの番号（0 始まり）。
+            profile (dict): 転送プロファイル。
+
+        Returns:
+            tuple[float, TransferConfig]: サイズ上限（バイト、上限なしは inf）と転送設定。
+
+        Raises:
+            ValueError: プロファイルの形式が正しくない場合。
+        """
+        from boto3.s3.transfer import TransferConfig
+
+        if not isinstance(profile, dict):
+            raise ValueError(
+                f"transfer_profiles[{number}] : プロファイルの形式が正しくありません"
+            )
+
+        unknown = set(profile) - {"max_size_mb", *PROFILE_FIELDS}
+        if unknown:
+            raise ValueError(
+                f"transfer_profiles[{number}] : 未対応のキーが含まれています: {sorted(unknown)}"
+            )
+
+        max_size_mb = profile.get("max_size_mb")
+        max_size = float("inf") if max_size_mb is None else float(max_size_mb) * MB
+
+        kwargs = {}
+        for field, arg_name in PROFILE_FIELDS.items():
+            if field not in profile:
+                continue
+            value = profile[field]
+            if field.endswith("_mb"):
+                kwargs[arg_name] = int(float(value) * MB)
+            elif field == "use_threads":
+                kwargs[arg_name] = bool(value)
+            else:
+                kwargs[arg_name] = int(value)
+
+        return max_size, TransferConfig(**kwargs)
+
+    def select(self, size: int) -> TransferConfig:
+        """
+        ファイルサイズに対応する転送設定を返す。
+
+        Args:
+            size (int): ファイルのバイト数。
+
+        Returns:
+            TransferConfig: 転送設定。同じプロファイルには同じインスタンスを返す。
+        """
+        for max_size, transfer_config in self.profiles:
+            if size <= max_size:
+                return transfer_config
+        return get_default_transfer_config()
+
+    @property
+    def max_concurrency(self) -> int:
+        """
+        1ファイルあたりの最大同時接続数（全プロファイルと既定値の最大）を返す。
+
+        Returns:
+            int: 最大同時接続数。
+        """
+        configs = [transfer_config for _, transfer_config in self.profiles]
+
+        # 上限なしのプロファイルがなければ既定値が使われる可能性がある
+        if not self.profiles or self.profiles[-1][0] != float("inf"):
+            configs.append(get_default_transfer_config())
+
+        return max(c.max_concurrency if c.use_threads else 1 for c in configs)
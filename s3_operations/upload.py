@@ -1,113 +1,435 @@
-import mimetypes
+from __future__ import annotations
+
+import argparse
+import logging
+import time
+from collections import defaultdict
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import TYPE_CHECKING
 from urllib import parse
 
-from botocore.client import BaseClient
-from custom_log import end, handle_exception, notify, setup_logger, start
-from utils import (
-    create_s3_client,
-    is_url_accessible,
-    load_file,
-    notify_output,
-    write_results_to_file,
-)
-
-from config import (
-    AWS_REGION,
-    CDN_DOMAIN,
-    CONFIG_SUMMARY,
-    ENVIRONMENT,
-    RESOURCE,
-    S3_BUCKET,
-    UPLOAD_FILE_LIST,
-    UPLOAD_RESULT,
-    report_config,
-)
+from custom_log import record_metrics, setup_logger, stage
+from hashing import HashService, compute_etag
+from journal import Journal
+from listing_index import ListingIndex, ObjectRecord
+from manifest import Manifest, ManifestRecord
+from metadata_rules import MetadataResolver
+from pipeline import Operation, Session, run_pipeline
+from rate_control import AdaptiveController
+from resource_index import ResourceFile, ResourceIndex
+from result_sink import ResultSink
+from stream import StreamStage, run_stream
+from transfer_profiles import MB, TransferProfiles
+from utils import check_urls_accessible
+
+import config
+
+if TYPE_CHECKING:
+    from botocore.client import BaseClient
 
 CONTEXT = {
-    "create_s3client": "s3クライアント生成",
-    "connect_bucket": "バケット疎通確認",
     "load_file_list": "ファイルリスト読込",
     "setup_upload_resource": "リソース準備",
-    "upload_s3_object": "s3オブジェクトアップロード",
-    "set_access_url": "アクセスURL生成",
-    "write_results": "結果リスト生成",
+    "process_upload": "差分判定・s3オブジェクトアップロード・アクセスURL生成",
+    "prepare_items": "アップロード対象準備",
+    "filter_unchanged": "差分判定",
+    "upload_object": "s3オブジェクトアップロード",
+    "verify_url": "アクセスURL生成",
+    "record_results": "結果・ジャーナル記録",
 }
 
 # エンコード除外キーワード をセット
 EXCLUDE_CHARS = "/-_.~!*'()+"
 
 
-def setup_upload_resources(s3_key_list: list) -> tuple[list[dict], list[dict]]:
+def create_upload_item(
+    key: str,
+    resource_file: ResourceFile,
+    metadata_resolver: MetadataResolver,
+    transfer_profiles: TransferProfiles,
+) -> dict:
+    """
+    リソースファイル1件分のアップロード情報を生成する。
+
+    Args:
+        key (str): アップロード先のS3キー。
+        resource_file (ResourceFile): 走査済みのリソースファイル。
+        metadata_resolver (MetadataResolver): 追加パラメータの決定ルール。
+        transfer_profiles (TransferProfiles): ファイルサイズごとの転送設定。
+
+    Returns:
+        dict: アップロード情報（resource_file, key, size, mtime_ns, extra_args, transfer_config）。
+    """
+    return {
+        "resource_file": resource_file.path,
+        "key": key,
+        "size": resource_file.size,
+        "mtime_ns": resource_file.mtime_ns,
+        "extra_args": metadata_resolver.resolve(key),
+        "transfer_config": transfer_profiles.select(resource_file.size),
+    }
+
+
+class UploadResources:
+    """
+    アップロード対象のファイル情報を準備するための状態をまとめたクラス。
+
+    リソースディレクトリのインデックス・メタデータルール・転送プロファイルは生成時に1回だけ準備し、
+    入力リストをバッチ単位で setup() に渡しても再走査しない。
+    ファイル名で探す場合は、バッチをまたいだファイル名の衝突も検出する。
+    """
+
+    def __init__(
+        self, mirror: bool = False, transfer_profiles: TransferProfiles | None = None
+    ):
+        """
+        Args:
+            mirror (bool, optional): True の場合、キーの階層と同じ相対パスでリソースを探す。
+                False の場合、キーのファイル名でリソースディレクトリ全体から探す。
+            transfer_profiles (TransferProfiles | None, optional): 転送プロファイル。
+                省略時は config.yml の設定から生成する。
+
+        Raises:
+            FileNotFoundError: リソースディレクトリが存在しない場合。
+            PermissionError: リソースディレクトリへのアクセス権がない場合。
+            ValueError: メタデータルール・転送プロファイルの形式が正しくない場合。
+        """
+        self.mirror = mirror
+
+        # ファイルサイズごとの転送設定を準備
+        self.transfer_profiles = transfer_profiles or TransferProfiles(
+            config.UPLOAD_TRANSFER_PROFILES
+        )
+
+        # リソース用のディレクトリを走査
+        self.resource_index = ResourceIndex.build(config.RESOURCE)
+
+        # 追加パラメータ（ContentType, CacheControl など）の決定ルールを準備
+        self.metadata_resolver = MetadataResolver(config.UPLOAD_METADATA_RULES)
+
+        # ファイル名ごとに最初に現れたキー（ファイル名で探す場合の衝突検出用）
+        self.key_by_name: dict[str, str] = {}
+
+    def find_collision(
+        self, key: str, batch_keys_by_name: dict[str, set]
+    ) -> str | None:
+        """
+        ファイル名で探す場合に、アップロードするファイルが一意に決まらない理由を返す。
+
+        Args:
+            key (str): S3キー。
+            batch_keys_by_name (dict[str, set]): 同じバッチ内のファイル名ごとのキー。
+
+        Returns:
+            str | None: 衝突している場合は理由、衝突がなければ None。
+        """
+        if self.mirror:
+            return None
+
+        file_name = Path(key).name
+        first_key = self.key_by_name.setdefault(file_name, key)
+
+        if len(batch_keys_by_name[file_name]) > 1 or first_key != key:
+            return "別フォルダのキーとファイル名が重複しています"
+        if self.resource_index.count_by_name(file_name) > 1:
+            return "リソース内に同名のファイルが複数あります"
+        return None
+
+    def setup(self, s3_keys: Iterable[str]) -> tuple[list[dict], list[dict]]:
+        """
+        アップロード対象のファイル情報と、存在しないファイルの情報を準備する。
+
+        Args:
+            s3_keys (Iterable[str]): アップロード対象のS3キー（1バッチ分）。
+
+        Returns:
+            tuple[list[dict], list[dict]]:
+                - upload_items: 存在するファイルの情報リスト
+                  （resource_file, key, size, mtime_ns, extra_args, transfer_config）。
+                - not_found_files: 存在しない・特定できないファイルの情報リスト（file_name, reason, path）。
+        """
+        s3_keys = list(s3_keys)
+
+        # バッチ内のファイル名ごとのキー（同じキーの重複指定は数えない）
+        batch_keys_by_name = defaultdict(set)
+        for key in s3_keys:
+            batch_keys_by_name[Path(key).name].add(key)
+
+        upload_items = []
+        not_found_files = []
+
+        for key in s3_keys:
+            file_name = Path(key).name
+            expected_path = Path(config.RESOURCE) / (key if self.mirror else file_name)
+
+            reason = self.find_collision(key, batch_keys_by_name)
+            resource_file = (
+                None if reason else self.resource_index.find(key, self.mirror)
+            )
+
+            if resource_file is None:
+                not_found_files.append(
+                    {
+                        "file_name": file_name,
+                        "reason": reason
+                        or "アップロード対象のファイルが見つかりません",
+                        "path": str(expected_path),
+                    }
+                )
+                continue
+
+            # リソースが存在したらアップロード情報をセットする
+            upload_items.append(
+                create_upload_item(
+                    key, resource_file, self.metadata_resolver, self.transfer_profiles
+                )
+            )
+
+        return upload_items, not_found_files
+
+
+def setup_upload_resources(
+    s3_key_list: list, mirror: bool = False
+) -> tuple[list[dict], list[dict]]:
     """
     アップロード対象のファイル情報と、存在しないファイルの情報を準備する。
 
+    リソースディレクトリは最初に1回だけ走査し、キーごとの存在確認はインデックス上で行う。
+    ファイル名で探す場合、別フォルダの同名キーや同名のリソースファイルは
+    どのファイルをアップロードすべきか決まらないため失敗として扱う。
+
     Args:
         s3_key_list (list): アップロード対象のS3キーのリスト。
+        mirror (bool, optional): True の場合、キーの階層と同じ相対パスでリソースを探す。
+            False の場合、キーのファイル名でリソースディレクトリ全体から探す。
 
     Returns:
         tuple[list[dict], list[dict]]:
-            - upload_items: 存在するファイルの情報リスト（file_name, key, extra_args）。
-            - not_found_files: 存在しないファイルの情報リスト（file_name, reason, path）。
+            - upload_items: 存在するファイルの情報リスト（resource_file, key, size, mtime_ns, extra_args）。
+            - not_found_files: 存在しない・特定できないファイルの情報リスト（file_name, reason, path）。
 
     Raises:
+        FileNotFoundError: リソースディレクトリが存在しない場合。
         PermissionError: リソースディレクトリまたはファイルへのアクセス権がない場合。
+        ValueError: メタデータルールの形式が正しくない場合。
     """
-    # リソース用のディレクトリ指定
-    resource_dir = Path(RESOURCE)
+    return UploadResources(mirror=mirror).setup(s3_key_list)
 
-    upload_items = []
-    not_found_files = []
 
-    for key in s3_key_list:
-        resource_file = resource_dir / Path(key).name
+def needs_hash(record: ObjectRecord | ManifestRecord | None, item: dict) -> bool:
+    """
+    内容の比較にローカルファイルのハッシュが必要かを判定する。
+
+    Args:
+        record (ObjectRecord | ManifestRecord | None): S3 オブジェクトの情報。存在しない場合は None。
+        item (dict): アップロード対象の情報（size, mtime_ns）。
+
+    Returns:
+        bool: サイズが同じで、マニフェストの更新日時でも判定できない場合は True。
+    """
+    if record is None or record.size != item["size"]:
+        return False
+    mtime_ns = getattr(record, "mtime_ns", None)
+    return mtime_ns is None or mtime_ns != item.get("mtime_ns")
 
-        if not resource_file.exists():
-            not_found_files.append(
-                {
-                    "file_name": str(resource_file.name),
-                    "reason": "アップロード対象のファイルが見つかりません",
-                    "path": str(resource_file),
-                }
-            )
-            continue
 
-        # リソースが存在したらアップロード情報をセットする
-        upload_items.append(
-            {
-                "resource_file": str(resource_file),
-                "key": key,
-                "extra_args": set_extra_args(resource_file),
-            }
+def hash_items(
+    upload_items: list[dict], hasher: HashService | None = None, max_workers: int = 1
+) -> None:
+    """
+    ファイルの ETag（アップロード時と同じパートサイズ）をまとめて計算し、content_hash に設定する。
+
+    Args:
+        upload_items (list[dict]): アップロード対象の情報（resource_file, size, mtime_ns, transfer_config）。
+        hasher (HashService | None, optional): ハッシュ計算のサービス。
+            省略時は max_workers のプロセスで計算する（キャッシュは使用しない）。
+        max_workers (int, optional): hasher を省略した場合の計算に使うプロセス数。
+    """
+    if not upload_items:
+        return
+
+    files = [
+        (
+            item["resource_file"],
+            item["size"],
+            item.get("mtime_ns"),
+            item.get("transfer_config"),
         )
+        for item in upload_items
+    ]
+    if hasher is None:
+        with HashService(max_workers) as hasher:
+            etags = hasher.compute_etags(files)
+    else:
+        etags = hasher.compute_etags(files)
 
-    return upload_items, not_found_files
+    for item, etag in zip(upload_items, etags):
+        item["content_hash"] = etag
 
 
-def set_extra_args(file: Path) -> dict:
+def matches_record(record: ObjectRecord | ManifestRecord | None, item: dict) -> bool:
     """
-    推測されるMIMEタイプに基づいて、S3アップロード時の追加パラメータを設定する。
+    ローカルファイルと、一覧取得（またはマニフェスト）で得た S3 オブジェクトの内容が同一かを判定する。
+
+    サイズが異なる場合はハッシュを計算せずに変更ありと判定する。
+    マニフェストの記録でアップロード時の更新日時と同じ場合も、ハッシュを計算しない。
+    hash_items() で計算済みの content_hash があれば、それを使う。
 
     Args:
-        file (Path): アップロード対象のファイルパス。
+        record (ObjectRecord | ManifestRecord | None): S3 オブジェクトの情報。存在しない場合は None。
+        item (dict): アップロード対象の情報（resource_file, size, transfer_config）。
 
     Returns:
-        dict: 以下のキーを持つ辞書。
-            - "ACL": アクセス権（常に "public-read"）
-            - "ContentType": 推測されたまたはデフォルトの MIME タイプ
+        bool: 同一であれば True。
     """
-    # MIMEタイプを取得 #mime_type の例: 'image/jpeg'
-    mime_type, _ = mimetypes.guess_type(file)
+    if not needs_hash(record, item):
+        # サイズ違い（または存在しない）は変更あり、更新日時が記録と同じ場合は同一
+        return record is not None and record.size == item["size"]
 
-    return {
-        "ACL": "public-read",
-        # MIMEタイプ不明な場合は 'application/octet-stream'とする
-        "ContentType": mime_type if mime_type else "application/octet-stream",
-    }
+    # アップロード時と同じパートサイズで計算する（マニフェストに記録できるよう保持する）
+    if item.get("content_hash") is None:
+        item["content_hash"] = compute_etag(
+            item["resource_file"], item.get("transfer_config")
+        )
+    return item["content_hash"] in (record.etag, getattr(record, "content_hash", None))
+
+
+def filter_unchanged_items(
+    s3_client: BaseClient,
+    upload_items: list[dict],
+    max_workers: int = 1,
+    manifest: Manifest | None = None,
+    hasher: HashService | None = None,
+) -> tuple[list[dict], list[dict]]:
+    """
+    S3 上のオブジェクトと内容が同一のファイルをアップロード対象から除外する。
+
+    対象キーが属するディレクトリをまとめて一覧取得し、オブジェクトごとの HEAD は行わない。
+    マニフェストを指定した場合は一覧取得も行わず、マニフェストの記録と比較する。
+    サイズが同じファイルのハッシュは、比較の前にまとめて（プロセスを分けて）計算する。
+
+    Args:
+        s3_client (BaseClient): boto3のS3クライアント。
+        upload_items (list[dict]): アップロード対象の情報リスト。
+        max_workers (int, optional): hasher を省略した場合のハッシュ計算のプロセス数。1 の場合は逐次処理。
+        manifest (Manifest | None, optional): 比較に使うマニフェスト。
+        hasher (HashService | None, optional): ハッシュ計算のサービス（キャッシュ・プロセスプール）。
+
+    Returns:
+        tuple[list[dict], list[dict]]:
+            - changed_items: アップロードが必要なファイルの情報リスト（upload_items と同じ形式）
+            - skipped_list: 変更がないためスキップしたファイルの情報（file_name, key）
+
+    Raises:
+        botocore.exceptions.ClientError: 一覧取得に失敗した場合。
+    """
+    listing_index = manifest or ListingIndex.build(
+        s3_client, config.S3_BUCKET, (item["key"] for item in upload_items)
+    )
+    records = [listing_index.get(item["key"]) for item in upload_items]
+
+    hash_items(
+        [
+            item
+            for record, item in zip(records, upload_items)
+            if needs_hash(record, item)
+        ],
+        hasher=hasher,
+        max_workers=max_workers,
+    )
+
+    changed_items = []
+    skipped_list = []
+    for record, item in zip(records, upload_items):
+        if matches_record(record, item):
+            skipped_list.append(
+                {"file_name": str(Path(item["key"]).name), "key": item["key"]}
+            )
+        else:
+            changed_items.append(item)
+
+    return changed_items, skipped_list
+
+
+def upload_one(
+    s3_client: BaseClient, item: dict, controller: AdaptiveController | None = None
+) -> tuple[bool, dict]:
+    """
+    1件のファイルをS3にアップロードし、結果を返す。
+
+    Args:
+        s3_client (BaseClient): boto3のS3クライアント。
+        item (dict): アップロード対象の情報（resource_file, key, extra_args, transfer_config）。
+            transfer_config がない場合は s3transfer の既定値で転送する。
+        controller (AdaptiveController | None, optional): 指定した場合、転送速度の上限に従う。
+
+    Returns:
+        tuple[bool, dict]:
+            - 成功した場合は True と成功情報（file_name, key）
+            - 失敗した場合は False と失敗情報（file_name, reason, path）
+    """
+    file_name = str(Path(item["key"]).name)
+    started = time.perf_counter()
+    try:
+        s3_client.upload_file(
+            Filename=item["resource_file"],
+            Bucket=config.S3_BUCKET,
+            Key=item["key"],
+            ExtraArgs=item["extra_args"],
+            Config=item.get("transfer_config"),
+            Callback=controller.consume if controller else None,
+        )
+        elapsed = time.perf_counter() - started
+        record_metrics(nbytes=item.get("size", 0), latency=elapsed)
+        logging.debug(
+            f"{item['key']} : アップロードしました（{elapsed * 1000:.1f} ms）"
+        )
+        return True, {"file_name": file_name, "key": item["key"]}
+
+    except Exception as e:
+        record_metrics(latency=time.perf_counter() - started)
+        reason = str(e)
+        logging.debug(f"{item['key']} : アップロードに失敗しました: {reason}")
+        return False, {
+            "file_name": file_name,
+            "reason": f"S3アップロード失敗: {reason}",
+            "path": "-",
+        }
+
+
+def upload_with_controller(
+    s3_client: BaseClient, item: dict, controller: AdaptiveController
+) -> tuple[bool, dict]:
+    """
+    同時実行数の枠を確保してから1件のファイルをアップロードし、所要時間を記録する。
+
+    所要時間はファイルサイズの影響を受けるため、1MB 以上のファイルは 1MB あたりの秒数で記録する。
+
+    Args:
+        s3_client (BaseClient): boto3のS3クライアント。
+        item (dict): アップロード対象の情報。
+        controller (AdaptiveController): 同時実行数と転送速度のコントローラー。
+
+    Returns:
+        tuple[bool, dict]: upload_one() の結果。
+    """
+    with controller.slot():
+        started = time.monotonic()
+        ok, result = upload_one(s3_client, item, controller)
+        if ok:
+            elapsed = time.monotonic() - started
+            controller.record_success(elapsed / max(1.0, item.get("size", 0) / MB))
+    return ok, result
 
 
 def upload_s3_object(
-    s3_client: BaseClient, upload_items: list[dict]
+    s3_client: BaseClient,
+    upload_items: list[dict],
+    max_workers: int = 1,
+    controller: AdaptiveController | None = None,
+    manifest: Manifest | None = None,
 ) -> tuple[list[dict], list[dict]]:
     """
     指定されたファイルをS3にアップロードし、成功・失敗結果を返す。
@@ -119,39 +441,48 @@ def upload_s3_object(
                 - 'resource_file': ローカルファイルパス
                 - 'key': S3キー
                 - 'extra_args': S3アップロード時の追加引数（ACL, ContentTypeなど）
+        max_workers (int, optional): 同時アップロード数。1 の場合は逐次処理。
+            2 以上の場合はスレッドプールで1つのクライアントを共有するため、
+            クライアントのコネクションプールも同数以上にしておくこと。
+        controller (AdaptiveController | None, optional): 指定した場合、max_workers の代わりに
+            コントローラーの同時実行数（上限 controller.maximum ）と転送速度の上限に従う。
+        manifest (Manifest | None, optional): 指定した場合、成功したファイルを1トランザクションで記録する。
 
     Returns:
         tuple[list[dict], list[dict]]:
             - succeed_items: アップロード成功ファイルの情報（file_name, key）
             - failure_list: アップロード失敗ファイルの情報（file_name, reason, path）
+            いずれも upload_items の順序を保持する。
 
     Notes:
         例外はキャッチされ、failure_list に記録される。
     """
-    succeed_items = []
-    failure_list = []
-    for item in upload_items:
-        try:
-            s3_client.upload_file(
-                Filename=item["resource_file"],
-                Bucket=S3_BUCKET,
-                Key=item["key"],
-                ExtraArgs=item["extra_args"],
+    if controller is not None:
+        # スレッドは上限数まで用意し、実際の同時実行数はコントローラーの枠で制限する
+        with ThreadPoolExecutor(max_workers=controller.maximum) as executor:
+            results = list(
+                executor.map(
+                    lambda item: upload_with_controller(s3_client, item, controller),
+                    upload_items,
+                )
             )
-
-            succeed_items.append(
-                {"file_name": str(Path(item["key"]).name), "key": item["key"]}
+    elif max_workers <= 1:
+        results = [upload_one(s3_client, item) for item in upload_items]
+    else:
+        # executor.map は入力順に結果を返すため、完了順に関わらず順序が保たれる
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(
+                executor.map(lambda item: upload_one(s3_client, item), upload_items)
             )
 
-        except Exception as e:
-            reason = str(e)
-            failure_list.append(
-                {
-                    "file_name": str(Path(item["key"]).name),
-                    "reason": f"S3アップロード失敗: {reason}",
-                    "path": "-",
-                }
-            )
+    succeed_items = [result for ok, result in results if ok]
+    failure_list = [result for ok, result in results if not ok]
+
+    # 成功したファイルをマニフェストへまとめて記録する
+    if manifest is not None:
+        manifest.record_uploads(
+            item for item, (ok, _) in zip(upload_items, results) if ok
+        )
 
     return succeed_items, failure_list
 
@@ -171,21 +502,29 @@ def create_access_url(s3_key: str) -> str:
     encoded_key = parse.quote(s3_key, safe=EXCLUDE_CHARS)
 
     # 返却用のURLをセット
-    url_replaced_domain = f"https://{CDN_DOMAIN}/{encoded_key}"
+    url_replaced_domain = f"https://{config.CDN_DOMAIN}/{encoded_key}"
     url_original_domain = (
-        f"https://{S3_BUCKET}.s3.{AWS_REGION}.amazonaws.com/{encoded_key}"
+        f"https://{config.S3_BUCKET}.s3.{config.AWS_REGION}.amazonaws.com/{encoded_key}"
     )
 
     # env設定の環境が本番であれば、CDN用のドメインに置換したURLを返す
-    return url_replaced_domain if ENVIRONMENT == "production" else url_original_domain
+    return (
+        url_replaced_domain
+        if config.ENVIRONMENT == "production"
+        else url_original_domain
+    )
 
 
-def set_access_url(s3_objects: list[dict]) -> tuple[list[dict], list[dict]]:
+def set_access_url(
+    s3_objects: list[dict], concurrency: int = 1, limit_per_host: int = 20
+) -> tuple[list[dict], list[dict]]:
     """
     アップロード済みオブジェクトのアクセスURLを生成し、検証結果を返す。
 
     Args:
         s3_objects (list[dict]): アップロード成功ファイルの情報リスト（file_name, key）。
+        concurrency (int, optional): URL 検証の同時実行数。2 以上の場合は asyncio で一括検証する。
+        limit_per_host (int, optional): 一括検証時のホストごとの同時接続数。
 
     Returns:
         tuple[list[dict], list[dict]]:
@@ -195,13 +534,20 @@ def set_access_url(s3_objects: list[dict]) -> tuple[list[dict], list[dict]]:
     success_list = []
     failure_list = []
 
-    for obj in s3_objects:
-        access_url = create_access_url(obj["key"])
+    new_objs = [
+        {"file_name": obj["file_name"], "path": create_access_url(obj["key"])}
+        for obj in s3_objects
+    ]
 
-        new_obj = {"file_name": obj["file_name"], "path": access_url}
+    results = check_urls_accessible(
+        [new_obj["path"] for new_obj in new_objs],
+        concurrency=concurrency,
+        limit_per_host=limit_per_host,
+    )
 
+    for new_obj, accessible in zip(new_objs, results):
         # URLが無効であれば失敗リストにセット
-        if not is_url_accessible(new_obj["path"]):
+        if not accessible:
             new_obj["reason"] = "URLが無効です"
             failure_list.append(new_obj)
             continue
@@ -212,91 +558,494 @@ def set_access_url(s3_objects: list[dict]) -> tuple[list[dict], list[dict]]:
     return success_list, failure_list
 
 
-# メイン処理
-def main():
-    # 開始通知
-    report_config(Path(__file__).name, CONFIG_SUMMARY)
-    start()
+def record_upload_batch(
+    s3_keys: list[str],
+    succeed_items: list[dict],
+    success_list: list[dict],
+    failure_list: list[dict],
+    skipped_list: list[dict],
+    journal: Journal | None = None,
+    sink: ResultSink | None = None,
+) -> None:
+    """
+    1バッチ分の結果をキーごとにジャーナル・結果ファイルへ記録する。
 
-    # s3 クライアントを作成
-    context = CONTEXT["create_s3client"]
-    try:
-        s3_client = create_s3_client()
-        notify(context)
-    except Exception as e:
-        handle_exception(e, context)
-        end()
-        return
+    成功・スキップ以外のキーは失敗としてジャーナルに記録し、再開時に再実行の対象とする。
+    失敗したキーは再実行用リストにも書き出す。
 
-    # バケットへの疎通確認
-    context = CONTEXT["connect_bucket"]
-    try:
-        s3_client.head_bucket(Bucket=S3_BUCKET)
-        notify(context)
-    except Exception as e:
-        handle_exception(e, context)
-        end()
-        return
+    Args:
+        s3_keys (list[str]): アップロード対象のS3キー（1バッチ分）。
+        succeed_items (list[dict]): アップロード成功ファイルの情報（file_name, key）。
+        success_list (list[dict]): 有効なURLのファイル情報（file_name, path）。
+        failure_list (list[dict]): 各処理で失敗したファイルの情報（file_name, reason, path）。
+        skipped_list (list[dict]): 変更がないためスキップしたファイルの情報（file_name, key）。
+        journal (Journal | None, optional): 記録先のジャーナル。
+        sink (ResultSink | None, optional): 結果の出力先。
+    """
+    # URL検証の結果にはキーが含まれないため、生成したURLからキーを引く
+    key_by_url = {create_access_url(item["key"]): item["key"] for item in succeed_items}
+    done_keys = set()
 
-    # アップロードリスト読込
-    context = CONTEXT["load_file_list"]
-    try:
-        s3_key_list = load_file(UPLOAD_FILE_LIST)
-        notify(context)
-    except Exception as e:
-        handle_exception(e, context)
-        end()
-        return
+    for result in success_list:
+        key = key_by_url[result["path"]]
+        done_keys.add(key)
+        if journal is not None:
+            journal.record(key, "success", result)
+        if sink is not None:
+            sink.success(result)
+
+    for result in skipped_list:
+        done_keys.add(result["key"])
+        if journal is not None:
+            journal.record(result["key"], "skipped", result)
+        if sink is not None:
+            sink.skipped(result)
+
+    if sink is not None:
+        for result in failure_list:
+            sink.failure(result)
+
+    for key in dict.fromkeys(s3_keys):
+        if key in done_keys:
+            continue
+        if journal is not None:
+            journal.record(key, "failure")
+        if sink is not None:
+            sink.add_retry(key)
+
+    if journal is not None:
+        journal.sync()
+
+
+def process_upload_batch(
+    s3_client: BaseClient,
+    upload_resources: UploadResources,
+    s3_keys: list[str],
+    journal: Journal | None = None,
+    controller: AdaptiveController | None = None,
+    sink: ResultSink | None = None,
+    incremental: bool | None = None,
+    manifest: Manifest | None = None,
+    hasher: HashService | None = None,
+) -> tuple[list[dict], list[dict], list[dict]]:
+    """
+    1バッチ分のキーについて、準備 → 差分判定 → アップロード → URL検証 を行う。
+
+    Args:
+        s3_client (BaseClient): boto3のS3クライアント。
+        upload_resources (UploadResources): アップロード対象の準備用の状態。
+        s3_keys (list[str]): アップロード対象のS3キー（1バッチ分）。
+        journal (Journal | None, optional): 指定した場合、キーごとの結果を記録する。
+        controller (AdaptiveController | None, optional): アップロードの同時実行数と転送速度のコントローラー。
+        sink (ResultSink | None, optional): 指定した場合、結果と再実行用のキーを書き出す。
+        incremental (bool | None, optional): True の場合、S3 上と同じ内容のファイルをスキップする。
+            省略時は config.yml の upload.incremental に従う。
+        manifest (Manifest | None, optional): 指定した場合、差分判定に使い、アップロード結果を記録する。
+        hasher (HashService | None, optional): 差分判定のハッシュ計算のサービス。
+
+    Returns:
+        tuple[list[dict], list[dict], list[dict]]:
+            - success_list: 有効なURLのファイル情報（file_name, path）
+            - failure_list: 各処理で失敗したファイルの情報（file_name, reason, path）
+            - skipped_list: 変更がないためスキップしたファイルの情報（file_name, key）
 
+    Raises:
+        botocore.exceptions.ClientError: 差分判定の一覧取得に失敗した場合。
+    """
     # アップロード用のリソース情報生成
-    context = CONTEXT["setup_upload_resource"]
-    try:
-        upload_items, setup_upload_resource_failure_list = setup_upload_resources(
-            s3_key_list
+    with stage(CONTEXT["prepare_items"]):
+        upload_items, setup_upload_resource_failure_list = upload_resources.setup(
+            s3_keys
         )
-        notify(context)
-    except Exception as e:
-        handle_exception(e, context)
-        end()
-        return
+        record_metrics(items=len(s3_keys))
+
+    # 変更のないファイルをアップロード対象から除外
+    skipped_list = []
+    if config.UPLOAD_INCREMENTAL if incremental is None else incremental:
+        with stage(CONTEXT["filter_unchanged"]):
+            record_metrics(items=len(upload_items))
+            upload_items, skipped_list = filter_unchanged_items(
+                s3_client,
+                upload_items,
+                max_workers=config.UPLOAD_MAX_WORKERS,
+                manifest=manifest,
+                hasher=hasher,
+            )
 
-    # アップロード処理
-    context = CONTEXT["upload_s3_object"]
-    succeed_items, upload_s3_object_failure_list = upload_s3_object(
-        s3_client, upload_items
+    return upload_and_record(
+        s3_client,
+        s3_keys,
+        upload_items,
+        failure_list=setup_upload_resource_failure_list,
+        skipped_list=skipped_list,
+        journal=journal,
+        controller=controller,
+        sink=sink,
+        manifest=manifest,
     )
-    notify(context)
+
+
+def upload_and_record(
+    s3_client: BaseClient,
+    s3_keys: list[str],
+    upload_items: list[dict],
+    failure_list: list[dict] | None = None,
+    skipped_list: list[dict] | None = None,
+    journal: Journal | None = None,
+    controller: AdaptiveController | None = None,
+    sink: ResultSink | None = None,
+    manifest: Manifest | None = None,
+) -> tuple[list[dict], list[dict], list[dict]]:
+    """
+    準備済みのファイルを アップロード → URL検証 し、1バッチ分の結果を記録する。
+
+    Args:
+        s3_client (BaseClient): boto3のS3クライアント。
+        s3_keys (list[str]): 対象のS3キー（1バッチ分）。結果の記録に使う。
+        upload_items (list[dict]): アップロード対象の情報リスト。
+        failure_list (list[dict] | None, optional): 準備までに失敗したファイルの情報。
+        skipped_list (list[dict] | None, optional): 変更がないためスキップしたファイルの情報。
+        journal (Journal | None, optional): 指定した場合、キーごとの結果を記録する。
+        controller (AdaptiveController | None, optional): アップロードの同時実行数と転送速度のコントローラー。
+        sink (ResultSink | None, optional): 指定した場合、結果と再実行用のキーを書き出す。
+        manifest (Manifest | None, optional): 指定した場合、アップロードに成功したファイルを記録する。
+
+    Returns:
+        tuple[list[dict], list[dict], list[dict]]:
+            - success_list: 有効なURLのファイル情報（file_name, path）
+            - failure_list: 各処理で失敗したファイルの情報（file_name, reason, path）
+            - skipped_list: 変更がないためスキップしたファイルの情報（file_name, key）
+    """
+    skipped_list = skipped_list or []
+
+    # アップロード処理（件数・バイト数・レイテンシは1件ごとに記録する）
+    with stage(CONTEXT["upload_object"]):
+        succeed_items, upload_s3_object_failure_list = upload_s3_object(
+            s3_client,
+            upload_items,
+            max_workers=config.UPLOAD_MAX_WORKERS,
+            controller=controller,
+            manifest=manifest,
+        )
 
     # アクセスURLの生成
-    context = CONTEXT["set_access_url"]
-    success_list, set_access_url_failure_list = set_access_url(succeed_items)
-    notify(context)
+    with stage(CONTEXT["verify_url"]):
+        record_metrics(items=len(succeed_items))
+        success_list, set_access_url_failure_list = set_access_url(
+            succeed_items,
+            concurrency=config.VERIFY_MAX_WORKERS,
+            limit_per_host=config.VERIFY_LIMIT_PER_HOST,
+        )
 
-    # 失敗リストのマージ
     # 各処理で排出された 失敗リストをマージ
     failure_list = [
-        *setup_upload_resource_failure_list,
+        *(failure_list or []),
         *upload_s3_object_failure_list,
         *set_access_url_failure_list,
     ]
 
-    # 結果書き込み
-    context = CONTEXT["write_results"]
-    try:
-        path = write_results_to_file(success_list, failure_list, UPLOAD_RESULT)
-        notify(context)
-    except Exception as e:
-        handle_exception(e, context)
-        end()
+    if journal is not None or sink is not None:
+        with stage(CONTEXT["record_results"]):
+            record_upload_batch(
+                s3_keys,
+                succeed_items,
+                success_list,
+                failure_list,
+                skipped_list,
+                journal=journal,
+                sink=sink,
+            )
+
+    return success_list, failure_list, skipped_list
+
+
+def stream_upload(
+    s3_client: BaseClient,
+    upload_resources: UploadResources,
+    s3_keys: Iterable[str],
+    journal: Journal | None = None,
+    controller: AdaptiveController | None = None,
+    sink: ResultSink | None = None,
+    incremental: bool | None = None,
+    manifest: Manifest | None = None,
+    hasher: HashService | None = None,
+    queue_size: int | None = None,
+) -> None:
+    """
+    キーを 準備 → 差分判定 → アップロード → URL検証 の各段にキューで流し、完了した順に結果を記録する。
+
+    各段は並行して動くため、準備できたファイルから順にアップロードし、
+    アップロードが終わったファイルから順に URL を検証する（全件のアップロードを待たない）。
+    準備・差分判定・URL検証は、その時点でキューにある分をまとめて処理する（最大 BATCH_SIZE 件）。
+
+    Args:
+        s3_client (BaseClient): boto3のS3クライアント。
+        upload_resources (UploadResources): アップロード対象の準備用の状態。
+        s3_keys (Iterable[str]): アップロード対象のS3キー。
+        journal (Journal | None, optional): 指定した場合、キーごとの結果を記録する。
+        controller (AdaptiveController | None, optional): アップロードの同時実行数と転送速度のコントローラー。
+        sink (ResultSink | None, optional): 指定した場合、結果と再実行用のキーを書き出す。
+        incremental (bool | None, optional): True の場合、S3 上と同じ内容のファイルをスキップする。
+            省略時は config.yml の upload.incremental に従う。
+        manifest (Manifest | None, optional): 指定した場合、差分判定に使い、アップロード結果を記録する。
+        hasher (HashService | None, optional): 差分判定のハッシュ計算のサービス。
+        queue_size (int | None, optional): 各段をつなぐキューの上限件数。
+            省略時は config.yml の concurrency.queue_size に従う。
+
+    Raises:
+        botocore.exceptions.ClientError: 差分判定の一覧取得に失敗した場合。
+    """
+
+    def prepare(s3_keys: list[str]) -> tuple[list[dict], list[tuple]]:
+        record_metrics(items=len(s3_keys))
+        upload_items, not_found_files = upload_resources.setup(s3_keys)
+        prepared = {item["key"] for item in upload_items}
+        failed_keys = [key for key in s3_keys if key not in prepared]
+        return upload_items, [
+            ("failure", key, result)
+            for key, result in zip(failed_keys, not_found_files)
+        ]
+
+    def filter_unchanged(upload_items: list[dict]) -> tuple[list[dict], list[tuple]]:
+        record_metrics(items=len(upload_items))
+        changed_items, skipped_list = filter_unchanged_items(
+            s3_client,
+            upload_items,
+            max_workers=config.UPLOAD_MAX_WORKERS,
+            manifest=manifest,
+            hasher=hasher,
+        )
+        return changed_items, [
+            ("skipped", result["key"], result) for result in skipped_list
+        ]
+
+    def upload(upload_items: list[dict]) -> tuple[list[dict], list[tuple]]:
+        results = [
+            upload_with_controller(s3_client, item, controller)
+            if controller is not None
+            else upload_one(s3_client, item)
+            for item in upload_items
+        ]
+        if manifest is not None:
+            manifest.record_uploads(
+                item for item, (ok, _) in zip(upload_items, results) if ok
+            )
+        return [result for ok, result in results if ok], [
+            ("failure", item["key"], result)
+            for item, (ok, result) in zip(upload_items, results)
+            if not ok
+        ]
+
+    def verify(succeed_items: list[dict]) -> tuple[list, list[tuple]]:
+        record_metrics(items=len(succeed_items))
+        success_list, failure_list = set_access_url(
+            succeed_items,
+            concurrency=config.VERIFY_MAX_WORKERS,
+            limit_per_host=config.VERIFY_LIMIT_PER_HOST,
+        )
+        # URL検証の結果にはキーが含まれないため、生成したURLからキーを引く
+        key_by_url = {
+            create_access_url(item["key"]): item["key"] for item in succeed_items
+        }
+        return [], [
+            *(
+                ("success", key_by_url[result["path"]], result)
+                for result in success_list
+            ),
+            *(
+                ("failure", key_by_url[result["path"]], result)
+                for result in failure_list
+            ),
+        ]
+
+    stages = [
+        StreamStage(CONTEXT["prepare_items"], prepare, chunk_size=config.BATCH_SIZE)
+    ]
+    if config.UPLOAD_INCREMENTAL if incremental is None else incremental:
+        stages.append(
+            StreamStage(
+                CONTEXT["filter_unchanged"],
+                filter_unchanged,
+                chunk_size=config.BATCH_SIZE,
+            )
+        )
+    stages.append(
+        StreamStage(
+            CONTEXT["upload_object"],
+            upload,
+            workers=controller.maximum if controller else config.UPLOAD_MAX_WORKERS,
+        )
+    )
+    stages.append(
+        StreamStage(CONTEXT["verify_url"], verify, chunk_size=config.BATCH_SIZE)
+    )
+
+    for status, key, result in run_stream(
+        s3_keys, stages, config.QUEUE_SIZE if queue_size is None else queue_size
+    ):
+        record_metrics()
+        record_upload_result(key, status, result, journal=journal, sink=sink)
+
+    if journal is not None:
+        journal.sync()
+
+
+def record_upload_result(
+    key: str,
+    status: str,
+    result: dict,
+    journal: Journal | None = None,
+    sink: ResultSink | None = None,
+) -> None:
+    """
+    1件分の結果をジャーナル・結果ファイルへ記録する（ record_upload_batch() の1件版）。
+
+    Args:
+        key (str): S3キー。
+        status (str): 結果の種類（success / skipped / failure）。
+        result (dict): 結果の情報。
+        journal (Journal | None, optional): 記録先のジャーナル。
+        sink (ResultSink | None, optional): 結果の出力先。失敗したキーは再実行用リストにも出力する。
+    """
+    if status == "failure":
+        if journal is not None:
+            journal.record(key, "failure")
+        if sink is not None:
+            sink.failure(result)
+            sink.add_retry(key)
         return
 
-    # 終了通知
-    end()
-    notify_output(path)
+    if journal is not None:
+        journal.record(key, status, result)
+    if sink is not None:
+        sink.write(status, result)
+
 
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """
+    コマンドライン引数を解析する。
+
+    Args:
+        argv (list[str] | None, optional): 引数のリスト。省略時は sys.argv を使う。
+
+    Returns:
+        argparse.Namespace: 解析結果（resume）。
+    """
+    parser = argparse.ArgumentParser(description="S3 へファイルを一括アップロードする")
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="前回のジャーナルを読み込み、完了済みのキーをスキップして再開する",
+    )
+    return parser.parse_args(argv)
+
+
+class UploadOperation(Operation):
+    """
+    S3 へのファイルの一括アップロード（ 準備 → 差分判定 → アップロード → URL検証 ）。
+    """
+
+    name = "upload"
+    script = Path(__file__).name
+    context = {
+        "load_list": CONTEXT["load_file_list"],
+        "setup": CONTEXT["setup_upload_resource"],
+        "process": CONTEXT["process_upload"],
+    }
+    resume_statuses = ("success", "skipped")
+
+    def __init__(self, incremental: bool | None = None):
+        """
+        Args:
+            incremental (bool | None, optional): True の場合、S3 上と同じ内容のファイルをスキップする。
+                省略時は config.yml の upload.incremental に従う。
+        """
+        self.incremental = (
+            config.UPLOAD_INCREMENTAL if incremental is None else incremental
+        )
+        self.with_skipped = self.incremental
+        self.input_file = config.UPLOAD_FILE_LIST
+        self.result_file = config.UPLOAD_RESULT
+        self.journal_file = config.UPLOAD_JOURNAL
+        self.retry_file = config.UPLOAD_RETRY_LIST
+        self.metrics_file = config.UPLOAD_METRICS
+        self.transfer_profiles: TransferProfiles | None = None
+        self.upload_resources: UploadResources | None = None
+
+    def create_session(self) -> Session:
+        """
+        最大同時アップロード数 × 1ファイルあたりの最大同時接続数 のコネクションを持つセッションを生成する。
+
+        Returns:
+            Session: 生成したセッション。
+        """
+        self.transfer_profiles = TransferProfiles(config.UPLOAD_TRANSFER_PROFILES)
+        return Session.create(
+            config.UPLOAD_MAX_WORKERS,
+            connections_per_worker=self.transfer_profiles.max_concurrency,
+            upload=True,
+        )
+
+    def setup(self, session: Session) -> None:
+        """アップロード用のリソース情報を準備する（リソースディレクトリの走査）。"""
+        self.upload_resources = UploadResources(
+            mirror=config.UPLOAD_MIRROR_KEYS, transfer_profiles=self.transfer_profiles
+        )
+
+    def process_items(
+        self,
+        session: Session,
+        items: Iterable[str],
+        journal: Journal,
+        sink: ResultSink,
+    ) -> None:
+        """
+        concurrency.queue_size が 1 以上の場合は各段をキューでつないで並行させ、
+        0 の場合はバッチごとに順に処理する。
+        """
+        if config.QUEUE_SIZE <= 0:
+            super().process_items(session, items, journal, sink)
+            return
+
+        stream_upload(
+            session.s3_client,
+            self.upload_resources,
+            items,
+            journal=journal,
+            controller=session.controller,
+            sink=sink,
+            incremental=self.incremental,
+            manifest=session.manifest,
+            hasher=session.hasher,
+        )
+
+    def process_batch(
+        self, session: Session, batch: list[str], journal: Journal, sink: ResultSink
+    ) -> None:
+        """1バッチ分のキーを 準備 → 差分判定 → アップロード → URL検証 に流す。"""
+        process_upload_batch(
+            session.s3_client,
+            self.upload_resources,
+            batch,
+            journal=journal,
+            controller=session.controller,
+            sink=sink,
+            incremental=self.incremental,
+            manifest=session.manifest,
+            hasher=session.hasher,
+        )
+
+
+# メイン処理
+def main(argv: list[str] | None = None):
+    args = parse_args(argv)
+    setup_logger(
+        config.LOGGING_LEVEL,
+        config.LOGGING_FORMAT,
+        config.LOGGING_DEBUG_SUMMARY_INTERVAL,
+    )
+    run_pipeline(UploadOperation(), resume=args.resume)
 
-# エラーログ用にセットアップ関数呼び出し
-setup_logger()
 
 # スクリプト実行
 if __name__ == "__main__":
@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from typing import TYPE_CHECKING
+
+import urllib3
+from custom_log import record_metrics
+
+if TYPE_CHECKING:
+    import aiohttp
+
+# 疎通確認で成功とみなすステータス（ranged GET の場合は 206 も含む）
+HEAD_OK_STATUS = {200}
+RANGED_GET_OK_STATUS = {200, 206}
+
+# HEAD が許可されていない場合に返るステータス。ranged GET で再確認する
+HEAD_UNSUPPORTED_STATUS = {403, 405, 501}
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """
+    試行回数に応じた待機時間（指数バックオフ + full jitter）を返す。
+
+    Args:
+        attempt (int): 0 から始まる試行回数。
+        base_delay (float): バックオフの基準待機時間（秒）。
+        max_delay (float): バックオフの最大待機時間（秒）。
+
+    Returns:
+        float: 待機時間（秒）。
+    """
+    return random.uniform(0, min(max_delay, base_delay * 2**attempt))
+
+
+class UrlChecker:
+    """
+    URL の疎通確認を行うチェッカー。
+
+    ホストごとのコネクションプール（keep-alive）を使い回し、
+    ボディをダウンロードしない HEAD リクエストでステータスを確認する。
+    HEAD が拒否された場合は先頭 1 バイトだけの ranged GET（bytes=0-0）で再確認する。
+
+    失敗時のリトライは指数バックオフ + ジッター（full jitter）で待機する。
+    スレッドセーフなため、複数のワーカーで1つのインスタンスを共有できる。
+    """
+
+    def __init__(
+        self,
+        retries: int = 3,
+        base_delay: float = 0.25,
+        max_delay: float = 4.0,
+        timeout: float = 10.0,
+        maxsize: int = 10,
+    ):
+        """
+        Args:
+            retries (int, optional): 試行回数。
+            base_delay (float, optional): バックオフの基準待機時間（秒）。
+            max_delay (float, optional): バックオフの最大待機時間（秒）。
+            timeout (float, optional): 接続・読込のタイムアウト（秒）。
+            maxsize (int, optional): ホストごとに保持する最大接続数。
+        """
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.pool = urllib3.PoolManager(
+            maxsize=maxsize,
+            timeout=urllib3.Timeout(total=timeout),
+            # リトライはこのクラスで制御する
+            retries=urllib3.Retry(total=0, redirect=5, raise_on_redirect=False),
+        )
+
+    def request_status(self, url: str) -> bool:
+        """
+        1回だけ疎通確認を行う。
+
+        Args:
+            url (str): アクセス対象の URL。
+
+        Returns:
+            bool: 成功ステータスが返った場合は True。
+
+        Raises:
+            urllib3.exceptions.HTTPError: 接続エラーやタイムアウトの場合。
+        """
+        response = self.pool.request("HEAD", url)
+        if response.status in HEAD_OK_STATUS:
+            return True
+        if response.status not in HEAD_UNSUPPORTED_STATUS:
+            return False
+
+        # HEAD が拒否された場合は先頭 1 バイトのみ取得して確認する
+        response = self.pool.request(
+            "GET", url, headers={"Range": "bytes=0-0"}, preload_content=False
+        )
+        try:
+            return response.status in RANGED_GET_OK_STATUS
+        finally:
+            response.drain_conn()
+            response.release_conn()
+
+    def is_accessible(self, url: str) -> bool:
+        """
+        指定した URL にアクセス可能かを確認する。
+
+        Args:
+            url (str): アクセス対象の URL。
+
+        Returns:
+            bool: アクセスに成功した場合は True、失敗した場合は False。
+        """
+        for attempt in range(self.retries):
+            started = time.perf_counter()
+            try:
+                accessible = self.request_status(url)
+            except Exception:
+                accessible = False
+            record_metrics(items=0, latency=time.perf_counter() - started)
+
+            if accessible:
+                return True
+
+            if attempt < self.retries - 1:
+                time.sleep(backoff_delay(attempt, self.base_delay, self.max_delay))
+        return False
+
+
+class AsyncUrlChecker:
+    """
+    大量の URL を asyncio でまとめて疎通確認するチェッカー。
+
+    全体の同時実行数をセマフォで、ホストごとの同時接続数をコネクターで制限する。
+    確認方法（HEAD → ranged GET）とリトライ方針は UrlChecker と同じ。
+    イベントループとセッション（コネクション）は close() まで check() の呼び出し間で使い回す。
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 100,
+        limit_per_host: int = 20,
+        retries: int = 3,
+        base_delay: float = 0.25,
+        max_delay: float = 4.0,
+        timeout: float = 10.0,
+    ):
+        """
+        Args:
+            concurrency (int, optional): 全体の同時実行数。
+            limit_per_host (int, optional): ホストごとの同時接続数。
+            retries (int, optional): 試行回数。
+            base_delay (float, optional): バックオフの基準待機時間（秒）。
+            max_delay (float, optional): バックオフの最大待機時間（秒）。
+            timeout (float, optional): 1リクエストあたりのタイムアウト（秒）。
+        """
+        self.concurrency = concurrency
+        self.limit_per_host = limit_per_host
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.session: aiohttp.ClientSession | None = None
+
+    def __enter__(self) -> AsyncUrlChecker:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    async def request_status(self, session: aiohttp.ClientSession, url: str) -> bool:
+        """
+        1回だけ疎通確認を行う。
+
+        Args:
+            session (aiohttp.ClientSession): 共有のセッション。
+            url (str): アクセス対象の URL。
+
+        Returns:
+            bool: 成功ステータスが返った場合は True。
+
+        Raises:
+            aiohttp.ClientError: 接続エラーの場合。
+            asyncio.TimeoutError: タイムアウトの場合。
+        """
+        async with session.head(url, allow_redirects=True) as response:
+            if response.status in HEAD_OK_STATUS:
+                return True
+            if response.status not in HEAD_UNSUPPORTED_STATUS:
+                return False
+
+        # HEAD が拒否された場合は先頭 1 バイトのみ取得して確認する
+        async with session.get(url, headers={"Range": "bytes=0-0"}) as response:
+            return response.status in RANGED_GET_OK_STATUS
+
+    async def is_accessible(
+        self,
+        session: aiohttp.ClientSession,
+        semaphore: asyncio.Semaphore,
+        url: str,
+    ) -> bool:
+        """
+        指定した URL にアクセス可能かを確認する。
+
+        バックオフの待機中はセマフォを解放し、他の URL の確認を進める。
+
+        Args:
+            session (aiohttp.ClientSession): 共有のセッション。
+            semaphore (asyncio.Semaphore): 全体の同時実行数を制限するセマフォ。
+            url (str): アクセス対象の URL。
+
+        Returns:
+            bool: アクセスに成功した場合は True、失敗した場合は False。
+        """
+        for attempt in range(self.retries):
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    accessible = await self.request_status(session, url)
+                except Exception:
+                    accessible = False
+                record_metrics(items=0, latency=time.perf_counter() - started)
+
+            if accessible:
+                return True
+
+            if attempt < self.retries - 1:
+                await asyncio.sleep(
+                    backoff_delay(attempt, self.base_delay, self.max_delay)
+                )
+        return False
+
+    async def check_all(self, urls: list[str]) -> list[bool]:
+        """
+        URL のリストをまとめて確認する。
+
+        セッションは初回の確認時に生成し、以降の呼び出しでも使い回す。
+
+        Args:
+            urls (list[str]): アクセス対象の URL のリスト。
+
+        Returns:
+            list[bool]: 各 URL の確認結果（urls と同じ順序）。
+        """
+        if self.session is None:
+            # aiohttp の読み込みに時間がかかるため、一括確認を行う時点で読み込む
+            import aiohttp
+
+            connector = aiohttp.TCPConnector(
+                limit=self.concurrency, limit_per_host=self.limit_per_host
+            )
+            timeout = aiohttp.ClientTimeout(total=self.timeout)
+            self.session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        return await asyncio.gather(
+            *(self.is_accessible(self.session, semaphore, url) for url in urls)
+        )
+
+    def check(self, urls: list[str]) -> list[bool]:
+        """
+        同期処理から URL のリストをまとめて確認する。
+
+        同じイベントループで実行するため、前回の呼び出しで開いた接続を再利用できる。
+        複数のスレッドから呼び出された場合は1回ずつ順に実行する。
+
+        Args:
+            urls (list[str]): アクセス対象の URL のリスト。
+
+        Returns:
+            list[bool]: 各 URL の確認結果（urls と同じ順序）。
+        """
+        with self.lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+            return self.loop.run_until_complete(self.check_all(urls))
+
+    def close(self) -> None:
+        """セッション（保持している接続）とイベントループを閉じる。"""
+        with self.lock:
+            if self.loop is None:
+                return
+            if self.session is not None:
+                self.loop.run_until_complete(self.session.close())
+                self.session = None
+            self.loop.close()
+            self.loop = None
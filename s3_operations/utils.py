@@ -1,94 +1,332 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import mmap
 import os
-import time
-from urllib import request
+from collections.abc import Iterable, Iterator
+from functools import lru_cache
+from itertools import islice
+from typing import TYPE_CHECKING
+
+from dedupe import Deduplicator
+from rate_control import AdaptiveController
+from result_sink import ResultSink
+from url_checker import AsyncUrlChecker, UrlChecker
+
+import config
+
+if TYPE_CHECKING:
+    from botocore.client import BaseClient
+
+# このサイズ以上の入力ファイルは mmap で読み込む
+MMAP_THRESHOLD = 64 * 1024 * 1024
+
+
+@lru_cache(maxsize=None)
+def get_s3_client(
+    environment: str,
+    region: str,
+    endpoint_url: str | None,
+    max_pool_connections: int,
+    connect_timeout: float,
+    read_timeout: float,
+    tcp_keepalive: bool,
+    retry_mode: str | None,
+    max_attempts: int | None,
+) -> BaseClient:
+    """指定した設定の S3 クライアントを生成する。同じ設定の組み合わせでは生成済みのクライアントを返す。
+
+    boto3 のクライアントはスレッドセーフなため、ワーカー間で共有してよい。
+
+    Args:
+        environment (str): 実行環境（キャッシュの区別に使用）。
+        region (str): AWS リージョン。
+        endpoint_url (str | None): 接続先のエンドポイント。None の場合は AWS の既定値。
+        max_pool_connections (int): コネクションプールの最大接続数。
+        connect_timeout (float): 接続タイムアウト（秒）。
+        read_timeout (float): 読み取りタイムアウト（秒）。
+        tcp_keepalive (bool): TCP キープアライブを有効にするか。
+        retry_mode (str | None): 再試行モード。None の場合は botocore の既定値。
+        max_attempts (int | None): 最大試行回数（初回を含む）。None の場合は botocore の既定値。
+
+    Returns:
+        BaseClient: S3 クライアント。
+    """
+    # boto3 の読み込みに時間がかかるため、クライアントを初めて生成する時点で読み込む
+    import boto3
+    from botocore.config import Config
 
-import boto3
+    retries = {}
+    if retry_mode:
+        retries["mode"] = retry_mode
+    if max_attempts:
+        retries["total_max_attempts"] = max_attempts
 
-from config import (
-    AWS_ACCESS_KEY_ID,
-    AWS_REGION,
-    AWS_SECRET_ACCESS_KEY,
-)
+    return boto3.client(
+        "s3",
+        aws_access_key_id=config.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=config.AWS_SECRET_ACCESS_KEY,
+        region_name=region,
+        endpoint_url=endpoint_url,
+        config=Config(
+            max_pool_connections=max_pool_connections,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            tcp_keepalive=tcp_keepalive,
+            retries=retries or None,
+        ),
+    )
 
 
-def create_s3_client():
-    """AWS S3 クライアントを生成して返す。
+def create_s3_client(
+    max_pool_connections: int | None = None, endpoint_url: str | None = None
+) -> BaseClient:
+    """AWS S3 クライアントを返す。
 
     環境変数や設定ファイルから取得した AWS 認証情報を使用して、
     boto3 の S3 クライアントオブジェクトを作成する。
+    コネクションプール・タイムアウト・再試行・キープアライブ・エンドポイントは config.yml の s3_client に従い、
+    同じ設定のクライアントは1回だけ生成して使い回す。
+
+    Args:
+        max_pool_connections (int | None, optional): コネクションプールの最大接続数。
+            複数スレッドでクライアントを共有する場合はワーカー数以上を指定する。
+            config.yml の設定値より小さい場合は設定値を使う。
+        endpoint_url (str | None, optional): 接続先のエンドポイント（ローカルの S3 互換サーバーなど）。
+            省略時は config.yml の設定値を使う。
 
     Returns:
-        boto3.client: 作成された S3 クライアントオブジェクト。
+        BaseClient: S3 クライアントオブジェクト。
     """
-    s3_client = boto3.client(
-        "s3",
-        aws_access_key_id=AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-        region_name=AWS_REGION,
+    return get_s3_client(
+        config.ENVIRONMENT,
+        config.AWS_REGION,
+        endpoint_url or config.S3_ENDPOINT_URL,
+        max(max_pool_connections or 0, config.S3_MAX_POOL_CONNECTIONS),
+        config.S3_CONNECT_TIMEOUT,
+        config.S3_READ_TIMEOUT,
+        config.S3_TCP_KEEPALIVE,
+        config.S3_RETRY_MODE,
+        config.S3_MAX_ATTEMPTS,
     )
-    return s3_client
 
 
-def is_url_accessible(url: str, retries: int = 2, delay: float = 1.5) -> bool:
+def create_controller(initial: int, upload: bool = False) -> AdaptiveController | None:
+    """config.yml の rate_control に従って、同時実行数と転送速度のコントローラーを生成する。
+
+    Args:
+        initial (int): 同時実行数の初期値（ adaptive でない場合は固定値 ）。
+        upload (bool, optional): True の場合、転送速度の上限（ max_mb_per_second ）も適用する。
+
+    Returns:
+        AdaptiveController | None: コントローラー。
+            adaptive でなく転送速度の上限もなく、逐次処理（ initial が 1 ）の場合は None。
+    """
+    bytes_per_second = config.RATE_CONTROL_MAX_BYTES_PER_SECOND if upload else 0
+    if not config.RATE_CONTROL_ADAPTIVE and not bytes_per_second and initial <= 1:
+        return None
+
+    if not config.RATE_CONTROL_ADAPTIVE:
+        return AdaptiveController(
+            initial, minimum=initial, bytes_per_second=bytes_per_second
+        )
+
+    return AdaptiveController(
+        initial,
+        minimum=config.RATE_CONTROL_MIN_WORKERS,
+        maximum=max(initial, config.RATE_CONTROL_MAX_WORKERS),
+        bytes_per_second=bytes_per_second,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_url_checker() -> UrlChecker:
+    """URL 疎通確認用の共有チェッカーを返す。
+
+    初回呼び出し時に生成し、以降は同じインスタンス（コネクションプール）を使い回す。
+
+    Returns:
+        UrlChecker: 共有の URL チェッカー。
+    """
+    return UrlChecker()
+
+
+@lru_cache(maxsize=None)
+def get_async_url_checker(concurrency: int, limit_per_host: int) -> AsyncUrlChecker:
+    """URL 一括疎通確認用の共有チェッカーを返す。
+
+    同時確認数・ホストごとの同時接続数の組み合わせごとに初回呼び出し時に生成し、以降は同じインスタンス
+    （セッションと保持している接続）をバッチ間で使い回す。生成したチェッカーはプロセス終了時に閉じる。
+
+    Args:
+        concurrency (int): 同時確認数。
+        limit_per_host (int): ホストごとの同時接続数。
+
+    Returns:
+        AsyncUrlChecker: 共有の非同期 URL チェッカー。
+    """
+    checker = AsyncUrlChecker(concurrency=concurrency, limit_per_host=limit_per_host)
+    atexit.register(checker.close)
+    return checker
+
+
+def is_url_accessible(url: str) -> bool:
     """指定した URL にアクセス可能かを確認する。
 
+    共有の UrlChecker を利用し、HEAD リクエストで確認する。
+
     Args:
         url (str): アクセス対象の URL。
-        retries (int, optional): 試行回数。デフォルトは 2 回。
-        delay (float, optional): リトライ間の待機時間（秒）。デフォルトは 1.5 秒。
 
     Returns:
         bool: アクセスに成功した場合は True、失敗した場合は False。
     """
-    for attempt in range(retries):
-        try:
-            with request.urlopen(url) as response:
-                if response.status == 200:
-                    return True
-        except Exception:
-            if attempt < retries - 1:
-                time.sleep(delay)
-    return False
+    return get_url_checker().is_accessible(url)
+
+
+def check_urls_accessible(
+    urls: list[str], concurrency: int = 1, limit_per_host: int = 20
+) -> list[bool]:
+    """複数の URL にアクセス可能かをまとめて確認する。
+
+    Args:
+        urls (list[str]): アクセス対象の URL のリスト。
+        concurrency (int, optional): 同時確認数。1 の場合は共有の UrlChecker で逐次確認する。
+            2 以上の場合は共有の AsyncUrlChecker で一括確認する。
+        limit_per_host (int, optional): 非同期確認時のホストごとの同時接続数。
+
+    Returns:
+        list[bool]: 各 URL の確認結果（urls と同じ順序）。
+    """
+    if concurrency <= 1:
+        return [is_url_accessible(url) for url in urls]
+
+    return get_async_url_checker(concurrency, limit_per_host).check(urls)
 
 
 def write_results_to_file(
-    success_list: list[dict], failure_list: list[dict], output_file: str
+    success_list: list[dict],
+    failure_list: list[dict],
+    output_file: str,
+    skipped_list: list[dict] | None = None,
 ) -> str:
     """成功・失敗した処理結果をファイルに出力する。
 
+    すべての結果がそろっている場合に使う。処理しながら書き出す場合は ResultSink を使う。
+
     Args:
         success_list (list[str]): 処理に成功した項目のリスト。
         failure_list (list[dict]): 処理に失敗した項目のリスト。
             各辞書には 'file_name', 'reason', 'path' のキーを含む。
         output_file (str): 出力先ファイルのパス。
+        skipped_list (list[dict] | None, optional): 処理をスキップした項目のリスト。
+            指定された場合のみ SKIPPED セクションを出力する。
 
     Returns:
         str: 出力したログファイルの絶対パス。
     """
-    with open(output_file, "w", encoding="utf-8") as f:
-        f.write("SUCCESS ++++++++++++++++++++++++\n")
+    with ResultSink(output_file, with_skipped=skipped_list is not None) as sink:
         for d in success_list:
-            line = "\t".join(str(v) for v in d.values())
-            f.write(f"{line}\n")
-
-        f.write("\nFAILURE ------------------------\n")
+            sink.success(d)
         for item in failure_list:
-            f.write(f"[{item['file_name']}] {item['reason']} : {item['path']}\n")
+            sink.failure(item)
+        for d in skipped_list or []:
+            sink.skipped(d)
+
+    return sink.close()
+
+
+def iter_lines(path: str) -> Iterator[str]:
+    """指定したファイルを1行ずつ読み込み、空行を除いた各行を順に返す。
+
+    ファイル全体をリストにせず、読み込んだ行から順に後続処理へ渡す。
+    MMAP_THRESHOLD 以上のファイルは mmap で読み込む。
+    ファイルの存在は呼び出し時点で確認するため、存在しない場合はその場で例外となる。
+    ファイルは読み込みを始める時点で開くため、読み込まずに破棄しても開いたままにはならない。
+
+    Args:
+        path (str): 入力ファイルのパス。
+
+    Returns:
+        Iterator[str]: 前後の空白を除いた各行のイテレーター。
+
+    Raises:
+        FileNotFoundError: 入力ファイルが存在しない場合。
+    """
+    os.stat(path)
+    return generate_lines(path)
 
-    return os.path.abspath(output_file)
 
+def generate_lines(path: str) -> Iterator[str]:
+    """ファイルを開いて空行を除いた各行を順に返し、最後にファイルを閉じる。
+
+    Args:
+        path (str): 入力ファイルのパス。
+
+    Yields:
+        str: 前後の空白を除いた各行。
+    """
+    with open(path, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                lines = iter(mapped.readline, b"")
+                yield from (
+                    line for raw in lines if (line := raw.decode("utf-8").strip())
+                )
+        else:
+            yield from (line for raw in file if (line := raw.decode("utf-8").strip()))
 
-def load_file(path: str) -> list[str]:
-    """指定したファイルを読み込み、空行を除いたリストを返す。
+
+def iter_unique_lines(
+    path: str, deduplicator: Deduplicator | None = None
+) -> Iterator[str]:
+    """指定したファイルを1行ずつ読み込み、空行と重複行を除いた各行を順に返す。
+
+    重複判定は一定件数まではメモリ上で、それ以降は固定サイズの Bloom フィルターと
+    一時ファイルのデータベースで行うため、入力が大きくなってもメモリ使用量は頭打ちになる。
 
     Args:
         path (str): 入力ファイルのパス。
+        deduplicator (Deduplicator | None, optional): 重複判定器。省略時は既定値で生成する。
 
     Returns:
-        list[str]: 空行を除いた各行（文字列）のリスト。
+        Iterator[str]: 空行と重複行を除いた各行のイテレーター。
+
+    Raises:
+        FileNotFoundError: 入力ファイルが存在しない場合。
+    """
+    deduplicator = deduplicator or Deduplicator()
+    lines = iter_lines(path)
+    return (line for line in lines if deduplicator.add(line))
+
+
+def iter_batches(items: Iterable, size: int) -> Iterator[list]:
+    """イテラブルを先頭から size 件ずつのリストに分割して順に返す。
+
+    Args:
+        items (Iterable): 分割対象。
+        size (int): 1バッチあたりの件数。
+
+    Yields:
+        list: 最大 size 件のリスト。
+    """
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def log_duplicates(deduplicator: Deduplicator, path: str) -> None:
+    """入力ファイルで除外した重複行の件数をログに出力する。
+
+    Args:
+        deduplicator (Deduplicator): 読み込みに使用した重複判定器。
+        path (str): 入力ファイルのパス。
     """
-    with open(path, "r", encoding="utf-8") as f:
-        return [line.strip() for line in f if line.strip()]
+    if deduplicator.duplicates:
+        logging.info(f"{path} : 重複する {deduplicator.duplicates} 行を除外しました")
 
 
 def notify_output(path: str) -> None:
@@ -0,0 +1,143 @@
+import argparse
+from pathlib import Path, PurePosixPath
+
+from custom_log import record_metrics, setup_logger, stage
+from journal import Journal
+from pipeline import Operation, Session, run_pipeline
+from result_sink import ResultSink
+from upload import create_access_url
+from utils import check_urls_accessible
+
+import config
+
+CONTEXT = {
+    "load_file_list": "ファイルリスト読込",
+    "process_verify": "URL検証処理",
+    "verify_url": "URL有効チェック",
+    "record_results": "結果・ジャーナル記録",
+}
+
+
+def verify_access_urls(
+    s3_keys: list[str], concurrency: int = 1, limit_per_host: int = 20
+) -> list[tuple[str, str, dict]]:
+    """
+    S3キーごとに公開アクセスURLを生成し、アクセスできるかをまとめて確認する。
+
+    Args:
+        s3_keys (list[str]): 検証対象のS3キー（1バッチ分）。
+        concurrency (int, optional): URL 検証の同時実行数。2 以上の場合は asyncio で一括検証する。
+        limit_per_host (int, optional): 一括検証時のホストごとの同時接続数。
+
+    Returns:
+        list[tuple[str, str, dict]]: 入力順の (S3キー, 結果の種類, 結果の情報)。
+            結果の種類は success / failure。
+    """
+    urls = [create_access_url(s3_key) for s3_key in s3_keys]
+    accessible = check_urls_accessible(
+        urls, concurrency=concurrency, limit_per_host=limit_per_host
+    )
+
+    results = []
+    for s3_key, url, ok in zip(s3_keys, urls, accessible):
+        result = {"file_name": PurePosixPath(s3_key).name, "path": url}
+        if ok:
+            results.append((s3_key, "success", result))
+        else:
+            results.append((s3_key, "failure", {**result, "reason": "URLが無効です"}))
+    return results
+
+
+def record_verify_batch(
+    results: list[tuple[str, str, dict]],
+    journal: Journal | None = None,
+    sink: ResultSink | None = None,
+) -> None:
+    """
+    1バッチ分の検証結果を結果ファイルへ書き出し、キーごとの状態をジャーナルに記録する。
+
+    Args:
+        results (list[tuple[str, str, dict]]): verify_access_urls() の結果。
+        journal (Journal | None, optional): 記録先のジャーナル。
+        sink (ResultSink | None, optional): 結果の出力先。失敗したキーは再実行用リストにも出力する。
+    """
+    for s3_key, status, result in results:
+        if sink is not None:
+            sink.write(status, result)
+            if status == "failure":
+                sink.add_retry(s3_key)
+        if journal is not None:
+            journal.record(s3_key, status, result if status == "success" else None)
+
+    if journal is not None:
+        journal.sync()
+
+
+class VerifyOperation(Operation):
+    """
+    アップロードリストのキーについて、公開URLにアクセスできるかをまとめて確認する。
+    """
+
+    name = "verify"
+    script = Path(__file__).name
+    context = {
+        "load_list": CONTEXT["load_file_list"],
+        "process": CONTEXT["process_verify"],
+    }
+
+    def __init__(self):
+        self.input_file = config.UPLOAD_FILE_LIST
+        self.result_file = config.VERIFY_RESULT
+        self.journal_file = config.VERIFY_JOURNAL
+        self.retry_file = config.VERIFY_RETRY_LIST
+        self.metrics_file = config.VERIFY_METRICS
+
+    def process_batch(
+        self, session: Session, batch: list[str], journal: Journal, sink: ResultSink
+    ) -> None:
+        """1バッチ分のキーの公開URLを確認し、結果を記録する。"""
+        with stage(CONTEXT["verify_url"]):
+            record_metrics(items=len(batch))
+            results = verify_access_urls(
+                batch,
+                concurrency=config.VERIFY_MAX_WORKERS,
+                limit_per_host=config.VERIFY_LIMIT_PER_HOST,
+            )
+        with stage(CONTEXT["record_results"]):
+            record_verify_batch(results, journal=journal, sink=sink)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """
+    コマンドライン引数を解析する。
+
+    Args:
+        argv (list[str] | None, optional): 引数のリスト。省略時は sys.argv を使う。
+
+    Returns:
+        argparse.Namespace: 解析結果（resume）。
+    """
+    parser = argparse.ArgumentParser(
+        description="アップロード済みファイルの公開URLを一括検証する"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="前回のジャーナルを読み込み、完了済みのキーをスキップして再開する",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None):
+    args = parse_args(argv)
+    setup_logger(
+        config.LOGGING_LEVEL,
+        config.LOGGING_FORMAT,
+        config.LOGGING_DEBUG_SUMMARY_INTERVAL,
+    )
+    run_pipeline(VerifyOperation(), resume=args.resume)
+
+
+# スクリプト実行
+if __name__ == "__main__":
+    main()
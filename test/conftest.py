@@ -0,0 +1,24 @@
+import sys
+from pathlib import Path
+
+import boto3
+import pytest
+from moto import mock_aws
+
+# 実行スクリプトと同じ import 解決（ from utils import ... ）ができるように
+# s3_operations ディレクトリを検索パスに追加する
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "s3_operations"))
+
+import config  # noqa: E402
+
+
+@pytest.fixture
+def s3_client():
+    """moto 上に config.yml のバケットを作成し、バージョニングを有効にしたS3クライアント"""
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=config.S3_BUCKET)
+        client.put_bucket_versioning(
+            Bucket=config.S3_BUCKET, VersioningConfiguration={"Status": "Enabled"}
+        )
+        yield client
@@ -1,6 +1,11 @@
+import os
 import pytest
+import subprocess
+import sys
+from pathlib import Path
 from unittest.mock import patch, mock_open
-from config import load_config  # config.pyのload_configをインポート
+import config
+from config import build_settings, load_config  # config.pyのload_configをインポート
 
 
 # ----------------------------------
@@ -67,3 +72,112 @@ def test_load_config_error():
         with pytest.raises(ValueError):
             load_config()
 
+
+# ----------------------------------
+# build_settings() / get_settings()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+minimal_config = {
+    "environment": "dev",
+    "environments": {
+        "dev": {
+            "aws": {
+                "access_key_id": "fake-access-key-id",
+                "secret_access_key": "fake-secret-access-key",
+                "region": "us-east-1",
+                "bucket_name": "test-bucket",
+            },
+            "cdn_origin": {"domain": "cdn.example.com"},
+        }
+    },
+    "data": {
+        "params": {
+            "delete_url_list": "data/params/delete_url_list.txt",
+            "upload_file_list": "data/params/upload_file_list.txt",
+        },
+        "logs": {
+            "delete_results": "data/logs/delete_results.txt",
+            "upload_results": "data/logs/upload_results.txt",
+        },
+        "resources": {"files": "data/resources"},
+    },
+}
+
+
+def test_build_settings_defaults():
+    """
+    省略可能な設定が既定値で補われることを確認
+    """
+    settings = build_settings(minimal_config)
+
+    assert settings["S3_BUCKET"] == "test-bucket"
+    assert settings["UPLOAD_JOURNAL"] == "data/logs/upload_results.journal.jsonl"
+    assert settings["UPLOAD_MAX_WORKERS"] == 1
+    assert settings["S3_MAX_ATTEMPTS"] is None
+    assert "config" not in settings
+
+
+def test_settings_loaded_once_on_first_access():
+    """
+    import 時ではなく最初の参照時に1回だけ設定ファイルを読み込むことを確認
+    """
+    config.get_settings.cache_clear()
+    try:
+        with patch("config.load_config", return_value=minimal_config) as mock_load:
+            mock_load.assert_not_called()
+            assert config.S3_BUCKET == "test-bucket"
+            assert config.CDN_DOMAIN == "cdn.example.com"
+
+        mock_load.assert_called_once()
+    finally:
+        config.get_settings.cache_clear()
+
+
+def test_import_does_not_read_config(tmp_path):
+    """
+    config.yml がなくても各スクリプトを import でき、yaml・boto3 を読み込まないことを確認
+    """
+    root = Path(__file__).resolve().parents[1]
+    modules = [
+        "config",
+        "utils",
+        "main",
+        "pipeline",
+        "upload",
+        "delete",
+        "verify",
+        "sync",
+        "move",
+        "restore",
+        "reconcile",
+        "backup",
+    ]
+    code = (
+        f"import sys\nimport {', '.join(modules)}\n"
+        "print(sorted({'yaml', 'boto3', 'botocore'} & set(sys.modules)))"
+    )
+
+    completed = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=tmp_path,
+        env=dict(
+            os.environ,
+            PYTHONPATH=os.pathsep.join([str(root), str(root / "s3_operations")]),
+        ),
+        capture_output=True,
+        text=True,
+    )
+
+    assert completed.returncode == 0, completed.stderr
+    assert completed.stdout.strip() == "[]"
+
+
+# ❌ Abnormal-Test >>>>>>>>>
+
+def test_unknown_setting():
+    """
+    存在しない設定名を参照した場合に AttributeError を発生させる
+    """
+    with pytest.raises(AttributeError):
+        config.UNKNOWN_SETTING
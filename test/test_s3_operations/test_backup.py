@@ -0,0 +1,173 @@
+import os
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from s3_operations.backup import Archive, backup_objects, byte_ranges
+from s3_operations.listing_index import ListingIndex
+
+from config import S3_BUCKET
+
+MB = 1024 * 1024
+
+
+@pytest.fixture
+def archive(tmp_path):
+    with Archive.create(str(tmp_path / "backup")) as archive:
+        yield archive
+
+
+def list_records(s3_client, keys):
+    index = ListingIndex.build(s3_client, S3_BUCKET, keys)
+    return [(key, index.get(key)) for key in keys]
+
+
+# ----------------------------------
+# byte_ranges()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+@pytest.mark.parametrize(
+    "size, expected",
+    [
+        (0, [(0, None)]),
+        (4, [(0, None)]),
+        (10, [(0, 3), (4, 7), (8, 9)]),
+    ],
+)
+def test_byte_ranges(size, expected):
+    """
+    パートサイズ以下は範囲指定なし、超える場合は重複・欠落のない範囲に分かれることを確認
+    """
+    assert byte_ranges(size, 4) == expected
+
+
+# ----------------------------------
+# Archive
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+def test_archive_create_makes_unique_directory(tmp_path):
+    """
+    同じ時刻に作成しても別のディレクトリになることを確認
+    """
+    with patch("s3_operations.backup.time.strftime", return_value="20250101-000000"):
+        first = Archive.create(str(tmp_path))
+        second = Archive.create(str(tmp_path))
+
+    assert first.root != second.root
+    assert second.root.endswith("20250101-000000-1")
+
+
+def test_archive_object_path_stays_inside(archive):
+    """
+    キーに ".." などが含まれても、アーカイブの外を指さないことを確認
+    """
+    assert archive.object_path("a/../b/./c.png").startswith(archive.root)
+    assert archive.object_path("/a/b.png").endswith("objects/a/b.png")
+
+
+# ----------------------------------
+# backup_objects()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_backup_objects_saves_latest_versions(s3_client, archive, max_workers):
+    """
+    範囲指定の GET に分けた場合も最新バージョンがそのまま保存され、索引に記録されることを確認
+    """
+    large = bytes(range(256)) * (3 * MB // 256) + b"tail"
+    s3_client.put_object(Bucket=S3_BUCKET, Key="dir/large.bin", Body=b"old")
+    s3_client.put_object(
+        Bucket=S3_BUCKET,
+        Key="dir/large.bin",
+        Body=large,
+        ContentType="video/mp4",
+        Metadata={"owner": "team"},
+    )
+    s3_client.put_object(Bucket=S3_BUCKET, Key="dir/empty.txt", Body=b"")
+
+    errors = backup_objects(
+        s3_client,
+        list_records(s3_client, ["dir/large.bin", "dir/empty.txt"]),
+        archive,
+        max_workers=max_workers,
+        part_size=MB,
+    )
+
+    assert errors == {}
+    with open(archive.object_path("dir/large.bin"), "rb") as f:
+        assert f.read() == large
+    with open(archive.object_path("dir/empty.txt"), "rb") as f:
+        assert f.read() == b""
+
+    archive.close()
+    entries = {entry["key"]: entry for entry in archive.iter_entries()}
+    head = s3_client.head_object(Bucket=S3_BUCKET, Key="dir/large.bin")
+    assert entries["dir/large.bin"]["version_id"] == head["VersionId"]
+    assert entries["dir/large.bin"]["headers"] == {
+        "ContentType": "video/mp4",
+        "Metadata": {"owner": "team"},
+    }
+
+
+def test_backup_objects_bounds_total_concurrency(s3_client, archive):
+    """
+    複数オブジェクトの全パートを合わせて、同時に実行する GET が上限を超えないことを確認
+    """
+    for i in range(3):
+        s3_client.put_object(Bucket=S3_BUCKET, Key=f"dir/{i}.bin", Body=b"x" * 40)
+
+    get_object = s3_client.get_object
+    lock = threading.Lock()
+    running = []
+    peak = []
+
+    def tracked_get_object(**kwargs):
+        with lock:
+            running.append(1)
+            peak.append(len(running))
+        time.sleep(0.01)
+        try:
+            return get_object(**kwargs)
+        finally:
+            with lock:
+                running.pop()
+
+    with patch.object(s3_client, "get_object", side_effect=tracked_get_object):
+        errors = backup_objects(
+            s3_client,
+            list_records(s3_client, [f"dir/{i}.bin" for i in range(3)]),
+            archive,
+            max_workers=2,
+            part_size=10,
+        )
+
+    assert errors == {}
+    assert len(peak) == 12
+    assert max(peak) <= 2
+
+
+# ❌ Abnormal-Test >>>>>>>>>
+
+
+def test_backup_objects_fails_when_object_changed(s3_client, archive):
+    """
+    一覧取得後に更新されたオブジェクトは失敗となり、書き込み途中のファイルが残らないことを確認
+    """
+    s3_client.put_object(Bucket=S3_BUCKET, Key="dir/a.txt", Body=b"before")
+    objects = list_records(s3_client, ["dir/a.txt"])
+    s3_client.put_object(Bucket=S3_BUCKET, Key="dir/a.txt", Body=b"after!")
+
+    errors = backup_objects(s3_client, objects, archive)
+
+    assert list(errors) == ["dir/a.txt"]
+    path = archive.object_path("dir/a.txt")
+    assert not os.path.exists(path)
+    assert not os.path.exists(path + ".partial")
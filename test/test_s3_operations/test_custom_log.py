@@ -0,0 +1,306 @@
+import json
+import logging
+import threading
+from logging.handlers import QueueHandler
+from unittest.mock import patch
+
+import pytest
+
+from s3_operations.custom_log import (
+    LOG_FORMAT,
+    METRICS,
+    ColorFormatter,
+    DebugSummaryFilter,
+    JsonFormatter,
+    MetricsRecorder,
+    StageMetrics,
+    end,
+    flush_logger,
+    record_metrics,
+    setup_logger,
+    stage,
+    start,
+    stop_logger,
+)
+
+
+@pytest.fixture
+def root_logger():
+    """
+    pytest のログ捕捉用ハンドラーがあっても setup_logger() が設定を行うようにし、
+    テスト後にルートロガーのログレベルを元に戻す
+    """
+    logger = logging.getLogger()
+    level = logger.level
+    with patch.object(logger, "hasHandlers", return_value=False):
+        yield logger
+    stop_logger()
+    logger.setLevel(level)
+
+
+def make_record(msg, level=logging.DEBUG, lineno=10, **extra):
+    record = logging.LogRecord("root", level, "/tmp/worker.py", lineno, msg, None, None)
+    record.__dict__.update(extra)
+    return record
+
+
+# ----------------------------------
+# MetricsRecorder.stage() / record()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+def test_stage_accumulates_and_nests():
+    """
+    同じ名前の段階は合算され、record() は実行中の最も内側の段階に加算されることを確認
+    """
+    recorder = MetricsRecorder()
+
+    for _ in range(2):
+        with recorder.stage("outer"):
+            recorder.record(items=10)
+            with recorder.stage("inner"):
+                recorder.record(nbytes=100, latency=0.5)
+
+    outer = recorder.stages["outer"]
+    inner = recorder.stages["inner"]
+    assert (outer.items, outer.bytes, outer.depth) == (20, 0, 0)
+    assert (inner.items, inner.bytes, inner.depth) == (2, 200, 1)
+    assert list(inner.latencies) == [0.5, 0.5]
+    assert outer.elapsed >= inner.elapsed > 0
+    assert recorder.active == []
+
+
+def test_bind_routes_records_per_thread():
+    """
+    bind() したスレッドの記録はその段階に加算され、所要時間は並行するワーカー全体の実時間になることを確認
+    """
+    recorder = MetricsRecorder()
+
+    def worker(name, depth):
+        with recorder.bind(recorder.get_stage(name)):
+            recorder.record(items=1, latency=0.1)
+            recorder.record_queue(depth)
+
+    with recorder.stage("process"):
+        threads = [
+            threading.Thread(target=worker, args=(name, depth))
+            for name, depth in [("upload", 3), ("upload", 1), ("verify", 0)]
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        recorder.record(items=5)
+
+    upload = recorder.stages["upload"]
+    assert (upload.items, upload.depth, upload.workers) == (2, 1, 0)
+    assert upload.queue_depth() == (2.0, 3)
+    assert upload.elapsed > 0
+    assert recorder.stages["verify"].items == 1
+    assert recorder.stages["process"].items == 5
+    assert recorder.summary()[0].endswith("queue avg/max")
+
+
+def test_record_without_stage():
+    """
+    計測中の段階がない場合は何も記録されないことを確認
+    """
+    recorder = MetricsRecorder()
+
+    recorder.record(items=5, latency=1.0)
+
+    assert recorder.stages == {}
+
+
+def test_percentiles():
+    """
+    レイテンシのパーセンタイルが最近傍順位法で求められることを確認
+    """
+    metrics = StageMetrics("upload")
+    metrics.latencies.extend(i / 1000 for i in range(100, 0, -1))
+
+    assert metrics.percentiles(50, 95, 99) == [0.05, 0.095, 0.099]
+    assert StageMetrics("empty").percentiles(50) == [None]
+
+
+# ❌ Abnormal-Test >>>>>>>>>
+
+
+def test_stage_marks_failure():
+    """
+    例外が発生した段階も所要時間が記録され、失敗として扱われることを確認
+    """
+    recorder = MetricsRecorder()
+
+    with pytest.raises(ValueError):
+        with recorder.stage("broken"):
+            raise ValueError("boom")
+
+    assert recorder.stages["broken"].failed
+    assert recorder.stages["broken"].elapsed > 0
+    assert "broken (失敗)" in recorder.summary()[1]
+
+
+# ----------------------------------
+# start() / end()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+def test_end_writes_summary_and_metrics_file(tmp_path, caplog):
+    """
+    end() で計測値の表が出力され、実行ごとに JSON Lines ファイルへ追記されることを確認
+    """
+    metrics_file = tmp_path / "logs" / "metrics.jsonl"
+
+    for run in range(2):
+        start(metrics_file=str(metrics_file))
+        with stage("s3オブジェクトアップロード"):
+            for _ in range(4):
+                record_metrics(nbytes=1024 * 1024, latency=0.01 * (run + 1))
+        with caplog.at_level(logging.INFO):
+            end()
+
+    assert "[処理時間]" in caplog.text
+    assert "s3オブジェクトアップロード" in caplog.text
+
+    records = [json.loads(line) for line in metrics_file.read_text().splitlines()]
+    assert len(records) == 2
+    stage_metrics = records[1]["stages"][0]
+    assert stage_metrics["stage"] == "s3オブジェクトアップロード"
+    assert stage_metrics["items"] == 4
+    assert stage_metrics["bytes"] == 4 * 1024 * 1024
+    assert stage_metrics["p99_ms"] == pytest.approx(20)
+
+    # 次の実行では計測値がリセットされる
+    start()
+    assert METRICS.stages == {}
+    assert METRICS.metrics_file is None
+
+
+# ----------------------------------
+# setup_logger() / stop_logger()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+def test_setup_logger_writes_from_background_thread(root_logger, capsys):
+    """
+    複数スレッドのログがキュー経由ですべて JSON 形式で書き出され、
+    設定したレベル未満のログは出力されないことを確認
+    """
+    setup_logger(level="INFO", style="json")
+
+    def work(number):
+        for i in range(50):
+            logging.info(f"worker {number} item {i}")
+            logging.debug("not shown")
+
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    flush_logger()
+
+    lines = capsys.readouterr().err.splitlines()
+    entries = [json.loads(line) for line in lines]
+    assert len(entries) == 200
+    assert {entry["level"] for entry in entries} == {"INFO"}
+    assert logging.getLogger("botocore").level == logging.INFO
+
+
+def test_stop_logger_allows_setup_again(root_logger, capsys):
+    """
+    stop_logger() で残りのログが書き出され、再度 setup_logger() できることを確認
+    """
+    setup_logger()
+    logging.info("first")
+    stop_logger()
+    assert not any(isinstance(h, QueueHandler) for h in root_logger.handlers)
+
+    setup_logger(style="json")
+    logging.info("second")
+    stop_logger()
+
+    output = capsys.readouterr().err
+    assert "first" in output
+    assert json.loads(output.splitlines()[-1])["message"] == "second"
+
+
+# ❌ Abnormal-Test >>>>>>>>>
+
+
+@pytest.mark.parametrize("kwargs", [{"level": "LOUD"}, {"style": "xml"}])
+def test_setup_logger_invalid_settings(root_logger, kwargs):
+    """
+    未対応のログレベル・出力形式の場合に ValueError を発生させる
+    """
+    with pytest.raises(ValueError):
+        setup_logger(**kwargs)
+
+
+# ----------------------------------
+# ColorFormatter / JsonFormatter
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+def test_color_formatter_highlight():
+    """
+    highlight 指定のログだけがレベルに関わらず青で出力されることを確認
+    """
+    formatter = ColorFormatter("%(message)s")
+    blue = LOG_FORMAT["color"]["blue"]
+
+    assert formatter.format(
+        make_record("START", logging.INFO, highlight=True)
+    ).startswith(blue)
+    assert formatter.format(make_record("done", logging.INFO)).startswith(
+        LOG_FORMAT["color"]["green"]
+    )
+
+
+def test_json_formatter():
+    """
+    1行の JSON に整形され、色指定が取り除かれることを確認
+    """
+    message = f"failed {LOG_FORMAT['color']['reset']}trace"
+    entry = json.loads(JsonFormatter().format(make_record(message, logging.ERROR)))
+
+    assert entry["level"] == "ERROR"
+    assert entry["message"] == "failed trace"
+    assert entry["thread"] == "MainThread"
+
+
+# ----------------------------------
+# DebugSummaryFilter
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+@patch("s3_operations.custom_log.time.monotonic")
+def test_debug_summary_filter(mock_monotonic):
+    """
+    区間ごとに先頭 burst 件だけを通し、省略件数が次の区間の最初のログと flush() で報告されることを確認
+    """
+    mock_monotonic.return_value = 100.0
+    log_filter = DebugSummaryFilter(interval=5.0, burst=3)
+
+    passed = [log_filter.filter(make_record(f"item {i}")) for i in range(10)]
+    assert passed == [True] * 3 + [False] * 7
+
+    # INFO 以上や別の出力箇所のログは間引かない
+    assert log_filter.filter(make_record("info", logging.INFO))
+    assert log_filter.filter(make_record("other", lineno=20))
+
+    mock_monotonic.return_value = 106.0
+    record = make_record("item 10")
+    assert log_filter.filter(record)
+    assert "7 件を省略" in record.getMessage()
+
+    for i in range(4):
+        log_filter.filter(make_record(f"item {11 + i}"))
+    assert log_filter.flush() == ["worker.py:10 : DEBUG ログ 2 件を省略しました"]
+    assert log_filter.flush() == []
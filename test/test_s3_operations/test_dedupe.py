@@ -0,0 +1,71 @@
+from s3_operations.dedupe import BloomFilter, Deduplicator, digest
+
+
+# ----------------------------------
+# Deduplicator.add()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+def test_add_exact():
+    """
+    上限件数までは正確に重複を判定することを確認
+    """
+    deduplicator = Deduplicator(max_exact=10)
+
+    assert [deduplicator.add(v) for v in ["a", "b", "a", "c", "b"]] == [
+        True,
+        True,
+        False,
+        True,
+        False,
+    ]
+    assert deduplicator.duplicates == 2
+    assert deduplicator.bloom is None
+
+
+def test_add_switches_to_bloom_filter():
+    """
+    上限件数を超えると Bloom フィルターに切り替わり、登録済みの行を引き続き重複と判定することを確認
+    """
+    deduplicator = Deduplicator(max_exact=100, capacity=10_000, error_rate=1e-6)
+    values = [f"https://example.com/{i}.png" for i in range(5000)]
+
+    assert all(deduplicator.add(v) for v in values)
+    assert deduplicator.exact is None
+    assert deduplicator.bloom is not None
+
+    # 切り替え前・後に登録した行のどちらも重複と判定される
+    assert not deduplicator.add(values[0])
+    assert not deduplicator.add(values[-1])
+    assert deduplicator.duplicates == 2
+
+
+def test_add_confirms_bloom_filter_hits():
+    """
+    Bloom フィルターの偽陽性で未登録の行を重複と判定しないことを確認
+    """
+    # 小さい Bloom フィルターはすぐに飽和し、ほとんどの判定が偽陽性になる
+    deduplicator = Deduplicator(max_exact=10, capacity=10, error_rate=0.5)
+    values = [f"https://example.com/{i}.png" for i in range(3000)]
+
+    assert all(deduplicator.add(v) for v in values)
+    assert deduplicator.duplicates == 0
+    assert not deduplicator.add(values[5])
+    assert not deduplicator.add(values[2999])
+    assert deduplicator.duplicates == 2
+    deduplicator.close()
+
+
+def test_bloom_filter_size_is_fixed():
+    """
+    Bloom フィルターのメモリ使用量が登録件数に依存しないことを確認
+    """
+    bloom = BloomFilter(capacity=100_000, error_rate=1e-6)
+    size = len(bloom.bits)
+
+    for i in range(20_000):
+        bloom.add(digest(str(i)))
+
+    assert len(bloom.bits) == size
+    assert not bloom.add(digest("0"))
@@ -0,0 +1,299 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from s3_operations.backup import Archive
+from s3_operations.delete import (
+    build_version_index,
+    delete_versions_in_batches,
+    process_deletions,
+)
+from s3_operations.rate_control import AdaptiveController
+
+from config import S3_BUCKET
+
+S3_ORIGIN = "https://bucket.s3.region.amazonaws.com"
+DELIMITER = "bucket.s3.region.amazonaws.com/"
+
+
+def to_url(key: str) -> str:
+    return f"https://dummy.cloudfront.net/{key}"
+
+
+@pytest.fixture(autouse=True)
+def url_accessible():
+    with patch("s3_operations.delete.is_url_accessible", return_value=True) as m:
+        yield m
+
+
+# ----------------------------------
+# process_deletions()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+def test_process_deletions_removes_all_versions(s3_client):
+    """
+    全バージョンと削除マーカーが DeleteObjects で削除されることを確認
+    """
+    for i in range(3):
+        s3_client.put_object(Bucket=S3_BUCKET, Key="test/a.png", Body=f"v{i}")
+    s3_client.put_object(Bucket=S3_BUCKET, Key="test/b.png", Body="v0")
+    s3_client.delete_object(Bucket=S3_BUCKET, Key="test/b.png")
+    s3_client.put_object(Bucket=S3_BUCKET, Key="test/b.png", Body="v1")
+
+    urls = [to_url("test/a.png"), to_url("test/b.png")]
+
+    with (
+        patch.object(
+            s3_client, "delete_object", side_effect=AssertionError("not batched")
+        ),
+        patch.object(
+            s3_client, "head_object", side_effect=AssertionError("not indexed")
+        ),
+        patch.object(
+            s3_client, "list_objects_v2", side_effect=AssertionError("listed twice")
+        ),
+        patch.object(
+            s3_client,
+            "list_object_versions",
+            wraps=s3_client.list_object_versions,
+        ) as list_object_versions,
+    ):
+        success_list, failure_list = process_deletions(
+            urls, S3_ORIGIN, DELIMITER, s3_client
+        )
+
+    assert failure_list == []
+    assert success_list == [
+        {"url": f"{S3_ORIGIN}/test/a.png"},
+        {"url": f"{S3_ORIGIN}/test/b.png"},
+    ]
+    assert list_object_versions.call_count == 1
+
+    response = s3_client.list_object_versions(Bucket=S3_BUCKET, Prefix="test/")
+    assert response.get("Versions", []) == []
+    assert response.get("DeleteMarkers", []) == []
+
+
+def test_delete_versions_in_batches_splits_requests():
+    """
+    バッチサイズごとに DeleteObjects が分割して呼ばれることを確認
+    """
+    s3_client = MagicMock()
+    s3_client.delete_objects.return_value = {}
+    objects = [{"Key": f"k{i}", "VersionId": "v"} for i in range(2500)]
+
+    errors = delete_versions_in_batches(s3_client, objects)
+
+    assert errors == {}
+    sizes = [
+        len(c.kwargs["Delete"]["Objects"])
+        for c in s3_client.delete_objects.call_args_list
+    ]
+    assert sizes == [1000, 1000, 500]
+
+
+def test_delete_versions_in_batches_with_controller():
+    """
+    コントローラー指定時に分割したリクエストを並行して送信し、
+    キー単位の SlowDown で同時実行数が減ることを確認
+    """
+    s3_client = MagicMock()
+    s3_client.delete_objects.side_effect = lambda **kwargs: (
+        {"Errors": [{"Key": "k0", "Code": "SlowDown", "Message": "Reduce rate"}]}
+        if kwargs["Delete"]["Objects"][0]["Key"] == "k0"
+        else {}
+    )
+    objects = [{"Key": f"k{i}", "VersionId": "v"} for i in range(3500)]
+    controller = AdaptiveController(4, maximum=4, cooldown=0)
+
+    errors = delete_versions_in_batches(s3_client, objects, controller)
+
+    assert errors == {"k0": "[SlowDown] Reduce rate"}
+    assert s3_client.delete_objects.call_count == 4
+    assert controller.throttles == 1
+    assert controller.limit < 4
+
+
+# ----------------------------------
+# build_version_index()
+# ----------------------------------
+
+
+def test_build_version_index_exact_match(s3_client):
+    """
+    前方一致する別キー（a.png.bak）やサブディレクトリのキーが除外されることを確認
+    """
+    for key in ["test/a.png", "test/a.png", "test/a.png.bak", "test/sub/a.png"]:
+        s3_client.put_object(Bucket=S3_BUCKET, Key=key, Body="x")
+
+    index = build_version_index(s3_client, ["test/a.png"])
+
+    assert list(index) == ["test/a.png"]
+    assert len(index["test/a.png"]) == 2
+
+
+def test_build_version_index_keeps_latest_record(s3_client):
+    """
+    最新バージョンのサイズ・ETag・VersionId を保持し、削除マーカーが最新のキーは含まないことを確認
+    """
+    s3_client.put_object(Bucket=S3_BUCKET, Key="test/a.png", Body="old")
+    response = s3_client.put_object(Bucket=S3_BUCKET, Key="test/a.png", Body="new!")
+    s3_client.put_object(Bucket=S3_BUCKET, Key="test/b.png", Body="b")
+    s3_client.delete_object(Bucket=S3_BUCKET, Key="test/b.png")
+
+    index = build_version_index(s3_client, ["test/a.png", "test/b.png"])
+
+    record = index.latest["test/a.png"]
+    assert (record.size, record.etag) == (4, response["ETag"].strip('"'))
+    assert record.version_id == response["VersionId"]
+    assert "test/b.png" not in index.latest
+    assert len(index["test/b.png"]) == 2
+
+
+def test_build_version_index_lists_each_prefix_once_with_pagination():
+    """
+    ディレクトリごとに1回だけ一覧取得し、全ページを読み込むことを確認
+    """
+    pages = {
+        "dir1/": [
+            {"Versions": [{"Key": "dir1/a.png", "VersionId": "1"}]},
+            {
+                "Versions": [{"Key": "dir1/a.png", "VersionId": "2"}],
+                "DeleteMarkers": [{"Key": "dir1/b.png", "VersionId": "3"}],
+            },
+        ],
+        "dir2/": [{"Versions": [{"Key": "dir2/c.png", "VersionId": "4"}]}],
+    }
+    s3_client = MagicMock()
+    paginator = s3_client.get_paginator.return_value
+    paginator.paginate.side_effect = lambda **kwargs: iter(pages[kwargs["Prefix"]])
+
+    index = build_version_index(s3_client, ["dir1/a.png", "dir1/b.png", "dir2/c.png"])
+
+    assert index == {"dir1/a.png": ["1", "2"], "dir1/b.png": ["3"], "dir2/c.png": ["4"]}
+    assert sorted(c.kwargs["Prefix"] for c in paginator.paginate.call_args_list) == [
+        "dir1/",
+        "dir2/",
+    ]
+
+
+def test_process_deletions_backs_up_before_deleting(s3_client, tmp_path):
+    """
+    アーカイブを指定した場合に、最新バージョンを保存してから削除されることを確認
+    """
+    s3_client.put_object(Bucket=S3_BUCKET, Key="test/a.png", Body="v0")
+    s3_client.put_object(
+        Bucket=S3_BUCKET, Key="test/a.png", Body="v1", ContentType="image/png"
+    )
+
+    with Archive.create(str(tmp_path)) as archive:
+        success_list, failure_list = process_deletions(
+            [to_url("test/a.png")], S3_ORIGIN, DELIMITER, s3_client, archive=archive
+        )
+
+    assert failure_list == []
+    assert success_list == [{"url": f"{S3_ORIGIN}/test/a.png"}]
+    with open(archive.object_path("test/a.png"), "rb") as f:
+        assert f.read() == b"v1"
+    [entry] = archive.iter_entries()
+    assert entry["key"] == "test/a.png"
+    assert entry["headers"]["ContentType"] == "image/png"
+
+    response = s3_client.list_object_versions(Bucket=S3_BUCKET, Prefix="test/")
+    assert response.get("Versions", []) == []
+
+
+# ❌ Abnormal-Test >>>>>>>>>
+
+
+def test_process_deletions_maps_per_key_errors(s3_client):
+    """
+    DeleteObjects のキー単位エラーが failure_list に反映されることを確認
+    """
+    s3_client.put_object(Bucket=S3_BUCKET, Key="test/a.png", Body="a")
+    s3_client.put_object(Bucket=S3_BUCKET, Key="test/b.png", Body="b")
+
+    response = {
+        "Errors": [
+            {
+                "Key": "test/b.png",
+                "VersionId": "x",
+                "Code": "AccessDenied",
+                "Message": "Access Denied",
+            }
+        ]
+    }
+    with patch.object(s3_client, "delete_objects", return_value=response):
+        success_list, failure_list = process_deletions(
+            [to_url("test/a.png"), to_url("test/b.png")],
+            S3_ORIGIN,
+            DELIMITER,
+            s3_client,
+        )
+
+    assert success_list == [{"url": f"{S3_ORIGIN}/test/a.png"}]
+    assert failure_list == [
+        {
+            "file_name": "test/b.png",
+            "path": f"{S3_ORIGIN}/test/b.png",
+            "reason": "[AccessDenied] Access Denied",
+        }
+    ]
+
+
+def test_process_deletions_missing_object(s3_client, url_accessible):
+    """
+    URL 無効・オブジェクト不在の場合に failure_list に記録されることを確認
+    """
+    url_accessible.side_effect = lambda url: not url.endswith("dead.png")
+
+    success_list, failure_list = process_deletions(
+        [to_url("test/dead.png"), to_url("test/missing.png")],
+        S3_ORIGIN,
+        DELIMITER,
+        s3_client,
+    )
+
+    assert success_list == []
+    assert [item["file_name"] for item in failure_list] == [
+        "test/dead.png",
+        "test/missing.png",
+    ]
+    assert failure_list[0]["reason"] == "URL not accessible"
+    assert failure_list[1]["reason"] == "オブジェクトが見つかりません"
+
+
+def test_process_deletions_keeps_objects_failed_to_back_up(s3_client, tmp_path):
+    """
+    保存に失敗したキーは削除されず、failure_list に理由が記録されることを確認
+    """
+    s3_client.put_object(Bucket=S3_BUCKET, Key="test/a.png", Body="a")
+    s3_client.put_object(Bucket=S3_BUCKET, Key="test/b.png", Body="b")
+
+    with (
+        Archive.create(str(tmp_path)) as archive,
+        patch(
+            "s3_operations.delete.backup_objects",
+            return_value={"test/b.png": "Access Denied"},
+        ),
+    ):
+        success_list, failure_list = process_deletions(
+            [to_url("test/a.png"), to_url("test/b.png")],
+            S3_ORIGIN,
+            DELIMITER,
+            s3_client,
+            archive=archive,
+        )
+
+    assert success_list == [{"url": f"{S3_ORIGIN}/test/a.png"}]
+    assert failure_list == [
+        {
+            "file_name": "test/b.png",
+            "path": f"{S3_ORIGIN}/test/b.png",
+            "reason": "バックアップ失敗: Access Denied",
+        }
+    ]
+    response = s3_client.list_object_versions(Bucket=S3_BUCKET, Prefix="test/")
+    assert [v["Key"] for v in response["Versions"]] == ["test/b.png"]
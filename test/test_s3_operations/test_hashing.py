@@ -0,0 +1,170 @@
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import patch
+
+import pytest
+from boto3.s3.transfer import TransferConfig
+
+from s3_operations.hashing import HashService, compute_etag, etag_part_size
+
+from config import S3_BUCKET
+
+MB = 1024 * 1024
+
+
+# ----------------------------------
+# compute_etag()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+def test_compute_etag_single_part(tmp_path):
+    """
+    閾値未満のファイルはファイル全体の MD5 になることを確認
+    """
+    path = tmp_path / "small.txt"
+    path.write_bytes(b"hello")
+
+    assert compute_etag(str(path)) == hashlib.md5(b"hello").hexdigest()
+
+
+def test_compute_etag_empty_file(tmp_path):
+    """
+    空のファイルは空データの MD5 になることを確認（ mmap できないケース ）
+    """
+    path = tmp_path / "empty.txt"
+    path.write_bytes(b"")
+
+    assert compute_etag(str(path)) == hashlib.md5(b"").hexdigest()
+
+
+@pytest.mark.parametrize(
+    "size, transfer_config",
+    [
+        # s3transfer の既定値（ 8MB ）でマルチパートになるケース
+        (17 * MB, TransferConfig()),
+        # 閾値・チャンクサイズを変更したケース
+        (
+            11 * MB + 1,
+            TransferConfig(multipart_threshold=5 * MB, multipart_chunksize=5 * MB),
+        ),
+        # 閾値未満のケース
+        (3 * MB, TransferConfig()),
+    ],
+)
+def test_compute_etag_matches_uploaded_object(
+    s3_client, tmp_path, size, transfer_config
+):
+    """
+    upload_file でアップロードした場合の ETag と一致することを確認
+    """
+    path = tmp_path / "file.bin"
+    path.write_bytes(bytes(range(256)) * (size // 256) + b"x" * (size % 256))
+
+    s3_client.upload_file(str(path), S3_BUCKET, "file.bin", Config=transfer_config)
+    etag = s3_client.head_object(Bucket=S3_BUCKET, Key="file.bin")["ETag"].strip('"')
+
+    assert compute_etag(str(path), transfer_config) == etag
+
+
+# ----------------------------------
+# etag_part_size()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+@pytest.mark.parametrize(
+    "size, expected",
+    [(8 * MB - 1, 0), (8 * MB, 8 * MB), (17 * MB, 8 * MB)],
+)
+def test_etag_part_size(size, expected):
+    """
+    閾値未満は 0（単一パート）、閾値以上はアップロード時のパートサイズになることを確認
+    """
+    assert etag_part_size(size, TransferConfig()) == expected
+
+
+# ----------------------------------
+# HashService
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+@pytest.fixture
+def files(tmp_path):
+    paths = []
+    for i in range(5):
+        path = tmp_path / f"file_{i}.bin"
+        path.write_bytes(f"content {i}".encode() * (i + 1))
+        paths.append(path)
+    return paths
+
+
+def describe(path, transfer_config=None):
+    stat = path.stat()
+    return (str(path), stat.st_size, stat.st_mtime_ns, transfer_config)
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_hash_service_matches_compute_etag(files, max_workers):
+    """
+    プロセスプールで計算した場合も compute_etag と同じ ETag が同じ順で返されることを確認
+    """
+    with HashService(max_workers) as hasher:
+        etags = hasher.compute_etags([describe(path) for path in files])
+
+    assert etags == [compute_etag(str(path)) for path in files]
+
+
+def test_hash_service_does_not_fork(files):
+    """
+    プロセスプールを fork 以外の方式で起動することを確認（スレッドのロックを引き継がない）
+    """
+    with (
+        patch(
+            "s3_operations.hashing.ProcessPoolExecutor", wraps=ProcessPoolExecutor
+        ) as pool,
+        HashService(2) as hasher,
+    ):
+        etags = hasher.compute_etags([describe(path) for path in files])
+
+    assert etags == [compute_etag(str(path)) for path in files]
+    assert pool.call_args.kwargs["mp_context"].get_start_method() != "fork"
+
+
+def test_hash_service_reuses_cache(files, tmp_path):
+    """
+    サイズ・更新日時が同じファイルはキャッシュから返し、更新したファイルだけ再計算することを確認
+    """
+    cache_path = str(tmp_path / "cache" / "hashes.sqlite3")
+    with HashService(cache_path=cache_path) as hasher:
+        expected = hasher.compute_etags([describe(path) for path in files])
+
+    files[0].write_bytes(b"updated")
+    with (
+        HashService(cache_path=cache_path) as hasher,
+        patch(
+            "s3_operations.hashing.file_etag", return_value="recomputed"
+        ) as file_etag,
+    ):
+        etags = hasher.compute_etags([describe(path) for path in files])
+
+    file_etag.assert_called_once_with(str(files[0]), 0)
+    assert etags == ["recomputed"] + expected[1:]
+
+
+def test_hash_service_without_mtime_skips_cache(files, tmp_path):
+    """
+    更新日時が不明なファイルはキャッシュを参照・記録せずに計算することを確認
+    """
+    cache_path = str(tmp_path / "hashes.sqlite3")
+    files_without_mtime = [
+        (str(path), path.stat().st_size, None, None) for path in files
+    ]
+
+    with HashService(cache_path=cache_path) as hasher:
+        hasher.compute_etags(files_without_mtime)
+        with patch("s3_operations.hashing.file_etag", return_value="etag") as file_etag:
+            hasher.compute_etags(files_without_mtime)
+
+    assert file_etag.call_count == len(files)
@@ -0,0 +1,100 @@
+from unittest.mock import patch
+
+from s3_operations.journal import Journal
+
+
+# ----------------------------------
+# Journal.record() / Journal.load()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+def test_resume_skips_done_items(tmp_path):
+    """
+    再開時に成功・スキップの項目だけが完了済みとなり、結果が引き継がれることを確認
+    """
+    path = str(tmp_path / "journal.jsonl")
+
+    with Journal(path) as journal:
+        journal.record("a", "success", {"file_name": "a", "path": "https://x/a"})
+        journal.record("b", "failure")
+        journal.record("c", "skipped", {"file_name": "c", "key": "c"})
+
+    resumed = Journal(path, resume=True)
+    resumed.close()
+
+    assert resumed.is_done("a")
+    assert not resumed.is_done("b")
+    assert resumed.is_done("c")
+    assert not resumed.is_done("d")
+    assert resumed.done_results("success") == [
+        {"file_name": "a", "path": "https://x/a"}
+    ]
+    assert resumed.done_results("skipped") == [{"file_name": "c", "key": "c"}]
+
+
+def test_latest_record_wins(tmp_path):
+    """
+    同じ項目が複数回記録された場合は最新のレコードを使うことを確認
+    """
+    path = str(tmp_path / "journal.jsonl")
+
+    with Journal(path) as journal:
+        journal.record("a", "failure")
+
+    with Journal(path, resume=True) as journal:
+        journal.record("a", "success", {"url": "https://x/a"})
+
+    assert Journal.load(path)["a"]["status"] == "success"
+
+
+def test_without_resume_starts_fresh(tmp_path):
+    """
+    再開指定なしの場合は既存のジャーナルを破棄することを確認
+    """
+    path = str(tmp_path / "journal.jsonl")
+
+    with Journal(path) as journal:
+        journal.record("a", "success", {"url": "https://x/a"})
+
+    with Journal(path) as journal:
+        assert not journal.is_done("a")
+
+    assert Journal.load(path) == {}
+
+
+def test_sync_is_batched(tmp_path):
+    """
+    fsync が sync_every 件ごとにまとめて実行されることを確認
+    """
+    path = str(tmp_path / "journal.jsonl")
+
+    with patch("s3_operations.journal.os.fsync") as mock_fsync:
+        with Journal(path, sync_every=10, sync_interval=3600) as journal:
+            for i in range(25):
+                journal.record(str(i), "success", {"url": str(i)})
+            assert mock_fsync.call_count == 2
+
+        # 終了時に残りのレコードを書き出す
+        assert mock_fsync.call_count == 3
+
+    assert len(Journal.load(path)) == 25
+
+
+# ❌ Error-Test >>>>>>>>>
+
+
+def test_load_ignores_torn_line(tmp_path):
+    """
+    異常終了で書き込み途中になった最終行を無視して読み込めることを確認
+    """
+    path = tmp_path / "journal.jsonl"
+
+    with Journal(str(path)) as journal:
+        journal.record("a", "success", {"url": "https://x/a"})
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"item": "b", "stat')
+
+    records = Journal.load(str(path))
+
+    assert list(records) == ["a"]
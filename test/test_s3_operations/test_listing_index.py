@@ -0,0 +1,71 @@
+from s3_operations.listing_index import ListingIndex, ObjectRecord, iter_objects
+
+from config import S3_BUCKET
+
+
+# ----------------------------------
+# ListingIndex.build()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+def test_build_indexes_listed_directories(s3_client):
+    """
+    入力キーのディレクトリ直下のオブジェクトが、サイズと ETag 付きで取得されることを確認
+    """
+    s3_client.put_object(Bucket=S3_BUCKET, Key="dir1/a.png", Body=b"aaa")
+    s3_client.put_object(Bucket=S3_BUCKET, Key="dir1/b.png", Body=b"bb")
+    s3_client.put_object(Bucket=S3_BUCKET, Key="dir1/sub/c.png", Body=b"c")
+    s3_client.put_object(Bucket=S3_BUCKET, Key="dir2/d.png", Body=b"d")
+    etag = s3_client.head_object(Bucket=S3_BUCKET, Key="dir1/a.png")["ETag"].strip('"')
+
+    index = ListingIndex.build(s3_client, S3_BUCKET, ["dir1/a.png", "dir1/missing.png"])
+
+    assert sorted(index.records) == ["dir1/a.png", "dir1/b.png"]
+    assert index.prefixes == {"dir1/"}
+    assert "dir1/missing.png" not in index
+
+    record = index.get("dir1/a.png")
+    assert isinstance(record, ObjectRecord)
+    assert (record.size, record.etag) == (3, etag)
+    assert not hasattr(record, "__dict__")
+
+
+def test_build_follows_pagination(s3_client):
+    """
+    1000件を超えるディレクトリも全件取得されることを確認
+    """
+    for i in range(1005):
+        s3_client.put_object(Bucket=S3_BUCKET, Key=f"many/{i}.txt", Body=b"")
+
+    index = ListingIndex.build(s3_client, S3_BUCKET, ["many/0.txt"])
+
+    assert len(index) == 1005
+
+
+# ----------------------------------
+# iter_objects()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+def test_iter_objects_lists_prefix_recursively(s3_client):
+    """
+    プレフィックス配下（サブディレクトリを含む）のオブジェクトがキーの昇順に返り、
+    フォルダのオブジェクトは除外されることを確認
+    """
+    keys = ["dir/b.png", "dir/a.png", "dir/sub/", "dir/sub/x.png", "dir/a0.png"]
+    for key in keys:
+        s3_client.put_object(Bucket=S3_BUCKET, Key=key, Body=b"x")
+    s3_client.put_object(Bucket=S3_BUCKET, Key="other/a.png", Body=b"x")
+
+    objects = list(iter_objects(s3_client, S3_BUCKET, "dir/"))
+
+    assert [key for key, _ in objects] == [
+        "dir/a.png",
+        "dir/a0.png",
+        "dir/b.png",
+        "dir/sub/x.png",
+    ]
+    assert isinstance(objects[0][1], ObjectRecord)
+    assert objects[0][1].size == 1
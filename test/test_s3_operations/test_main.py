@@ -0,0 +1,93 @@
+import pytest
+
+from s3_operations.main import create_operation, parse_args
+
+# ----------------------------------
+# parse_args() / create_operation()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+@pytest.mark.parametrize(
+    "argv, command, resume",
+    [
+        (["upload"], "upload", False),
+        (["delete", "--resume"], "delete", True),
+        (["verify"], "verify", False),
+        (["sync", "--resume"], "sync", True),
+        (["move", "--resume"], "move", True),
+    ],
+)
+def test_parse_args(argv, command, resume):
+    """
+    サブコマンドと --resume が解析されることを確認
+    """
+    args = parse_args(argv)
+
+    assert args.command == command
+    assert args.resume is resume
+
+
+@pytest.mark.parametrize(
+    "command", ["upload", "delete", "verify", "sync", "copy", "move"]
+)
+def test_create_operation(command):
+    """
+    サブコマンドに対応する処理が生成されることを確認
+    """
+    operation = create_operation(command)
+
+    assert operation.name == command
+    assert "load_list" in operation.context
+    assert "process" in operation.context
+
+
+def test_parse_args_reconcile():
+    """
+    reconcile は --prefix を受け付けることを確認
+    """
+    args = parse_args(["reconcile", "--prefix", "site/"])
+
+    assert args.command == "reconcile"
+    assert args.prefix == "site/"
+
+
+def test_create_operation_sync_uses_diff():
+    """
+    sync はリソースディレクトリと S3 の差分を処理対象にすることを確認
+    """
+    operation = create_operation("sync")
+
+    assert type(operation).__name__ == "SyncOperation"
+
+
+def test_create_operation_restore_reads_archive(tmp_path):
+    """
+    restore は --archive のアーカイブの索引を入力とし、結果をアーカイブ内に出力することを確認
+    """
+    args = parse_args(["restore", "--archive", str(tmp_path), "--resume"])
+    operation = create_operation(args.command, args.archive)
+
+    assert args.resume is True
+    assert operation.name == "restore"
+    assert operation.input_file == str(tmp_path / "index.jsonl")
+    assert operation.result_file.startswith(str(tmp_path))
+
+
+# ❌ Abnormal-Test >>>>>>>>>
+
+
+def test_parse_args_requires_command():
+    """
+    サブコマンドが指定されない場合に終了することを確認
+    """
+    with pytest.raises(SystemExit):
+        parse_args([])
+
+
+def test_parse_args_restore_requires_archive():
+    """
+    restore で --archive が指定されない場合に終了することを確認
+    """
+    with pytest.raises(SystemExit):
+        parse_args(["restore"])
@@ -0,0 +1,189 @@
+import pytest
+
+from s3_operations.manifest import (
+    Manifest,
+    ManifestRecord,
+    iter_latest_versions,
+    prefix_range,
+)
+
+from config import S3_BUCKET
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    with Manifest(str(tmp_path / "manifest" / "manifest.sqlite3")) as manifest:
+        yield manifest
+
+
+def put_objects(s3_client, objects: dict[str, bytes]) -> None:
+    for key, body in objects.items():
+        s3_client.put_object(Bucket=S3_BUCKET, Key=key, Body=body)
+
+
+# ----------------------------------
+# prefix_range()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+@pytest.mark.parametrize(
+    "prefix, expected",
+    [("", None), ("site/", ("site/", "site0")), ("a", ("a", "b"))],
+)
+def test_prefix_range(prefix, expected):
+    """
+    前方一致するキーの範囲（下限・上限）が返されることを確認
+    """
+    assert prefix_range(prefix) == expected
+
+
+# ----------------------------------
+# iter_latest_versions()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+def test_iter_latest_versions_skips_old_versions_and_delete_markers(s3_client):
+    """
+    最新バージョンだけがキーの昇順で返され、削除済み・フォルダのキーは除外されることを確認
+    """
+    put_objects(
+        s3_client,
+        {"site/b.png": b"old", "site/a.png": b"a", "site/c.png": b"c", "site/": b""},
+    )
+    put_objects(s3_client, {"site/b.png": b"latest"})
+    s3_client.delete_object(Bucket=S3_BUCKET, Key="site/c.png")
+
+    listing = list(iter_latest_versions(s3_client, S3_BUCKET, "site/"))
+
+    assert [key for key, _ in listing] == ["site/a.png", "site/b.png"]
+    head = s3_client.head_object(Bucket=S3_BUCKET, Key="site/b.png")
+    record = listing[1][1]
+    assert record.size == len(b"latest")
+    assert record.etag == head["ETag"].strip('"')
+    assert record.version_id == head["VersionId"]
+
+
+# ----------------------------------
+# Manifest
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+def test_record_uploads_stores_response_etag_and_version(s3_client, manifest):
+    """
+    アップロードのレスポンスの ETag・VersionId がファイル情報とともに記録されることを確認
+    """
+    manifest.attach(s3_client)
+    put_objects(s3_client, {"site/a.png": b"abc"})
+
+    manifest.record_uploads(
+        [{"key": "site/a.png", "size": 3, "mtime_ns": 123, "content_hash": None}]
+    )
+
+    head = s3_client.head_object(Bucket=S3_BUCKET, Key="site/a.png")
+    record = manifest.get("site/a.png")
+    assert record.size == 3
+    assert record.mtime_ns == 123
+    assert record.etag == head["ETag"].strip('"')
+    assert record.version_id == head["VersionId"]
+    assert record.uploaded_at > 0
+    assert manifest.responses == {}
+
+
+def test_detach_stops_recording_responses(s3_client, manifest):
+    """
+    登録を解除した後のアップロードのレスポンスは保持されないことを確認
+    """
+    manifest.attach(s3_client)
+    manifest.detach(s3_client)
+    put_objects(s3_client, {"site/a.png": b"abc"})
+
+    assert manifest.responses == {}
+
+
+def test_record_uploads_overwrites_existing_record(manifest):
+    """
+    同じキーを再度記録した場合は上書きされることを確認
+    """
+    manifest.record_uploads([{"key": "a.png", "size": 1, "mtime_ns": 1}])
+    manifest.record_uploads([{"key": "a.png", "size": 2, "mtime_ns": 2}])
+
+    assert len(manifest) == 1
+    assert manifest.get("a.png").size == 2
+
+
+def test_iter_objects_returns_prefix_in_key_order(manifest):
+    """
+    プレフィックス配下の記録だけがキーの昇順で返されることを確認
+    """
+    manifest.record_uploads(
+        {"key": key, "size": 1}
+        for key in ["site/b.png", "site0.png", "site/a.png", "other/c.png"]
+    )
+
+    assert [key for key, _ in manifest.iter_objects("site/")] == [
+        "site/a.png",
+        "site/b.png",
+    ]
+    assert [key for key, _ in manifest.iter_objects()] == [
+        "other/c.png",
+        "site/a.png",
+        "site/b.png",
+        "site0.png",
+    ]
+
+
+def test_remove_deletes_records(manifest):
+    """
+    削除したキーの記録が削除されることを確認
+    """
+    manifest.record_uploads({"key": key, "size": 1} for key in ["a.png", "b.png"])
+
+    manifest.remove(["a.png", "missing.png"])
+
+    assert manifest.get("a.png") is None
+    assert manifest.get("b.png") is not None
+
+
+def test_reconcile_matches_listing(s3_client, manifest):
+    """
+    S3 の一覧に合わせて、記録の追加・更新・削除が行われることを確認
+    """
+    manifest.attach(s3_client)
+    put_objects(s3_client, {"site/same.png": b"same", "site/changed.png": b"old"})
+    manifest.record_uploads(
+        [
+            {"key": "site/same.png", "size": 4, "mtime_ns": 10},
+            {"key": "site/changed.png", "size": 3, "mtime_ns": 20},
+            {"key": "site/removed.png", "size": 1},
+            {"key": "other/kept.png", "size": 1},
+        ]
+    )
+    put_objects(s3_client, {"site/changed.png": b"new!", "site/added.png": b"added"})
+
+    counts = manifest.reconcile(
+        iter_latest_versions(s3_client, S3_BUCKET, "site/"), "site/"
+    )
+
+    assert counts == {"added": 1, "updated": 1, "removed": 1, "unchanged": 1}
+    assert [key for key, _ in manifest.iter_objects()] == [
+        "other/kept.png",
+        "site/added.png",
+        "site/changed.png",
+        "site/same.png",
+    ]
+    assert manifest.get("site/changed.png").size == 4
+    # 内容が同じ記録はアップロード時の更新日時を残す
+    assert manifest.get("site/same.png").mtime_ns == 10
+
+
+def test_record_rows_accepts_manifest_records(manifest):
+    """
+    照合用のキーと記録の組がそのまま書き込まれることを確認
+    """
+    manifest.record_rows([("a.png", ManifestRecord(5, etag="e", version_id="v"))])
+
+    record = manifest.get("a.png")
+    assert (record.size, record.etag, record.version_id) == (5, "e", "v")
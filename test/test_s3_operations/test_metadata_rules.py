@@ -0,0 +1,127 @@
+import time
+from unittest.mock import patch
+
+import pytest
+
+from s3_operations.metadata_rules import MetadataResolver
+
+RULES = [
+    {"patterns": ["*.png", "*.jpg"], "cache_control": "public, max-age=31536000"},
+    {
+        "patterns": ["*/downloads/*"],
+        "cache_control": "no-cache",
+        "content_disposition": "attachment",
+        "metadata": {"category": "download"},
+    },
+    {"patterns": ["*.pdf"], "metadata": {"owner": "web"}},
+    {"patterns": ["*.dat"], "content_type": "application/x-custom"},
+]
+
+
+# ----------------------------------
+# MetadataResolver.resolve()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+@pytest.mark.parametrize(
+    "s3_key, expected",
+    [
+        # ルールなし（従来どおり ACL と推測した ContentType のみ）
+        (
+            "test/file.txt",
+            {"ACL": "public-read", "ContentType": "text/plain"},
+        ),
+        # 拡張子ルール
+        (
+            "test/image.png",
+            {
+                "ACL": "public-read",
+                "ContentType": "image/png",
+                "CacheControl": "public, max-age=31536000",
+            },
+        ),
+        # 後のルールで上書きされ、metadata は結合される
+        (
+            "test/downloads/doc.pdf",
+            {
+                "ACL": "public-read",
+                "ContentType": "application/pdf",
+                "CacheControl": "no-cache",
+                "ContentDisposition": "attachment",
+                "Metadata": {"category": "download", "owner": "web"},
+            },
+        ),
+        # ContentType の指定と、拡張子不明時の既定値
+        (
+            "test/raw.dat",
+            {"ACL": "public-read", "ContentType": "application/x-custom"},
+        ),
+        (
+            "test/noext",
+            {"ACL": "public-read", "ContentType": "application/octet-stream"},
+        ),
+    ],
+)
+def test_resolve(s3_key, expected):
+    """
+    ルールが順に適用されて追加パラメータが決まることを確認
+    """
+    assert MetadataResolver(RULES).resolve(s3_key) == expected
+
+
+def test_resolve_returns_independent_copies():
+    """
+    キャッシュした結果を呼び出し側が変更しても影響しないことを確認
+    """
+    resolver = MetadataResolver(RULES)
+
+    first = resolver.resolve("a/downloads/x.pdf")
+    first["Metadata"]["owner"] = "changed"
+    first["ACL"] = "private"
+
+    second = resolver.resolve("b/downloads/y.pdf")
+    assert second["Metadata"]["owner"] == "web"
+    assert second["ACL"] == "public-read"
+
+
+def test_resolve_many_keys_fast():
+    """
+    10万キーの解決で追加パラメータの生成がキャッシュされ、短時間で終わることを確認
+    """
+    resolver = MetadataResolver(RULES)
+    keys = [
+        f"dir{i % 100}/file_{i}.{('png', 'pdf', 'txt')[i % 3]}" for i in range(100_000)
+    ]
+
+    started = time.perf_counter()
+    with patch.object(
+        resolver, "build_extra_args", wraps=resolver.build_extra_args
+    ) as build_extra_args:
+        results = [resolver.resolve(key) for key in keys]
+    elapsed = time.perf_counter() - started
+
+    assert len(results) == len(keys)
+    assert len(resolver.result_cache) == 3
+    assert build_extra_args.call_count == 3
+    assert elapsed < 5.0
+
+
+# ❌ Abnormal-Test >>>>>>>>>
+
+
+@pytest.mark.parametrize(
+    "rules",
+    [
+        [{"cache_control": "no-cache"}],
+        [{"patterns": "*.png"}],
+        [{"patterns": ["*.png"], "acl": "private"}],
+        [{"patterns": ["*.png"], "metadata": ["a"]}],
+    ],
+)
+def test_invalid_rules(rules):
+    """
+    ルールの形式が正しくない場合に ValueError となることを確認
+    """
+    with pytest.raises(ValueError):
+        MetadataResolver(rules)
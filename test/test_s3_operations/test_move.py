@@ -0,0 +1,426 @@
+from unittest.mock import patch
+
+import pytest
+
+from s3_operations.journal import Journal
+from s3_operations.manifest import Manifest
+from s3_operations.move import (
+    MoveOperation,
+    copy_part_ranges,
+    parse_move_line,
+    process_moves,
+    record_move_batch,
+)
+from s3_operations.result_sink import ResultSink
+
+from config import S3_BUCKET
+
+S3_ORIGIN = "https://bucket.s3.region.amazonaws.com"
+DELIMITER = "bucket.s3.region.amazonaws.com/"
+MB = 1024 * 1024
+
+
+def to_line(source_key: str, dest_key: str) -> str:
+    return f"https://dummy.cloudfront.net/{source_key}\t{dest_key}"
+
+
+def is_public(s3_client, s3_key: str) -> bool:
+    grants = s3_client.get_object_acl(Bucket=S3_BUCKET, Key=s3_key)["Grants"]
+    return any(
+        grant["Grantee"].get("URI", "").endswith("/AllUsers")
+        and grant["Permission"] == "READ"
+        for grant in grants
+    )
+
+
+def list_keys(s3_client) -> list[str]:
+    response = s3_client.list_object_versions(Bucket=S3_BUCKET)
+    return sorted(
+        version["Key"]
+        for attr in ["Versions", "DeleteMarkers"]
+        for version in response.get(attr, [])
+    )
+
+
+# ----------------------------------
+# parse_move_line() / copy_part_ranges()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+def test_parse_move_line():
+    """
+    最初の空白で URL と移動先のキー（空白を含んでもよい）に分けられることを確認
+    """
+    assert parse_move_line("https://host.net/a.png  /new dir/a b.png") == (
+        "https://host.net/a.png",
+        "new dir/a b.png",
+    )
+
+
+@pytest.mark.parametrize(
+    "size, part_size, expected",
+    [
+        (10, 4, ["bytes=0-3", "bytes=4-7", "bytes=8-9"]),
+        (8, 4, ["bytes=0-3", "bytes=4-7"]),
+        # パート数が上限（ 10000 ）を超える場合はパートを大きくする
+        (20000, 1, ["bytes=0-1", "bytes=2-3"]),
+    ],
+)
+def test_copy_part_ranges(size, part_size, expected):
+    """
+    コピー元の範囲が重複・欠落なくパートに分けられることを確認
+    """
+    ranges = copy_part_ranges(size, part_size)
+
+    assert ranges[: len(expected)] == expected
+    assert len(ranges) <= 10000
+    assert ranges[-1].endswith(f"-{size - 1}")
+
+
+# ❌ Abnormal-Test >>>>>>>>>
+
+
+def test_parse_move_line_without_dest():
+    """
+    移動先のキーがない行は ValueError になることを確認
+    """
+    with pytest.raises(ValueError):
+        parse_move_line("https://host.net/a.png")
+
+
+# ----------------------------------
+# process_moves()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_process_moves_copy_keeps_source(s3_client, max_workers):
+    """
+    コピー先にメタデータごと複製され、コピー元は残ることを確認
+    """
+    s3_client.put_object(
+        Bucket=S3_BUCKET, Key="old/a.png", Body=b"a", ContentType="image/png"
+    )
+    s3_client.put_object(Bucket=S3_BUCKET, Key="old/b.png", Body=b"b")
+    lines = [to_line("old/a.png", "new/a.png"), to_line("old/b.png", "new/b.png")]
+
+    with patch.object(
+        s3_client, "get_object", side_effect=AssertionError("not server side")
+    ):
+        results = process_moves(
+            lines, S3_ORIGIN, DELIMITER, s3_client, max_workers=max_workers
+        )
+
+    assert [(line, status) for line, status, _ in results] == [
+        (lines[0], "success"),
+        (lines[1], "success"),
+    ]
+    assert results[0][2]["key"] == "new/a.png"
+    head = s3_client.head_object(Bucket=S3_BUCKET, Key="new/a.png")
+    assert head["ContentType"] == "image/png"
+    assert is_public(s3_client, "new/a.png")
+    assert list_keys(s3_client) == ["new/a.png", "new/b.png", "old/a.png", "old/b.png"]
+
+
+def test_process_moves_deletes_all_source_versions(s3_client, tmp_path):
+    """
+    移動の場合はコピー元の全バージョンが削除され、マニフェストの記録も移ることを確認
+    """
+    for body in [b"v1", b"v2"]:
+        s3_client.put_object(Bucket=S3_BUCKET, Key="old/a.png", Body=body)
+
+    with Manifest(str(tmp_path / "manifest.sqlite3")) as manifest:
+        manifest.record_uploads([{"key": "old/a.png", "size": 2, "mtime_ns": 5}])
+        results = process_moves(
+            [to_line("old/a.png", "new/a.png")],
+            S3_ORIGIN,
+            DELIMITER,
+            s3_client,
+            delete_source=True,
+            manifest=manifest,
+        )
+
+        assert results[0][1] == "success"
+        assert manifest.get("old/a.png") is None
+        record = manifest.get("new/a.png")
+        assert (record.size, record.mtime_ns) == (2, 5)
+
+    assert list_keys(s3_client) == ["new/a.png"]
+    body = s3_client.get_object(Bucket=S3_BUCKET, Key="new/a.png")["Body"].read()
+    assert body == b"v2"
+
+
+def test_process_moves_multipart_copy(s3_client):
+    """
+    閾値を超えるオブジェクトは UploadPartCopy で分割してコピーされることを確認
+    """
+    body = bytes(range(256)) * (11 * MB // 256)
+    s3_client.put_object(
+        Bucket=S3_BUCKET, Key="old/large.bin", Body=body, ContentType="video/mp4"
+    )
+
+    with (
+        patch("s3_operations.move.MULTIPART_COPY_THRESHOLD", 5 * MB),
+        patch("s3_operations.move.COPY_PART_SIZE", 5 * MB),
+        patch.object(
+            s3_client, "copy_object", side_effect=AssertionError("not multipart")
+        ),
+    ):
+        results = process_moves(
+            [to_line("old/large.bin", "new/large.bin")],
+            S3_ORIGIN,
+            DELIMITER,
+            s3_client,
+        )
+
+    assert results[0][1] == "success"
+    response = s3_client.get_object(Bucket=S3_BUCKET, Key="new/large.bin")
+    assert response["ContentType"] == "video/mp4"
+    assert response["ETag"].strip('"').endswith("-3")
+    assert response["Body"].read() == body
+    assert is_public(s3_client, "new/large.bin")
+
+
+# ❌ Abnormal-Test >>>>>>>>>
+
+
+def test_process_moves_failures(s3_client):
+    """
+    コピー元がない行・同じキーへの移動・形式の誤った行は失敗となり、削除されないことを確認
+    """
+    s3_client.put_object(Bucket=S3_BUCKET, Key="old/a.png", Body=b"a")
+    lines = [
+        to_line("old/missing.png", "new/missing.png"),
+        to_line("old/a.png", "old/a.png"),
+        "https://dummy.cloudfront.net/old/a.png",
+    ]
+
+    results = process_moves(lines, S3_ORIGIN, DELIMITER, s3_client, delete_source=True)
+
+    assert [status for _, status, _ in results] == ["failure"] * 3
+    assert [result["reason"] for _, _, result in results] == [
+        "オブジェクトが見つかりません",
+        "移動元と移動先が同じです",
+        "移動先のS3キーがありません",
+    ]
+    assert list_keys(s3_client) == ["old/a.png"]
+
+
+def test_process_moves_keeps_source_when_copy_fails(s3_client):
+    """
+    コピーに失敗したオブジェクトは移動元が削除されないことを確認
+    """
+    s3_client.put_object(Bucket=S3_BUCKET, Key="old/a.png", Body=b"a")
+
+    with patch.object(s3_client, "copy_object", side_effect=Exception("denied")):
+        results = process_moves(
+            [to_line("old/a.png", "new/a.png")],
+            S3_ORIGIN,
+            DELIMITER,
+            s3_client,
+            delete_source=True,
+        )
+
+    assert results[0][1] == "failure"
+    assert results[0][2]["reason"] == "S3コピー失敗: denied"
+    assert list_keys(s3_client) == ["old/a.png"]
+
+
+@pytest.mark.parametrize(
+    "pairs, expected",
+    [
+        # 連鎖: d/b.png は d/a.png の移動先であり、次の行の移動元でもある
+        (
+            [("d/a.png", "d/b.png"), ("d/b.png", "d/c.png")],
+            ["failure", "success"],
+        ),
+        # 入れ替え
+        ([("d/a.png", "d/b.png"), ("d/b.png", "d/a.png")], ["failure", "failure"]),
+    ],
+)
+def test_process_moves_rejects_chains_and_swaps(s3_client, pairs, expected):
+    """
+    移動先が他の行の移動元になっている行は失敗となり、他の行の移動で内容が失われないことを確認
+    """
+    s3_client.put_object(Bucket=S3_BUCKET, Key="d/a.png", Body=b"a")
+    s3_client.put_object(Bucket=S3_BUCKET, Key="d/b.png", Body=b"b")
+    lines = [to_line(source, dest) for source, dest in pairs]
+
+    results = process_moves(lines, S3_ORIGIN, DELIMITER, s3_client, delete_source=True)
+
+    assert [status for _, status, _ in results] == expected
+    assert results[0][2]["reason"] == "移動先が対応表の他の行の移動元です"
+    objects = {
+        key: s3_client.get_object(Bucket=S3_BUCKET, Key=key)["Body"].read()
+        for key in list_keys(s3_client)
+    }
+    if expected[1] == "success":
+        assert objects == {"d/a.png": b"a", "d/c.png": b"b"}
+    else:
+        assert objects == {"d/a.png": b"a", "d/b.png": b"b"}
+
+
+def test_process_moves_rejects_sources_in_other_batches(s3_client):
+    """
+    移動先が対応表の他のバッチの行の移動元になっている場合も失敗となることを確認
+    """
+    s3_client.put_object(Bucket=S3_BUCKET, Key="d/a.png", Body=b"a")
+
+    results = process_moves(
+        [to_line("d/a.png", "d/b.png")],
+        S3_ORIGIN,
+        DELIMITER,
+        s3_client,
+        delete_source=True,
+        mapping_sources={"d/a.png", "d/b.png"},
+    )
+
+    assert results[0][1] == "failure"
+    assert list_keys(s3_client) == ["d/a.png"]
+
+
+@pytest.mark.parametrize(
+    "delete_source, expected",
+    [(True, ["failure", "failure"]), (False, ["success", "success"])],
+)
+def test_process_moves_rejects_shared_sources(s3_client, delete_source, expected):
+    """
+    移動の場合、同じ移動元から複数の移動先への行は失敗となり、移動元が残ることを確認
+    （コピーのみの場合は成功する）
+    """
+    s3_client.put_object(Bucket=S3_BUCKET, Key="d/a.png", Body=b"a")
+    lines = [to_line("d/a.png", "d/b.png"), to_line("d/a.png", "d/c.png")]
+
+    results = process_moves(
+        lines, S3_ORIGIN, DELIMITER, s3_client, delete_source=delete_source
+    )
+
+    assert [status for _, status, _ in results] == expected
+    if delete_source:
+        assert {info["reason"] for _, _, info in results} == {
+            "移動元が対応表の複数の行で使われています"
+        }
+        assert list_keys(s3_client) == ["d/a.png"]
+    else:
+        assert list_keys(s3_client) == ["d/a.png", "d/b.png", "d/c.png"]
+
+
+def test_process_moves_rejects_shared_sources_in_other_batches(s3_client):
+    """
+    移動元が対応表の他のバッチの行でも使われている場合は失敗となることを確認
+    """
+    s3_client.put_object(Bucket=S3_BUCKET, Key="d/a.png", Body=b"a")
+
+    results = process_moves(
+        [to_line("d/a.png", "d/b.png")],
+        S3_ORIGIN,
+        DELIMITER,
+        s3_client,
+        delete_source=True,
+        mapping_sources={"d/a.png"},
+        shared_mapping_sources={"d/a.png"},
+    )
+
+    assert results[0][1] == "failure"
+    assert list_keys(s3_client) == ["d/a.png"]
+
+
+def test_move_operation_collects_mapping_sources(tmp_path):
+    """
+    準備で対応表全体の移動元のキーが集められ、形式の誤った行は無視されることを確認
+    """
+    move_list = tmp_path / "move_list.txt"
+    move_list.write_text(
+        f"{to_line('d/a.png', 'd/b.png')}\n"
+        "https://dummy.cloudfront.net/d/x.png\n"
+        f"{to_line('d/b.png', 'd/c.png')}\n"
+    )
+    operation = MoveOperation()
+    operation.input_file = str(move_list)
+
+    operation.setup(None)
+
+    assert operation.mapping_sources == {"d/a.png", "d/b.png"}
+    assert operation.shared_mapping_sources == set()
+
+
+@pytest.mark.parametrize(
+    "delete_source, expected", [(True, {"d/a.png"}), (False, set())]
+)
+def test_move_operation_collects_shared_sources(tmp_path, delete_source, expected):
+    """
+    移動の場合、準備で複数の移動先に対応している移動元が集められることを確認
+    """
+    move_list = tmp_path / "move_list.txt"
+    move_list.write_text(
+        f"{to_line('d/a.png', 'd/b.png')}\n"
+        f"{to_line('d/x.png', 'd/y.png')}\n"
+        f"{to_line('d/a.png', 'd/c.png')}\n"
+    )
+    operation = MoveOperation(delete_source=delete_source)
+    operation.input_file = str(move_list)
+
+    operation.setup(None)
+
+    assert operation.shared_mapping_sources == expected
+
+
+def test_process_moves_keeps_versions_written_after_listing(s3_client):
+    """
+    一覧取得の後に移動元へ書き込まれたバージョンは削除されないことを確認
+    """
+    s3_client.put_object(Bucket=S3_BUCKET, Key="d/a.png", Body=b"a")
+    copy_object = s3_client.copy_object
+
+    def copy_then_overwrite(**kwargs):
+        response = copy_object(**kwargs)
+        s3_client.put_object(Bucket=S3_BUCKET, Key="d/a.png", Body=b"new")
+        return response
+
+    with patch.object(s3_client, "copy_object", side_effect=copy_then_overwrite):
+        results = process_moves(
+            [to_line("d/a.png", "d/b.png")],
+            S3_ORIGIN,
+            DELIMITER,
+            s3_client,
+            delete_source=True,
+        )
+
+    assert results[0][1] == "success"
+    assert (
+        s3_client.get_object(Bucket=S3_BUCKET, Key="d/a.png")["Body"].read() == b"new"
+    )
+    assert s3_client.get_object(Bucket=S3_BUCKET, Key="d/b.png")["Body"].read() == b"a"
+
+
+# ----------------------------------
+# record_move_batch()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+def test_record_move_batch(tmp_path):
+    """
+    行ごとの結果がジャーナル・結果ファイルに記録され、失敗した行が再実行用リストに出力されることを確認
+    """
+    results = [
+        ("a\tnew/a", "success", {"file_name": "a", "key": "new/a", "path": "url"}),
+        ("b\tnew/b", "failure", {"file_name": "b", "path": "b", "reason": "x"}),
+    ]
+    retry_file = tmp_path / "retry.txt"
+
+    with (
+        Journal(str(tmp_path / "journal.jsonl")) as journal,
+        ResultSink(str(tmp_path / "results.txt"), retry_file=str(retry_file)) as sink,
+    ):
+        record_move_batch(results, journal=journal, sink=sink)
+
+    records = Journal.load(journal.path)
+    assert {line: record["status"] for line, record in records.items()} == {
+        "a\tnew/a": "success",
+        "b\tnew/b": "failure",
+    }
+    assert sink.counts == {"success": 1, "failure": 1, "skipped": 0, "retry": 1}
+    assert retry_file.read_text() == "b\tnew/b\n"
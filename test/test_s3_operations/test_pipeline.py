@@ -0,0 +1,187 @@
+from unittest.mock import MagicMock, patch
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from s3_operations import pipeline
+from s3_operations.manifest import Manifest
+from s3_operations.pipeline import Operation, Session, run_pipeline
+from s3_operations.rate_control import AdaptiveController
+
+from config import S3_BUCKET
+
+
+class RecordOperation(Operation):
+    """
+    "ng" を含む項目を失敗、それ以外を成功として記録するテスト用の処理
+    """
+
+    name = "record"
+    script = "test"
+    context = {"load_list": "リスト読込", "setup": "準備", "process": "処理"}
+
+    def __init__(self, tmp_path):
+        self.input_file = str(tmp_path / "input.txt")
+        self.result_file = str(tmp_path / "results.txt")
+        self.journal_file = str(tmp_path / "journal.jsonl")
+        self.retry_file = str(tmp_path / "retry.txt")
+        self.metrics_file = str(tmp_path / "metrics.jsonl")
+        self.setup_called = False
+        self.finished = False
+        self.processed = []
+
+    def setup(self, session):
+        self.setup_called = True
+
+    def finish(self):
+        self.finished = True
+
+    def process_batch(self, session, batch, journal, sink):
+        self.processed.extend(batch)
+        for item in batch:
+            if "ng" in item:
+                journal.record(item, "failure")
+                sink.failure({"file_name": item, "reason": "ng", "path": "-"})
+                sink.add_retry(item)
+            else:
+                journal.record(item, "success", {"file_name": item})
+                sink.success({"file_name": item})
+
+
+@pytest.fixture
+def session(s3_client):
+    return Session(s3_client)
+
+
+@pytest.fixture
+def operation(tmp_path):
+    operation = RecordOperation(tmp_path)
+    (tmp_path / "input.txt").write_text("a\nng_b\nc\na\n")
+    return operation
+
+
+# ----------------------------------
+# Session.close()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+def test_session_close_detaches_manifest(s3_client, tmp_path):
+    """
+    閉じたセッションのマニフェストが、同じクライアントのレスポンスを受け取らないことを確認
+    """
+    manifest = Manifest(str(tmp_path / "manifest.sqlite3"))
+    manifest.attach(s3_client)
+
+    Session(s3_client, manifest=manifest).close()
+    s3_client.put_object(Bucket=S3_BUCKET, Key="a.png", Body=b"a")
+
+    assert manifest.responses == {}
+
+
+def test_session_close_detaches_controller(s3_client):
+    """
+    閉じたセッションのコントローラーが、同じクライアントのスロットリングを受け取らないことを確認
+    """
+    controller = AdaptiveController(8, maximum=8, cooldown=0)
+    controller.attach(s3_client)
+
+    Session(s3_client, controller=controller).close()
+    s3_client.meta.events.emit(
+        "needs-retry.s3.PutObject",
+        response=(MagicMock(status_code=503), {"Error": {"Code": "SlowDown"}}),
+        endpoint=None,
+        operation=None,
+        attempts=1,
+        caught_exception=None,
+        request_dict={"context": {}},
+    )
+
+    assert controller.throttles == 0
+
+
+# ----------------------------------
+# run_pipeline()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+def test_run_pipeline(session, operation, tmp_path):
+    """
+    重複を除いた項目が処理され、結果ファイル・再実行用リストが出力されることを確認
+    """
+    path = run_pipeline(operation, session=session)
+
+    assert operation.setup_called
+    assert operation.finished
+    assert operation.processed == ["a", "ng_b", "c"]
+    assert path == str(tmp_path / "results.txt")
+    assert (tmp_path / "results.txt").read_text().splitlines() == [
+        "SUCCESS ++++++++++++++++++++++++",
+        "a",
+        "c",
+        "",
+        "FAILURE ------------------------",
+        "[ng_b] ng : -",
+    ]
+    assert (tmp_path / "retry.txt").read_text() == "ng_b\n"
+    assert (tmp_path / "metrics.jsonl").exists()
+
+
+def test_run_pipeline_resume(session, operation, tmp_path):
+    """
+    再開時は完了済みの項目をスキップし、前回の結果も結果ファイルに含めることを確認
+    """
+    run_pipeline(operation, session=session)
+
+    resumed = RecordOperation(tmp_path)
+    run_pipeline(resumed, resume=True, session=session)
+
+    assert resumed.processed == ["ng_b"]
+    assert (tmp_path / "results.txt").read_text().splitlines()[1:3] == ["a", "c"]
+
+
+# ❌ Abnormal-Test >>>>>>>>>
+
+
+def test_run_pipeline_preflight_failure(operation):
+    """
+    バケットへの疎通確認に失敗した場合、処理を行わずに None を返すことを確認
+    """
+    with mock_aws():
+        session = Session(boto3.client("s3", region_name="us-east-1"))
+        assert run_pipeline(operation, session=session) is None
+
+    assert operation.processed == []
+    assert not operation.setup_called
+
+
+def test_run_pipeline_missing_input(session, operation, tmp_path):
+    """
+    入力ファイルが存在しない場合、処理を行わずに None を返すことを確認
+    """
+    (tmp_path / "input.txt").unlink()
+
+    assert run_pipeline(operation, session=session) is None
+    assert operation.processed == []
+
+
+@pytest.mark.parametrize("failing", ["setup", "process_batch"])
+def test_run_pipeline_cleans_up_on_failure(session, operation, failing):
+    """
+    準備・バッチ処理で失敗した場合も、ジャーナルを閉じて後処理（ finish ）を行うことを確認
+    """
+    with (
+        patch.object(operation, failing, side_effect=RuntimeError("boom")),
+        patch.object(
+            pipeline.Journal,
+            "close",
+            autospec=True,
+            side_effect=pipeline.Journal.close,
+        ) as close,
+    ):
+        assert run_pipeline(operation, session=session) is None
+
+    assert operation.finished
+    assert close.called
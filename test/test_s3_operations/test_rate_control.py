@@ -0,0 +1,203 @@
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import boto3
+
+from s3_operations.rate_control import AdaptiveController
+
+
+# ----------------------------------
+# AdaptiveController.record_success() / record_throttle()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+def test_additive_increase_while_latency_is_stable():
+    """
+    レイテンシが安定している間は、枠1周分の成功ごとに同時実行数が増えることを確認
+    """
+    controller = AdaptiveController(4, maximum=8, cooldown=0)
+
+    # おおよそ枠1周分（ 4〜5 件 ）の成功で +1 される
+    for _ in range(5):
+        controller.record_success(0.1)
+
+    assert int(controller.limit) == 5
+
+    for _ in range(100):
+        controller.record_success(0.1)
+
+    assert controller.limit == 8
+
+
+def test_hold_when_latency_grows():
+    """
+    レイテンシが平均より大きく伸びた場合は同時実行数を増やさないことを確認
+    """
+    controller = AdaptiveController(4, maximum=8, cooldown=0, latency_tolerance=2.0)
+    controller.record_success(0.1)
+    limit = controller.limit
+
+    controller.record_success(1.0)
+
+    assert controller.limit == limit
+
+
+def test_multiplicative_decrease_on_throttle():
+    """
+    スロットリングで同時実行数が半減し、cooldown 中の連続したスロットリングでは減らないことを確認
+    """
+    controller = AdaptiveController(16, minimum=2, maximum=32, cooldown=60)
+
+    controller.record_throttle()
+    controller.record_throttle()
+
+    assert controller.limit == 8
+    assert controller.throttles == 2
+
+    # cooldown 中は増加もしない
+    controller.record_success(0.1)
+    assert controller.limit == 8
+
+
+def test_decrease_stops_at_minimum():
+    """
+    同時実行数が下限より小さくならないことを確認
+    """
+    controller = AdaptiveController(4, minimum=3, maximum=8, cooldown=0)
+
+    for _ in range(5):
+        controller.record_throttle()
+
+    assert controller.limit == 3
+
+
+def test_fixed_limit_without_maximum():
+    """
+    上限を省略した場合は初期値から増えないことを確認
+    """
+    controller = AdaptiveController(4, cooldown=0)
+
+    for _ in range(100):
+        controller.record_success(0.1)
+
+    assert controller.limit == 4
+
+
+# ----------------------------------
+# AdaptiveController.slot()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+def test_slot_limits_active_requests():
+    """
+    同時に処理される件数が同時実行数を超えないことを確認
+    """
+    controller = AdaptiveController(3)
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+
+    def work():
+        nonlocal active, peak
+        with controller.slot():
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.01)
+            with lock:
+                active -= 1
+
+    threads = [threading.Thread(target=work) for _ in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak == 3
+    assert controller.active == 0
+
+
+# ----------------------------------
+# AdaptiveController.consume()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+@patch("s3_operations.rate_control.time.sleep")
+def test_consume_waits_over_ceiling(mock_sleep):
+    """
+    転送速度の上限を超えた分だけ待機することを確認
+    """
+    controller = AdaptiveController(1, bytes_per_second=1000)
+
+    # 1秒分まではまとめて送れる
+    controller.consume(1000)
+    mock_sleep.assert_not_called()
+
+    controller.consume(500)
+    assert 0.4 < mock_sleep.call_args.args[0] <= 0.5
+
+
+@patch("s3_operations.rate_control.time.sleep")
+def test_consume_without_ceiling(mock_sleep):
+    """
+    転送速度の上限がない場合は待機しないことを確認
+    """
+    controller = AdaptiveController(1)
+
+    controller.consume(10**9)
+
+    mock_sleep.assert_not_called()
+
+
+# ----------------------------------
+# AdaptiveController.attach()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+def emit_retry(s3_client, status_code, code):
+    http_response = MagicMock(status_code=status_code)
+    s3_client.meta.events.emit(
+        "needs-retry.s3.PutObject",
+        response=(http_response, {"Error": {"Code": code}}),
+        endpoint=None,
+        operation=None,
+        attempts=1,
+        caught_exception=None,
+        request_dict={"context": {}},
+    )
+
+
+def test_attach_detects_throttling_responses():
+    """
+    クライアントの needs-retry イベントで 503 SlowDown を検知することを確認
+    """
+    controller = AdaptiveController(8, maximum=8, cooldown=0)
+    s3_client = boto3.client("s3", region_name="us-east-1")
+    controller.attach(s3_client)
+
+    emit_retry(s3_client, 404, "NoSuchKey")
+    assert controller.throttles == 0
+
+    emit_retry(s3_client, 503, "SlowDown")
+    assert controller.throttles == 1
+    assert controller.limit == 4
+
+
+def test_detach_stops_detecting_throttling():
+    """
+    登録を解除した後のスロットリングは検知しないことを確認
+    """
+    controller = AdaptiveController(8, maximum=8, cooldown=0)
+    s3_client = boto3.client("s3", region_name="us-east-1")
+    controller.attach(s3_client)
+    controller.detach(s3_client)
+
+    emit_retry(s3_client, 503, "SlowDown")
+
+    assert controller.throttles == 0
+    assert controller.limit == 8
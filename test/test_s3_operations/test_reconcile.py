@@ -0,0 +1,52 @@
+from unittest.mock import patch
+
+
+from s3_operations.manifest import Manifest
+from s3_operations.pipeline import Session
+from s3_operations.reconcile import run_reconcile
+
+from config import S3_BUCKET
+
+
+# ----------------------------------
+# run_reconcile()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+def test_run_reconcile_updates_manifest(s3_client, tmp_path):
+    """
+    S3 の一覧に合わせてマニフェストが更新され、件数が返されることを確認
+    """
+    path = str(tmp_path / "manifest.sqlite3")
+    s3_client.put_object(Bucket=S3_BUCKET, Key="site/a.png", Body=b"a")
+    s3_client.put_object(Bucket=S3_BUCKET, Key="other/b.png", Body=b"b")
+
+    with (
+        patch("config.MANIFEST_PATH", path),
+        patch(
+            "s3_operations.reconcile.Session.create",
+            return_value=Session(s3_client, manifest=Manifest(path)),
+        ),
+    ):
+        counts = run_reconcile("site/")
+
+    assert counts["added"] == 1
+    with Manifest(path) as manifest:
+        assert [key for key, _ in manifest.iter_objects()] == ["site/a.png"]
+
+
+# ❌ Abnormal-Test >>>>>>>>>
+
+
+def test_run_reconcile_requires_manifest_path():
+    """
+    manifest.path が設定されていない場合は照合せずに None を返すことを確認
+    """
+    with (
+        patch("config.MANIFEST_PATH", ""),
+        patch("s3_operations.reconcile.Session.create") as create,
+    ):
+        assert run_reconcile() is None
+
+    create.assert_not_called()
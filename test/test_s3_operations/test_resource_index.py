@@ -0,0 +1,105 @@
+import pytest
+
+from s3_operations.resource_index import ResourceIndex, iter_sorted_files
+
+
+@pytest.fixture
+def resource_dir(tmp_path):
+    for relative_path in ["a.png", "dir1/b.png", "dir1/sub/c.png", "dir2/c.png"]:
+        path = tmp_path / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x" * len(relative_path))
+    return tmp_path
+
+
+# ----------------------------------
+# ResourceIndex
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+def test_build_scans_recursively(resource_dir):
+    """
+    サブディレクトリを含めて走査し、サイズと更新日時を保持することを確認
+    """
+    index = ResourceIndex.build(str(resource_dir))
+
+    assert sorted(index.by_path) == [
+        "a.png",
+        "dir1/b.png",
+        "dir1/sub/c.png",
+        "dir2/c.png",
+    ]
+    resource_file = index.by_path["dir1/sub/c.png"]
+    assert resource_file.path == str(resource_dir / "dir1" / "sub" / "c.png")
+    assert resource_file.size == len("dir1/sub/c.png")
+    assert (
+        resource_file.mtime_ns
+        == (resource_dir / "dir1" / "sub" / "c.png").stat().st_mtime_ns
+    )
+
+
+def test_find(resource_dir):
+    """
+    ファイル名・階層それぞれの探し方で解決できることを確認
+    """
+    index = ResourceIndex.build(str(resource_dir))
+
+    assert index.find("any/dir/b.png").path == str(resource_dir / "dir1" / "b.png")
+    assert index.find("dir1/b.png", mirror=True).path == str(
+        resource_dir / "dir1" / "b.png"
+    )
+    assert index.find("any/dir/b.png", mirror=True) is None
+
+    # 同名ファイルが複数ある場合はファイル名では決まらない
+    assert index.count_by_name("c.png") == 2
+    assert index.find("x/c.png") is None
+
+
+# ❌ Abnormal-Test >>>>>>>>>
+
+
+def test_build_missing_directory(tmp_path):
+    """
+    リソースディレクトリが存在しない場合に FileNotFoundError となることを確認
+    """
+    with pytest.raises(FileNotFoundError):
+        ResourceIndex.build(str(tmp_path / "missing"))
+
+
+# ----------------------------------
+# iter_sorted_files()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+def test_iter_sorted_files_in_s3_key_order(tmp_path):
+    """
+    S3 の一覧と同じ順（ディレクトリは末尾 "/" として比較）でファイルが返ることを確認
+    """
+    for relative_path in [
+        "a0.txt",
+        "a/b.txt",
+        "a.txt",
+        "b/z.txt",
+        "b/a/c.txt",
+        "あ.txt",
+    ]:
+        path = tmp_path / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(relative_path)
+
+    files = list(iter_sorted_files(str(tmp_path)))
+
+    relative_paths = [relative_path for relative_path, _ in files]
+    assert relative_paths == [
+        "a.txt",
+        "a/b.txt",
+        "a0.txt",
+        "b/a/c.txt",
+        "b/z.txt",
+        "あ.txt",
+    ]
+    assert relative_paths == sorted(relative_paths, key=lambda p: p.encode("utf-8"))
+    assert files[1][1].path == str(tmp_path / "a" / "b.txt")
+    assert files[1][1].size == len("a/b.txt")
@@ -0,0 +1,96 @@
+import os
+
+import pytest
+
+from s3_operations.backup import Archive, backup_objects
+from s3_operations.journal import Journal
+from s3_operations.listing_index import ListingIndex
+from s3_operations.pipeline import Session
+from s3_operations.restore import RestoreOperation
+from s3_operations.result_sink import ResultSink
+from s3_operations.utils import iter_lines
+
+from config import S3_BUCKET
+
+
+@pytest.fixture
+def archive_dir(s3_client, tmp_path):
+    """2件のオブジェクトを保存したアーカイブ"""
+    s3_client.put_object(
+        Bucket=S3_BUCKET,
+        Key="dir/a.png",
+        Body=b"a",
+        ContentType="image/png",
+        CacheControl="max-age=60",
+    )
+    s3_client.put_object(Bucket=S3_BUCKET, Key="dir/b.txt", Body=b"b")
+    keys = ["dir/a.png", "dir/b.txt"]
+    index = ListingIndex.build(s3_client, S3_BUCKET, keys)
+
+    with Archive.create(str(tmp_path / "backup")) as archive:
+        assert (
+            backup_objects(s3_client, [(key, index.get(key)) for key in keys], archive)
+            == {}
+        )
+    for key in keys:
+        s3_client.delete_object(Bucket=S3_BUCKET, Key=key)
+    return archive.root
+
+
+def run_restore(s3_client, operation, tmp_path):
+    retry_file = tmp_path / "retry.txt"
+    with (
+        Journal(operation.journal_file) as journal,
+        ResultSink(operation.result_file, retry_file=str(retry_file)) as sink,
+    ):
+        operation.process_batch(
+            Session(s3_client), list(iter_lines(operation.input_file)), journal, sink
+        )
+    return Journal.load(operation.journal_file), sink, retry_file
+
+
+# ----------------------------------
+# RestoreOperation
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+def test_restore_uploads_archived_objects(s3_client, archive_dir, tmp_path):
+    """
+    保存したオブジェクトが同じキーへ、Content-Type などを引き継いで再アップロードされることを確認
+    """
+    operation = RestoreOperation(archive_dir)
+
+    records, sink, _ = run_restore(s3_client, operation, tmp_path)
+
+    assert {key: record["status"] for key, record in records.items()} == {
+        "dir/a.png": "success",
+        "dir/b.txt": "success",
+    }
+    response = s3_client.get_object(Bucket=S3_BUCKET, Key="dir/a.png")
+    assert response["Body"].read() == b"a"
+    assert response["ContentType"] == "image/png"
+    assert response["CacheControl"] == "max-age=60"
+    grants = s3_client.get_object_acl(Bucket=S3_BUCKET, Key="dir/a.png")["Grants"]
+    assert {
+        "Type": "Group",
+        "URI": "http://acs.amazonaws.com/groups/global/AllUsers",
+    } in [grant["Grantee"] for grant in grants if grant["Permission"] == "READ"]
+    assert operation.item_key(next(iter_lines(operation.input_file))) == "dir/a.png"
+
+
+# ❌ Abnormal-Test >>>>>>>>>
+
+
+def test_restore_reports_missing_files(s3_client, archive_dir, tmp_path):
+    """
+    アーカイブのファイルがない行は失敗となり、再実行用リストに索引の行が出力されることを確認
+    """
+    operation = RestoreOperation(archive_dir)
+    os.remove(operation.archive.object_path("dir/b.txt"))
+
+    records, sink, retry_file = run_restore(s3_client, operation, tmp_path)
+
+    assert records["dir/b.txt"]["status"] == "failure"
+    assert sink.counts["failure"] == 1
+    assert '"key": "dir/b.txt"' in retry_file.read_text()
@@ -0,0 +1,129 @@
+import csv
+import json
+import threading
+
+import pytest
+
+from s3_operations.result_sink import ResultSink, result_path
+from s3_operations.utils import write_results_to_file
+
+SUCCESS = {"file_name": "a.png", "path": "https://example.com/a.png"}
+FAILURE = {"file_name": "b.png", "reason": "URLが無効です", "path": "https://x/b.png"}
+SKIPPED = {"file_name": "c.png", "key": "test/c.png"}
+
+
+# ----------------------------------
+# ResultSink
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+def test_text_matches_write_results_to_file(tmp_path):
+    """
+    テキスト形式は結果の到着順に関わらず、従来と同じセクション構成で出力されることを確認
+    """
+    expected = tmp_path / "expected.txt"
+    write_results_to_file([SUCCESS], [FAILURE], str(expected), skipped_list=[SKIPPED])
+
+    output = tmp_path / "results.txt"
+    with ResultSink(str(output), with_skipped=True) as sink:
+        sink.skipped(SKIPPED)
+        sink.failure(FAILURE)
+        sink.success(SUCCESS)
+
+    assert output.read_text(encoding="utf-8") == expected.read_text(encoding="utf-8")
+    assert output.read_text(encoding="utf-8") == (
+        "SUCCESS ++++++++++++++++++++++++\n"
+        "a.png\thttps://example.com/a.png\n"
+        "\nFAILURE ------------------------\n"
+        "[b.png] URLが無効です : https://x/b.png\n"
+        "\nSKIPPED ========================\n"
+        "c.png\ttest/c.png\n"
+    )
+
+
+def test_jsonl(tmp_path):
+    """
+    JSONL 形式では1件ごとにステータス付きの1行が出力されることを確認
+    """
+    output = tmp_path / "results.jsonl"
+    with ResultSink(str(output), "jsonl") as sink:
+        sink.success(SUCCESS)
+        sink.failure(FAILURE)
+
+    lines = [
+        json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()
+    ]
+    assert lines == [{"status": "success", **SUCCESS}, {"status": "failure", **FAILURE}]
+
+
+def test_csv(tmp_path):
+    """
+    CSV 形式では共通の列で出力され、使わない列は空になることを確認
+    """
+    output = tmp_path / "results.csv"
+    with ResultSink(str(output), "csv") as sink:
+        sink.success(SUCCESS)
+        sink.skipped(SKIPPED)
+
+    with open(output, encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+
+    assert rows[0]["status"] == "success"
+    assert rows[0]["path"] == SUCCESS["path"]
+    assert rows[0]["reason"] == ""
+    assert rows[1]["key"] == "test/c.png"
+
+
+def test_retry_list(tmp_path):
+    """
+    再実行用リストに入力ファイルと同じ形式（1行1件）で書き出されることを確認
+    """
+    retry_file = tmp_path / "retry.txt"
+    with ResultSink(str(tmp_path / "results.txt"), retry_file=str(retry_file)) as sink:
+        sink.add_retry("test/dir/a.png")
+        sink.add_retry("test/dir/b.png")
+
+    assert retry_file.read_text(encoding="utf-8") == "test/dir/a.png\ntest/dir/b.png\n"
+
+
+def test_concurrent_writes(tmp_path):
+    """
+    複数スレッドから書き出しても行が混ざらないことを確認
+    """
+    output = tmp_path / "results.jsonl"
+
+    with ResultSink(str(output), "jsonl") as sink:
+
+        def work(worker):
+            for i in range(200):
+                sink.success({"file_name": f"{worker}-{i}", "path": "x" * 100})
+
+        threads = [threading.Thread(target=work, args=(w,)) for w in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    lines = output.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 1600
+    assert all(json.loads(line)["status"] == "success" for line in lines)
+
+
+def test_result_path():
+    """
+    出力形式に合わせて拡張子が置き換わることを確認
+    """
+    assert result_path("logs/upload_results.txt", "text") == "logs/upload_results.txt"
+    assert result_path("logs/upload_results.txt", "csv") == "logs/upload_results.csv"
+
+
+# ❌ Error-Test >>>>>>>>>
+
+
+def test_unknown_format(tmp_path):
+    """
+    未対応の出力形式を指定した場合に ValueError となることを確認
+    """
+    with pytest.raises(ValueError):
+        ResultSink(str(tmp_path / "results.xml"), "xml")
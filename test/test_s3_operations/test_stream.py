@@ -0,0 +1,137 @@
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from s3_operations.stream import StreamStage, run_stream
+
+
+def passthrough(chunk):
+    return chunk, []
+
+
+# ----------------------------------
+# run_stream()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+def test_run_stream_passes_items_through_stages():
+    """
+    各段の処理を経た項目と、途中の段で完了した結果がすべて返されることを確認
+    """
+
+    def double(chunk):
+        return [n * 2 for n in chunk], []
+
+    def split_odd(chunk):
+        # 奇数の入力（2倍して 4 で割り切れないもの）はこの段で完了させる
+        return (
+            [("even", n) for n in chunk if n % 4 == 0],
+            [("odd", n) for n in chunk if n % 4 != 0],
+        )
+
+    stages = [
+        StreamStage("double", double, workers=3),
+        StreamStage("split", split_odd, chunk_size=5),
+    ]
+
+    results = list(run_stream(range(20), stages, queue_size=4))
+
+    assert sorted(results) == sorted(
+        [("even" if n % 2 == 0 else "odd", n * 2) for n in range(20)]
+    )
+
+
+def test_run_stream_overlaps_stages():
+    """
+    前の段が全件を終える前に、次の段が処理を始めることを確認
+    """
+    second_started = threading.Event()
+
+    def first(chunk):
+        if chunk == [9]:
+            # 最後の項目は、次の段が始まるまで終えない
+            assert second_started.wait(timeout=5)
+        return chunk, []
+
+    def second(chunk):
+        second_started.set()
+        return chunk, []
+
+    stages = [StreamStage("first", first), StreamStage("second", second)]
+
+    assert sorted(run_stream(range(10), stages, queue_size=2)) == list(range(10))
+
+
+def test_run_stream_applies_backpressure():
+    """
+    後ろの段が詰まっている間は、入力をキューの上限を超えて読み込まないことを確認
+    """
+    release = threading.Event()
+    consumed = []
+
+    def items():
+        for n in range(100):
+            consumed.append(n)
+            yield n
+
+    def blocked(chunk):
+        release.wait(timeout=5)
+        return chunk, []
+
+    results = run_stream(items(), [StreamStage("blocked", blocked)], queue_size=2)
+    thread = threading.Thread(target=lambda: results.__next__())
+    thread.start()
+    time.sleep(0.3)
+
+    # 処理中の1件 + キューの2件 + キューの空きを待っている1件
+    assert len(consumed) <= 4
+    release.set()
+    thread.join()
+    assert len(list(results)) == 99
+
+
+def test_run_stream_records_queue_depth():
+    """
+    取り出しのたびに入力キューの滞留数が記録されることを確認
+    """
+    with patch("s3_operations.stream.record_queue_depth") as record_queue_depth:
+        list(run_stream(range(10), [StreamStage("one", passthrough)], queue_size=4))
+
+    depths = [call.args[0] for call in record_queue_depth.call_args_list]
+    assert depths
+    assert max(depths) <= 4
+
+
+# ❌ Abnormal-Test >>>>>>>>>
+
+
+def test_run_stream_raises_stage_error():
+    """
+    いずれかの段で発生した例外が呼び出し元で送出されることを確認
+    """
+
+    def broken(chunk):
+        if 5 in chunk:
+            raise ValueError("boom")
+        return chunk, []
+
+    stages = [StreamStage("ok", passthrough), StreamStage("broken", broken)]
+
+    with pytest.raises(ValueError, match="boom"):
+        list(run_stream(range(100), stages, queue_size=2))
+
+
+def test_run_stream_raises_input_error():
+    """
+    入力の読み込みで発生した例外が呼び出し元で送出されることを確認
+    """
+
+    def items():
+        yield 1
+        raise OSError("read error")
+
+    with pytest.raises(OSError, match="read error"):
+        list(run_stream(items(), [StreamStage("one", passthrough)]))
@@ -0,0 +1,156 @@
+from unittest.mock import patch
+
+import pytest
+
+from s3_operations.journal import Journal
+from s3_operations.manifest import Manifest, iter_latest_versions
+from s3_operations.pipeline import Session, run_pipeline
+from s3_operations.sync import SyncOperation, normalize_prefix
+
+from config import S3_BUCKET
+
+
+@pytest.fixture
+def resource_dir(tmp_path):
+    files = tmp_path / "files"
+    for relative_path, body in [
+        ("a.png", b"new"),
+        ("dir/b.png", b"same"),
+        ("dir/c.png", b"changed!"),
+    ]:
+        path = files / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(body)
+
+    with (
+        patch("config.RESOURCE", str(files)),
+        patch("upload.check_urls_accessible", lambda urls, **_: [True] * len(urls)),
+    ):
+        yield files
+
+
+def create_operation(tmp_path, **kwargs) -> SyncOperation:
+    operation = SyncOperation(prefix="site", **kwargs)
+    operation.result_file = str(tmp_path / "sync_results.jsonl")
+    operation.journal_file = str(tmp_path / "sync_journal.jsonl")
+    operation.retry_file = str(tmp_path / "sync_retry_list.txt")
+    operation.metrics_file = str(tmp_path / "sync_metrics.jsonl")
+    return operation
+
+
+@pytest.fixture
+def remote_objects(s3_client):
+    s3_client.put_object(Bucket=S3_BUCKET, Key="site/dir/b.png", Body=b"same")
+    s3_client.put_object(Bucket=S3_BUCKET, Key="site/dir/c.png", Body=b"old")
+    s3_client.put_object(Bucket=S3_BUCKET, Key="site/dir/d.png", Body=b"removed")
+    s3_client.put_object(Bucket=S3_BUCKET, Key="other/e.png", Body=b"other")
+
+
+def list_keys(s3_client) -> list[str]:
+    response = s3_client.list_objects_v2(Bucket=S3_BUCKET)
+    return [obj["Key"] for obj in response.get("Contents", [])]
+
+
+# ----------------------------------
+# normalize_prefix()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+@pytest.mark.parametrize(
+    "prefix, expected",
+    [("", ""), ("/", ""), ("site", "site/"), ("/site/dir/", "site/dir/")],
+)
+def test_normalize_prefix(prefix, expected):
+    """
+    先頭の "/" なし・末尾 "/" ありの形にそろえられることを確認
+    """
+    assert normalize_prefix(prefix) == expected
+
+
+# ----------------------------------
+# SyncOperation
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+def test_sync_uploads_and_deletes_diff(
+    s3_client, resource_dir, remote_objects, tmp_path
+):
+    """
+    新規・変更はアップロード、内容が同じものはスキップ、S3 にのみ存在するものは削除されることを確認
+    """
+    operation = create_operation(tmp_path, delete=True)
+
+    run_pipeline(operation, session=Session(s3_client))
+
+    assert list_keys(s3_client) == [
+        "other/e.png",
+        "site/a.png",
+        "site/dir/b.png",
+        "site/dir/c.png",
+    ]
+    body = s3_client.get_object(Bucket=S3_BUCKET, Key="site/dir/c.png")["Body"]
+    assert body.read() == b"changed!"
+
+    records = Journal.load(operation.journal_file)
+    assert {key: record["status"] for key, record in records.items()} == {
+        "site/a.png": "success",
+        "site/dir/b.png": "skipped",
+        "site/dir/c.png": "success",
+        "site/dir/d.png": "success",
+    }
+    assert operation.counts == {"new": 1, "matched": 1, "changed": 1, "deleted": 1}
+
+
+def test_sync_keeps_remote_only_objects_by_default(
+    s3_client, resource_dir, remote_objects, tmp_path
+):
+    """
+    削除が無効の場合、S3 にのみ存在するオブジェクトは削除・記録されないことを確認
+    """
+    operation = create_operation(tmp_path, delete=False)
+
+    run_pipeline(operation, session=Session(s3_client))
+
+    assert "site/dir/d.png" in list_keys(s3_client)
+    assert "site/dir/d.png" not in Journal.load(operation.journal_file)
+    assert operation.counts["deleted"] == 1
+
+
+def test_sync_resume_skips_done_keys(s3_client, resource_dir, tmp_path):
+    """
+    再開時はジャーナルで完了済みのキーをアップロードしないことを確認
+    """
+    run_pipeline(create_operation(tmp_path), session=Session(s3_client))
+    (resource_dir / "a.png").write_bytes(b"modified after first run")
+
+    operation = create_operation(tmp_path)
+    run_pipeline(operation, resume=True, session=Session(s3_client))
+
+    body = s3_client.get_object(Bucket=S3_BUCKET, Key="site/a.png")["Body"]
+    assert body.read() == b"new"
+
+
+def test_sync_with_manifest_skips_listing(
+    s3_client, resource_dir, remote_objects, tmp_path
+):
+    """
+    マニフェストを使う場合は S3 の一覧を取得せずに差分を計算し、結果がマニフェストに反映されることを確認
+    """
+    with Manifest(str(tmp_path / "manifest.sqlite3")) as manifest:
+        manifest.attach(s3_client)
+        manifest.reconcile(iter_latest_versions(s3_client, S3_BUCKET, "site/"), "site/")
+        operation = create_operation(tmp_path, delete=True)
+
+        with patch("s3_operations.sync.iter_objects", side_effect=AssertionError):
+            run_pipeline(operation, session=Session(s3_client, manifest=manifest))
+
+        assert operation.counts == {"new": 1, "matched": 1, "changed": 1, "deleted": 1}
+        assert [key for key, _ in manifest.iter_objects()] == [
+            "site/a.png",
+            "site/dir/b.png",
+            "site/dir/c.png",
+        ]
+        head = s3_client.head_object(Bucket=S3_BUCKET, Key="site/dir/c.png")
+        assert manifest.get("site/dir/c.png").etag == head["ETag"].strip('"')
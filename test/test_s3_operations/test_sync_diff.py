@@ -0,0 +1,72 @@
+from collections import Counter
+
+import pytest
+
+from s3_operations.listing_index import ObjectRecord
+from s3_operations.resource_index import ResourceFile
+from s3_operations.sync_diff import diff_listings
+
+
+def local(key: str, size: int) -> tuple[str, ResourceFile]:
+    return key, ResourceFile(f"/files/{key}", size, 0)
+
+
+def remote(key: str, size: int) -> tuple[str, ObjectRecord]:
+    return key, ObjectRecord(size, "etag", 0.0)
+
+
+# ----------------------------------
+# diff_listings()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+def test_diff_listings_merges_sorted_listings():
+    """
+    キーの昇順で突き合わせ、新規・変更・サイズ一致・削除に振り分けられることを確認
+    """
+    local_files = [local("a.png", 1), local("b.png", 2), local("c.png", 3)]
+    remote_objects = [remote("b.png", 2), remote("bb.png", 1), remote("c.png", 4)]
+    counts = Counter()
+
+    entries = list(diff_listings(local_files, remote_objects, counts))
+
+    assert [(entry.status, entry.key) for entry in entries] == [
+        ("new", "a.png"),
+        ("matched", "b.png"),
+        ("deleted", "bb.png"),
+        ("changed", "c.png"),
+    ]
+    assert entries[0].remote is None
+    assert entries[2].local is None
+    assert entries[3].local.size == 3
+    assert entries[3].remote.size == 4
+    assert counts == {"new": 1, "matched": 1, "deleted": 1, "changed": 1}
+
+
+def test_diff_listings_is_lazy():
+    """
+    一覧を先頭から必要な分だけ読み進めることを確認（全件をメモリに保持しない）
+    """
+    consumed = []
+
+    def local_files():
+        for i in range(10**6):
+            consumed.append(i)
+            yield local(f"{i:07d}.png", 1)
+
+    entries = diff_listings(local_files(), iter([]))
+
+    assert next(entries).key == "0000000.png"
+    assert len(consumed) <= 2
+
+
+# ❌ Abnormal-Test >>>>>>>>>
+
+
+def test_diff_listings_rejects_unsorted_listing():
+    """
+    昇順に並んでいない一覧を渡した場合に ValueError となることを確認
+    """
+    with pytest.raises(ValueError):
+        list(diff_listings([local("b.png", 1), local("a.png", 1)], []))
@@ -0,0 +1,78 @@
+import pytest
+
+from s3_operations.transfer_profiles import (
+    MB,
+    TransferProfiles,
+    get_default_transfer_config,
+)
+
+PROFILES = [
+    {"max_concurrency": 16, "multipart_chunksize_mb": 64, "multipart_threshold_mb": 64},
+    {"max_size_mb": 16, "multipart_threshold_mb": 64, "use_threads": False},
+    {"max_size_mb": 1024, "multipart_chunksize_mb": 16, "max_concurrency": 8},
+]
+
+
+# ----------------------------------
+# TransferProfiles.select()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+@pytest.mark.parametrize(
+    "size, threshold, chunksize, concurrency, use_threads",
+    [
+        (1 * MB, 64 * MB, 8 * MB, 10, False),
+        (16 * MB, 64 * MB, 8 * MB, 10, False),
+        (100 * MB, 8 * MB, 16 * MB, 8, True),
+        (2048 * MB, 64 * MB, 64 * MB, 16, True),
+    ],
+)
+def test_select(size, threshold, chunksize, concurrency, use_threads):
+    """
+    ファイルサイズに応じたプロファイルが選ばれることを確認（記載順に関わらず上限の昇順で評価）
+    """
+    config = TransferProfiles(PROFILES).select(size)
+
+    assert config.multipart_threshold == threshold
+    assert config.multipart_chunksize == chunksize
+    assert config.max_concurrency == concurrency
+    assert config.use_threads is use_threads
+
+
+def test_select_falls_back_to_default():
+    """
+    該当するプロファイルがない場合は s3transfer の既定値となることを確認
+    """
+    profiles = TransferProfiles([{"max_size_mb": 1, "use_threads": False}])
+
+    assert profiles.select(2 * MB) is get_default_transfer_config()
+    assert TransferProfiles().select(1) is get_default_transfer_config()
+
+
+@pytest.mark.parametrize(
+    "profiles, expected",
+    [
+        (PROFILES, 16),
+        ([{"max_size_mb": 1, "max_concurrency": 4}], 10),
+        ([{"max_concurrency": 4}], 4),
+        ([{"use_threads": False}], 1),
+    ],
+)
+def test_max_concurrency(profiles, expected):
+    """
+    コネクションプールの見積もりに使う最大同時接続数を確認
+    """
+    assert TransferProfiles(profiles).max_concurrency == expected
+
+
+# ❌ Abnormal-Test >>>>>>>>>
+
+
+@pytest.mark.parametrize("profiles", [["16MB"], [{"max_size": 16}]])
+def test_invalid_profiles(profiles):
+    """
+    プロファイルの形式が正しくない場合に ValueError となることを確認
+    """
+    with pytest.raises(ValueError):
+        TransferProfiles(profiles)
@@ -0,0 +1,352 @@
+from unittest.mock import patch
+
+import pytest
+
+from s3_operations.journal import Journal
+from s3_operations.rate_control import AdaptiveController
+from s3_operations.result_sink import ResultSink
+from s3_operations.upload import (
+    UploadResources,
+    create_access_url,
+    filter_unchanged_items,
+    record_upload_batch,
+    set_access_url,
+    setup_upload_resources,
+    stream_upload,
+    upload_s3_object,
+)
+
+from config import S3_BUCKET
+
+
+@pytest.fixture
+def upload_items(tmp_path):
+    items = []
+    for i in range(20):
+        resource_file = tmp_path / f"file_{i}.txt"
+        resource_file.write_text(f"content {i}")
+        items.append(
+            {
+                "resource_file": str(resource_file),
+                "key": f"test/dir/file_{i}.txt",
+                "size": resource_file.stat().st_size,
+                "extra_args": {"ContentType": "text/plain"},
+            }
+        )
+    return items
+
+
+# ----------------------------------
+# setup_upload_resources()
+# ----------------------------------
+
+
+@pytest.fixture
+def resource_dir(tmp_path):
+    for relative_path in ["a.png", "dir1/b.png", "dir2/c.png", "dir3/c.png"]:
+        path = tmp_path / "files" / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x" * len(relative_path))
+
+    with patch("config.RESOURCE", str(tmp_path / "files")):
+        yield tmp_path / "files"
+
+
+# ✅ Normal-Test >>>>>>>>>
+
+
+def test_setup_upload_resources_by_name(resource_dir):
+    """
+    ファイル名でリソース全体から探し、サイズ等がセットされることを確認
+    """
+    upload_items, not_found_files = setup_upload_resources(
+        ["test/a.png", "test/x/b.png"]
+    )
+
+    assert not_found_files == []
+    assert [item["resource_file"] for item in upload_items] == [
+        str(resource_dir / "a.png"),
+        str(resource_dir / "dir1" / "b.png"),
+    ]
+    assert upload_items[1]["size"] == len("dir1/b.png")
+    assert upload_items[1]["mtime_ns"] > 0
+    assert upload_items[1]["extra_args"]["ContentType"] == "image/png"
+
+
+def test_setup_upload_resources_mirror(resource_dir):
+    """
+    mirror 指定時にキーの階層と同じパスで探すことを確認
+    """
+    upload_items, not_found_files = setup_upload_resources(
+        ["dir2/c.png", "dir1/a.png"], mirror=True
+    )
+
+    assert [item["resource_file"] for item in upload_items] == [
+        str(resource_dir / "dir2" / "c.png")
+    ]
+    assert not_found_files[0]["file_name"] == "a.png"
+    assert not_found_files[0]["path"] == str(resource_dir / "dir1" / "a.png")
+
+
+# ❌ Abnormal-Test >>>>>>>>>
+
+
+def test_setup_upload_resources_collisions(resource_dir):
+    """
+    ファイル名が衝突するキー・リソースが失敗として報告されることを確認
+    """
+    upload_items, not_found_files = setup_upload_resources(
+        ["x/a.png", "y/a.png", "test/c.png", "test/missing.png"]
+    )
+
+    assert upload_items == []
+    assert [(item["file_name"], item["reason"]) for item in not_found_files] == [
+        ("a.png", "別フォルダのキーとファイル名が重複しています"),
+        ("a.png", "別フォルダのキーとファイル名が重複しています"),
+        ("c.png", "リソース内に同名のファイルが複数あります"),
+        ("missing.png", "アップロード対象のファイルが見つかりません"),
+    ]
+
+
+def test_upload_resources_collision_across_batches(resource_dir):
+    """
+    バッチをまたいだファイル名の衝突が後から現れたキーの失敗として報告されることを確認
+    """
+    upload_resources = UploadResources()
+
+    first_items, first_failures = upload_resources.setup(["x/a.png"])
+    second_items, second_failures = upload_resources.setup(["y/a.png", "z/b.png"])
+
+    assert [item["key"] for item in first_items] == ["x/a.png"]
+    assert first_failures == []
+    assert [item["key"] for item in second_items] == ["z/b.png"]
+    assert (
+        second_failures[0]["reason"] == "別フォルダのキーとファイル名が重複しています"
+    )
+
+
+# ----------------------------------
+# upload_s3_object()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+@pytest.mark.parametrize("max_workers", [1, 8])
+def test_upload_s3_object_keeps_input_order(s3_client, upload_items, max_workers):
+    """
+    並列数に関わらず、結果が入力順で返ることを確認
+    """
+    succeed_items, failure_list = upload_s3_object(
+        s3_client, upload_items, max_workers=max_workers
+    )
+
+    assert failure_list == []
+    assert [item["key"] for item in succeed_items] == [
+        item["key"] for item in upload_items
+    ]
+    assert succeed_items[0] == {"file_name": "file_0.txt", "key": "test/dir/file_0.txt"}
+
+    # 実際にオブジェクトが作成されていることを確認
+    response = s3_client.list_objects_v2(Bucket=S3_BUCKET, Prefix="test/dir/")
+    assert response["KeyCount"] == len(upload_items)
+
+
+def test_upload_s3_object_with_controller(s3_client, upload_items):
+    """
+    コントローラー指定時も結果が入力順で返り、転送量と所要時間が記録されることを確認
+    """
+    controller = AdaptiveController(2, maximum=4, bytes_per_second=10**9, cooldown=0)
+
+    with patch.object(controller, "consume", wraps=controller.consume) as consume:
+        succeed_items, failure_list = upload_s3_object(
+            s3_client, upload_items, controller=controller
+        )
+
+    assert failure_list == []
+    assert [item["key"] for item in succeed_items] == [
+        item["key"] for item in upload_items
+    ]
+    assert consume.called
+    assert controller.limit > 2
+
+
+# ❌ Abnormal-Test >>>>>>>>>
+
+
+@pytest.mark.parametrize("max_workers", [1, 8])
+def test_upload_s3_object_failure(s3_client, upload_items, max_workers):
+    """
+    アップロードに失敗したファイルが failure_list に入力順で記録されることを確認
+    """
+    upload_items[3]["resource_file"] = "./not_exists_3.txt"
+    upload_items[11]["resource_file"] = "./not_exists_11.txt"
+
+    succeed_items, failure_list = upload_s3_object(
+        s3_client, upload_items, max_workers=max_workers
+    )
+
+    assert len(succeed_items) == len(upload_items) - 2
+    assert [item["file_name"] for item in failure_list] == [
+        "file_3.txt",
+        "file_11.txt",
+    ]
+    assert failure_list[0]["reason"].startswith("S3アップロード失敗: ")
+    assert failure_list[0]["path"] == "-"
+
+
+# ----------------------------------
+# filter_unchanged_items()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_filter_unchanged_items(s3_client, upload_items, max_workers):
+    """
+    S3 上と同じ内容のファイルだけがスキップされることを確認
+    """
+    upload_s3_object(s3_client, upload_items[:3])
+
+    # 1件目はサイズ違い、2件目は同サイズで内容違いに変更する
+    with open(upload_items[0]["resource_file"], "a") as f:
+        f.write("changed")
+    with open(upload_items[1]["resource_file"], "w") as f:
+        f.write("CONTENT 1")
+    upload_items[0]["size"] += len("changed")
+
+    changed_items, skipped_list = filter_unchanged_items(
+        s3_client, upload_items, max_workers=max_workers
+    )
+
+    assert skipped_list == [{"file_name": "file_2.txt", "key": "test/dir/file_2.txt"}]
+    assert [item["key"] for item in changed_items] == [
+        item["key"] for item in upload_items if item["key"] != "test/dir/file_2.txt"
+    ]
+
+
+# ----------------------------------
+# set_access_url()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+@patch("s3_operations.upload.check_urls_accessible")
+def test_set_access_url_splits_results(mock_check):
+    """
+    一括検証の結果が入力順のまま成功・失敗に振り分けられることを確認
+    """
+    mock_check.return_value = [True, False, True]
+    s3_objects = [
+        {"file_name": f"file_{i}.png", "key": f"test/file_{i}.png"} for i in range(3)
+    ]
+
+    success_list, failure_list = set_access_url(s3_objects, concurrency=50)
+
+    assert mock_check.call_args.kwargs["concurrency"] == 50
+    assert [item["file_name"] for item in success_list] == ["file_0.png", "file_2.png"]
+    assert failure_list[0]["file_name"] == "file_1.png"
+    assert failure_list[0]["reason"] == "URLが無効です"
+    assert failure_list[0]["path"].endswith("/test/file_1.png")
+
+
+# ----------------------------------
+# record_upload_batch()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+def test_record_upload_batch(tmp_path):
+    """
+    URL検証まで成功したキー・スキップしたキーが完了済み、それ以外が失敗として記録され、
+    失敗したキーだけが再実行用リストに出力されることを確認
+    """
+    s3_keys = ["test/a.png", "test/b.png", "test/c.png", "test/d.png"]
+    succeed_items = [
+        {"file_name": "a.png", "key": "test/a.png"},
+        {"file_name": "b.png", "key": "test/b.png"},
+    ]
+    success_list = [
+        {"file_name": "a.png", "path": create_access_url("test/a.png")},
+    ]
+    failure_list = [
+        {"file_name": "d.png", "reason": "not found", "path": "files/d.png"},
+        {"file_name": "b.png", "reason": "URLが無効です", "path": "-"},
+    ]
+    skipped_list = [{"file_name": "c.png", "key": "test/c.png"}]
+    retry_file = tmp_path / "retry.txt"
+
+    with (
+        Journal(str(tmp_path / "journal.jsonl")) as journal,
+        ResultSink(
+            str(tmp_path / "results.jsonl"), "jsonl", retry_file=str(retry_file)
+        ) as sink,
+    ):
+        record_upload_batch(
+            s3_keys,
+            succeed_items,
+            success_list,
+            failure_list,
+            skipped_list,
+            journal=journal,
+            sink=sink,
+        )
+
+    records = Journal.load(journal.path)
+    assert {key: record["status"] for key, record in records.items()} == {
+        "test/a.png": "success",
+        "test/b.png": "failure",
+        "test/c.png": "skipped",
+        "test/d.png": "failure",
+    }
+    assert records["test/a.png"]["result"] == success_list[0]
+    assert sink.counts == {"success": 1, "failure": 2, "skipped": 1, "retry": 2}
+    assert retry_file.read_text().splitlines() == ["test/b.png", "test/d.png"]
+
+
+# ----------------------------------
+# stream_upload()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+@pytest.mark.parametrize("incremental", [False, True])
+def test_stream_upload_records_each_key(s3_client, resource_dir, tmp_path, incremental):
+    """
+    各段をキューでつないで処理し、キーごとの結果（成功・失敗）が記録されることを確認
+    """
+    s3_keys = ["test/a.png", "test/b.png", "test/c.png", "test/missing.png"]
+    retry_file = tmp_path / "retry.txt"
+
+    with (
+        patch(
+            "s3_operations.upload.check_urls_accessible",
+            lambda urls, **_: [True] * len(urls),
+        ),
+        Journal(str(tmp_path / "journal.jsonl")) as journal,
+        ResultSink(
+            str(tmp_path / "results.jsonl"), "jsonl", retry_file=str(retry_file)
+        ) as sink,
+    ):
+        stream_upload(
+            s3_client,
+            UploadResources(),
+            iter(s3_keys),
+            journal=journal,
+            sink=sink,
+            incremental=incremental,
+            queue_size=1,
+        )
+
+    records = Journal.load(journal.path)
+    assert {key: record["status"] for key, record in records.items()} == {
+        "test/a.png": "success",
+        "test/b.png": "success",
+        "test/c.png": "failure",
+        "test/missing.png": "failure",
+    }
+    assert records["test/a.png"]["result"]["path"] == create_access_url("test/a.png")
+    assert sorted(retry_file.read_text().splitlines()) == [
+        "test/c.png",
+        "test/missing.png",
+    ]
+    s3_client.head_object(Bucket=S3_BUCKET, Key="test/b.png")
@@ -0,0 +1,225 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+
+from s3_operations.url_checker import AsyncUrlChecker, UrlChecker
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    疎通確認用のスタブサーバー。
+
+    - /ok       : HEAD / GET ともに 200
+    - /no-head  : HEAD は 405、Range 付き GET は 206
+    - それ以外  : 404
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def record(self):
+        self.server.requests.append(
+            (self.command, self.path, self.headers.get("Range"))
+        )
+        self.server.client_ports.add(self.client_address[1])
+
+    def reply(self, status: int, body: bytes = b""):
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def do_HEAD(self):
+        self.record()
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if self.path == "/ok":
+            self.reply(200)
+        elif self.path == "/no-head":
+            self.reply(405)
+        else:
+            self.reply(404)
+
+    def do_GET(self):
+        self.record()
+        if self.path == "/no-head" and self.headers.get("Range") == "bytes=0-0":
+            self.reply(206, b"x")
+        else:
+            self.reply(404)
+
+
+class StubServer(ThreadingHTTPServer):
+    # 同時接続のテストで接続待ちがあふれないようにする
+    request_queue_size = 128
+
+
+@pytest.fixture
+def server():
+    httpd = StubServer(("127.0.0.1", 0), StubHandler)
+    httpd.requests = []
+    httpd.client_ports = set()
+    httpd.latency = 0
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def url(server, path: str) -> str:
+    return f"http://127.0.0.1:{server.server_address[1]}{path}"
+
+
+# ----------------------------------
+# UrlChecker.is_accessible()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+def test_is_accessible_uses_head_over_keep_alive(server):
+    """
+    HEAD で確認し、同一ホストへの接続が使い回されることを確認
+    """
+    checker = UrlChecker()
+
+    results = [checker.is_accessible(url(server, "/ok")) for _ in range(5)]
+
+    assert results == [True] * 5
+    assert {command for command, _, _ in server.requests} == {"HEAD"}
+    assert len(server.client_ports) == 1
+
+
+def test_is_accessible_falls_back_to_ranged_get(server):
+    """
+    HEAD が拒否された場合に bytes=0-0 の GET で確認することを確認
+    """
+    checker = UrlChecker()
+
+    assert checker.is_accessible(url(server, "/no-head")) is True
+    assert server.requests == [
+        ("HEAD", "/no-head", None),
+        ("GET", "/no-head", "bytes=0-0"),
+    ]
+
+
+# ❌ Abnormal-Test >>>>>>>>>
+
+
+@patch("s3_operations.url_checker.time.sleep")
+def test_is_accessible_retries_with_backoff(mock_sleep, server):
+    """
+    失敗時に指数バックオフ（上限付き）で待機しながら試行回数分リトライすることを確認
+    """
+    checker = UrlChecker(retries=4, base_delay=1.0, max_delay=3.0)
+
+    with patch("s3_operations.url_checker.random.uniform", side_effect=lambda a, b: b):
+        assert checker.is_accessible(url(server, "/missing")) is False
+
+    assert len(server.requests) == 4
+    assert [c.args[0] for c in mock_sleep.call_args_list] == [1.0, 2.0, 3.0]
+
+
+@patch("s3_operations.url_checker.time.sleep")
+def test_is_accessible_connection_error(mock_sleep):
+    """
+    接続できない場合に False を返すことを確認
+    """
+    checker = UrlChecker(retries=2, timeout=1.0)
+
+    assert checker.is_accessible("http://127.0.0.1:9/unreachable") is False
+    assert mock_sleep.call_count == 1
+
+
+# ----------------------------------
+# AsyncUrlChecker.check()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+def test_async_check_keeps_order(server):
+    """
+    成功・失敗が入力順のまま返ることを確認
+    """
+    urls = [url(server, path) for path in ["/ok", "/missing", "/no-head", "/ok"]]
+    with AsyncUrlChecker(concurrency=4, retries=1) as checker:
+        assert checker.check(urls) == [True, False, True, True]
+
+
+def test_async_check_reuses_connections_between_calls(server):
+    """
+    check() を繰り返し呼び出しても、同一ホストへの接続が使い回されることを確認
+    """
+    with AsyncUrlChecker(concurrency=2, limit_per_host=1) as checker:
+        results = [checker.check([url(server, "/ok")]) for _ in range(3)]
+
+    assert results == [[True]] * 3
+    assert len(server.requests) == 3
+    assert len(server.client_ports) == 1
+
+
+def test_async_close_releases_session(server):
+    """
+    close() でセッションとイベントループが閉じられ、再度の close() も問題ないことを確認
+    """
+    checker = AsyncUrlChecker(concurrency=2)
+    checker.check([url(server, "/ok")])
+    session = checker.session
+
+    checker.close()
+    checker.close()
+
+    assert session.closed
+    assert checker.session is None
+    assert checker.loop is None
+
+
+def test_async_check_is_faster_than_sequential(server):
+    """
+    遅延のあるサーバーに対して、逐次確認より大幅に速いことを確認
+    """
+    server.latency = 0.05
+    urls = [url(server, "/ok") for _ in range(40)]
+
+    started = time.perf_counter()
+    sequential = [UrlChecker().is_accessible(u) for u in urls]
+    sequential_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    with AsyncUrlChecker(concurrency=40, limit_per_host=40) as checker:
+        concurrent = checker.check(urls)
+    concurrent_time = time.perf_counter() - started
+
+    assert sequential == concurrent == [True] * 40
+    assert concurrent_time * 5 < sequential_time
+
+
+def test_async_check_respects_per_host_limit(server):
+    """
+    ホストごとの同時接続数の上限を超えないことを確認
+    """
+    server.latency = 0.05
+    urls = [url(server, "/ok") for _ in range(20)]
+
+    with AsyncUrlChecker(concurrency=20, limit_per_host=4) as checker:
+        assert checker.check(urls) == [True] * 20
+    assert len(server.client_ports) <= 4
+
+
+# ❌ Abnormal-Test >>>>>>>>>
+
+
+@patch("s3_operations.url_checker.asyncio.sleep")
+def test_async_check_retries(mock_sleep, server):
+    """
+    失敗時に試行回数分リトライすることを確認
+    """
+    with AsyncUrlChecker(retries=3) as checker:
+        assert checker.check([url(server, "/missing")]) == [False]
+    assert len(server.requests) == 3
+    assert mock_sleep.call_count == 2
@@ -0,0 +1,51 @@
+from unittest.mock import patch
+
+from s3_operations.utils import create_s3_client, get_s3_client
+
+
+# ----------------------------------
+# create_s3_client()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+def test_create_s3_client_is_cached():
+    """
+    同じ設定では生成済みのクライアントを使い回し、設定が異なれば別のクライアントを生成することを確認
+    """
+    client = create_s3_client(max_pool_connections=50)
+
+    assert create_s3_client(max_pool_connections=50) is client
+    assert create_s3_client(max_pool_connections=60) is not client
+
+
+def test_create_s3_client_applies_settings():
+    """
+    config.yml の s3_client の設定がクライアントに反映されることを確認
+    """
+    with (
+        patch("config.S3_CONNECT_TIMEOUT", 3.0),
+        patch("config.S3_READ_TIMEOUT", 30.0),
+        patch("config.S3_TCP_KEEPALIVE", True),
+        patch("config.S3_RETRY_MODE", "adaptive"),
+        patch("config.S3_MAX_ATTEMPTS", 7),
+        patch("config.S3_MAX_POOL_CONNECTIONS", 10),
+    ):
+        client = create_s3_client(max_pool_connections=4)
+
+    config = client.meta.config
+    assert config.max_pool_connections == 10
+    assert config.connect_timeout == 3.0
+    assert config.read_timeout == 30.0
+    assert config.tcp_keepalive is True
+    assert config.retries == {"mode": "adaptive", "total_max_attempts": 7}
+
+
+def test_create_s3_client_endpoint_url():
+    """
+    エンドポイントを指定した場合はその URL に接続するクライアントになることを確認
+    """
+    client = create_s3_client(endpoint_url="http://127.0.0.1:5000")
+
+    assert client.meta.endpoint_url == "http://127.0.0.1:5000"
+    assert get_s3_client.cache_info().currsize >= 1
@@ -0,0 +1,87 @@
+from unittest.mock import patch
+
+import pytest
+
+from s3_operations.dedupe import Deduplicator
+from s3_operations.utils import iter_batches, iter_lines, iter_unique_lines
+
+LINES = "test/a.png\n\n  test/b.png  \ntest/テスト.png\r\ntest/a.png\n"
+
+
+@pytest.fixture
+def input_file(tmp_path):
+    path = tmp_path / "list.txt"
+    path.write_text(LINES, encoding="utf-8")
+    return str(path)
+
+
+# ----------------------------------
+# iter_lines() / iter_unique_lines()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+@pytest.mark.parametrize("threshold", [0, 1024 * 1024])
+def test_iter_lines(input_file, threshold):
+    """
+    mmap 使用の有無に関わらず、空行を除いた各行が順に返ることを確認
+    """
+    with patch("s3_operations.utils.MMAP_THRESHOLD", threshold):
+        lines = list(iter_lines(input_file))
+
+    assert lines == ["test/a.png", "test/b.png", "test/テスト.png", "test/a.png"]
+
+
+def test_iter_lines_is_lazy(input_file):
+    """
+    読み込んだ行から順に返されることを確認
+    """
+    lines = iter_lines(input_file)
+
+    assert next(lines) == "test/a.png"
+    assert next(lines) == "test/b.png"
+
+
+def test_iter_lines_opens_file_on_first_read(input_file):
+    """
+    ファイルは読み込みを始める時点で開き、読み込まずに破棄した場合は開かないことを確認
+    """
+    with patch("builtins.open", wraps=open) as opened:
+        lines = iter_lines(input_file)
+        assert not opened.called
+
+        assert next(lines) == "test/a.png"
+        assert opened.called
+        lines.close()
+
+
+def test_iter_unique_lines(input_file):
+    """
+    重複行が除外され、件数が記録されることを確認
+    """
+    deduplicator = Deduplicator()
+
+    lines = list(iter_unique_lines(input_file, deduplicator))
+
+    assert lines == ["test/a.png", "test/b.png", "test/テスト.png"]
+    assert deduplicator.duplicates == 1
+
+
+def test_iter_batches():
+    """
+    指定件数ずつのリストに分割されることを確認
+    """
+    batches = list(iter_batches((i for i in range(7)), 3))
+
+    assert batches == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+# ❌ Abnormal-Test >>>>>>>>>
+
+
+def test_iter_lines_missing_file(tmp_path):
+    """
+    ファイルが存在しない場合、呼び出し時点で FileNotFoundError となることを確認
+    """
+    with pytest.raises(FileNotFoundError):
+        iter_lines(str(tmp_path / "missing.txt"))
@@ -0,0 +1,48 @@
+from unittest.mock import patch
+
+import pytest
+
+from s3_operations.utils import check_urls_accessible, get_async_url_checker
+
+
+@pytest.fixture(autouse=True)
+def clear_checkers():
+    get_async_url_checker.cache_clear()
+    yield
+    get_async_url_checker.cache_clear()
+
+
+# ----------------------------------
+# check_urls_accessible()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+@patch("s3_operations.utils.atexit.register")
+@patch("s3_operations.utils.AsyncUrlChecker")
+def test_check_urls_accessible_reuses_async_checker(mock_checker, mock_register):
+    """
+    同じ設定の一括確認ではチェッカーを使い回し、設定ごとに1つだけ生成して終了時に閉じることを確認
+    """
+    mock_checker.return_value.check.side_effect = lambda urls: [True] * len(urls)
+
+    for _ in range(3):
+        assert check_urls_accessible(["a", "b"], concurrency=4) == [True, True]
+    check_urls_accessible(["a"], concurrency=8)
+
+    assert mock_checker.call_count == 2
+    assert mock_checker.return_value.check.call_count == 4
+    assert mock_register.call_count == 2
+    mock_register.assert_called_with(mock_checker.return_value.close)
+
+
+@patch("s3_operations.utils.AsyncUrlChecker")
+@patch("s3_operations.utils.is_url_accessible", return_value=True)
+def test_check_urls_accessible_sequential(mock_accessible, mock_checker):
+    """
+    同時確認数が1の場合は共有の UrlChecker で逐次確認し、非同期のチェッカーを生成しないことを確認
+    """
+    assert check_urls_accessible(["a", "b"], concurrency=1) == [True, True]
+
+    assert mock_accessible.call_count == 2
+    mock_checker.assert_not_called()
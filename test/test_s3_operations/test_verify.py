@@ -0,0 +1,68 @@
+from unittest.mock import patch
+
+from s3_operations.journal import Journal
+from s3_operations.result_sink import ResultSink
+from s3_operations.verify import record_verify_batch, verify_access_urls
+
+# ----------------------------------
+# verify_access_urls()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+@patch("s3_operations.verify.check_urls_accessible")
+def test_verify_access_urls_keeps_input_order(mock_check):
+    """
+    検証結果が入力順のまま、キーごとに成功・失敗として返ることを確認
+    """
+    mock_check.return_value = [False, True, False]
+    s3_keys = ["test/a.png", "test/dir/b.png", "test/c.png"]
+
+    results = verify_access_urls(s3_keys, concurrency=10)
+
+    assert mock_check.call_args.kwargs["concurrency"] == 10
+    assert [(key, status) for key, status, _ in results] == [
+        ("test/a.png", "failure"),
+        ("test/dir/b.png", "success"),
+        ("test/c.png", "failure"),
+    ]
+    assert results[1][2]["file_name"] == "b.png"
+    assert results[1][2]["path"].endswith("/test/dir/b.png")
+    assert results[0][2]["reason"] == "URLが無効です"
+
+
+# ----------------------------------
+# record_verify_batch()
+# ----------------------------------
+# ✅ Normal-Test >>>>>>>>>
+
+
+def test_record_verify_batch(tmp_path):
+    """
+    成功したキーが完了済み、失敗したキーが再実行用リストに記録されることを確認
+    """
+    results = [
+        ("test/a.png", "success", {"file_name": "a.png", "path": "https://x/a.png"}),
+        (
+            "test/b.png",
+            "failure",
+            {"file_name": "b.png", "path": "https://x/b.png", "reason": "NG"},
+        ),
+    ]
+    retry_file = tmp_path / "retry.txt"
+
+    with (
+        Journal(str(tmp_path / "journal.jsonl")) as journal,
+        ResultSink(
+            str(tmp_path / "results.jsonl"), "jsonl", retry_file=str(retry_file)
+        ) as sink,
+    ):
+        record_verify_batch(results, journal=journal, sink=sink)
+
+    records = Journal.load(journal.path)
+    assert {key: record["status"] for key, record in records.items()} == {
+        "test/a.png": "success",
+        "test/b.png": "failure",
+    }
+    assert sink.counts == {"success": 1, "failure": 1, "skipped": 0, "retry": 1}
+    assert retry_file.read_text() == "test/b.png\n"